@@ -0,0 +1,28 @@
+"""add quotes (user_id, created_at DESC) index
+
+Revision ID: 006_quotes_user_created_idx
+Revises: 005_add_product_categories
+Create Date: 2025-11-10
+
+Supports COUNT(*) per user and keyset pagination (created_at, id) of the
+quotes list without scanning every quote of the user.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = '006_quotes_user_created_idx'
+down_revision = '005_add_product_categories'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # CONCURRENTLY: no write lock on quotes while the index is built
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_user_created_at "
+            "ON quotes (user_id, created_at DESC)"
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_quotes_user_created_at")
@@ -0,0 +1,48 @@
+"""add quote list summary columns
+
+Revision ID: 007_quote_summary_columns
+Revises: 006_quotes_user_created_idx
+Create Date: 2025-11-12
+
+Denormalized list fields (total area, first 3 items) so the quotes list
+and dashboard can skip the quote_data JSONB. New and updated quotes fill
+them in DatabaseQuoteService; existing rows are backfilled here.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = '007_quote_summary_columns'
+down_revision = '006_quotes_user_created_idx'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('quotes', sa.Column('total_area_m2', sa.Numeric(precision=12, scale=3), nullable=True))
+    op.add_column('quotes', sa.Column('sample_items', postgresql.JSONB(), nullable=True))
+
+    # Backfill from quote_data (same fields as database.quote_summary_columns)
+    op.execute("""
+        UPDATE quotes q SET
+            total_area_m2 = COALESCE((
+                SELECT SUM(NULLIF(item->>'area_m2', '')::numeric)
+                FROM jsonb_array_elements(COALESCE(q.quote_data->'items', '[]'::jsonb)) AS item
+            ), 0),
+            sample_items = COALESCE((
+                SELECT jsonb_agg(jsonb_build_object(
+                    'window_type', COALESCE(item->>'window_type', 'Desconocido'),
+                    'name', COALESCE(item->>'product_bom_name', 'Producto #' || COALESCE(item->>'product_bom_id', 'N/A')),
+                    'width_cm', trunc(COALESCE(NULLIF(item->>'width_cm', '')::numeric, 0))::int,
+                    'height_cm', trunc(COALESCE(NULLIF(item->>'height_cm', '')::numeric, 0))::int
+                ) ORDER BY position)
+                FROM jsonb_array_elements(COALESCE(q.quote_data->'items', '[]'::jsonb))
+                     WITH ORDINALITY AS items(item, position)
+                WHERE position <= 3
+            ), '[]'::jsonb)
+        WHERE jsonb_typeof(q.quote_data->'items') = 'array'
+    """)
+
+def downgrade():
+    op.drop_column('quotes', 'sample_items')
+    op.drop_column('quotes', 'total_area_m2')
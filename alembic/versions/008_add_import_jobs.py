@@ -0,0 +1,47 @@
+"""add import_jobs table
+
+Revision ID: 008_import_jobs
+Revises: 007_quote_summary_columns
+Create Date: 2025-11-20
+
+Background CSV imports: one row per uploaded file with its status, row
+progress, cancel flag and the success/errors/summary result. Workers claim
+queued rows with a conditional UPDATE, so no external broker is needed.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = '008_import_jobs'
+down_revision = '007_quote_summary_columns'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('filename', sa.Text(), nullable=False),
+        sa.Column('file_path', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='queued'),
+        sa.Column('rows_total', sa.Integer(), nullable=True),
+        sa.Column('rows_processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('result', postgresql.JSONB(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('idx_import_jobs_user_created_at', 'import_jobs',
+                    ['user_id', sa.text('created_at DESC')])
+    op.create_index('idx_import_jobs_status', 'import_jobs', ['status'])
+
+def downgrade():
+    op.drop_index('idx_import_jobs_status', table_name='import_jobs')
+    op.drop_index('idx_import_jobs_user_created_at', table_name='import_jobs')
+    op.drop_table('import_jobs')
@@ -4,29 +4,41 @@ Extracted from main.py as part of TASK-20250929-001
 Contains authentication and authorization dependencies for routes
 """
 
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import Request, Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, User, DatabaseUserService
-from passlib.context import CryptContext
+from database import get_db, get_async_db, User, DatabaseUserService, AsyncDatabaseUserService
+from services.session_cache import session_cache
+from security.password_hashing import pwd_context, password_hasher
 from error_handling.logging_config import get_logger
 from error_handling.error_manager import create_auth_error
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+    """Hash a password using bcrypt (blocking: use hash_password_async in request handlers)"""
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hashed password"""
+    """Verify a password against a hashed password (blocking: use verify_password_async in request handlers)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the bcrypt thread pool"""
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password in the bcrypt thread pool
+    Returns (valid, new_hash); new_hash is set when the stored hash uses an old work factor
+    """
+    return await password_hasher.verify_and_update(plain_password, hashed_password)
+
+
 def get_token_from_request(request: Request) -> Optional[str]:
     """
     Extract authentication token from request
@@ -41,7 +53,7 @@ def get_token_from_request(request: Request) -> Optional[str]:
     return request.cookies.get("access_token")
 
 
-async def get_current_user_flexible(request: Request, db: Session = Depends(get_db)) -> User:
+async def get_current_user_flexible(request: Request, db: AsyncSession = Depends(get_async_db)) -> User:
     """
     Get current user with comprehensive error handling
     Supports both cookie-based (web) and bearer token (API) authentication
@@ -56,9 +68,15 @@ async def get_current_user_flexible(request: Request, db: Session = Depends(get_
         if not token:
             raise create_auth_error("TOKEN_EXPIRED")
 
-        # Use database service with error handling
-        user_service = DatabaseUserService(db)
-        session = user_service.get_session_by_token(token)
+        # Token validated recently: no session/user queries
+        user = session_cache.get(token)
+        if user is not None:
+            request.state.user_id = str(user.id)
+            return user
+
+        # Use database service with error handling (async session: does not block the event loop)
+        user_service = AsyncDatabaseUserService(db)
+        session = await user_service.get_session_by_token(token)
 
         if not session:
             logger.security_event("invalid_token", "Token validation failed",
@@ -66,11 +84,12 @@ async def get_current_user_flexible(request: Request, db: Session = Depends(get_
                                 ip_address=request.client.host if request.client else "unknown")
             raise create_auth_error("TOKEN_EXPIRED")
 
-        user = user_service.get_user_by_id(session.user_id)
+        user = await user_service.get_user_by_id(session.user_id)
         if not user:
             logger.security_event("user_not_found", "User not found for valid session",
                                 user_id=session.user_id)
             raise create_auth_error("UNAUTHORIZED_ACCESS")
+        session_cache.put(token, user, session.expires_at)
 
         # Store user ID in request state for logging
         # CRITICAL FIX: Always store user_id as string to prevent UUID serialization errors
@@ -93,10 +112,41 @@ async def get_current_user_from_cookie(request: Request, db: Session) -> Optiona
     if not token:
         return None
 
+    user = session_cache.get(token)
+    if user is not None:
+        return user
+
     user_service = DatabaseUserService(db)
     session = user_service.get_session_by_token(token)
 
     if not session:
         return None
 
-    return user_service.get_user_by_id(session.user_id)
\ No newline at end of file
+    user = user_service.get_user_by_id(session.user_id)
+    if user:
+        session_cache.put(token, user, session.expires_at)
+    return user
+
+
+async def get_current_user_from_cookie_async(request: Request, db: AsyncSession) -> Optional[User]:
+    """
+    Same as get_current_user_from_cookie for routes that use the async session
+    """
+    token = request.cookies.get("access_token")
+    if not token:
+        return None
+
+    user = session_cache.get(token)
+    if user is not None:
+        return user
+
+    user_service = AsyncDatabaseUserService(db)
+    session = await user_service.get_session_by_token(token)
+
+    if not session:
+        return None
+
+    user = await user_service.get_user_by_id(session.user_id)
+    if user:
+        session_cache.put(token, user, session.expires_at)
+    return user
@@ -4,10 +4,12 @@ HOTFIX-20251001-001: Extracted from main.py lines 932-989
 This presenter handles data processing for quotes_list.html template
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from database import Quote
 from services.product_bom_service_db import ProductBOMServiceDB
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 
 class QuoteListPresenter:
@@ -21,6 +23,52 @@ class QuoteListPresenter:
         self.db = db
         self.product_bom_service = ProductBOMServiceDB(db)
 
+    def present_page(self, quotes: List[Quote]) -> List[Dict[str, Any]]:
+        """Present a whole list page with a fixed number of queries
+
+        Quotes with summary columns need nothing else. For older quotes the
+        deferred quote_data of the page is loaded with one query and every
+        referenced product with one more (or from the catalog cache), instead
+        of a quote_data load and up to 3 product lookups per quote.
+
+        Args:
+            quotes: Quotes of the page (summary projections or full rows)
+
+        Returns:
+            List of template-compatible dictionaries, same order as quotes
+        """
+        legacy_quotes = [quote for quote in quotes if not self._has_summary(quote)]
+        self._load_quote_data(legacy_quotes)
+
+        product_ids = set()
+        for quote in legacy_quotes:
+            for item in (quote.quote_data or {}).get("items", [])[:3]:
+                if isinstance(item, dict) and isinstance(item.get("product_bom_id"), int):
+                    product_ids.add(item["product_bom_id"])
+        if product_ids:
+            self.product_bom_service.load_product_snapshot(product_ids)
+
+        return [self.present(quote) for quote in quotes]
+
+    @staticmethod
+    def _has_summary(quote: Quote) -> bool:
+        return getattr(quote, "sample_items", None) is not None and getattr(quote, "total_area_m2", None) is not None
+
+    def _load_quote_data(self, quotes: List[Quote]) -> None:
+        """Load deferred quote_data of several quotes with one query"""
+        unloaded = {}
+        for quote in quotes:
+            try:
+                if "quote_data" in inspect(quote).unloaded:
+                    unloaded[quote.id] = quote
+            except Exception:
+                continue  # Not an ORM instance (already has its data)
+        if not unloaded:
+            return
+        rows = self.db.query(Quote.id, Quote.quote_data).filter(Quote.id.in_(list(unloaded))).all()
+        for quote_id, quote_data in rows:
+            set_committed_value(unloaded[quote_id], "quote_data", quote_data)
+
     def present(self, quote: Quote) -> Dict[str, Any]:
         """Convert Quote ORM object to template-compatible dictionary
 
@@ -34,20 +82,14 @@ class QuoteListPresenter:
             - Extracted data (sample_items, remaining_items)
         """
         try:
-            # Extract quote data JSON (line 934 from main.py)
-            quote_data = quote.quote_data or {}
-            items = quote_data.get("items", [])
-            items_count = len(items)
-
-            # Calculate total area from items (lines 938-945 from main.py)
-            total_area = 0
-            for item in items:
-                try:
-                    area_value = item.get("area_m2", 0)
-                    if area_value is not None:
-                        total_area += float(area_value)
-                except (ValueError, TypeError):
-                    continue  # Skip invalid area values
+            if self._has_summary(quote):
+                # Denormalized summary columns (filled on save): quote_data is not read,
+                # so deferred-JSONB list queries never load it
+                items_count = quote.items_count or 0
+                total_area = float(quote.total_area_m2)
+                sample_items = list(quote.sample_items)
+            else:
+                items_count, total_area, sample_items = self._summary_from_quote_data(quote)
 
             # Calculate price per m² (line 956 from main.py)
             price_per_m2 = (
@@ -56,9 +98,6 @@ class QuoteListPresenter:
                 else 0
             )
 
-            # Extract sample items with product info (lines 961-986 from main.py)
-            sample_items = self._extract_sample_items(quote_data, items_count)
-
             # Build template-compatible dictionary (lines 947-958 from main.py)
             return {
                 "id": quote.id,
@@ -91,6 +130,27 @@ class QuoteListPresenter:
                 "remaining_items": 0
             }
 
+    def _summary_from_quote_data(self, quote: Quote) -> Tuple[int, float, List[Dict[str, Any]]]:
+        """Items count, total area and sample items for quotes saved before the summary columns"""
+        # Extract quote data JSON (line 934 from main.py)
+        quote_data = quote.quote_data or {}
+        items = quote_data.get("items", [])
+        items_count = len(items)
+
+        # Calculate total area from items (lines 938-945 from main.py)
+        total_area = 0
+        for item in items:
+            try:
+                area_value = item.get("area_m2", 0)
+                if area_value is not None:
+                    total_area += float(area_value)
+            except (ValueError, TypeError):
+                continue  # Skip invalid area values
+
+        # Extract sample items with product info (lines 961-986 from main.py)
+        sample_items = self._extract_sample_items(quote_data, items_count)
+        return items_count, total_area, sample_items
+
     def _extract_sample_items(self, quote_data: dict, items_count: int) -> List[Dict[str, Any]]:
         """Extract first 3 items with product information
 
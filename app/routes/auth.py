@@ -16,8 +16,8 @@ from pydantic import BaseModel, EmailStr
 
 from database import get_db, User, DatabaseUserService
 from app.dependencies.auth import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     get_current_user_flexible
 )
 from config import settings
@@ -54,6 +54,14 @@ class Token(BaseModel):
     user: UserResponse
 
 
+async def _check_password(user_service: DatabaseUserService, user: User, password: str) -> bool:
+    """Verify off the event loop; re-hash with the current work factor when it changed"""
+    valid, new_hash = await verify_password_async(password, user.hashed_password)
+    if valid and new_hash:
+        user_service.update_password_hash(user.id, new_hash)
+    return valid
+
+
 # === WEB PAGE ROUTES (HTML) ===
 @router.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
@@ -88,7 +96,7 @@ async def web_login(
     user_service = DatabaseUserService(db)
     user = user_service.get_user_by_email(email)
 
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await _check_password(user_service, user, password):
         return templates.TemplateResponse("login.html", {
             "request": request,
             "title": "Iniciar Sesión",
@@ -158,7 +166,7 @@ async def web_register(
         })
 
     # Create user with validated data
-    hashed_password = hash_password(validated_password)
+    hashed_password = await hash_password_async(validated_password)
     new_user = user_service.create_user(validated_email, hashed_password, validated_name)
 
     # Auto-login
@@ -221,7 +229,7 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
             detail=f"El email {validated_input.email} ya está registrado"
         )
 
-    hashed_password = hash_password(validated_input.password)
+    hashed_password = await hash_password_async(validated_input.password)
     new_user = user_service.create_user(
         validated_input.email,
         hashed_password,
@@ -244,7 +252,7 @@ async def login_user(login_data: UserLogin, db: Session = Depends(get_db)):
     user_service = DatabaseUserService(db)
     user = user_service.get_user_by_email(login_data.email)
 
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await _check_password(user_service, user, login_data.password):
         raise HTTPException(status_code=401, detail="Email o contraseña incorrectos")
 
     token = secrets.token_urlsafe(32)
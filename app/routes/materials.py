@@ -7,23 +7,29 @@ This module contains all material and product catalog routes including:
 - Product CRUD operations
 - Material-Color relationships
 - CSV import/export for both materials and products
+- Background CSV import jobs (queue, progress, cancel)
 """
 
+import uuid
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, Query, File, UploadFile, status
-from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import (
     get_db,
+    get_async_db,
     User,
-    DatabaseMaterialService,
-    DatabaseColorService,
-    DatabaseUserService
+    AsyncDatabaseMaterialService,
+    AsyncDatabaseColorService,
+    AsyncDatabaseUserService
 )
-from services.product_bom_service_db import ProductBOMServiceDB
+from services.product_bom_service_db import AsyncProductBOMServiceDB
 from services.material_csv_service import MaterialCSVService
 from services.product_bom_csv_service import ProductBOMCSVService
+from services.import_job_service import import_job_runner
 from models.product_bom_models import AppMaterial, AppProduct, MaterialType
 from models.quote_models import WindowType, AluminumLine, GlassType
 from models.color_models import MaterialColorCreate, MaterialColorResponse
@@ -35,7 +41,7 @@ router = APIRouter()
 # === AUTH HELPER FUNCTIONS ===
 # Note: These are temporary until app/dependencies/auth.py is created in TASK-001
 
-async def get_current_user_from_cookie(request: Request, db: Session = Depends(get_db)):
+async def get_current_user_from_cookie(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get current user from cookie - returns None if no valid session"""
     logger = get_logger()
 
@@ -44,13 +50,13 @@ async def get_current_user_from_cookie(request: Request, db: Session = Depends(g
         if not token:
             return None
 
-        user_service = DatabaseUserService(db)
-        session = user_service.get_session_by_token(token)
+        user_service = AsyncDatabaseUserService(db)
+        session = await user_service.get_session_by_token(token)
 
         if not session:
             return None
 
-        user = user_service.get_user_by_id(session.user_id)
+        user = await user_service.get_user_by_id(session.user_id)
         if user and request.state:
             request.state.user_id = str(user.id)
 
@@ -60,7 +66,7 @@ async def get_current_user_from_cookie(request: Request, db: Session = Depends(g
         logger.warning(f"Error getting user from cookie: {str(e)}")
         return None
 
-async def get_current_user_flexible(request: Request, db: Session = Depends(get_db)):
+async def get_current_user_flexible(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get current user from either cookie or bearer token"""
     # Try cookie first
     user = await get_current_user_from_cookie(request, db)
@@ -73,13 +79,13 @@ async def get_current_user_flexible(request: Request, db: Session = Depends(get_
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     token = auth_header.replace("Bearer ", "")
-    user_service = DatabaseUserService(db)
-    session = user_service.get_session_by_token(token)
+    user_service = AsyncDatabaseUserService(db)
+    session = await user_service.get_session_by_token(token)
 
     if not session:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    user = user_service.get_user_by_id(session.user_id)
+    user = await user_service.get_user_by_id(session.user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
@@ -88,77 +94,77 @@ async def get_current_user_flexible(request: Request, db: Session = Depends(get_
 # === MATERIAL CRUD ROUTES ===
 
 @router.get("/api/materials", response_model=List[AppMaterial])
-async def get_all_app_materials(current_user: User = Depends(get_current_user_flexible), db: Session = Depends(get_db)):
+async def get_all_app_materials(current_user: User = Depends(get_current_user_flexible), db: AsyncSession = Depends(get_async_db)):
     """Get all materials from catalog"""
-    service = ProductBOMServiceDB(db)
-    return service.get_all_materials()
+    service = AsyncProductBOMServiceDB(db)
+    return await service.get_all_materials()
 
 @router.post("/api/materials", response_model=AppMaterial, status_code=status.HTTP_201_CREATED)
-async def create_app_material(material: AppMaterial, current_user: User = Depends(get_current_user_flexible), db: Session = Depends(get_db)):
+async def create_app_material(material: AppMaterial, current_user: User = Depends(get_current_user_flexible), db: AsyncSession = Depends(get_async_db)):
     """Create a new material in catalog"""
-    service = ProductBOMServiceDB(db)
-    return service.create_material(material)
+    service = AsyncProductBOMServiceDB(db)
+    return await service.create_material(material)
 
 @router.put("/api/materials/{material_id}", response_model=AppMaterial)
-async def update_app_material(material_id: int, material: AppMaterial, current_user: User = Depends(get_current_user_flexible), db: Session = Depends(get_db)):
+async def update_app_material(material_id: int, material: AppMaterial, current_user: User = Depends(get_current_user_flexible), db: AsyncSession = Depends(get_async_db)):
     """Update an existing material"""
-    service = ProductBOMServiceDB(db)
-    updated = service.update_material(material_id, material)
+    service = AsyncProductBOMServiceDB(db)
+    updated = await service.update_material(material_id, material)
     if not updated:
         raise HTTPException(status_code=404, detail="Material no encontrado")
     return updated
 
 @router.delete("/api/materials/{material_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_app_material(material_id: int, current_user: User = Depends(get_current_user_flexible), db: Session = Depends(get_db)):
+async def delete_app_material(material_id: int, current_user: User = Depends(get_current_user_flexible), db: AsyncSession = Depends(get_async_db)):
     """Delete a material from catalog"""
-    service = ProductBOMServiceDB(db)
-    if not service.delete_material(material_id):
+    service = AsyncProductBOMServiceDB(db)
+    if not await service.delete_material(material_id):
         raise HTTPException(status_code=404, detail="Material no encontrado")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # === PRODUCT CRUD ROUTES ===
 
 @router.get("/api/products", response_model=List[AppProduct])
-async def get_all_app_products(current_user: User = Depends(get_current_user_flexible), db: Session = Depends(get_db)):
+async def get_all_app_products(current_user: User = Depends(get_current_user_flexible), db: AsyncSession = Depends(get_async_db)):
     """Get all products from catalog"""
-    service = ProductBOMServiceDB(db)
-    return service.get_all_products()
+    service = AsyncProductBOMServiceDB(db)
+    return await service.get_all_products()
 
 @router.post("/api/products", response_model=AppProduct, status_code=status.HTTP_201_CREATED)
-async def create_app_product(product: AppProduct, current_user: User = Depends(get_current_user_flexible), db: Session = Depends(get_db)):
+async def create_app_product(product: AppProduct, current_user: User = Depends(get_current_user_flexible), db: AsyncSession = Depends(get_async_db)):
     """Create a new product in catalog"""
-    service = ProductBOMServiceDB(db)
+    service = AsyncProductBOMServiceDB(db)
     # Validar que los material_id en el BOM existan
     for bom_item in product.bom:
-        if not service.get_material(bom_item.material_id):
+        if not await service.get_material(bom_item.material_id):
             raise HTTPException(status_code=400, detail=f"Material con ID {bom_item.material_id} no existe en el catálogo.")
-    return service.create_product(product)
+    return await service.create_product(product)
 
 @router.put("/api/products/{product_id}", response_model=AppProduct)
-async def update_app_product(product_id: int, product: AppProduct, current_user: User = Depends(get_current_user_flexible), db: Session = Depends(get_db)):
+async def update_app_product(product_id: int, product: AppProduct, current_user: User = Depends(get_current_user_flexible), db: AsyncSession = Depends(get_async_db)):
     """Update an existing product"""
-    service = ProductBOMServiceDB(db)
+    service = AsyncProductBOMServiceDB(db)
     # Validar materiales
     for bom_item in product.bom:
-        if not service.get_material(bom_item.material_id):
+        if not await service.get_material(bom_item.material_id):
             raise HTTPException(status_code=400, detail=f"Material con ID {bom_item.material_id} no existe en el catálogo.")
-    updated = service.update_product(product_id, product)
+    updated = await service.update_product(product_id, product)
     if not updated:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
     return updated
 
 @router.delete("/api/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_app_product(product_id: int, current_user: User = Depends(get_current_user_flexible), db: Session = Depends(get_db)):
+async def delete_app_product(product_id: int, current_user: User = Depends(get_current_user_flexible), db: AsyncSession = Depends(get_async_db)):
     """Delete a product from catalog"""
-    service = ProductBOMServiceDB(db)
-    if not service.delete_product(product_id):
+    service = AsyncProductBOMServiceDB(db)
+    if not await service.delete_product(product_id):
         raise HTTPException(status_code=404, detail="Producto no encontrado")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # === CATALOG HTML PAGES ===
 
 @router.get("/materials_catalog", response_class=HTMLResponse)
-async def materials_catalog_page(request: Request, db: Session = Depends(get_db)):
+async def materials_catalog_page(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Materials catalog management page"""
     user = await get_current_user_from_cookie(request, db)
     if not user:
@@ -171,15 +177,15 @@ async def materials_catalog_page(request: Request, db: Session = Depends(get_db)
     })
 
 @router.get("/products_catalog", response_class=HTMLResponse)
-async def products_catalog_page(request: Request, db: Session = Depends(get_db)):
+async def products_catalog_page(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Products catalog management page"""
     user = await get_current_user_from_cookie(request, db)
     if not user:
         return RedirectResponse(url="/login")
 
     # Obtener materiales para los selects del BOM
-    service = ProductBOMServiceDB(db)
-    materials_for_frontend = service.get_all_materials()
+    service = AsyncProductBOMServiceDB(db)
+    materials_for_frontend = await service.get_all_materials()
 
     window_types_display = [
         {"value": wt.value, "label": wt.value.replace('_', ' ').title()} for wt in WindowType
@@ -208,11 +214,11 @@ async def get_material_colors(
     material_id: int,
     available_only: bool = True,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener colores disponibles para un material"""
-    color_service = DatabaseColorService(db)
-    material_colors = color_service.get_material_colors(material_id, available_only)
+    color_service = AsyncDatabaseColorService(db)
+    material_colors = await color_service.get_material_colors(material_id, available_only)
 
     # Formatear respuesta
     result = []
@@ -233,10 +239,10 @@ async def create_material_color(
     material_id: int,
     material_color_data: MaterialColorCreate,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Agregar color a un material con precio específico"""
-    color_service = DatabaseColorService(db)
+    color_service = AsyncDatabaseColorService(db)
 
     # Verificar que el material_id coincida
     if material_color_data.material_id != material_id:
@@ -244,7 +250,7 @@ async def create_material_color(
 
     material_color_dict = material_color_data.model_dump()
     try:
-        return color_service.create_material_color(material_color_dict)
+        return await color_service.create_material_color(material_color_dict)
     except Exception as e:
         if "unique" in str(e).lower():
             raise HTTPException(status_code=400, detail="Esta combinación de material y color ya existe")
@@ -254,12 +260,12 @@ async def create_material_color(
 async def delete_material_color(
     material_color_id: int,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Eliminar relación material-color"""
-    color_service = DatabaseColorService(db)
+    color_service = AsyncDatabaseColorService(db)
 
-    success = color_service.delete_material_color(material_color_id)
+    success = await color_service.delete_material_color(material_color_id)
     if not success:
         raise HTTPException(status_code=404, detail="Relación material-color no encontrada")
 
@@ -268,16 +274,16 @@ async def delete_material_color(
 @router.get("/api/materials/by-category")
 async def get_materials_by_category(
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener materiales agrupados por categoría con sus colores"""
     try:
-        material_service = DatabaseMaterialService(db)
-        color_service = DatabaseColorService(db)
+        material_service = AsyncDatabaseMaterialService(db)
+        color_service = AsyncDatabaseColorService(db)
 
         # Obtener todos los materiales activos
         try:
-            materials = material_service.get_all_materials()
+            materials = await material_service.get_all_materials()
         except Exception as e:
             print(f"Error getting materials: {e}")
             raise HTTPException(status_code=500, detail=f"Error accediendo a materiales: {str(e)}")
@@ -310,7 +316,7 @@ async def get_materials_by_category(
                 categories[category] = []
 
             # Get colors for this material
-            material_colors = color_service.get_material_colors(material.id, available_only=True)
+            material_colors = await color_service.get_material_colors(material.id, available_only=True)
 
             # Format material data
             material_data = {
@@ -355,6 +361,8 @@ async def get_materials_by_category(
         raise HTTPException(status_code=500, detail=f"Error obteniendo materiales: {str(e)}")
 
 # === MATERIAL CSV OPERATIONS ===
+# CSV routes keep the sync session: imports run in the threadpool and exports
+# keep reading it while the response streams
 
 @router.get("/api/materials/csv/export")
 async def export_materials_csv(
@@ -365,14 +373,15 @@ async def export_materials_csv(
     """Export materials to CSV format by category"""
     try:
         csv_service = MaterialCSVService(db)
-        csv_content = csv_service.export_materials_to_csv(category)
+        # Streamed in chunks while rows are read from the database
+        csv_chunks = csv_service.iter_materials_csv(category)
 
         # Generate filename
         category_part = f"_{category}" if category and category != "all" else ""
         filename = f"materials{category_part}.csv"
 
-        return Response(
-            content=csv_content,
+        return StreamingResponse(
+            csv_chunks,
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -391,20 +400,18 @@ async def import_materials_csv(
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="File must be a CSV file")
 
-        # Read file content
-        content = await file.read()
-        csv_content = content.decode('utf-8')
-
-        # Process CSV
+        # Stream the upload (spooled to disk by Starlette) in chunks, off the event loop
         csv_service = MaterialCSVService(db)
-        results = csv_service.import_materials_from_csv(csv_content)
+        results = await run_in_threadpool(csv_service.import_materials_streaming, file.file)
+        summary = results["summary"]
 
         return {
             "message": "CSV import completed",
             "filename": file.filename,
-            "summary": results["summary"],
-            "success_count": len(results["success"]),
-            "error_count": len(results["errors"]),
+            "summary": summary,
+            "success_count": summary["created"] + summary["updated"] + summary["deleted"],
+            "error_count": summary["skipped"] or len(results["errors"]),
+            "truncated": results["truncated"],
             "successes": results["success"],
             "errors": results["errors"]
         }
@@ -448,14 +455,15 @@ async def export_products_csv(
     """Export products to CSV format by window type"""
     try:
         csv_service = ProductBOMCSVService(db)
-        csv_content = csv_service.export_products_to_csv(window_type)
+        # Streamed in chunks while rows are read from the database
+        csv_chunks = csv_service.iter_products_csv(window_type)
 
         # Generate filename
         window_type_part = f"_{window_type}" if window_type and window_type != "all" else ""
         filename = f"products{window_type_part}.csv"
 
-        return Response(
-            content=csv_content,
+        return StreamingResponse(
+            csv_chunks,
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -497,6 +505,47 @@ async def import_products_csv(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error importing products: {str(e)}")
 
+@router.post("/api/products/csv/import/bulk")
+async def import_products_csv_bulk(
+    file: UploadFile = File(..., description="CSV file with products data"),
+    dry_run: bool = Query(False, description="Only return the diff report, do not write anything"),
+    current_user: User = Depends(get_current_user_flexible),
+    db: Session = Depends(get_db)
+):
+    """Import products from CSV in one transaction (formulas and materials checked once per file)
+
+    With dry_run=true nothing is written: the response lists what each row would
+    create, update or delete and which fields change.
+    """
+    try:
+        if not file.filename.endswith('.csv'):
+            raise HTTPException(status_code=400, detail="File must be a CSV file")
+
+        content = await file.read()
+        csv_content = content.decode('utf-8')
+
+        csv_service = ProductBOMCSVService(db)
+        results = await run_in_threadpool(csv_service.import_products_bulk, csv_content, dry_run)
+
+        return {
+            "message": "CSV import preview" if dry_run else "CSV import completed",
+            "filename": file.filename,
+            "dry_run": dry_run,
+            "summary": results["summary"],
+            "success_count": len(results["success"]),
+            "error_count": len(results["errors"]),
+            "successes": results["success"],
+            "errors": results["errors"],
+            "diff": results["diff"]
+        }
+
+    except HTTPException:
+        raise
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File encoding error. Please ensure the CSV file is UTF-8 encoded")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing products: {str(e)}")
+
 @router.get("/api/products/csv/template")
 async def get_products_csv_template(
     window_type: Optional[str] = Query(None, description="Generate template for specific window type"),
@@ -518,4 +567,59 @@ async def get_products_csv_template(
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating template: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error generating template: {str(e)}")
+
+# === BACKGROUND CSV IMPORT JOBS ===
+# Same imports as above, run by the local job runner: the upload returns at once
+# and the result is polled (large catalogs no longer hit the proxy timeout)
+
+async def _submit_import_job(kind: str, file: UploadFile, current_user: User):
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV file")
+    try:
+        job = await run_in_threadpool(import_job_runner.submit, current_user.id, kind, file.filename, file.file)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error queuing import: {str(e)}")
+    job["status_url"] = f"/api/imports/jobs/{job['job_id']}"
+    return job
+
+@router.post("/api/materials/csv/import/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def queue_materials_csv_import(
+    file: UploadFile = File(..., description="CSV file with materials data"),
+    current_user: User = Depends(get_current_user_flexible)
+):
+    """Queue a materials CSV import; poll status_url for progress and the result"""
+    return await _submit_import_job("materials", file, current_user)
+
+@router.post("/api/products/csv/import/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def queue_products_csv_import(
+    file: UploadFile = File(..., description="CSV file with products data"),
+    bulk: bool = Query(False, description="Apply the file in one transaction (as /api/products/csv/import/bulk)"),
+    current_user: User = Depends(get_current_user_flexible)
+):
+    """Queue a products CSV import; poll status_url for progress and the result"""
+    return await _submit_import_job("products_bulk" if bulk else "products", file, current_user)
+
+@router.get("/api/imports/jobs")
+async def list_import_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user_flexible)
+):
+    """Most recent import jobs of the current user (without results)"""
+    return await run_in_threadpool(import_job_runner.list_jobs, current_user.id, limit)
+
+@router.get("/api/imports/jobs/{job_id}")
+async def get_import_job(job_id: uuid.UUID, current_user: User = Depends(get_current_user_flexible)):
+    """Status, rows processed and, once finished, the success/errors/summary result"""
+    job = await run_in_threadpool(import_job_runner.get_job, current_user.id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+@router.post("/api/imports/jobs/{job_id}/cancel")
+async def cancel_import_job(job_id: uuid.UUID, current_user: User = Depends(get_current_user_flexible)):
+    """Cancel a queued job, or stop a running one after its current chunk"""
+    job = await run_in_threadpool(import_job_runner.cancel, current_user.id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
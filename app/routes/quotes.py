@@ -4,29 +4,36 @@ Extracted from main.py as part of TASK-20250929-002
 Handles quote creation, calculation, viewing, editing, and PDF generation
 """
 
-import math
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Optional
+from typing import List, Optional, Union
 
 from fastapi import APIRouter, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, User, DatabaseQuoteService, DatabaseColorService, DatabaseCompanyService, DatabaseMaterialService
+from database import (
+    get_async_db, User, DatabaseQuoteService, DatabaseColorService, DatabaseCompanyService,
+    AsyncDatabaseQuoteService
+)
 from services.product_bom_service_db import ProductBOMServiceDB
-from services.pdf_service import PDFQuoteService
-from app.dependencies.auth import get_current_user_flexible, get_current_user_from_cookie
+from services.product_cost_kernel import empty_material_totals
+from services.quote_item_cache import quote_item_cache, item_cache_key
+from services.pdf_render_service import pdf_render_service, pdf_job_manager, pdf_cache_key
+from services.pdf_zip_export import stream_quote_pdfs_zip
+from app.dependencies.auth import get_current_user_flexible, get_current_user_from_cookie_async
 from security.formula_evaluator import formula_evaluator
 from config import settings
 
 # Import models
 from models.quote_models import (
     WindowType, AluminumLine, GlassType,
-    Client, QuoteRequest, WindowItem, WindowCalculation, QuoteCalculation
+    Client, QuoteRequest, WindowItem, WindowCalculation, QuoteCalculation,
+    BatchQuoteRequest, BatchQuoteResult
 )
-from models.product_bom_models import MaterialUnit, MaterialType
+from models.product_bom_models import MaterialType
 
 # Initialize templates
 templates = Jinja2Templates(directory="templates")
@@ -47,27 +54,8 @@ def round_measurement(measurement: Decimal) -> Decimal:
 
 
 # === CALCULATION FUNCTIONS ===
-def calculate_window_item_from_bom(
-    item: WindowItem,
-    product_bom_service: ProductBOMServiceDB,
-    global_labor_rate_per_m2_override: Optional[Decimal] = None
-) -> WindowCalculation:
-    """
-    Calculate window item cost using dynamic BOM from database
-
-    This is a complex calculation function that:
-    - Retrieves product BOM from database
-    - Evaluates material quantity formulas safely
-    - Applies waste factors
-    - Handles color-specific pricing for profiles
-    - Calculates glass and labor costs
-    """
-
-    product = product_bom_service.get_product(item.product_bom_id)
-    if not product:
-        raise ValueError(f"Producto BOM con ID {item.product_bom_id} no encontrado.")
-
-    # Validate dimensions against product ranges
+def _validate_item_dimensions(item: WindowItem, product) -> None:
+    """Raise ValueError if the item dimensions are outside the product ranges"""
     if not (product.min_width_cm <= item.width_cm <= product.max_width_cm and
             product.min_height_cm <= item.height_cm <= product.max_height_cm):
         raise ValueError(
@@ -76,85 +64,35 @@ def calculate_window_item_from_bom(
             f"{product.min_height_cm}-{product.max_height_cm}cm)."
         )
 
-    # Calculate base measurements for formulas
+
+def _item_formula_variables(item: WindowItem) -> dict:
+    """Base measurements available to BOM quantity formulas"""
     width_m = item.width_cm / Decimal('100')
     height_m = item.height_cm / Decimal('100')
-    area_m2 = width_m * height_m
-    perimeter_m = 2 * (width_m + height_m)
-
-    # Variables available for formulas
-    formula_vars = {
+    return {
         'width_m': width_m,
         'height_m': height_m,
         'width_cm': item.width_cm,
         'height_cm': item.height_cm,
         'quantity': item.quantity,
-        'area_m2': area_m2,
-        'perimeter_m': perimeter_m,
+        'area_m2': width_m * height_m,
+        'perimeter_m': 2 * (width_m + height_m),
     }
 
-    # Initialize detailed costs by material type
-    total_profiles_cost = Decimal('0')
-    total_glass_cost = Decimal('0')
-    total_hardware_cost = Decimal('0')
-    total_consumables_cost = Decimal('0')
-
-    # Calculate material costs from BOM
-    for bom_item in product.bom:
-        material = product_bom_service.get_material(bom_item.material_id)
-        if not material:
-            raise ValueError(
-                f"Material con ID {bom_item.material_id} referenciado en BOM de "
-                f"'{product.name}' no encontrado."
-            )
 
-        try:
-            # Evaluate formula safely to get net quantity for ONE window
-            quantity_net_for_one_window = formula_evaluator.evaluate_formula(
-                bom_item.quantity_formula, formula_vars
-            )
-            if quantity_net_for_one_window < 0:
-                quantity_net_for_one_window = Decimal('0')
-        except Exception as e:
-            raise ValueError(
-                f"Error al evaluar fórmula '{bom_item.quantity_formula}' para material "
-                f"'{material.name}': {e}"
-            )
-
-        # Apply waste factor
-        quantity_with_waste_for_one_window = quantity_net_for_one_window * bom_item.waste_factor
-
-        # Adjust for selling unit if it's a profile
-        final_quantity_to_cost = quantity_with_waste_for_one_window
-        if material.selling_unit_length_m and material.unit == MaterialUnit.ML:
-            num_selling_units = math.ceil(
-                quantity_with_waste_for_one_window / material.selling_unit_length_m
-            )
-            final_quantity_to_cost = Decimal(str(num_selling_units)) * material.selling_unit_length_m
-
-        # Determine price per unit (considering color for profiles)
-        price_per_unit = material.cost_per_unit
-        if bom_item.material_type == MaterialType.PERFIL and item.selected_profile_color:
-            # Look up color-specific price for this material
-            color_service = DatabaseColorService(product_bom_service.db)
-            color_price = color_service.get_material_color_price(
-                material.id, item.selected_profile_color
-            )
-            if color_price:
-                price_per_unit = color_price
-
-        # Cost of this material for ONE window
-        cost_for_this_material_per_product_unit = final_quantity_to_cost * price_per_unit
-
-        # Add to category total, multiplied by quantity of windows in quote item
-        total_cost_for_item_quantity = cost_for_this_material_per_product_unit * item.quantity
-
-        if bom_item.material_type == MaterialType.PERFIL:
-            total_profiles_cost += total_cost_for_item_quantity
-        elif bom_item.material_type == MaterialType.HERRAJE:
-            total_hardware_cost += total_cost_for_item_quantity
-        elif bom_item.material_type == MaterialType.CONSUMIBLE:
-            total_consumables_cost += total_cost_for_item_quantity
+def _finish_window_calculation(
+    item: WindowItem,
+    product,
+    formula_vars: dict,
+    material_totals: dict,
+    product_bom_service: ProductBOMServiceDB,
+    global_labor_rate_per_m2_override: Optional[Decimal] = None
+) -> WindowCalculation:
+    """Add glass and labor costs to the BOM material totals and build the WindowCalculation"""
+    area_m2 = formula_vars['area_m2']
+    total_profiles_cost = material_totals[MaterialType.PERFIL]
+    total_hardware_cost = material_totals[MaterialType.HERRAJE]
+    total_consumables_cost = material_totals[MaterialType.CONSUMIBLE]
 
     # Calculate glass cost - DUAL PATH SUPPORT
     # NEW PATH: Use material ID (database-driven)
@@ -197,11 +135,12 @@ def calculate_window_item_from_bom(
         # DUAL PATH: Include both for backward compatibility
         selected_glass_type=item.selected_glass_type,  # OLD PATH
         selected_glass_material_id=item.selected_glass_material_id,  # NEW PATH
+        selected_profile_color=item.selected_profile_color,
         width_cm=item.width_cm,
         height_cm=item.height_cm,
         quantity=item.quantity,
         area_m2=round_measurement(area_m2),
-        perimeter_m=round_measurement(perimeter_m),
+        perimeter_m=round_measurement(formula_vars['perimeter_m']),
         total_profiles_cost=round_currency(total_profiles_cost),
         total_glass_cost=round_currency(total_glass_cost),
         total_hardware_cost=round_currency(total_hardware_cost),
@@ -216,21 +155,180 @@ def calculate_window_item_from_bom(
     )
 
 
-def calculate_complete_quote(quote_request: QuoteRequest, db: Session) -> QuoteCalculation:
+def calculate_window_item_from_bom(
+    item: WindowItem,
+    product_bom_service: ProductBOMServiceDB,
+    global_labor_rate_per_m2_override: Optional[Decimal] = None
+) -> WindowCalculation:
     """
-    Calculate complete quote using database
+    Calculate window item cost using dynamic BOM from database
 
-    Processes all items in quote request and applies:
-    - Material costs per item
-    - Labor costs per item
-    - Profit margin
-    - Indirect costs
-    - Taxes
+    This is a complex calculation function that:
+    - Retrieves the product's precompiled cost kernel (BOM with compiled formulas)
+    - Evaluates material quantity formulas safely
+    - Applies waste factors
+    - Handles color-specific pricing for profiles
+    - Calculates glass and labor costs
     """
 
-    product_bom_service = ProductBOMServiceDB(db)
+    kernel = product_bom_service.get_cost_kernel(item.product_bom_id)
+    if not kernel:
+        raise ValueError(f"Producto BOM con ID {item.product_bom_id} no encontrado.")
+    product = kernel.product
 
-    calculated_items = []
+    # Validate dimensions against product ranges
+    _validate_item_dimensions(item, product)
+
+    # Variables available for formulas
+    formula_vars = _item_formula_variables(item)
+    # Converted once per item and shared by every BOM line formula
+    formula_names = formula_evaluator.prepare_variables(formula_vars)
+
+    # Detailed costs by material type from the BOM (glass is added afterwards)
+    material_totals = kernel.material_costs(item, formula_names, product_bom_service)
+
+    return _finish_window_calculation(
+        item, product, formula_vars, material_totals, product_bom_service,
+        global_labor_rate_per_m2_override=global_labor_rate_per_m2_override
+    )
+
+
+def calculate_window_item_cached(
+    item: WindowItem,
+    product_bom_service: ProductBOMServiceDB,
+    global_labor_rate_per_m2_override: Optional[Decimal] = None
+) -> WindowCalculation:
+    """calculate_window_item_from_bom, memoized per canonical item + catalog version"""
+    key = item_cache_key(item, global_labor_rate_per_m2_override)
+    cached = quote_item_cache.get(key, item)
+    if cached is not None:
+        return cached
+    window_calc = calculate_window_item_from_bom(
+        item, product_bom_service,
+        global_labor_rate_per_m2_override=global_labor_rate_per_m2_override
+    )
+    quote_item_cache.put(key, window_calc)
+    return window_calc
+
+
+def calculate_window_items_batch(
+    items: List[WindowItem],
+    product_bom_service: ProductBOMServiceDB,
+    labor_rate_overrides: Optional[List[Optional[Decimal]]] = None
+) -> List[Union[WindowCalculation, ValueError]]:
+    """
+    Calculate many window items column-wise, grouped by product
+
+    Same results as calling calculate_window_item_from_bom for each item, but:
+    - Product kernel, materials and labor data are looked up once per product
+    - Each precompiled BOM formula is evaluated once per distinct
+      (width, height, quantity) row instead of once per item
+    - Errors are returned in place of the item's result, so one invalid
+      item does not abort the whole batch
+
+    Args:
+        items: Window items from any number of quotes
+        product_bom_service: Service (ideally with a catalog snapshot loaded for all items)
+        labor_rate_overrides: Optional per-item labor rate override (same order as items)
+
+    Returns:
+        List with a WindowCalculation or the ValueError raised for each item
+    """
+    if labor_rate_overrides is None:
+        labor_rate_overrides = [None] * len(items)
+    results: List[Union[WindowCalculation, ValueError, None]] = [None] * len(items)
+
+    groups: dict = {}
+    for index, item in enumerate(items):
+        groups.setdefault(item.product_bom_id, []).append(index)
+
+    for product_id, indices in groups.items():
+        kernel = product_bom_service.get_cost_kernel(product_id)
+        if not kernel:
+            for index in indices:
+                results[index] = ValueError(f"Producto BOM con ID {product_id} no encontrado.")
+            continue
+        product = kernel.product
+
+        pending = []
+        for index in indices:
+            try:
+                _validate_item_dimensions(items[index], product)
+                pending.append(index)
+            except ValueError as e:
+                results[index] = e
+
+        # Dimension columns: one row per distinct (width, height, quantity)
+        row_by_dimensions: dict = {}
+        row_of_item: dict = {}
+        row_vars: List[dict] = []
+        for index in pending:
+            item = items[index]
+            key = (item.width_cm, item.height_cm, item.quantity)
+            if key not in row_by_dimensions:
+                row_by_dimensions[key] = len(row_vars)
+                row_vars.append(_item_formula_variables(item))
+            row_of_item[index] = row_by_dimensions[key]
+        row_names = [formula_evaluator.prepare_variables(formula_vars) for formula_vars in row_vars]
+
+        material_totals = {index: empty_material_totals() for index in pending}
+
+        for line in kernel.lines:
+            if not pending:
+                break
+            material = product_bom_service.get_material(line.material_id)
+            if not material:
+                error = kernel.material_not_found_error(line)
+                for index in pending:
+                    results[index] = error
+                pending = []
+                break
+
+            # Quantity column for this BOM line (errors kept per row)
+            try:
+                line.check_compiled(material)
+            except ValueError as e:
+                for index in pending:
+                    results[index] = e
+                pending = []
+                break
+            row_quantities = []
+            for formula_names in row_names:
+                try:
+                    row_quantities.append(line.quantity_for_one(material, formula_names))
+                except ValueError as e:
+                    row_quantities.append(e)
+
+            price_by_color: dict = {}
+            still_pending = []
+            for index in pending:
+                item = items[index]
+                quantity_to_cost = row_quantities[row_of_item[index]]
+                if isinstance(quantity_to_cost, ValueError):
+                    results[index] = quantity_to_cost
+                    continue
+                color_id = item.selected_profile_color
+                if color_id not in price_by_color:
+                    price_by_color[color_id] = line.price_per_unit(material, color_id, product_bom_service)
+                if line.bucket is not None:
+                    material_totals[index][line.bucket] += quantity_to_cost * price_by_color[color_id] * item.quantity
+                still_pending.append(index)
+            pending = still_pending
+
+        for index in pending:
+            try:
+                results[index] = _finish_window_calculation(
+                    items[index], product, row_vars[row_of_item[index]], material_totals[index],
+                    product_bom_service, global_labor_rate_per_m2_override=labor_rate_overrides[index]
+                )
+            except ValueError as e:
+                results[index] = e
+
+    return results
+
+
+def _build_quote_calculation(quote_request: QuoteRequest, calculated_items: List[WindowCalculation]) -> QuoteCalculation:
+    """Roll up item results into totals with profit, indirect costs and taxes"""
     materials_subtotal = Decimal('0')
     labor_subtotal = Decimal('0')
 
@@ -247,15 +345,8 @@ def calculate_complete_quote(quote_request: QuoteRequest, db: Session) -> QuoteC
         quote_request.tax_rate if quote_request.tax_rate is not None
         else Decimal(str(settings.default_tax_rate))
     )
-    current_labor_rate_per_m2_override = quote_request.labor_rate_per_m2_override
-
-    for item in quote_request.items:
-        window_calc = calculate_window_item_from_bom(
-            item, product_bom_service,
-            global_labor_rate_per_m2_override=current_labor_rate_per_m2_override
-        )
-        calculated_items.append(window_calc)
 
+    for window_calc in calculated_items:
         materials_subtotal += (
             window_calc.total_profiles_cost +
             window_calc.total_glass_cost +
@@ -273,7 +364,7 @@ def calculate_complete_quote(quote_request: QuoteRequest, db: Session) -> QuoteC
     tax_amount = subtotal_with_overhead * current_tax_rate
     total_final = subtotal_with_overhead + tax_amount
 
-    result = QuoteCalculation(
+    return QuoteCalculation(
         client=quote_request.client,
         items=calculated_items,
         materials_subtotal=round_currency(materials_subtotal),
@@ -284,30 +375,221 @@ def calculate_complete_quote(quote_request: QuoteRequest, db: Session) -> QuoteC
         subtotal_with_overhead=round_currency(subtotal_with_overhead),
         tax_amount=round_currency(tax_amount),
         total_final=round_currency(total_final),
+        # Rates used, so the quote can be re-priced or edited later
+        profit_margin=current_profit_margin,
+        indirect_costs_rate=current_indirect_costs_rate,
+        tax_rate=current_tax_rate,
+        labor_rate_per_m2_override=quote_request.labor_rate_per_m2_override,
         calculated_at=datetime.now(timezone.utc),
         valid_until=datetime.now(timezone.utc) + timedelta(days=30),
         notes=quote_request.notes
     )
 
-    return result
+
+def calculate_complete_quote(quote_request: QuoteRequest, db: Session) -> QuoteCalculation:
+    """
+    Calculate complete quote using database
+
+    Processes all items in quote request and applies:
+    - Material costs per item
+    - Labor costs per item
+    - Profit margin
+    - Indirect costs
+    - Taxes
+
+    Items already priced with the same catalog version are taken from
+    quote_item_cache; only the roll-up is recomputed for them.
+    """
+
+    labor_override = quote_request.labor_rate_per_m2_override
+    keys = [item_cache_key(item, labor_override) for item in quote_request.items]
+    # Items unchanged since the last calculation reuse their cached result
+    calculated_items = [quote_item_cache.get(key, item) for key, item in zip(keys, quote_request.items)]
+    pending = [index for index, window_calc in enumerate(calculated_items) if window_calc is None]
+
+    if pending or quote_request.material_items:
+        product_bom_service = ProductBOMServiceDB(db)
+        # Bulk-load every product, material and color price the quote references
+        # (fixed number of queries instead of one per item / BOM line)
+        product_bom_service.load_catalog_snapshot(
+            [quote_request.items[index] for index in pending], quote_request.material_items
+        )
+
+        for index in pending:
+            window_calc = calculate_window_item_from_bom(
+                quote_request.items[index], product_bom_service,
+                global_labor_rate_per_m2_override=labor_override
+            )
+            quote_item_cache.put(keys[index], window_calc)
+            calculated_items[index] = window_calc
+
+    return _build_quote_calculation(quote_request, calculated_items)
+
+
+def calculate_quotes_batch(
+    quote_requests: List[QuoteRequest],
+    db: Session
+) -> List[Union[QuoteCalculation, ValueError]]:
+    """
+    Calculate many quotes in one pass (bulk re-pricing)
+
+    All items of all requests share one catalog snapshot and are priced
+    column-wise per product (see calculate_window_items_batch). Each quote
+    gets the same result as calculate_complete_quote, or the ValueError that
+    calculate_complete_quote would have raised for it.
+    """
+    product_bom_service = ProductBOMServiceDB(db)
+    all_items = [item for quote_request in quote_requests for item in quote_request.items]
+    product_bom_service.load_catalog_snapshot(
+        all_items,
+        [material_item for quote_request in quote_requests for material_item in quote_request.material_items]
+    )
+
+    item_results = calculate_window_items_batch(
+        all_items, product_bom_service,
+        labor_rate_overrides=[
+            quote_request.labor_rate_per_m2_override
+            for quote_request in quote_requests for _ in quote_request.items
+        ]
+    )
+
+    results = []
+    position = 0
+    for quote_request in quote_requests:
+        quote_items = item_results[position:position + len(quote_request.items)]
+        position += len(quote_request.items)
+        error = next((r for r in quote_items if isinstance(r, ValueError)), None)
+        results.append(error if error is not None else _build_quote_calculation(quote_request, quote_items))
+    return results
+
+
+def _saved_rate(quote_data: dict, key: str, amount: Decimal, base: Decimal) -> Optional[Decimal]:
+    """Rate stored in quote_data, or derived from the saved amounts for older quotes"""
+    if quote_data.get(key) is not None:
+        return Decimal(str(quote_data[key]))
+    if amount is None or not base:
+        return None
+    return (Decimal(str(amount)) / Decimal(str(base))).quantize(Decimal('0.0001'), rounding=ROUND_HALF_UP)
+
+
+def quote_request_from_saved_quote(quote) -> QuoteRequest:
+    """Rebuild the QuoteRequest of a saved Quote (for re-pricing with current catalog prices)"""
+    quote_data = quote.quote_data or {}
+    items = [
+        WindowItem(
+            product_bom_id=saved_item["product_bom_id"],
+            selected_glass_type=saved_item.get("selected_glass_type"),
+            selected_glass_material_id=saved_item.get("selected_glass_material_id"),
+            selected_profile_color=saved_item.get("selected_profile_color"),
+            width_cm=saved_item["width_cm"],
+            height_cm=saved_item["height_cm"],
+            quantity=saved_item["quantity"],
+        )
+        for saved_item in quote_data.get("items", [])
+    ]
+    subtotal_before_overhead = quote_data.get("subtotal_before_overhead")
+    subtotal_with_overhead = quote_data.get("subtotal_with_overhead")
+    return QuoteRequest(
+        client=Client(
+            name=quote.client_name,
+            email=quote.client_email,
+            phone=quote.client_phone,
+            address=quote.client_address
+        ),
+        items=items,
+        notes=quote.notes,
+        profit_margin=_saved_rate(quote_data, "profit_margin", quote_data.get("profit_amount"), subtotal_before_overhead),
+        indirect_costs_rate=_saved_rate(
+            quote_data, "indirect_costs_rate", quote_data.get("indirect_costs_amount"), subtotal_before_overhead
+        ),
+        tax_rate=_saved_rate(quote_data, "tax_rate", quote_data.get("tax_amount"), subtotal_with_overhead),
+        labor_rate_per_m2_override=quote_data.get("labor_rate_per_m2_override"),
+    )
+
+
+def quote_fields_for_db(result: QuoteCalculation) -> dict:
+    """Columns stored by DatabaseQuoteService.create_quote / update_quote"""
+    return {
+        'client_name': result.client.name,
+        'client_email': result.client.email,
+        'client_phone': result.client.phone,
+        'client_address': result.client.address,
+        'total_final': result.total_final,
+        'materials_subtotal': result.materials_subtotal,
+        'labor_subtotal': result.labor_subtotal,
+        'profit_amount': result.profit_amount,
+        'indirect_costs_amount': result.indirect_costs_amount,
+        'tax_amount': result.tax_amount,
+        'items_count': len(result.items),
+        'quote_data': result.model_dump(mode='json'),
+        'notes': result.notes,
+        'valid_until': result.valid_until
+    }
+
+
+def reprice_user_quotes(user_id, db: Session, save: bool = False, page_size: int = 200) -> List[BatchQuoteResult]:
+    """
+    Re-price every saved quote of a user with current catalog prices in one batch
+
+    Args:
+        user_id: Owner of the quotes
+        db: Database session
+        save: Persist the new totals (otherwise only returns them)
+        page_size: Quotes loaded per query
+    """
+    quote_service = DatabaseQuoteService(db)
+    quotes = []
+    offset = 0
+    while True:
+        page = quote_service.get_quotes_by_user(user_id, limit=page_size, offset=offset)
+        quotes.extend(page)
+        if len(page) < page_size:
+            break
+        offset += page_size
+
+    results: List[BatchQuoteResult] = []
+    quote_requests = []
+    request_quotes = []
+    for quote in quotes:
+        try:
+            quote_requests.append(quote_request_from_saved_quote(quote))
+            request_quotes.append(quote)
+        except (ValueError, KeyError, TypeError) as e:
+            results.append(BatchQuoteResult(index=len(results), quote_id=quote.id, error=f"Cotización guardada inválida: {e}"))
+
+    for quote, calculation in zip(request_quotes, calculate_quotes_batch(quote_requests, db)):
+        if isinstance(calculation, ValueError):
+            results.append(BatchQuoteResult(index=len(results), quote_id=quote.id, error=str(calculation)))
+            continue
+        calculation.quote_id = quote.id
+        if save:
+            quote_service.update_quote(quote.id, user_id, quote_fields_for_db(calculation))
+        results.append(BatchQuoteResult(index=len(results), quote_id=quote.id, calculation=calculation))
+
+    return results
+
+
+def _quote_form_catalog(db: Session):
+    """Materials, products and glass materials (NEW PATH - database-driven, served
+    from the catalog cache) for the new / edit quote pages"""
+    product_bom_service = ProductBOMServiceDB(db)
+    return (
+        product_bom_service.get_all_materials(),
+        product_bom_service.get_all_products(),
+        product_bom_service.get_materials_by_category("Vidrio")
+    )
 
 
 # === WEB PAGE ROUTES (HTML) ===
 @router.get("/quotes/new", response_class=HTMLResponse)
-async def new_quote_page(request: Request, db: Session = Depends(get_db)):
+async def new_quote_page(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Display new quote creation page"""
-    user = await get_current_user_from_cookie(request, db)
+    user = await get_current_user_from_cookie_async(request, db)
     if not user:
         return RedirectResponse(url="/login")
 
     # Get products and materials from database
-    product_bom_service = ProductBOMServiceDB(db)
-    materials_for_frontend = product_bom_service.get_all_materials()
-    products_for_frontend = product_bom_service.get_all_products()
-
-    # Query glass materials from database (NEW PATH - database-driven)
-    material_service = DatabaseMaterialService(db)
-    glass_materials_db = material_service.get_materials_by_category("Vidrio")
+    materials_for_frontend, products_for_frontend, glass_materials_db = await db.run_sync(_quote_form_catalog)
 
     # Map enums for frontend
     window_types_display = [
@@ -332,7 +614,6 @@ async def new_quote_page(request: Request, db: Session = Depends(get_db)):
             "display_label": f"{m.name} - ${float(m.cost_per_unit):.2f}/m²"
         }
         for m in glass_materials_db
-        if m.is_active
     ]
 
     # Convert to JSON-compatible format
@@ -360,30 +641,45 @@ async def new_quote_page(request: Request, db: Session = Depends(get_db)):
 @router.get("/quotes", response_class=HTMLResponse)
 async def quotes_list_page(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     page: int = 1,
-    per_page: int = 20
+    per_page: int = 20,
+    cursor: Optional[str] = None
 ):
-    """Display list of user's quotes with pagination"""
-    user = await get_current_user_from_cookie(request, db)
+    """Display list of user's quotes with pagination
+
+    ``cursor`` (keyset on created_at, id) is preferred over ``page``: its cost
+    does not grow with the page number. ``next_cursor`` links the next page.
+    """
+    user = await get_current_user_from_cookie_async(request, db)
     if not user:
         return RedirectResponse(url="/login")
 
-    quote_service = DatabaseQuoteService(db)
+    quote_service = AsyncDatabaseQuoteService(db)
 
     # Get paginated quotes
-    offset = (page - 1) * per_page
-    user_quotes = quote_service.get_quotes_by_user(user.id, limit=per_page, offset=offset)
-
-    # Get total count for pagination
-    all_quotes = quote_service.get_quotes_by_user(user.id, limit=10000)
-    total_quotes = len(all_quotes)
+    next_cursor = None
+    if cursor:
+        try:
+            user_quotes, next_cursor = await quote_service.get_quotes_page_by_user(
+                user.id, limit=per_page, cursor=cursor, summary=True
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        offset = (page - 1) * per_page
+        user_quotes = await quote_service.get_quote_summaries_by_user(user.id, limit=per_page + 1, offset=offset)
+        if len(user_quotes) > per_page:
+            user_quotes = user_quotes[:per_page]
+            next_cursor = DatabaseQuoteService.encode_quote_cursor(user_quotes[-1])
+
+    # Get total count for pagination (COUNT(*) instead of loading every quote)
+    total_quotes = await quote_service.count_quotes_by_user(user.id)
     total_pages = (total_quotes + per_page - 1) // per_page
 
     # HOTFIX-20251001-001: Process quotes for template compatibility
     from app.presenters.quote_presenter import QuoteListPresenter
-    presenter = QuoteListPresenter(db)
-    processed_quotes = [presenter.present(quote) for quote in user_quotes]
+    processed_quotes = await db.run_sync(lambda session: QuoteListPresenter(session).present_page(user_quotes))
 
     from datetime import date
     today = date.today()
@@ -397,6 +693,7 @@ async def quotes_list_page(
         "per_page": per_page,
         "total_quotes": total_quotes,
         "total_pages": total_pages,
+        "next_cursor": next_cursor,
         "today": today
     })
 
@@ -405,15 +702,15 @@ async def quotes_list_page(
 async def view_quote_page(
     quote_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display specific quote details"""
-    user = await get_current_user_from_cookie(request, db)
+    user = await get_current_user_from_cookie_async(request, db)
     if not user:
         return RedirectResponse(url="/login")
 
-    quote_service = DatabaseQuoteService(db)
-    quote = quote_service.get_quote_by_id(quote_id, user.id)
+    quote_service = AsyncDatabaseQuoteService(db)
+    quote = await quote_service.get_quote_by_id(quote_id, user.id)
 
     if not quote:
         raise HTTPException(status_code=404, detail="Cotización no encontrada")
@@ -448,27 +745,21 @@ async def view_quote_page(
 async def edit_quote_page(
     quote_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display quote editing page (QE-001)"""
-    user = await get_current_user_from_cookie(request, db)
+    user = await get_current_user_from_cookie_async(request, db)
     if not user:
         return RedirectResponse(url="/login")
 
-    quote_service = DatabaseQuoteService(db)
-    quote = quote_service.get_quote_by_id(quote_id, user.id)
+    quote_service = AsyncDatabaseQuoteService(db)
+    quote = await quote_service.get_quote_by_id(quote_id, user.id)
 
     if not quote:
         raise HTTPException(status_code=404, detail="Cotización no encontrada")
 
     # Get products and materials for editing
-    product_bom_service = ProductBOMServiceDB(db)
-    materials_for_frontend = product_bom_service.get_all_materials()
-    products_for_frontend = product_bom_service.get_all_products()
-
-    # Query glass materials from database (NEW PATH - database-driven)
-    material_service = DatabaseMaterialService(db)
-    glass_materials_db = material_service.get_materials_by_category("Vidrio")
+    materials_for_frontend, products_for_frontend, glass_materials_db = await db.run_sync(_quote_form_catalog)
 
     # Map enums for frontend
     window_types_display = [
@@ -493,7 +784,6 @@ async def edit_quote_page(
             "display_label": f"{m.name} - ${float(m.cost_per_unit):.2f}/m²"
         }
         for m in glass_materials_db
-        if m.is_active
     ]
 
     # Convert to JSON-compatible
@@ -520,7 +810,7 @@ async def calculate_single_window_item(
     item_request: WindowItem,
     request: Request,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Calculate single window item cost"""
     try:
@@ -528,11 +818,10 @@ async def calculate_single_window_item(
         labor_override_param = request.query_params.get("labor_rate_override")
         labor_override_decimal = Decimal(labor_override_param) if labor_override_param else None
 
-        product_bom_service = ProductBOMServiceDB(db)
-        result = calculate_window_item_from_bom(
-            item_request, product_bom_service,
+        result = await db.run_sync(lambda session: calculate_window_item_cached(
+            item_request, ProductBOMServiceDB(session),
             global_labor_rate_per_m2_override=labor_override_decimal
-        )
+        ))
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -547,31 +836,16 @@ async def calculate_quote_main(
     quote_request: QuoteRequest,
     request: Request,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Calculate complete quote and save to database"""
     try:
-        result = calculate_complete_quote(quote_request, db)
+        result = await db.run_sync(lambda session: calculate_complete_quote(quote_request, session))
 
         # Save quote to database
-        quote_service = DatabaseQuoteService(db)
-        quote_data_for_db = {
-            'client_name': result.client.name,
-            'client_email': result.client.email,
-            'client_phone': result.client.phone,
-            'client_address': result.client.address,
-            'total_final': result.total_final,
-            'materials_subtotal': result.materials_subtotal,
-            'labor_subtotal': result.labor_subtotal,
-            'profit_amount': result.profit_amount,
-            'indirect_costs_amount': result.indirect_costs_amount,
-            'tax_amount': result.tax_amount,
-            'items_count': len(result.items),
-            'quote_data': result.model_dump(mode='json'),
-            'notes': result.notes,
-            'valid_until': result.valid_until
-        }
-        saved_quote = quote_service.create_quote(
+        quote_service = AsyncDatabaseQuoteService(db)
+        quote_data_for_db = quote_fields_for_db(result)
+        saved_quote = await quote_service.create_quote(
             user_id=current_user.id,
             quote_data=quote_data_for_db
         )
@@ -588,74 +862,219 @@ async def calculate_quote_main(
         raise HTTPException(status_code=500, detail=f"Error en el cálculo: {str(e)}")
 
 
+@router.post("/api/quotes/calculate_batch", response_model=List[BatchQuoteResult])
+async def calculate_quotes_batch_endpoint(
+    batch_request: BatchQuoteRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user_flexible),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Calculate many quotes in one pass (not saved); errors are reported per quote"""
+    try:
+        results = []
+        calculations = await db.run_sync(lambda session: calculate_quotes_batch(batch_request.quotes, session))
+        for index, calculation in enumerate(calculations):
+            if isinstance(calculation, ValueError):
+                results.append(BatchQuoteResult(index=index, error=str(calculation)))
+            else:
+                results.append(BatchQuoteResult(index=index, calculation=calculation))
+        return results
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error en el cálculo en lote: {str(e)}")
+
+
+@router.post("/api/quotes/reprice", response_model=List[BatchQuoteResult])
+async def reprice_quotes(
+    request: Request,
+    save: bool = False,
+    current_user: User = Depends(get_current_user_flexible),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Re-price all saved quotes of the current user with current catalog prices (?save=true to persist)"""
+    try:
+        return await db.run_sync(lambda session: reprice_user_quotes(current_user.id, session, save=save))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error recotizando cotizaciones: {str(e)}")
+
+
 @router.post("/quotes/example")
 async def create_example_quote_main(
     request: Request,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create an example quote for testing"""
     # Implementation can be added if needed
     raise HTTPException(status_code=501, detail="Example quote endpoint not yet implemented")
 
 
+def _company_info_for_pdf(db: Session, user_id) -> dict:
+    """Company header data (and logo path) printed on the user's quote PDFs"""
+    company = DatabaseCompanyService(db).get_or_create_company(user_id)
+    return {
+        'name': company.name,
+        'address': company.address,
+        'phone': company.phone,
+        'email': company.email,
+        'website': company.website,
+        'logo_path': f"static/logos/{company.logo_filename}" if company.logo_filename else None
+    }
+
+
+def _pdf_response(pdf_bytes: bytes, quote_id: int) -> Response:
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=cotizacion_{quote_id}.pdf"
+        }
+    )
+
+
+async def _quote_for_pdf(quote_id: int, current_user: User, db: AsyncSession):
+    quote = await AsyncDatabaseQuoteService(db).get_quote_by_id(quote_id, current_user.id)
+    if not quote:
+        raise HTTPException(status_code=404, detail="Cotización no encontrada")
+    return quote, await db.run_sync(_company_info_for_pdf, current_user.id)
+
+
 @router.get("/quotes/{quote_id}/pdf")
 async def generate_quote_pdf(
     quote_id: int,
     request: Request,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Generate PDF for a specific quote"""
-    try:
-        quote_service = DatabaseQuoteService(db)
-        company_service = DatabaseCompanyService(db)
+    """Generate PDF for a specific quote
 
-        # Get quote
-        quote = quote_service.get_quote_by_id(quote_id, current_user.id)
-        if not quote:
-            raise HTTPException(status_code=404, detail="Cotización no encontrada")
+    Served from the PDF cache when the quote, company info and logo are
+    unchanged; otherwise rendered in the PDF process pool (never on the
+    event loop).
+    """
+    try:
+        quote, company_info = await _quote_for_pdf(quote_id, current_user, db)
 
-        # Get company information
-        company = company_service.get_or_create_company(current_user.id)
-        company_info = {
-            'name': company.name,
-            'address': company.address,
-            'phone': company.phone,
-            'email': company.email,
-            'website': company.website,
-            'logo_path': f"static/logos/{company.logo_filename}" if company.logo_filename else None
-        }
+        # The Quote model stores the QuoteCalculation in the quote_data JSONB field
+        pdf_bytes = await pdf_render_service.render_async(quote.quote_data, company_info)
 
-        # Convert Quote database model to QuoteCalculation for PDF service
-        # The Quote model stores data in quote_data JSONB field
-        quote_data_for_pdf = quote.quote_data
-
-        # Generate PDF
-        pdf_service = PDFQuoteService()
-        pdf_bytes = pdf_service.generate_quote_pdf(quote_data_for_pdf, company_info)
-
-        # Return PDF response
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=cotizacion_{quote_id}.pdf"
-            }
-        )
+        return _pdf_response(pdf_bytes, quote_id)
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error generando PDF: {str(e)}")
 
 
+@router.post("/api/quotes/{quote_id}/pdf/jobs", status_code=202)
+async def enqueue_quote_pdf(
+    quote_id: int,
+    current_user: User = Depends(get_current_user_flexible),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Render the quote PDF in the background (for large quotes); poll the returned job"""
+    quote, company_info = await _quote_for_pdf(quote_id, current_user, db)
+    job = await pdf_job_manager.enqueue(current_user.id, quote_id, quote.quote_data, company_info)
+    return job.to_dict()
+
+
+async def _job_for_quote(job_id: str, quote_id: int, current_user: User, db: AsyncSession) -> dict:
+    quote, company_info = await _quote_for_pdf(quote_id, current_user, db)
+    # Job ids are content addresses: a job of another quote (or of an edited
+    # version of this one) never matches
+    status = None
+    if job_id == pdf_cache_key(quote.quote_data, company_info):
+        status = await pdf_job_manager.get_status(job_id, quote_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Trabajo de PDF no encontrado")
+    return status
+
+
+@router.get("/api/quotes/{quote_id}/pdf/jobs/{job_id}")
+async def get_quote_pdf_job(
+    quote_id: int,
+    job_id: str,
+    current_user: User = Depends(get_current_user_flexible),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Status of a background PDF render: queued, running, done or failed"""
+    return await _job_for_quote(job_id, quote_id, current_user, db)
+
+
+@router.get("/api/quotes/{quote_id}/pdf/jobs/{job_id}/download")
+async def download_quote_pdf_job(
+    quote_id: int,
+    job_id: str,
+    current_user: User = Depends(get_current_user_flexible),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Download the PDF of a finished job"""
+    status = await _job_for_quote(job_id, quote_id, current_user, db)
+    pdf_bytes = await pdf_job_manager.get_result(job_id) if status["status"] == "done" else None
+    if pdf_bytes is None:
+        raise HTTPException(status_code=409, detail=f"El PDF aún no está listo (estado: {status['status']})")
+    return _pdf_response(pdf_bytes, quote_id)
+
+
+def _month_range(month: str):
+    """'YYYY-MM' -> [first day of the month, first day of the next month) in UTC"""
+    try:
+        start = datetime.strptime(month, "%Y-%m").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Mes inválido, use el formato AAAA-MM")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+@router.get("/api/quotes/pdf/export")
+async def export_quotes_pdf_zip(
+    client: Optional[str] = None,
+    month: Optional[str] = None,
+    current_user: User = Depends(get_current_user_flexible),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Download the PDFs of every quote of a client and/or a month (YYYY-MM) as one ZIP
+
+    The archive is streamed while the PDFs are rendered in the PDF process
+    pool, so memory stays flat whatever the number of quotes.
+    """
+    if not client and not month:
+        raise HTTPException(status_code=400, detail="Indique un cliente o un mes (AAAA-MM)")
+
+    filters = {"client_name": client}
+    if month:
+        filters["created_from"], filters["created_to"] = _month_range(month)
+
+    # The session stays open while the ZIP streams: each batch of quotes is read through it
+    quote_service = AsyncDatabaseQuoteService(db)
+    total = await quote_service.count_quotes_for_export(current_user.id, **filters)
+    if total == 0:
+        raise HTTPException(status_code=404, detail="No hay cotizaciones para el filtro indicado")
+
+    company_info = await db.run_sync(_company_info_for_pdf, current_user.id)
+    quotes = quote_service.iter_quote_data(current_user.id, **filters)
+    filename = f"cotizaciones_{month or 'cliente'}.zip"
+    return StreamingResponse(
+        stream_quote_pdfs_zip(pdf_render_service, quotes, company_info),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Quote-Count": str(total)
+        }
+    )
+
+
 @router.put("/api/quotes/{quote_id}", response_model=QuoteCalculation)
 async def update_quote(
     quote_id: int,
     quote_request: QuoteRequest,
     request: Request,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update existing quote (QE-001)
 
@@ -666,34 +1085,19 @@ async def update_quote(
         print(f"DEBUG: Item {idx}: glass_type={item.selected_glass_type}, product_bom_id={item.product_bom_id}")
     try:
         # Verify quote exists and belongs to user
-        quote_service = DatabaseQuoteService(db)
-        existing_quote = quote_service.get_quote_by_id(quote_id, current_user.id)
+        quote_service = AsyncDatabaseQuoteService(db)
+        existing_quote = await quote_service.get_quote_by_id(quote_id, current_user.id)
 
         if not existing_quote:
             raise HTTPException(status_code=404, detail="Cotización no encontrada")
 
         # Recalculate with new data
-        result = calculate_complete_quote(quote_request, db)
+        result = await db.run_sync(lambda session: calculate_complete_quote(quote_request, session))
 
         # Update quote in database
-        quote_data_for_db = {
-            'client_name': result.client.name,
-            'client_email': result.client.email,
-            'client_phone': result.client.phone,
-            'client_address': result.client.address,
-            'total_final': result.total_final,
-            'materials_subtotal': result.materials_subtotal,
-            'labor_subtotal': result.labor_subtotal,
-            'profit_amount': result.profit_amount,
-            'indirect_costs_amount': result.indirect_costs_amount,
-            'tax_amount': result.tax_amount,
-            'items_count': len(result.items),
-            'quote_data': result.model_dump(mode='json'),
-            'notes': result.notes,
-            'valid_until': result.valid_until
-        }
+        quote_data_for_db = quote_fields_for_db(result)
 
-        updated_quote = quote_service.update_quote(quote_id, current_user.id, quote_data_for_db)
+        updated_quote = await quote_service.update_quote(quote_id, current_user.id, quote_data_for_db)
 
         if not updated_quote:
             raise HTTPException(status_code=404, detail="Error actualizando cotización")
@@ -717,15 +1121,15 @@ async def get_quote_edit_data(
     quote_id: int,
     request: Request,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get quote data formatted for editing (QE-001)
 
     HOTFIX-20251001-001: Fixed to flatten quote_data JSONB for template compatibility
     """
     try:
-        quote_service = DatabaseQuoteService(db)
-        quote = quote_service.get_quote_by_id(quote_id, current_user.id)
+        quote_service = AsyncDatabaseQuoteService(db)
+        quote = await quote_service.get_quote_by_id(quote_id, current_user.id)
 
         if not quote:
             raise HTTPException(status_code=404, detail="Cotización no encontrada")
@@ -9,15 +9,15 @@ from datetime import datetime, timezone, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import (
-    get_db,
+    get_async_db,
     User,
     WorkOrder,
-    DatabaseUserService,
-    DatabaseQuoteService,
-    DatabaseWorkOrderService
+    AsyncDatabaseUserService,
+    AsyncDatabaseQuoteService,
+    AsyncDatabaseWorkOrderService
 )
 from models.work_order_models import (
     WorkOrderCreate,
@@ -36,7 +36,7 @@ router = APIRouter()
 # === AUTH HELPER FUNCTIONS ===
 # Note: These are temporary until app/dependencies/auth.py is created in TASK-001
 
-async def get_current_user_from_cookie(request: Request, db: Session = Depends(get_db)):
+async def get_current_user_from_cookie(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get current user from cookie - returns None if no valid session"""
     logger = get_logger()
 
@@ -45,13 +45,13 @@ async def get_current_user_from_cookie(request: Request, db: Session = Depends(g
         if not token:
             return None
 
-        user_service = DatabaseUserService(db)
-        session = user_service.get_session_by_token(token)
+        user_service = AsyncDatabaseUserService(db)
+        session = await user_service.get_session_by_token(token)
 
         if not session:
             return None
 
-        user = user_service.get_user_by_id(session.user_id)
+        user = await user_service.get_user_by_id(session.user_id)
         if user and request.state:
             request.state.user_id = str(user.id)
 
@@ -61,7 +61,7 @@ async def get_current_user_from_cookie(request: Request, db: Session = Depends(g
         logger.warning(f"Error getting user from cookie: {str(e)}")
         return None
 
-async def get_current_user_flexible(request: Request, db: Session = Depends(get_db)):
+async def get_current_user_flexible(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get current user from either cookie or bearer token"""
     # Try cookie first
     user = await get_current_user_from_cookie(request, db)
@@ -74,13 +74,13 @@ async def get_current_user_flexible(request: Request, db: Session = Depends(get_
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     token = auth_header.replace("Bearer ", "")
-    user_service = DatabaseUserService(db)
-    session = user_service.get_session_by_token(token)
+    user_service = AsyncDatabaseUserService(db)
+    session = await user_service.get_session_by_token(token)
 
     if not session:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    user = user_service.get_user_by_id(session.user_id)
+    user = await user_service.get_user_by_id(session.user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
@@ -89,7 +89,7 @@ async def get_current_user_flexible(request: Request, db: Session = Depends(get_
 # === HTML ROUTES (User Interface) ===
 
 @router.get("/work-orders", response_class=HTMLResponse)
-async def work_orders_list_page(request: Request, db: Session = Depends(get_db)):
+async def work_orders_list_page(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Work orders list page - QTO-001"""
     user = await get_current_user_from_cookie(request, db)
     if not user:
@@ -102,15 +102,15 @@ async def work_orders_list_page(request: Request, db: Session = Depends(get_db))
     })
 
 @router.get("/work-orders/{work_order_id}", response_class=HTMLResponse)
-async def work_order_detail_page(request: Request, work_order_id: int, db: Session = Depends(get_db)):
+async def work_order_detail_page(request: Request, work_order_id: int, db: AsyncSession = Depends(get_async_db)):
     """Work order detail page - QTO-001"""
     user = await get_current_user_from_cookie(request, db)
     if not user:
         return RedirectResponse(url="/login")
 
     # Get work order details
-    work_order_service = DatabaseWorkOrderService(db)
-    work_order = work_order_service.get_work_order_by_id(work_order_id, user.id)
+    work_order_service = AsyncDatabaseWorkOrderService(db)
+    work_order = await work_order_service.get_work_order_by_id(work_order_id, user.id)
 
     if not work_order:
         raise HTTPException(status_code=404, detail="Orden de trabajo no encontrada")
@@ -128,7 +128,7 @@ async def work_order_detail_page(request: Request, work_order_id: int, db: Sessi
 async def create_work_order_from_quote(
     work_order_request: WorkOrderCreate,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Convert a quote to a work order - QTO-001"""
     try:
@@ -136,11 +136,11 @@ async def create_work_order_from_quote(
         logger.info(f"Creating work order from quote {work_order_request.quote_id} for user {current_user.id}")
 
         # Get the quote service and work order service
-        quote_service = DatabaseQuoteService(db)
-        work_order_service = DatabaseWorkOrderService(db)
+        quote_service = AsyncDatabaseQuoteService(db)
+        work_order_service = AsyncDatabaseWorkOrderService(db)
 
         # Verify the quote exists and belongs to the user
-        quote = quote_service.get_quote_by_id(work_order_request.quote_id, current_user.id)
+        quote = await quote_service.get_quote_by_id(work_order_request.quote_id, current_user.id)
         if not quote:
             raise HTTPException(
                 status_code=404,
@@ -148,7 +148,7 @@ async def create_work_order_from_quote(
             )
 
         # Create work order from quote
-        work_order = work_order_service.create_work_order_from_quote(quote)
+        work_order = await work_order_service.create_work_order_from_quote(quote)
 
         # Update additional fields if provided
         if work_order_request.production_notes:
@@ -170,8 +170,8 @@ async def create_work_order_from_quote(
         # Commit changes if any updates were made
         if (work_order_request.production_notes or work_order_request.delivery_instructions or
             work_order_request.priority != WorkOrderPriority.NORMAL or work_order_request.estimated_delivery):
-            db.commit()
-            db.refresh(work_order)
+            await db.commit()
+            await db.refresh(work_order)
 
         logger.info(f"Work order {work_order.order_number} created successfully")
         return work_order
@@ -187,12 +187,12 @@ async def create_work_order_from_quote(
 async def get_work_orders(
     limit: int = Query(50, ge=1, le=100, description="Number of work orders to retrieve"),
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of work orders for current user"""
     try:
-        work_order_service = DatabaseWorkOrderService(db)
-        work_orders = work_order_service.get_work_orders_by_user(current_user.id, limit)
+        work_order_service = AsyncDatabaseWorkOrderService(db)
+        work_orders = await work_order_service.get_work_order_summaries_by_user(current_user.id, limit)
         return work_orders
 
     except Exception as e:
@@ -204,12 +204,12 @@ async def get_work_orders(
 async def get_work_order(
     work_order_id: int,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific work order by ID"""
     try:
-        work_order_service = DatabaseWorkOrderService(db)
-        work_order = work_order_service.get_work_order_by_id(work_order_id, current_user.id)
+        work_order_service = AsyncDatabaseWorkOrderService(db)
+        work_order = await work_order_service.get_work_order_by_id(work_order_id, current_user.id)
 
         if not work_order:
             raise HTTPException(status_code=404, detail="Work order not found or access denied")
@@ -228,15 +228,15 @@ async def update_work_order_status(
     work_order_id: int,
     status_update: WorkOrderStatusUpdate,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update work order status"""
     try:
         logger = get_logger()
-        work_order_service = DatabaseWorkOrderService(db)
+        work_order_service = AsyncDatabaseWorkOrderService(db)
 
         # Update the work order status
-        work_order = work_order_service.update_work_order_status(
+        work_order = await work_order_service.update_work_order_status(
             work_order_id,
             current_user.id,
             status_update.status,
@@ -261,15 +261,15 @@ async def update_work_order(
     work_order_id: int,
     work_order_update: WorkOrderUpdate,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update work order details"""
     try:
         logger = get_logger()
-        work_order_service = DatabaseWorkOrderService(db)
+        work_order_service = AsyncDatabaseWorkOrderService(db)
 
         # Get the work order first
-        work_order = work_order_service.get_work_order_by_id(work_order_id, current_user.id)
+        work_order = await work_order_service.get_work_order_by_id(work_order_id, current_user.id)
         if not work_order:
             raise HTTPException(status_code=404, detail="Work order not found or access denied")
 
@@ -277,7 +277,7 @@ async def update_work_order(
         updated = False
 
         if work_order_update.status is not None:
-            work_order = work_order_service.update_work_order_status(
+            work_order = await work_order_service.update_work_order_status(
                 work_order_id, current_user.id, work_order_update.status, work_order_update.notes
             )
             updated = True
@@ -310,8 +310,8 @@ async def update_work_order(
 
         # Commit if any updates were made
         if updated:
-            db.commit()
-            db.refresh(work_order)
+            await db.commit()
+            await db.refresh(work_order)
             logger.info(f"Work order {work_order.order_number} updated successfully")
 
         return work_order
@@ -327,20 +327,20 @@ async def update_work_order(
 async def delete_work_order(
     work_order_id: int,
     current_user: User = Depends(get_current_user_flexible),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a work order"""
     try:
         logger = get_logger()
-        work_order_service = DatabaseWorkOrderService(db)
+        work_order_service = AsyncDatabaseWorkOrderService(db)
 
         # Get the work order first to verify ownership
-        work_order = work_order_service.get_work_order_by_id(work_order_id, current_user.id)
+        work_order = await work_order_service.get_work_order_by_id(work_order_id, current_user.id)
         if not work_order:
             raise HTTPException(status_code=404, detail="Work order not found or access denied")
 
         # Delete the work order
-        success = work_order_service.delete_work_order(work_order_id, current_user.id)
+        success = await work_order_service.delete_work_order(work_order_id, current_user.id)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to delete work order")
 
@@ -15,9 +15,32 @@ class Settings(BaseSettings):
     db_port: int = 5432
     db_name: str = "ventanas_db"
     
+    # Connection pools of engine_registry: one sync and one async engine per database URL.
+    # Each uvicorn worker opens at most
+    #   (db_pool_size + db_max_overflow) + (db_async_pool_size + db_async_max_overflow) = 30
+    # connections per database: keep workers * 30 below PostgreSQL max_connections.
+    # Sync pool: get_db routes, audit writer, migrations, health checks
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    # Async pool (get_async_db): most request handlers
+    db_async_pool_size: int = 10
+    db_async_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_connect_timeout_seconds: int = 10
+    # PostgreSQL statement_timeout per connection (0 = no limit)
+    db_statement_timeout_ms: int = 30000
+    
     # Security
     secret_key: str = "your-secret-key-here-change-in-production"
     session_expire_hours: int = 2
+    # bcrypt work factor (existing hashes are upgraded on login) and hashing threads per worker
+    password_bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    # Per-IP rate limit state: "memory" (each worker) or "sqlite" (one limit shared by the host's workers)
+    rate_limit_backend: str = "memory"
+    rate_limit_sqlite_path: str = "cache/rate_limit.sqlite3"
     
     # Application
     app_name: str = "Sistema de Cotización de Ventanas"
@@ -30,7 +53,48 @@ class Settings(BaseSettings):
     default_profit_margin: float = 0.25
     default_indirect_costs: float = 0.15
     default_tax_rate: float = 0.16
-    
+
+    # Catalog cache (materials, products, color/glass prices)
+    catalog_cache_ttl_seconds: int = 60
+    catalog_cache_max_entries: int = 2048
+    # Per-item quote calculation results (expire with the catalog TTL)
+    quote_item_cache_max_entries: int = 4096
+    # Validated session tokens (skips the session + user queries; 0 disables)
+    session_cache_ttl_seconds: int = 30
+    session_cache_max_entries: int = 10000
+
+    # PDF rendering (process pool + content-addressed disk cache)
+    pdf_render_workers: int = 2
+    pdf_render_max_pending: int = 8
+    pdf_cache_dir: str = "cache/pdf"
+    pdf_cache_max_bytes: int = 256 * 1024 * 1024
+
+    # CSV imports: rows validated and written per transaction
+    csv_import_chunk_size: int = 1000
+    # Background CSV import jobs (import_jobs table + uploads kept on disk until run)
+    import_job_workers: int = 1
+    import_job_upload_dir: str = "cache/imports"
+    # A running job without progress for this long is considered interrupted
+    import_job_stale_seconds: int = 600
+
+    # Audit trail writer: events are queued and written by a background thread in batches
+    audit_batch_size: int = 100
+    audit_flush_interval_ms: int = 500
+    audit_queue_max_events: int = 10000
+    # How long log_event waits for room in a full queue before dropping the event
+    audit_queue_put_timeout_ms: int = 50
+    # PostgreSQL: monthly audit_logs partitions created ahead of time
+    audit_partition_months_ahead: int = 3
+    # Daily statistics rollups: a day is rolled up once it ended this long ago (must exceed
+    # the writer's worst lag: flush interval, retried batches, other workers' queues)
+    audit_rollup_grace_seconds: int = 3600
+    # Rolled-up days compared with the raw events on each refresh (late events are re-rolled)
+    audit_rollup_recheck_days: int = 7
+    # Bulk checksum verification: rows per batch, pool processes, resume checkpoint
+    audit_verify_batch_size: int = 5000
+    audit_verify_workers: int = 2
+    audit_verify_checkpoint_path: str = "cache/audit_verify_checkpoint.json"
+
     # Supabase (si se usa)
     supabase_url: Optional[str] = None
     supabase_key: Optional[str] = None
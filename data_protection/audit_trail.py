@@ -10,25 +10,35 @@ Features:
 - User action tracking with context
 - Compliance reporting capabilities
 - Real-time audit event streaming
+- Monthly range partitions on PostgreSQL (retention drops whole partitions)
+- Parallel, resumable checksum verification of the whole trail (audit_verification.py)
 - Integration with existing logging system
 """
 
 import json
 import uuid
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Any, Optional, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 import hashlib
+import queue
 import threading
+import time
 from collections import defaultdict
 
-from sqlalchemy import Column, String, DateTime, Text, Boolean, Integer, create_engine, MetaData, Table
+from sqlalchemy import (
+    Column, String, DateTime, Date, Text, Boolean, Integer, Index, MetaData, Table, func, literal, or_, select,
+    text, union_all
+)
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
+from config import settings
 from error_handling.logging_config import get_logger
 from error_handling.error_manager import create_database_error
+from engine_registry import get_engine
 
 
 class AuditAction(str, Enum):
@@ -90,6 +100,241 @@ class AuditEvent:
     checksum: Optional[str] = None
 
 
+CHECKSUM_FIELDS = ("event_id", "timestamp", "user_id", "action", "resource_type", "resource_id", "success",
+                   "changes", "old_values", "new_values")
+
+
+def audit_event_checksum(values: Dict[str, Any]) -> str:
+    """SHA-256 checksum of an event's CHECKSUM_FIELDS (action as its string value)
+
+    Module level so bulk verification can run it in pool processes.
+    """
+    # Create deterministic string representation
+    checksum_data = {field: values[field] for field in CHECKSUM_FIELDS}
+    checksum_data["timestamp"] = values["timestamp"].isoformat()
+    
+    # Convert to JSON string with sorted keys for consistency
+    json_str = json.dumps(checksum_data, sort_keys=True, default=str)
+    
+    # Calculate SHA-256 hash
+    return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+
+
+def _month_start(value: Union[date, datetime]) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+
+def audit_partition_name(month: date) -> str:
+    """Name of the audit_logs partition holding one calendar month"""
+    return f"audit_logs_y{month.year:04d}m{month.month:02d}"
+
+
+def audit_partition_month(name: str) -> Optional[date]:
+    """Month of a partition named by audit_partition_name (None for other tables, e.g. the default one)"""
+    prefix = "audit_logs_y"
+    if not name.startswith(prefix) or len(name) != len(prefix) + 7 or name[len(prefix) + 4] != "m":
+        return None
+    try:
+        return date(int(name[len(prefix):len(prefix) + 4]), int(name[-2:]), 1)
+    except ValueError:
+        return None
+
+
+def expired_partition_months(months: List[date], cutoff: datetime) -> List[date]:
+    """Partitions whose whole month is older than cutoff (they can be dropped instead of deleted from)"""
+    return sorted(month for month in months if datetime.combine(_next_month(month), datetime.min.time()) <= cutoff)
+
+
+class _FlushRequest:
+    """Queue marker: write everything queued before it, then signal"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class AuditEventWriter:
+    """
+    Background writer for audit events
+
+    Callers only enqueue rows. A daemon thread drains the bounded queue and
+    writes a batch every ``batch_size`` events or ``flush_interval_ms`` after
+    the oldest unwritten event, whichever comes first, as one executemany
+    INSERT over a connection it keeps open. A failed batch is kept and
+    retried after the interval. When the queue is full, submit() waits up to
+    ``put_timeout_ms`` and then drops the event; both are counted in the stats.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        table: Table,
+        batch_size: int = settings.audit_batch_size,
+        flush_interval_ms: int = settings.audit_flush_interval_ms,
+        max_queue: int = settings.audit_queue_max_events,
+        put_timeout_ms: int = settings.audit_queue_put_timeout_ms,
+        before_write: Optional[Callable[[Connection, List[Dict[str, Any]]], None]] = None
+    ):
+        self.engine = engine
+        self.table = table
+        self.before_write = before_write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.put_timeout = put_timeout_ms / 1000
+        self.logger = get_logger()
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._conn: Optional[Connection] = None
+        self._retry_at = 0.0
+        self._unwritten = 0  # Rows taken off the queue by the thread but not yet written
+        
+        self._stats_lock = threading.Lock()
+        self._stats = defaultdict(int)
+    
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """Queue one audit row; returns False if it was dropped because the queue stayed full"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["queue_full_waits"] += 1
+            try:
+                self._queue.put(row, timeout=self.put_timeout)
+            except queue.Full:
+                with self._stats_lock:
+                    self._stats["dropped"] += 1
+                return False
+        
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._stats["enqueued"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+        return True
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every row queued so far has been written (or its write failed)"""
+        with self._thread_lock:
+            running = self._thread is not None and self._thread.is_alive()
+        if not running:
+            return True
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+    
+    def close(self, timeout: Optional[float] = 30):
+        """Write everything still queued and stop the writer thread"""
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {
+            'pending_events': self._queue.qsize() + self._unwritten,
+            'batch_size': self.batch_size,
+            'flush_interval_ms': int(self.flush_interval * 1000),
+            'max_queue': self.max_queue,
+            'enqueued': stats.get('enqueued', 0),
+            'written': stats.get('written', 0),
+            'dropped': stats.get('dropped', 0),
+            'queue_full_waits': stats.get('queue_full_waits', 0),
+            'max_queue_depth': stats.get('max_queue_depth', 0),
+            'flushes': stats.get('flushes', 0),
+            'failed_flushes': stats.get('failed_flushes', 0),
+            'last_flush_ms': stats.get('last_flush_ms', 0),
+        }
+    
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        batch: List[Dict[str, Any]] = []
+        deadline: Optional[float] = None  # When the oldest unwritten row is due
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if item is _STOP:
+                self._write(batch)
+                self._close_connection()
+                return
+            if isinstance(item, _FlushRequest):
+                batch = self._write(batch)
+                item.done.set()
+            elif item is not None:
+                batch.append(item)
+                self._unwritten = len(batch)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size or time.monotonic() < self._retry_at:
+                    continue
+                batch = self._write(batch)
+            else:
+                batch = self._write(batch)
+            deadline = time.monotonic() + self.flush_interval if batch else None
+    
+    def _write(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert rows in one executemany; returns the rows still unwritten"""
+        if not rows:
+            return rows
+        
+        start = time.perf_counter()
+        try:
+            if self._conn is None:
+                self._conn = self.engine.connect()
+            if self.before_write is not None:
+                self.before_write(self._conn, rows)
+            self._conn.execute(self.table.insert(), rows)
+            self._conn.commit()
+        except Exception as e:
+            self._close_connection()
+            self._retry_at = time.monotonic() + self.flush_interval
+            kept = rows[-self.max_queue:]
+            with self._stats_lock:
+                self._stats["failed_flushes"] += 1
+                self._stats["dropped"] += len(rows) - len(kept)
+            self.logger.error(f"Failed to write {len(rows)} audit events: {str(e)}")
+            self._unwritten = len(kept)
+            return kept
+        
+        with self._stats_lock:
+            self._stats["flushes"] += 1
+            self._stats["written"] += len(rows)
+            self._stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        self._unwritten = 0
+        return []
+    
+    def _close_connection(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
 class AuditTrailManager:
     """
     Comprehensive audit trail management
@@ -107,13 +352,16 @@ class AuditTrailManager:
         self.retention_days = retention_days
         self.logger = get_logger()
         
+        # PostgreSQL: audit_logs is range-partitioned by month on timestamp
+        self.partitioned = False
+        self._partitions_through: Optional[date] = None  # Last month with a partition
+        
         # Create audit log table
         self._create_audit_table()
         
-        # Event buffers for batch processing
-        self._event_buffer = []
-        self._buffer_lock = threading.Lock()
-        self._batch_size = 100
+        # Events are written in batches by a background thread, never inside log_event
+        self._writer = AuditEventWriter(get_engine(self.database_url), self.audit_table,
+                                        before_write=self._prepare_partitions)
         
         # Statistics tracking
         self._stats = defaultdict(int)
@@ -122,19 +370,29 @@ class AuditTrailManager:
         """Create audit log table if it doesn't exist"""
         
         try:
-            engine = create_engine(self.database_url)
+            engine = get_engine(self.database_url)
             metadata = MetaData()
             
-            # Define audit log table
+            if engine.dialect.name == "postgresql":
+                with engine.connect() as conn:
+                    relkind = conn.execute(
+                        text("SELECT relkind FROM pg_class WHERE oid = to_regclass('audit_logs')")
+                    ).scalar()
+                # A table created before partitioning keeps working, with row-by-row retention
+                self.partitioned = relkind in (None, "p")
+                if relkind == "r":
+                    self.logger.warning("audit_logs is not partitioned: retention will delete rows")
+            
+            # Define audit log table (partitioned: the primary key must include the partition key)
             self.audit_table = Table(
                 'audit_logs',
                 metadata,
                 Column('event_id', String(36), primary_key=True),
-                Column('timestamp', DateTime, nullable=False, index=True),
-                Column('user_id', String(36), index=True),
+                Column('timestamp', DateTime, nullable=False, index=True, primary_key=self.partitioned),
+                Column('user_id', String(36)),
                 Column('session_id', String(36), index=True),
-                Column('action', String(50), nullable=False, index=True),
-                Column('resource_type', String(100), nullable=False, index=True),
+                Column('action', String(50), nullable=False),
+                Column('resource_type', String(100), nullable=False),
                 Column('resource_id', String(36), index=True),
                 Column('level', String(20), nullable=False, index=True),
                 Column('success', Boolean, nullable=False),
@@ -155,18 +413,94 @@ class AuditTrailManager:
                 Column('metadata', JSONB),
                 
                 # Integrity
-                Column('checksum', String(64), nullable=False)
+                Column('checksum', String(64), nullable=False),
+                
+                # search_events filters, newest first
+                Index('idx_audit_logs_user_timestamp', 'user_id', 'timestamp'),
+                Index('idx_audit_logs_resource_timestamp', 'resource_type', 'resource_id', 'timestamp'),
+                Index('idx_audit_logs_action_timestamp', 'action', 'timestamp'),
+                
+                postgresql_partition_by='RANGE (timestamp)' if self.partitioned else None
             )
             
-            # Create table
+            # Daily pre-aggregated counts for statistics over long ranges
+            self.rollup_table = Table(
+                'audit_daily_rollups',
+                metadata,
+                Column('id', Integer, primary_key=True, autoincrement=True),
+                Column('day', Date, nullable=False, index=True),
+                Column('action', String(50), nullable=False),
+                Column('level', String(20), nullable=False),
+                Column('success', Boolean, nullable=False),
+                Column('user_id', String(36)),
+                Column('event_count', Integer, nullable=False)
+            )
+            
+            # Days already rolled up (contiguous, including days without events)
+            self.rollup_days_table = Table(
+                'audit_rollup_days',
+                metadata,
+                Column('day', Date, primary_key=True),
+                Column('refreshed_at', DateTime, nullable=False)
+            )
+            
+            # Create tables
             metadata.create_all(engine)
             
+            # Indexes added after the table was first created (no-op when they exist)
+            with engine.begin() as conn:
+                for index in self.audit_table.indexes:
+                    index.create(conn, checkfirst=True)
+            
+            if self.partitioned:
+                with engine.begin() as conn:
+                    self.ensure_partitions(conn)
+            
             self.logger.info("Audit trail table initialized")
             
         except Exception as e:
             self.logger.error(f"Failed to create audit table: {str(e)}")
             raise create_database_error("DB_INITIALIZATION_FAILED", str(e))
     
+    def ensure_partitions(self, conn: Connection, through: Optional[date] = None):
+        """
+        Create the monthly partitions from the current month through `through`
+        (default: settings.audit_partition_months_ahead months ahead), plus a
+        default partition for rows outside them (e.g. backfilled old events)
+        """
+        month = _month_start(datetime.utcnow())
+        horizon = month
+        for _ in range(settings.audit_partition_months_ahead):
+            horizon = _next_month(horizon)
+        through = max(_month_start(through), horizon) if through else horizon
+        
+        conn.execute(text("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT"))
+        while month <= through:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {audit_partition_name(month)} PARTITION OF audit_logs "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            ))
+            month = _next_month(month)
+        self._partitions_through = through
+    
+    def _prepare_partitions(self, conn: Connection, rows: List[Dict[str, Any]]):
+        """Writer hook: make sure the month of the newest row has a partition before inserting"""
+        if not self.partitioned:
+            return
+        newest = _month_start(max(row['timestamp'] for row in rows))
+        if self._partitions_through is None or newest > self._partitions_through:
+            self.ensure_partitions(conn, newest)
+            conn.commit()
+    
+    def list_partitions(self, conn: Connection) -> List[date]:
+        """Months that have a partition (oldest first)"""
+        names = conn.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass('audit_logs')"
+        )).scalars()
+        return sorted(month for month in map(audit_partition_month, names) if month is not None)
+    
     def log_event(
         self,
         action: AuditAction,
@@ -241,13 +575,10 @@ class AuditTrailManager:
         # Calculate integrity checksum
         event.checksum = self._calculate_checksum(event)
         
-        # Add to buffer for batch processing
-        with self._buffer_lock:
-            self._event_buffer.append(event)
-            
-            # Process batch if buffer is full
-            if len(self._event_buffer) >= self._batch_size:
-                self._flush_buffer()
+        # Queue for the background writer (no database work in the caller)
+        if not self._writer.submit(self._event_row(event)):
+            self.logger.error(f"Audit queue full, event dropped: {action.value} on {resource_type}",
+                              event_id=event_id)
         
         # Update statistics
         self._stats["total_events"] += 1
@@ -269,11 +600,9 @@ class AuditTrailManager:
     
     def _calculate_checksum(self, event: AuditEvent) -> str:
         """Calculate SHA-256 checksum for event integrity"""
-        
-        # Create deterministic string representation
-        checksum_data = {
+        return audit_event_checksum({
             "event_id": event.event_id,
-            "timestamp": event.timestamp.isoformat(),
+            "timestamp": event.timestamp,
             "user_id": event.user_id,
             "action": event.action.value,
             "resource_type": event.resource_type,
@@ -282,66 +611,40 @@ class AuditTrailManager:
             "changes": event.changes,
             "old_values": event.old_values,
             "new_values": event.new_values
+        })
+    
+    @staticmethod
+    def _event_row(event: AuditEvent) -> Dict[str, Any]:
+        """audit_logs row for an event"""
+        return {
+            'event_id': event.event_id,
+            'timestamp': event.timestamp,
+            'user_id': event.user_id,
+            'session_id': event.session_id,
+            'action': event.action.value,
+            'resource_type': event.resource_type,
+            'resource_id': event.resource_id,
+            'level': event.level.value,
+            'success': event.success,
+            'ip_address': event.ip_address,
+            'user_agent': event.user_agent,
+            'request_id': event.request_id,
+            'changes': event.changes,
+            'old_values': event.old_values,
+            'new_values': event.new_values,
+            'description': event.description,
+            'error_message': event.error_message,
+            'metadata': event.metadata,
+            'checksum': event.checksum
         }
-        
-        # Convert to JSON string with sorted keys for consistency
-        json_str = json.dumps(checksum_data, sort_keys=True, default=str)
-        
-        # Calculate SHA-256 hash
-        return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
     
-    def _flush_buffer(self):
-        """Flush event buffer to database"""
-        
-        if not self._event_buffer:
-            return
-        
-        try:
-            engine = create_engine(self.database_url)
-            
-            with engine.connect() as conn:
-                # Insert all events in batch
-                events_data = []
-                for event in self._event_buffer:
-                    events_data.append({
-                        'event_id': event.event_id,
-                        'timestamp': event.timestamp,
-                        'user_id': event.user_id,
-                        'session_id': event.session_id,
-                        'action': event.action.value,
-                        'resource_type': event.resource_type,
-                        'resource_id': event.resource_id,
-                        'level': event.level.value,
-                        'success': event.success,
-                        'ip_address': event.ip_address,
-                        'user_agent': event.user_agent,
-                        'request_id': event.request_id,
-                        'changes': event.changes,
-                        'old_values': event.old_values,
-                        'new_values': event.new_values,
-                        'description': event.description,
-                        'error_message': event.error_message,
-                        'metadata': event.metadata,
-                        'checksum': event.checksum
-                    })
-                
-                conn.execute(self.audit_table.insert(), events_data)
-                conn.commit()
-                
-                self.logger.info(f"Flushed {len(self._event_buffer)} audit events to database")
-                
-                # Clear buffer
-                self._event_buffer.clear()
-                
-        except Exception as e:
-            self.logger.error(f"Failed to flush audit events: {str(e)}")
-            # Keep events in buffer for retry
+    def force_flush(self, timeout: Optional[float] = None) -> bool:
+        """Force flush of all pending events (waits for the background writer)"""
+        return self._writer.flush(timeout)
     
-    def force_flush(self):
-        """Force flush of all pending events"""
-        with self._buffer_lock:
-            if self._event_buffer:
-                self._flush_buffer()
+    def shutdown(self, timeout: Optional[float] = 30):
+        """Write all pending events and stop the background writer"""
+        self._writer.close(timeout)
     
     def search_events(
         self,
@@ -376,7 +679,7 @@ class AuditTrailManager:
         """
         
         try:
-            engine = create_engine(self.database_url)
+            engine = get_engine(self.database_url)
             
             with engine.connect() as conn:
                 # Build query
@@ -423,7 +726,7 @@ class AuditTrailManager:
         """Get a specific audit event by ID"""
         
         try:
-            engine = create_engine(self.database_url)
+            engine = get_engine(self.database_url)
             
             with engine.connect() as conn:
                 query = self.audit_table.select().where(
@@ -473,92 +776,238 @@ class AuditTrailManager:
     def get_audit_statistics(
         self,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        use_rollups: bool = True
     ) -> Dict[str, Any]:
-        """Get audit trail statistics"""
+        """
+        Get audit trail statistics
+        
+        Totals, per-action and per-level counts and the success rate come from
+        one aggregate query (FILTER clauses); the most active users from one
+        grouped query. With use_rollups, whole days already rolled up are read
+        from audit_daily_rollups and only the remaining events from audit_logs.
+        """
         
         try:
-            engine = create_engine(self.database_url)
+            engine = get_engine(self.database_url)
+            
+            if use_rollups:
+                try:
+                    self.refresh_daily_rollups()
+                except Exception as e:
+                    # Statistics still work from the rollups already stored plus the raw events
+                    self.logger.error(f"Failed to refresh audit rollups: {str(e)}")
             
             with engine.connect() as conn:
-                # Base query
-                base_query = self.audit_table.select()
+                source, rollup_span = self._statistics_source(conn, start_date, end_date, use_rollups)
+                count = source.c.event_count
                 
-                # Add date filters
-                if start_date:
-                    base_query = base_query.where(self.audit_table.c.timestamp >= start_date)
-                if end_date:
-                    base_query = base_query.where(self.audit_table.c.timestamp <= end_date)
-                
-                # Total events
-                total_events = conn.execute(
-                    f"SELECT COUNT(*) FROM ({base_query}) as filtered"
-                ).scalar()
-                
-                # Events by action
-                action_stats = {}
+                columns = [
+                    func.coalesce(func.sum(count), 0).label("total"),
+                    func.coalesce(func.sum(count).filter(source.c.success == True), 0).label("successful")
+                ]
                 for action in AuditAction:
-                    count = conn.execute(
-                        base_query.where(self.audit_table.c.action == action.value)
-                    ).rowcount
-                    if count > 0:
-                        action_stats[action.value] = count
-                
-                # Events by level
-                level_stats = {}
+                    columns.append(func.coalesce(func.sum(count).filter(source.c.action == action.value), 0)
+                                   .label(f"action_{action.value}"))
                 for level in AuditLevel:
-                    count_query = base_query.where(self.audit_table.c.level == level.value)
-                    count = len(list(conn.execute(count_query)))
-                    if count > 0:
-                        level_stats[level.value] = count
-                
-                # Success rate
-                success_count = len(list(conn.execute(
-                    base_query.where(self.audit_table.c.success == True)
-                )))
-                success_rate = (success_count / total_events * 100) if total_events > 0 else 0
+                    columns.append(func.coalesce(func.sum(count).filter(source.c.level == level.value), 0)
+                                   .label(f"level_{level.value}"))
+                totals = conn.execute(select(*columns)).one()._mapping
                 
                 # Most active users
-                user_activity_query = f"""
-                SELECT user_id, COUNT(*) as event_count 
-                FROM ({base_query}) as filtered 
-                WHERE user_id IS NOT NULL 
-                GROUP BY user_id 
-                ORDER BY event_count DESC 
-                LIMIT 10
-                """
-                
-                user_activity = []
-                try:
-                    result = conn.execute(user_activity_query)
-                    user_activity = [dict(row._mapping) for row in result]
-                except:
-                    user_activity = []
-                
-                return {
-                    "period": {
-                        "start_date": start_date.isoformat() if start_date else None,
-                        "end_date": end_date.isoformat() if end_date else None
-                    },
-                    "total_events": total_events,
-                    "success_rate_percent": round(success_rate, 2),
-                    "events_by_action": action_stats,
-                    "events_by_level": level_stats,
-                    "most_active_users": user_activity,
-                    "buffer_stats": {
-                        "pending_events": len(self._event_buffer),
-                        "batch_size": self._batch_size
-                    }
-                }
+                event_count = func.sum(count).label("event_count")
+                user_activity_query = (
+                    select(source.c.user_id, event_count)
+                    .where(source.c.user_id.isnot(None))
+                    .group_by(source.c.user_id)
+                    .order_by(event_count.desc())
+                    .limit(10)
+                )
+                user_activity = [
+                    {"user_id": row.user_id, "event_count": int(row.event_count)}
+                    for row in conn.execute(user_activity_query)
+                ]
+            
+            total_events = int(totals["total"])
+            success_rate = (int(totals["successful"]) / total_events * 100) if total_events > 0 else 0
+            action_stats = {
+                action.value: int(totals[f"action_{action.value}"])
+                for action in AuditAction if totals[f"action_{action.value}"]
+            }
+            level_stats = {
+                level.value: int(totals[f"level_{level.value}"])
+                for level in AuditLevel if totals[f"level_{level.value}"]
+            }
+            
+            return {
+                "period": {
+                    "start_date": start_date.isoformat() if start_date else None,
+                    "end_date": end_date.isoformat() if end_date else None
+                },
+                "total_events": total_events,
+                "success_rate_percent": round(success_rate, 2),
+                "events_by_action": action_stats,
+                "events_by_level": level_stats,
+                "most_active_users": user_activity,
+                "rollup_days": {
+                    "first": rollup_span[0].isoformat(),
+                    "last": rollup_span[1].isoformat()
+                } if rollup_span else None,
+                "buffer_stats": self._writer.get_stats()
+            }
                 
         except Exception as e:
             self.logger.error(f"Failed to get audit statistics: {str(e)}")
             return {"error": str(e)}
     
+    def _statistics_source(self, conn, start_date: Optional[datetime], end_date: Optional[datetime],
+                           use_rollups: bool):
+        """
+        Subquery of (action, level, success, user_id, event_count) rows for the period:
+        raw events count 1 each, rolled-up days their stored count
+        """
+        audit = self.audit_table
+        raw = select(
+            audit.c.action, audit.c.level, audit.c.success, audit.c.user_id,
+            literal(1).label("event_count")
+        )
+        if start_date:
+            raw = raw.where(audit.c.timestamp >= start_date)
+        if end_date:
+            raw = raw.where(audit.c.timestamp <= end_date)
+        
+        span = self._rollup_span(conn, start_date, end_date) if use_rollups else None
+        if span is None:
+            return raw.subquery("audit_events"), None
+        
+        first_day, last_day = span
+        span_start = datetime.combine(first_day, datetime.min.time())
+        span_end = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+        raw = raw.where(or_(audit.c.timestamp < span_start, audit.c.timestamp >= span_end))
+        
+        rollup = self.rollup_table
+        rolled = select(
+            rollup.c.action, rollup.c.level, rollup.c.success, rollup.c.user_id, rollup.c.event_count
+        ).where(rollup.c.day >= first_day, rollup.c.day <= last_day)
+        return union_all(raw, rolled).subquery("audit_events"), span
+    
+    def _rollup_span(self, conn, start_date: Optional[datetime], end_date: Optional[datetime]):
+        """(first, last) rolled-up days lying entirely inside the period, or None"""
+        days = self.rollup_days_table
+        covered_first, covered_last = conn.execute(select(func.min(days.c.day), func.max(days.c.day))).one()
+        if covered_first is None:
+            return None
+        
+        first_day, last_day = covered_first, covered_last
+        if start_date:
+            start_day = start_date.date()
+            if start_date != datetime.combine(start_day, datetime.min.time()):
+                start_day += timedelta(days=1)
+            first_day = max(first_day, start_day)
+        if end_date:
+            # end_date is inclusive: day d is whole if its end (d + 1 at 00:00) <= end_date
+            last_day = min(last_day, (end_date - timedelta(days=1)).date())
+        return (first_day, last_day) if first_day <= last_day else None
+    
+    def refresh_daily_rollups(self, through: Optional[date] = None) -> int:
+        """
+        Roll up every final day not yet rolled up, through `through` (default: the last final day)
+        
+        Events are timestamped by log_event but written later by the background writer (one flush
+        interval normally, much longer while a batch is retried). A day is final only once it
+        ended more than audit_rollup_grace_seconds ago; `through` is capped at that day.
+        
+        Incremental: continues after the last rolled-up day, or from the first event. The last
+        audit_rollup_recheck_days rolled-up days are also compared with the raw events, and a day
+        that received events after it was rolled up is rolled up again. Returns days rolled up.
+        """
+        grace = timedelta(seconds=settings.audit_rollup_grace_seconds)
+        last_final = (datetime.utcnow() - grace).date() - timedelta(days=1)
+        through = min(through or last_final, last_final)
+        audit, days = self.audit_table, self.rollup_days_table
+        
+        engine = get_engine(self.database_url)
+        with engine.connect() as conn:
+            last_rolled = conn.execute(select(func.max(days.c.day))).scalar()
+            stale_days = self._stale_rollup_days(conn, last_rolled) if last_rolled is not None else []
+            for day in stale_days:
+                self._roll_up_span(conn, day, day)
+                conn.execute(days.update().where(days.c.day == day).values(refreshed_at=datetime.utcnow()))
+            
+            if last_rolled is not None:
+                first_day = last_rolled + timedelta(days=1)
+            else:
+                first_event = conn.execute(select(func.min(audit.c.timestamp))).scalar()
+                first_day = first_event.date() if first_event is not None else through + timedelta(days=1)
+            
+            new_days = []
+            if first_day <= through:
+                self._roll_up_span(conn, first_day, through)
+                refreshed_at = datetime.utcnow()
+                new_days = [
+                    {"day": first_day + timedelta(days=offset), "refreshed_at": refreshed_at}
+                    for offset in range((through - first_day).days + 1)
+                ]
+                conn.execute(days.insert(), new_days)
+            conn.commit()
+        
+        if stale_days:
+            self.logger.warning(f"Re-rolled {len(stale_days)} audit days with late events",
+                                days=[day.isoformat() for day in stale_days])
+        if new_days:
+            self.logger.info(f"Rolled up audit events for {len(new_days)} days through {through.isoformat()}")
+        return len(new_days) + len(stale_days)
+    
+    def _roll_up_span(self, conn, first_day: date, last_day: date):
+        """Replace the rollup rows of [first_day, last_day] with counts from the raw events"""
+        audit, rollup = self.audit_table, self.rollup_table
+        span_start = datetime.combine(first_day, datetime.min.time())
+        span_end = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+        day = func.date(audit.c.timestamp)
+        grouped = (
+            select(day, audit.c.action, audit.c.level, audit.c.success, audit.c.user_id, func.count())
+            .where(audit.c.timestamp >= span_start, audit.c.timestamp < span_end)
+            .group_by(day, audit.c.action, audit.c.level, audit.c.success, audit.c.user_id)
+        )
+        conn.execute(rollup.delete().where(rollup.c.day >= first_day, rollup.c.day <= last_day))
+        conn.execute(rollup.insert().from_select(
+            ["day", "action", "level", "success", "user_id", "event_count"], grouped
+        ))
+    
+    def _stale_rollup_days(self, conn, last_rolled: date) -> List[date]:
+        """Recently rolled-up days whose raw event count no longer matches their rollup"""
+        audit, rollup = self.audit_table, self.rollup_table
+        first_day = last_rolled - timedelta(days=settings.audit_rollup_recheck_days - 1)
+        # The retention cutoff day has lost raw rows on purpose: its rollup stays as it is
+        retention_cutoff = (datetime.utcnow() - timedelta(days=self.retention_days)).date()
+        first_day = max(first_day, retention_cutoff + timedelta(days=1))
+        if first_day > last_rolled:
+            return []
+        
+        day = func.date(audit.c.timestamp, type_=Date)
+        raw_counts = dict(conn.execute(
+            select(day, func.count())
+            .where(audit.c.timestamp >= datetime.combine(first_day, datetime.min.time()),
+                   audit.c.timestamp < datetime.combine(last_rolled + timedelta(days=1), datetime.min.time()))
+            .group_by(day)
+        ).all())
+        rolled_counts = dict(conn.execute(
+            select(rollup.c.day, func.sum(rollup.c.event_count))
+            .where(rollup.c.day >= first_day, rollup.c.day <= last_rolled)
+            .group_by(rollup.c.day)
+        ).all())
+        return sorted(d for d in set(raw_counts) | set(rolled_counts)
+                      if raw_counts.get(d, 0) != rolled_counts.get(d, 0))
+    
     def cleanup_old_events(self, dry_run: bool = True) -> Dict[str, int]:
         """
         Clean up audit events older than retention period
         
+        On PostgreSQL, monthly partitions entirely older than the cutoff are
+        detached and dropped (their row count is the planner's estimate); only
+        the month straddling the cutoff and the default partition are deleted
+        from row by row.
+        
         Args:
             dry_run: If True, only count events without deleting
             
@@ -569,36 +1018,67 @@ class AuditTrailManager:
         cutoff_date = datetime.utcnow() - timedelta(days=self.retention_days)
         
         try:
-            engine = create_engine(self.database_url)
+            engine = get_engine(self.database_url)
             
             with engine.connect() as conn:
-                # Count events to be deleted
-                count_query = self.audit_table.select().where(
+                # Partitions entirely older than the cutoff are dropped, not deleted from
+                expired_months = (
+                    expired_partition_months(self.list_partitions(conn), cutoff_date) if self.partitioned else []
+                )
+                
+                # Count events to be deleted: planner estimate for whole partitions, exact for the rest
+                count_query = select(func.count()).select_from(self.audit_table).where(
                     self.audit_table.c.timestamp < cutoff_date
                 )
-                events_to_delete = len(list(conn.execute(count_query)))
+                partition_rows = 0
+                if expired_months:
+                    expired_start = datetime.combine(expired_months[0], datetime.min.time())
+                    expired_end = datetime.combine(_next_month(expired_months[-1]), datetime.min.time())
+                    count_query = count_query.where(or_(
+                        self.audit_table.c.timestamp < expired_start, self.audit_table.c.timestamp >= expired_end
+                    ))
+                    for month in expired_months:
+                        partition_rows += max(conn.execute(
+                            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+                            {"name": audit_partition_name(month)}
+                        ).scalar() or 0, 0)
+                events_to_delete = partition_rows + conn.execute(count_query).scalar()
                 
                 if dry_run:
                     return {
                         "events_to_delete": events_to_delete,
+                        "partitions_to_drop": [audit_partition_name(month) for month in expired_months],
                         "cutoff_date": cutoff_date.isoformat(),
                         "dry_run": True
                     }
                 
-                # Delete old events
+                for month in expired_months:
+                    partition = audit_partition_name(month)
+                    conn.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {partition}"))
+                    conn.execute(text(f"DROP TABLE {partition}"))
+                
+                # Remaining old events: the month straddling the cutoff and the default partition
                 delete_query = self.audit_table.delete().where(
                     self.audit_table.c.timestamp < cutoff_date
                 )
                 
                 result = conn.execute(delete_query)
+                
+                # Rollups of whole days before the cutoff go with their events
+                conn.execute(self.rollup_table.delete().where(self.rollup_table.c.day < cutoff_date.date()))
+                conn.execute(self.rollup_days_table.delete().where(
+                    self.rollup_days_table.c.day < cutoff_date.date()
+                ))
                 conn.commit()
                 
-                deleted_count = result.rowcount
+                deleted_count = partition_rows + result.rowcount
                 
-                self.logger.info(f"Deleted {deleted_count} old audit events")
+                self.logger.info(f"Deleted {deleted_count} old audit events "
+                                 f"({len(expired_months)} partitions dropped)")
                 
                 return {
                     "events_deleted": deleted_count,
+                    "partitions_dropped": [audit_partition_name(month) for month in expired_months],
                     "cutoff_date": cutoff_date.isoformat(),
                     "dry_run": False
                 }
@@ -702,6 +1182,12 @@ def initialize_audit_system(
     return audit_manager
 
 
+def shutdown_audit_system(timeout: Optional[float] = 30):
+    """Write pending audit events and stop the writer (application shutdown)"""
+    if audit_manager is not None:
+        audit_manager.shutdown(timeout)
+
+
 def get_audit_manager() -> AuditTrailManager:
     """Get the global audit manager instance"""
     global audit_manager
@@ -0,0 +1,181 @@
+# data_protection/audit_verification.py - Verificación masiva de checksums del audit trail
+"""
+Bulk integrity verification of the audit trail.
+
+verify_event_integrity() checks one event per query; compliance needs the
+whole trail (millions of events per quarter). AuditIntegrityVerifier:
+
+- Streams audit_logs in (timestamp, event_id) order in batches of
+  batch_size rows with yield_per (a server-side cursor on PostgreSQL, so
+  the client never holds more than a few batches).
+- Recomputes the SHA-256 checksums of each batch in a process pool, keeping
+  at most 2 * workers batches in flight while the next ones are read.
+- After every batch, in order, writes a JSON checkpoint with the last
+  (timestamp, event_id) verified and the counts so far. An interrupted run
+  resumes after that key with a keyset query instead of starting over.
+"""
+
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+
+from config import settings
+from data_protection.audit_trail import CHECKSUM_FIELDS, AuditTrailManager, audit_event_checksum
+from engine_registry import get_engine
+from error_handling.logging_config import get_logger
+
+VERIFY_COLUMNS = CHECKSUM_FIELDS + ("checksum",)
+
+
+def verify_checksum_batch(rows: List[Tuple]) -> List[Dict[str, Any]]:
+    """Mismatches in a batch of VERIFY_COLUMNS tuples (runs inside a pool process)"""
+    mismatches = []
+    for row in rows:
+        values = dict(zip(VERIFY_COLUMNS, row))
+        calculated = audit_event_checksum(values)
+        if calculated != values["checksum"]:
+            mismatches.append({
+                "event_id": values["event_id"],
+                "timestamp": values["timestamp"].isoformat(),
+                "stored_checksum": values["checksum"],
+                "calculated_checksum": calculated,
+            })
+    return mismatches
+
+
+class AuditIntegrityVerifier:
+    """Checksum verification of every audit event, parallel and resumable"""
+
+    def __init__(self, manager: AuditTrailManager, checkpoint_path: Optional[str] = None,
+                 batch_size: int = settings.audit_verify_batch_size,
+                 workers: int = settings.audit_verify_workers,
+                 max_reported_mismatches: int = 1000):
+        self.manager = manager
+        self.checkpoint_path = checkpoint_path or settings.audit_verify_checkpoint_path
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_reported_mismatches = max_reported_mismatches
+        self.logger = get_logger()
+
+    def run(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+            resume: bool = True, max_events: Optional[int] = None) -> Dict[str, Any]:
+        """Verify the events in [start_date, end_date] and return the report
+
+        With resume, continues from the checkpoint of an interrupted run over
+        the same range. max_events stops after about that many events (whole
+        batches) with completed=False, leaving the checkpoint to resume from.
+        """
+        state = self._load_checkpoint(start_date, end_date) if resume else None
+        resumed = state is not None
+        if state is None:
+            state = {
+                "start_date": start_date.isoformat() if start_date else None,
+                "end_date": end_date.isoformat() if end_date else None,
+                "last_timestamp": None,
+                "last_event_id": None,
+                "events_checked": 0,
+                "mismatch_count": 0,
+                "mismatches": [],
+            }
+
+        table = self.manager.audit_table
+        query = select(*[table.c[name] for name in VERIFY_COLUMNS]).order_by(table.c.timestamp, table.c.event_id)
+        if start_date:
+            query = query.where(table.c.timestamp >= start_date)
+        if end_date:
+            query = query.where(table.c.timestamp <= end_date)
+        if state["last_event_id"] is not None:
+            last_key = (datetime.fromisoformat(state["last_timestamp"]), state["last_event_id"])
+            query = query.where(tuple_(table.c.timestamp, table.c.event_id) > last_key)
+
+        started = time.perf_counter()
+        checked_before = state["events_checked"]
+        completed = True
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0 else None
+        pending: Deque[Tuple[Any, Tuple]] = deque()
+        try:
+            with get_engine(self.manager.database_url).connect() as conn:
+                result = conn.execution_options(yield_per=self.batch_size).execute(query)
+                for partition in result.partitions():
+                    rows = [tuple(row) for row in partition]
+                    last_key = (rows[-1][1], rows[-1][0])
+                    outcome = (pool.submit(verify_checksum_batch, rows) if pool is not None
+                               else verify_checksum_batch(rows))
+                    pending.append((outcome, (len(rows), last_key)))
+                    if len(pending) >= 2 * max(self.workers, 1):
+                        self._record(state, *pending.popleft())
+                    if max_events is not None and \
+                            state["events_checked"] + sum(size for _, (size, _) in pending) >= max_events:
+                        completed = False
+                        break
+                result.close()
+            while pending:
+                self._record(state, *pending.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        if completed and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        elapsed = time.perf_counter() - started
+        checked = state["events_checked"] - checked_before
+        report = {
+            "completed": completed,
+            "resumed": resumed,
+            "start_date": state["start_date"],
+            "end_date": state["end_date"],
+            "events_checked": state["events_checked"],
+            "mismatch_count": state["mismatch_count"],
+            "mismatches": state["mismatches"],
+            "last_event_id": state["last_event_id"],
+            "elapsed_seconds": round(elapsed, 3),
+            "events_per_second": round(checked / elapsed) if elapsed > 0 else 0,
+        }
+        log = self.logger.critical if state["mismatch_count"] else self.logger.info
+        log(f"Audit integrity verification: {state['events_checked']} events checked, "
+            f"{state['mismatch_count']} mismatches", completed=completed, resumed=resumed)
+        return report
+
+    def _record(self, state: Dict[str, Any], outcome: Any, batch: Tuple[int, Tuple[datetime, str]]):
+        """Add a finished batch to the state and checkpoint it (batches are recorded in read order)"""
+        mismatches = outcome.result() if isinstance(outcome, Future) else outcome
+        size, (last_timestamp, last_event_id) = batch
+        state["events_checked"] += size
+        state["mismatch_count"] += len(mismatches)
+        room = self.max_reported_mismatches - len(state["mismatches"])
+        state["mismatches"].extend(mismatches[:max(room, 0)])
+        state["last_timestamp"] = last_timestamp.isoformat()
+        state["last_event_id"] = last_event_id
+        self._save_checkpoint(state)
+
+    def _load_checkpoint(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> Optional[Dict]:
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            state = json.load(f)
+        requested = (start_date.isoformat() if start_date else None, end_date.isoformat() if end_date else None)
+        if (state["start_date"], state["end_date"]) != requested:
+            raise ValueError(f"Checkpoint {self.checkpoint_path} is for a different range "
+                             f"({state['start_date']} - {state['end_date']}); resume=False starts over")
+        return state
+
+    def _save_checkpoint(self, state: Dict[str, Any]):
+        directory = os.path.dirname(self.checkpoint_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Atomic replace: a crash mid-write leaves the previous checkpoint
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.checkpoint_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -26,8 +26,9 @@ from alembic import command
 from alembic.config import Config
 from alembic.runtime.migration import MigrationContext
 from alembic.script import ScriptDirectory
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
+from engine_registry import get_engine
 from error_handling.logging_config import get_logger
 from error_handling.error_manager import create_database_error, DatabaseError
 
@@ -307,7 +308,7 @@ else:
             config = Config(str(self.alembic_config_path))
             
             # Get current revision from database
-            engine = create_engine(self.database_url)
+            engine = get_engine(self.database_url)
             with engine.connect() as conn:
                 context = MigrationContext.configure(conn)
                 current_rev = context.get_current_revision()
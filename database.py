@@ -1,21 +1,30 @@
 # database.py - Configuración de SQLAlchemy para Supabase
-from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Text, Numeric, Boolean, DateTime, JSON, ForeignKey, Index, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Numeric, Boolean, DateTime, JSON, ForeignKey, Index, Enum, or_, and_, insert, update
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session, relationship
+from sqlalchemy.orm import sessionmaker, Session, relationship, defer, noload
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
-from typing import Optional
+from typing import Optional, List, Tuple, Iterator, Iterable, Dict, AsyncIterator
 import os
+import base64
+import datetime as dt
 from decimal import Decimal
 import uuid
+import inspect
 from enum import Enum as PythonEnum
 
 # Configuración de la base de datos
 from config import settings
+from services.catalog_cache import bump_catalog_version
+from services.session_cache import session_cache
+from engine_registry import engine_registry
 
 DATABASE_URL = settings.database_url
 
-engine = create_engine(DATABASE_URL)
+# Engine compartido con el resto de subsistemas (pool configurado en settings.db_pool_*)
+engine = engine_registry.get_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -27,6 +36,39 @@ def get_db():
     finally:
         db.close()
 
+# ===== SESIONES ASYNC (SQLAlchemy asyncio: asyncpg en PostgreSQL, aiosqlite en tests) =====
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def async_database_url(url: str) -> str:
+    """Misma base de datos con el driver async del dialecto (postgresql+asyncpg, sqlite+aiosqlite)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay driver async configurado para {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+_async_session_factory: Optional[async_sessionmaker] = None
+
+def get_async_session_factory() -> async_sessionmaker:
+    """Engine async del registro creado al primer uso (el driver async solo se importa si se usa)"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        async_engine = engine_registry.get_async_engine(async_database_url(DATABASE_URL))
+        # expire_on_commit=False: los objetos devueltos se leen sin volver a consultar (sin I/O implícito)
+        _async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+    return _async_session_factory
+
+async def dispose_async_engine():
+    global _async_session_factory
+    await engine_registry.dispose_async()
+    _async_session_factory = None
+
+# Dependency async: las consultas no bloquean el event loop
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
+
 # ===== MODELOS SQLAlchemy =====
 
 class User(Base):
@@ -120,6 +162,15 @@ class Quote(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     valid_until = Column(DateTime(timezone=True), nullable=True)
 
+    # Resumen desnormalizado para listados (se calcula al guardar, migración 007)
+    total_area_m2 = Column(Numeric(precision=12, scale=3), nullable=True)
+    sample_items = Column(JSONB, nullable=True)  # Primeros 3 ítems: name, window_type, width_cm, height_cm
+
+    __table_args__ = (
+        # Listado/paginación por usuario (migración 006)
+        Index('idx_quotes_user_created_at', 'user_id', created_at.desc()),
+    )
+
 # WorkOrder enums for QTO-001
 class WorkOrderStatus(PythonEnum):
     PENDING = "pending"
@@ -215,8 +266,42 @@ class MaterialColor(Base):
         Index('idx_material_color_unique', 'material_id', 'color_id', unique=True),
     )
 
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    kind = Column(String(20), nullable=False)  # materials | products | products_bulk
+    filename = Column(Text, nullable=False)
+    file_path = Column(Text, nullable=True)  # CSV subido pendiente de procesar (se borra al terminar)
+    status = Column(String(20), nullable=False, default="queued")  # queued | running | done | failed | cancelled
+    rows_total = Column(Integer, nullable=True)  # Estimado a partir de las líneas del archivo
+    rows_processed = Column(Integer, nullable=False, default=0)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    result = Column(JSONB, nullable=True)  # success / errors / summary del servicio de importación
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # Último reporte de progreso
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Listado por usuario y reanudación de trabajos pendientes (migración 008)
+        Index('idx_import_jobs_user_created_at', 'user_id', created_at.desc()),
+        Index('idx_import_jobs_status', 'status'),
+    )
+
 # ===== SERVICIOS DE BASE DE DATOS =====
 
+def dialect_insert(db: Session, model):
+    """INSERT con soporte ON CONFLICT del dialecto de la sesión (PostgreSQL; SQLite en tests)"""
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model)
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    return pg_insert(model)
+
+
 class DatabaseUserService:
     """Servicio para gestión de usuarios en base de datos"""
     
@@ -240,6 +325,13 @@ class DatabaseUserService:
         self.db.refresh(user)
         return user
     
+    def update_password_hash(self, user_id: uuid.UUID, hashed_password: str):
+        """Reemplazar el hash de la misma contraseña (p.ej. al cambiar el factor de trabajo de bcrypt)"""
+        self.db.query(User).filter(User.id == user_id).update(
+            {User.hashed_password: hashed_password}, synchronize_session=False
+        )
+        self.db.commit()
+
     def create_session(self, user_id: uuid.UUID, token: str, expires_at) -> UserSession:
         session = UserSession(
             user_id=user_id,
@@ -263,6 +355,8 @@ class DatabaseUserService:
         if session:
             session.is_active = False
             self.db.commit()
+        # El token deja de ser válido también en la caché de sesiones de este proceso
+        session_cache.invalidate(token)
 
 class DatabaseMaterialService:
     """Servicio para gestión de materiales en base de datos"""
@@ -309,6 +403,7 @@ class DatabaseMaterialService:
         )
         self.db.add(material)
         self.db.commit()
+        bump_catalog_version()
         self.db.refresh(material)
         return material
     
@@ -323,6 +418,7 @@ class DatabaseMaterialService:
         
         material.updated_at = func.now()
         self.db.commit()
+        bump_catalog_version()
         self.db.refresh(material)
         return material
     
@@ -333,8 +429,88 @@ class DatabaseMaterialService:
         
         material.is_active = False
         self.db.commit()
+        bump_catalog_version()
         return True
 
+    def iter_materials_with_colors(self, category: Optional[str] = None,
+                                   batch_size: int = 500) -> Iterator[Tuple[AppMaterial, Optional[MaterialColor], Optional[Color]]]:
+        """
+        Materiales activos con sus colores disponibles, para exportación.
+
+        Una sola consulta con LEFT JOIN (solo los perfiles llevan colores), ordenada
+        por material y leída en lotes de batch_size con yield_per: en PostgreSQL usa
+        un cursor del servidor, así la memoria no depende del tamaño del catálogo.
+        Un material sin colores produce una fila (material, None, None).
+        """
+        available_colors = MaterialColor.__table__.join(
+            Color.__table__, and_(Color.id == MaterialColor.color_id, Color.is_active == True)
+        )
+        query = (self.db.query(AppMaterial, MaterialColor, Color)
+                 .select_from(AppMaterial)
+                 .outerjoin(available_colors, and_(
+                     MaterialColor.material_id == AppMaterial.id,
+                     MaterialColor.is_available == True,
+                     AppMaterial.category == "Perfiles"
+                 ))
+                 .options(noload(AppMaterial.material_colors))
+                 .filter(AppMaterial.is_active == True))
+        if category:
+            query = query.filter(AppMaterial.category == category)
+        return iter(query.order_by(AppMaterial.id, MaterialColor.id).yield_per(batch_size))
+
+    # --- Operaciones masivas (importación CSV): sin commit, el llamador confirma cada bloque ---
+
+    def get_materials_by_ids(self, material_ids: Iterable[int]) -> Dict[int, AppMaterial]:
+        """Materiales activos por ID, en una consulta"""
+        material_ids = list(set(material_ids))
+        if not material_ids:
+            return {}
+        materials = self.db.query(AppMaterial).filter(
+            AppMaterial.id.in_(material_ids),
+            AppMaterial.is_active == True
+        ).all()
+        return {material.id: material for material in materials}
+
+    def get_active_material_ids(self) -> set:
+        """IDs de todos los materiales activos (solo la columna id)"""
+        return {material_id for (material_id,) in
+                self.db.query(AppMaterial.id).filter(AppMaterial.is_active == True).all()}
+
+    def get_materials_by_codes(self, codes: Iterable[str]) -> Dict[str, AppMaterial]:
+        """Materiales por código, en una consulta (incluye inactivos: el código sigue siendo único)"""
+        codes = list(set(codes))
+        if not codes:
+            return {}
+        return {material.code: material
+                for material in self.db.query(AppMaterial).filter(AppMaterial.code.in_(codes)).all()}
+
+    def bulk_create_materials(self, rows: List[dict]) -> List[int]:
+        """INSERT de varios materiales en una sentencia; IDs en el orden de rows"""
+        if not rows:
+            return []
+        result = self.db.execute(
+            insert(AppMaterial).returning(AppMaterial.id, sort_by_parameter_order=True),
+            rows
+        )
+        return list(result.scalars())
+
+    def bulk_update_materials(self, rows: List[dict]):
+        """UPDATE por clave primaria de varios materiales (cada dict incluye 'id')"""
+        if not rows:
+            return
+        now = dt.datetime.now(dt.timezone.utc)
+        self.db.execute(update(AppMaterial), [dict(row, updated_at=now) for row in rows])
+
+    def bulk_deactivate_materials(self, material_ids: Iterable[int]):
+        """Baja lógica de varios materiales en una sentencia"""
+        material_ids = list(set(material_ids))
+        if not material_ids:
+            return
+        self.db.query(AppMaterial).filter(AppMaterial.id.in_(material_ids)).update(
+            {AppMaterial.is_active: False, AppMaterial.updated_at: func.now()},
+            synchronize_session=False
+        )
+
 class DatabaseProductService:
     """Servicio para gestión de productos en base de datos"""
     
@@ -343,6 +519,13 @@ class DatabaseProductService:
     
     def get_all_products(self):
         return self.db.query(AppProduct).filter(AppProduct.is_active == True).all()
+
+    def iter_products(self, window_type: Optional[str] = None, batch_size: int = 500) -> Iterator[AppProduct]:
+        """Productos activos por ID, leídos en lotes con yield_per (cursor del servidor en PostgreSQL)"""
+        query = self.db.query(AppProduct).filter(AppProduct.is_active == True)
+        if window_type:
+            query = query.filter(AppProduct.window_type == window_type)
+        return iter(query.order_by(AppProduct.id).yield_per(batch_size))
     
     def get_product_by_id(self, product_id: int) -> Optional[AppProduct]:
         return self.db.query(AppProduct).filter(
@@ -372,6 +555,7 @@ class DatabaseProductService:
         )
         self.db.add(product)
         self.db.commit()
+        bump_catalog_version()
         self.db.refresh(product)
         return product
     
@@ -386,6 +570,7 @@ class DatabaseProductService:
         
         product.updated_at = func.now()
         self.db.commit()
+        bump_catalog_version()
         self.db.refresh(product)
         return product
     
@@ -396,8 +581,49 @@ class DatabaseProductService:
         
         product.is_active = False
         self.db.commit()
+        bump_catalog_version()
         return True
 
+    # --- Operaciones masivas (importación CSV): sin commit, el llamador confirma la transacción ---
+
+    def get_products_by_ids(self, product_ids: Iterable[int]) -> Dict[int, AppProduct]:
+        """Productos activos por ID, en una consulta"""
+        product_ids = list(set(product_ids))
+        if not product_ids:
+            return {}
+        products = self.db.query(AppProduct).filter(
+            AppProduct.id.in_(product_ids),
+            AppProduct.is_active == True
+        ).all()
+        return {product.id: product for product in products}
+
+    def bulk_create_products(self, rows: List[dict]) -> List[int]:
+        """INSERT de varios productos en una sentencia; IDs en el orden de rows"""
+        if not rows:
+            return []
+        result = self.db.execute(
+            insert(AppProduct).returning(AppProduct.id, sort_by_parameter_order=True),
+            rows
+        )
+        return list(result.scalars())
+
+    def bulk_update_products(self, rows: List[dict]):
+        """UPDATE por clave primaria de varios productos (cada dict incluye 'id')"""
+        if not rows:
+            return
+        now = dt.datetime.now(dt.timezone.utc)
+        self.db.execute(update(AppProduct), [dict(row, updated_at=now) for row in rows])
+
+    def bulk_deactivate_products(self, product_ids: Iterable[int]):
+        """Baja lógica de varios productos en una sentencia"""
+        product_ids = list(set(product_ids))
+        if not product_ids:
+            return
+        self.db.query(AppProduct).filter(AppProduct.id.in_(product_ids)).update(
+            {AppProduct.is_active: False, AppProduct.updated_at: func.now()},
+            synchronize_session=False
+        )
+
 class DatabaseColorService:
     """Servicio para gestión de colores y precios por color"""
     
@@ -424,6 +650,7 @@ class DatabaseColorService:
         color = Color(**color_data)
         self.db.add(color)
         self.db.commit()
+        bump_catalog_version()
         self.db.refresh(color)
         return color
     
@@ -438,6 +665,7 @@ class DatabaseColorService:
                 setattr(color, field, value)
         
         self.db.commit()
+        bump_catalog_version()
         self.db.refresh(color)
         return color
     
@@ -465,6 +693,7 @@ class DatabaseColorService:
         material_color = MaterialColor(**material_color_data)
         self.db.add(material_color)
         self.db.commit()
+        bump_catalog_version()
         self.db.refresh(material_color)
         return material_color
     
@@ -482,9 +711,43 @@ class DatabaseColorService:
                 setattr(material_color, field, value)
         
         self.db.commit()
+        bump_catalog_version()
         self.db.refresh(material_color)
         return material_color
     
+    def find_colors(self, codes: Iterable[str], names: Iterable[str]) -> List[Color]:
+        """Colores cuyo código o nombre está en las listas dadas, en una consulta"""
+        codes, names = list(set(codes)), list(set(names))
+        if not codes and not names:
+            return []
+        return self.db.query(Color).filter(or_(Color.code.in_(codes), Color.name.in_(names))).all()
+
+    def bulk_create_colors(self, rows: List[dict]) -> List[int]:
+        """INSERT de varios colores en una sentencia (sin commit); IDs en el orden de rows"""
+        if not rows:
+            return []
+        result = self.db.execute(insert(Color).returning(Color.id, sort_by_parameter_order=True), rows)
+        return list(result.scalars())
+
+    def upsert_material_colors(self, rows: List[dict]):
+        """
+        INSERT ... ON CONFLICT (material_id, color_id) DO UPDATE de precios por color (sin commit).
+
+        Cada par material/color debe aparecer una sola vez en rows.
+        """
+        if not rows:
+            return
+        stmt = dialect_insert(self.db, MaterialColor).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MaterialColor.material_id, MaterialColor.color_id],
+            set_={
+                "price_per_unit": stmt.excluded.price_per_unit,
+                "is_available": stmt.excluded.is_available,
+                "updated_at": func.now(),
+            }
+        )
+        self.db.execute(stmt)
+
     def delete_material_color(self, material_color_id: int) -> bool:
         """Eliminar relación material-color"""
         material_color = self.db.query(MaterialColor).filter(
@@ -494,6 +757,7 @@ class DatabaseColorService:
         if material_color:
             self.db.delete(material_color)
             self.db.commit()
+            bump_catalog_version()
             return True
         return False
     
@@ -556,20 +820,161 @@ class DatabaseCompanyService:
             company = self.create_default_company(user_id)
         return company
 
+# Número de ítems de muestra guardados en Quote.sample_items
+QUOTE_SAMPLE_ITEMS = 3
+
+
+def quote_summary_columns(quote_data: dict) -> dict:
+    """
+    Columnas de resumen (total_area_m2, sample_items) derivadas de quote_data.
+
+    Permiten mostrar listados sin leer el JSONB completo de cada cotización.
+    """
+    items = (quote_data or {}).get("items") or []
+    total_area = Decimal('0')
+    for item in items:
+        try:
+            total_area += Decimal(str(item.get("area_m2") or 0))
+        except (ArithmeticError, ValueError, TypeError):
+            continue  # Valores de área inválidos se ignoran
+
+    sample_items = []
+    for item in items[:QUOTE_SAMPLE_ITEMS]:
+        try:
+            sample_items.append({
+                "window_type": str(item.get("window_type") or "Desconocido"),
+                "name": item.get("product_bom_name") or f"Producto #{item.get('product_bom_id', 'N/A')}",
+                "width_cm": int(float(item.get("width_cm", 0))),
+                "height_cm": int(float(item.get("height_cm", 0)))
+            })
+        except (ValueError, TypeError):
+            continue
+
+    return {"total_area_m2": total_area, "sample_items": sample_items}
+
+
 class DatabaseQuoteService:
     """Servicio para gestión de cotizaciones en base de datos"""
     
     def __init__(self, db: Session):
         self.db = db
+
+    def _summary_query(self):
+        """Consulta de cotizaciones sin cargar quote_data (se carga al accederlo)"""
+        return self.db.query(Quote).options(defer(Quote.quote_data))
+
+    def get_quote_summaries_by_user(self, user_id: uuid.UUID, limit: int = 50, offset: int = 0) -> List[Quote]:
+        """Como get_quotes_by_user pero sin el JSONB quote_data, para listados"""
+        return (self._summary_query()
+                .filter(Quote.user_id == user_id)
+                .order_by(Quote.created_at.desc(), Quote.id.desc())
+                .offset(offset)
+                .limit(limit)
+                .all())
     
     def get_quotes_by_user(self, user_id: uuid.UUID, limit: int = 50, offset: int = 0):
         """Obtener cotizaciones del usuario con soporte para paginación"""
         return (self.db.query(Quote)
                 .filter(Quote.user_id == user_id)
-                .order_by(Quote.created_at.desc())
+                .order_by(Quote.created_at.desc(), Quote.id.desc())
                 .offset(offset)
                 .limit(limit)
                 .all())
+
+    def count_quotes_by_user(self, user_id: uuid.UUID) -> int:
+        """Total de cotizaciones del usuario (COUNT(*), sin cargar filas)"""
+        return self.db.query(func.count(Quote.id)).filter(Quote.user_id == user_id).scalar() or 0
+
+    @staticmethod
+    def _filter_quotes(query, user_id: uuid.UUID, client_name: Optional[str] = None,
+                       created_from: Optional[dt.datetime] = None, created_to: Optional[dt.datetime] = None):
+        """Filtro de exportación: cliente (sin distinguir mayúsculas) y/o rango [created_from, created_to)"""
+        query = query.filter(Quote.user_id == user_id)
+        if client_name:
+            query = query.filter(func.lower(Quote.client_name) == client_name.strip().lower())
+        if created_from is not None:
+            query = query.filter(Quote.created_at >= created_from)
+        if created_to is not None:
+            query = query.filter(Quote.created_at < created_to)
+        return query
+
+    def count_quotes_for_export(self, user_id: uuid.UUID, **filters) -> int:
+        """Número de cotizaciones que entran en una exportación (mismos filtros que iter_quote_data)"""
+        return self._filter_quotes(self.db.query(func.count(Quote.id)), user_id, **filters).scalar() or 0
+
+    def get_quote_data_batch(self, user_id: uuid.UUID, after_id: int = 0, batch_size: int = 50,
+                             **filters) -> List[Tuple[int, dict]]:
+        """Siguiente lote keyset de (id, quote_data) filtrados con id > after_id"""
+        return (self._filter_quotes(self.db.query(Quote.id, Quote.quote_data), user_id, **filters)
+                .filter(Quote.id > after_id)
+                .order_by(Quote.id)
+                .limit(batch_size)
+                .all())
+
+    def iter_quote_data(self, user_id: uuid.UUID, batch_size: int = 50, **filters) -> Iterator[Tuple[int, dict]]:
+        """
+        (id, quote_data) de las cotizaciones filtradas, en lotes de batch_size.
+
+        Cada lote es una consulta keyset por id que solo trae esas dos
+        columnas, así la memoria no depende del número de cotizaciones.
+        """
+        last_id = 0
+        while True:
+            rows = self.get_quote_data_batch(user_id, last_id, batch_size, **filters)
+            for quote_id, quote_data in rows:
+                yield quote_id, quote_data
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def get_quotes_page_by_user(self, user_id: uuid.UUID, limit: int = 20,
+                                cursor: Optional[str] = None,
+                                summary: bool = False) -> Tuple[List[Quote], Optional[str]]:
+        """
+        Página de cotizaciones con cursor keyset (created_at, id), más recientes primero.
+
+        A diferencia de offset, el costo no crece con el número de página: la
+        consulta arranca en el cursor usando idx_quotes_user_created_at.
+
+        Args:
+            summary: No cargar quote_data (listados)
+
+        Returns:
+            (cotizaciones, cursor de la siguiente página o None si es la última)
+
+        Raises:
+            ValueError: Cursor inválido
+        """
+        query = self._summary_query() if summary else self.db.query(Quote)
+        query = query.filter(Quote.user_id == user_id)
+        if cursor:
+            created_at, quote_id = self.decode_quote_cursor(cursor)
+            query = query.filter(or_(
+                Quote.created_at < created_at,
+                and_(Quote.created_at == created_at, Quote.id < quote_id)
+            ))
+        quotes = (query.order_by(Quote.created_at.desc(), Quote.id.desc())
+                  .limit(limit + 1)
+                  .all())
+        if len(quotes) <= limit:
+            return quotes, None
+        quotes = quotes[:limit]
+        return quotes, self.encode_quote_cursor(quotes[-1])
+
+    @staticmethod
+    def encode_quote_cursor(quote: Quote) -> str:
+        """Cursor opaco (URL-safe) que apunta después de la cotización dada"""
+        raw = f"{quote.created_at.isoformat()}|{quote.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_quote_cursor(cursor: str) -> Tuple[dt.datetime, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            created_at, quote_id = raw.rsplit("|", 1)
+            return dt.datetime.fromisoformat(created_at), int(quote_id)
+        except Exception:
+            raise ValueError("Cursor de paginación inválido")
     
     def get_quote_by_id(self, quote_id: int, user_id: uuid.UUID) -> Optional[Quote]:
         """Obtener cotización específica del usuario"""
@@ -595,7 +1000,8 @@ class DatabaseQuoteService:
             items_count=quote_data.get('items_count', 0),
             quote_data=quote_data.get('quote_data', {}),
             notes=quote_data.get('notes'),
-            valid_until=quote_data.get('valid_until')
+            valid_until=quote_data.get('valid_until'),
+            **quote_summary_columns(quote_data.get('quote_data', {}))
         )
         self.db.add(quote)
         self.db.commit()
@@ -620,7 +1026,10 @@ class DatabaseQuoteService:
         quote.indirect_costs_amount = quote_data.get('indirect_costs_amount', quote.indirect_costs_amount)
         quote.tax_amount = quote_data.get('tax_amount', quote.tax_amount)
         quote.items_count = quote_data.get('items_count', quote.items_count)
-        quote.quote_data = quote_data.get('quote_data', quote.quote_data)
+        if 'quote_data' in quote_data:
+            quote.quote_data = quote_data['quote_data']
+            for column, value in quote_summary_columns(quote.quote_data).items():
+                setattr(quote, column, value)
         quote.notes = quote_data.get('notes', quote.notes)
         quote.valid_until = quote_data.get('valid_until', quote.valid_until)
         
@@ -672,6 +1081,12 @@ class DatabaseWorkOrderService:
         return self.db.query(WorkOrder).filter(
             WorkOrder.user_id == user_id
         ).order_by(WorkOrder.created_at.desc()).limit(limit).all()
+
+    def get_work_order_summaries_by_user(self, user_id: uuid.UUID, limit: int = 50) -> List[WorkOrder]:
+        """Órdenes de trabajo del usuario sin el JSONB work_order_data (se carga al accederlo)"""
+        return self.db.query(WorkOrder).options(defer(WorkOrder.work_order_data)).filter(
+            WorkOrder.user_id == user_id
+        ).order_by(WorkOrder.created_at.desc()).limit(limit).all()
     
     def get_work_order_by_id(self, work_order_id: int, user_id: uuid.UUID) -> Optional[WorkOrder]:
         """Obtener orden de trabajo por ID del usuario"""
@@ -780,4 +1195,158 @@ class DatabaseWorkOrderService:
             }
             materials.append(material_entry)
         
-        return materials
\ No newline at end of file
+        return materials
+
+class DatabaseImportJobService:
+    """Servicio para la tabla de trabajos de importación CSV en segundo plano"""
+
+    ACTIVE_STATUSES = ("queued", "running")
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(self, user_id, kind: str, filename: str, file_path: str,
+                   rows_total: Optional[int] = None) -> ImportJob:
+        job = ImportJob(user_id=user_id, kind=kind, filename=filename, file_path=file_path,
+                        rows_total=rows_total, status="queued", rows_processed=0, cancel_requested=False)
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_job(self, job_id, user_id=None) -> Optional[ImportJob]:
+        query = self.db.query(ImportJob).filter(ImportJob.id == job_id)
+        if user_id is not None:
+            query = query.filter(ImportJob.user_id == user_id)
+        return query.first()
+
+    def list_jobs(self, user_id, limit: int = 20) -> List[ImportJob]:
+        return self.db.query(ImportJob).filter(ImportJob.user_id == user_id)\
+            .order_by(ImportJob.created_at.desc()).limit(limit).all()
+
+    def claim_job(self, job_id) -> bool:
+        """Pasar un trabajo de queued a running; False si otro worker lo tomó o fue cancelado"""
+        now = dt.datetime.now(dt.timezone.utc)
+        claimed = self.db.query(ImportJob).filter(
+            ImportJob.id == job_id,
+            ImportJob.status == "queued",
+            ImportJob.cancel_requested.is_(False)
+        ).update({ImportJob.status: "running", ImportJob.started_at: now, ImportJob.heartbeat_at: now},
+                 synchronize_session=False)
+        self.db.commit()
+        return claimed == 1
+
+    def update_progress(self, job_id, rows_processed: int) -> bool:
+        """Guardar el avance y devolver si se pidió cancelar el trabajo (una sola sentencia)"""
+        cancel_requested = self.db.execute(
+            update(ImportJob).where(ImportJob.id == job_id).values(
+                rows_processed=rows_processed, heartbeat_at=dt.datetime.now(dt.timezone.utc)
+            ).returning(ImportJob.cancel_requested)
+        ).scalar()
+        self.db.commit()
+        return bool(cancel_requested)
+
+    def finish_job(self, job_id, status: str, result: Optional[dict] = None, error: Optional[str] = None,
+                   rows_processed: Optional[int] = None):
+        values = {ImportJob.status: status, ImportJob.result: result, ImportJob.error: error,
+                  ImportJob.file_path: None, ImportJob.finished_at: dt.datetime.now(dt.timezone.utc)}
+        if rows_processed is not None:
+            values[ImportJob.rows_processed] = rows_processed
+        self.db.query(ImportJob).filter(ImportJob.id == job_id).update(values, synchronize_session=False)
+        self.db.commit()
+
+    def request_cancel(self, job_id, user_id) -> Optional[ImportJob]:
+        """Marcar un trabajo para cancelar; uno que aún no empezó queda cancelado de inmediato"""
+        self.db.query(ImportJob).filter(
+            ImportJob.id == job_id,
+            ImportJob.user_id == user_id,
+            ImportJob.status.in_(self.ACTIVE_STATUSES)
+        ).update({ImportJob.cancel_requested: True}, synchronize_session=False)
+        self.db.query(ImportJob).filter(
+            ImportJob.id == job_id,
+            ImportJob.status == "queued"
+        ).update({ImportJob.status: "cancelled", ImportJob.finished_at: dt.datetime.now(dt.timezone.utc)},
+                 synchronize_session=False)
+        self.db.commit()
+        return self.get_job(job_id, user_id)
+
+    def get_queued_jobs(self) -> List[ImportJob]:
+        return self.db.query(ImportJob).filter(ImportJob.status == "queued")\
+            .order_by(ImportJob.created_at).all()
+
+    def fail_stale_jobs(self, older_than: dt.datetime) -> int:
+        """Dar por fallidos los trabajos running sin progreso desde older_than (proceso caído)"""
+        count = self.db.query(ImportJob).filter(
+            ImportJob.status == "running",
+            ImportJob.heartbeat_at < older_than
+        ).update({ImportJob.status: "failed", ImportJob.error: "Import interrupted (worker stopped)",
+                  ImportJob.finished_at: dt.datetime.now(dt.timezone.utc)},
+                 synchronize_session=False)
+        self.db.commit()
+        return count
+
+
+# ===== VARIANTES ASYNC DE LOS SERVICIOS =====
+
+class AsyncServiceAdapter:
+    """Versión async de un servicio síncrono que recibe una Session
+
+    Cada método público se ejecuta con AsyncSession.run_sync: el mismo código
+    del servicio, pero la E/S va por el driver async y el event loop sigue
+    atendiendo otras peticiones mientras se espera a la base de datos.
+    Los generadores (iter_*) no se adaptan: usan la sesión después de volver.
+    Donde hacen falta se definen como generadores async (p. ej. iter_quote_data).
+    """
+
+    service_class = None
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def __getattr__(self, name: str):
+        method = getattr(self.service_class, name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
+        if inspect.isgeneratorfunction(method):
+            raise AttributeError(f"{self.service_class.__name__}.{name} is a generator; use run_sync with a sync session")
+
+        async def call(*args, **kwargs):
+            return await self.db.run_sync(
+                lambda session: getattr(self.service_class(session), name)(*args, **kwargs)
+            )
+
+        call.__name__ = name
+        return call
+
+class AsyncDatabaseUserService(AsyncServiceAdapter):
+    service_class = DatabaseUserService
+
+class AsyncDatabaseMaterialService(AsyncServiceAdapter):
+    service_class = DatabaseMaterialService
+
+class AsyncDatabaseProductService(AsyncServiceAdapter):
+    service_class = DatabaseProductService
+
+class AsyncDatabaseColorService(AsyncServiceAdapter):
+    service_class = DatabaseColorService
+
+class AsyncDatabaseCompanyService(AsyncServiceAdapter):
+    service_class = DatabaseCompanyService
+
+class AsyncDatabaseQuoteService(AsyncServiceAdapter):
+    service_class = DatabaseQuoteService
+
+    async def iter_quote_data(self, user_id: uuid.UUID, batch_size: int = 50,
+                              **filters) -> AsyncIterator[Tuple[int, dict]]:
+        """Como DatabaseQuoteService.iter_quote_data, con cada lote leído por el driver async"""
+        last_id = 0
+        while True:
+            rows = await self.get_quote_data_batch(user_id, last_id, batch_size, **filters)
+            for quote_id, quote_data in rows:
+                yield quote_id, quote_data
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+class AsyncDatabaseWorkOrderService(AsyncServiceAdapter):
+    service_class = DatabaseWorkOrderService
@@ -0,0 +1,201 @@
+# engine_registry.py - Registro único de engines SQLAlchemy (un pool por base de datos para toda la app)
+"""
+Shared SQLAlchemy engines.
+
+database.py (get_db / get_async_db), the resilience DatabaseConnectionManager,
+the audit trail and the migration manager all ask this registry for their
+engine, so each database URL gets one sync and one async connection pool
+instead of a pool per subsystem (or per call). Pools are sized from settings
+(db_pool_*), pre-ping connections, set the PostgreSQL statement_timeout on
+connect and record checkout wait times; get_pool_stats() reports them for
+the health endpoint.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from config import settings
+
+APPLICATION_NAME = "VentanasApp"
+
+
+class PoolMetrics:
+    """Checkout counters and wait times of one pool (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait / waits * 1000, 3) if waits else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+            }
+
+
+class _TimedPoolMixin:
+    """Times how long a checkout waits for a free connection"""
+
+    metrics: PoolMetrics  # Set on the per-engine subclass, so pool.recreate() keeps it
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(url: URL, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine keyword arguments for url (pool sizing, pre-ping, timeouts)"""
+    if _is_memory_sqlite(url):
+        # One connection per thread is the whole database: nothing to size
+        return {}
+
+    # Separate budgets: the two pools of a worker must fit max_connections together
+    options = {
+        "pool_size": settings.db_async_pool_size if is_async else settings.db_pool_size,
+        "max_overflow": settings.db_async_max_overflow if is_async else settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if url.get_backend_name() != "postgresql":
+        return options
+
+    statement_timeout = settings.db_statement_timeout_ms
+    if is_async:
+        server_settings = {"application_name": APPLICATION_NAME}
+        if statement_timeout:
+            server_settings["statement_timeout"] = str(statement_timeout)
+        options["connect_args"] = {"timeout": settings.db_connect_timeout_seconds,
+                                   "server_settings": server_settings}
+    else:
+        connect_args = {"connect_timeout": settings.db_connect_timeout_seconds,
+                        "application_name": APPLICATION_NAME}
+        if statement_timeout:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+        options["connect_args"] = connect_args
+    return options
+
+
+class EngineRegistry:
+    """One sync and one async engine per database URL, created on first use"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: Dict[Tuple[str, bool], Any] = {}
+        self._metrics: Dict[Tuple[str, bool], PoolMetrics] = {}
+
+    def get_engine(self, database_url: Optional[str] = None) -> Engine:
+        return self._get(database_url or settings.database_url, is_async=False)
+
+    def get_async_engine(self, database_url: str) -> AsyncEngine:
+        """database_url must name the async driver (see database.async_database_url)"""
+        return self._get(database_url, is_async=True)
+
+    def _get(self, database_url: str, is_async: bool):
+        url = make_url(database_url)
+        key = (url.render_as_string(hide_password=False), is_async)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                options = engine_options(url, is_async)
+                if options:
+                    metrics = PoolMetrics()
+                    base = TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool
+                    options["poolclass"] = type(base.__name__, (base,), {"metrics": metrics})
+                    self._metrics[key] = metrics
+                engine = (create_async_engine if is_async else create_engine)(url, **options)
+                self._engines[key] = engine
+            return engine
+
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Pool occupancy and checkout waits per engine (passwords hidden)"""
+        with self._lock:
+            engines = list(self._engines.items())
+        stats = {}
+        for (url, is_async), engine in engines:
+            pool = engine.pool
+            name = make_url(url).render_as_string(hide_password=True) + (" (async)" if is_async else "")
+            entry = {"pool": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                entry.update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    checked_in=pool.checkedin(),
+                    overflow=max(pool.overflow(), 0),
+                    max_overflow=pool._max_overflow,
+                )
+            metrics = self._metrics.get((url, is_async))
+            if metrics is not None:
+                entry.update(metrics.get_stats())
+            stats[name] = entry
+        return stats
+
+    def dispose_sync(self):
+        """Close the pooled connections of the sync engines (engines stay usable)"""
+        with self._lock:
+            engines = [engine for (_, is_async), engine in self._engines.items() if not is_async]
+        for engine in engines:
+            engine.dispose()
+
+    async def dispose_async(self):
+        """Close the async engines and forget them (they are recreated on next use)"""
+        with self._lock:
+            keys = [key for key in self._engines if key[1]]
+            engines = [self._engines.pop(key) for key in keys]
+            for key in keys:
+                self._metrics.pop(key, None)
+        for engine in engines:
+            await engine.dispose()
+
+
+engine_registry = EngineRegistry()
+
+
+def get_engine(database_url: Optional[str] = None) -> Engine:
+    """Shared sync engine for database_url (default: settings.database_url)"""
+    return engine_registry.get_engine(database_url)
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    return engine_registry.get_pool_stats()
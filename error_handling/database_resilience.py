@@ -17,13 +17,14 @@ from typing import Optional, Callable, Any, Dict, List
 from contextlib import contextmanager
 from enum import Enum
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError, DisconnectionError, TimeoutError
 from error_handling.error_manager import (
     DatabaseError, ErrorMessages, create_database_error, error_manager
 )
 from error_handling.logging_config import get_logger
+from engine_registry import get_engine, get_pool_stats
 
 
 class ConnectionState(str, Enum):
@@ -271,17 +272,8 @@ class DatabaseConnectionManager:
     def _initialize_connection(self):
         """Initialize database connection"""
         try:
-            self.engine = create_engine(
-                self.database_url,
-                pool_pre_ping=True,  # Verify connections before use
-                pool_recycle=3600,   # Recycle connections every hour
-                pool_size=10,        # Connection pool size
-                max_overflow=20,     # Max overflow connections
-                connect_args={
-                    "connect_timeout": 10,
-                    "application_name": "VentanasApp"
-                }
-            )
+            # Same engine (and pool) as get_db: sizing, pre-ping and timeouts come from settings.db_pool_*
+            self.engine = get_engine(self.database_url)
             
             self.session_factory = sessionmaker(bind=self.engine)
             self.connection_state = ConnectionState.HEALTHY
@@ -361,6 +353,7 @@ class DatabaseConnectionManager:
                 return {
                     "status": self.connection_state.value,
                     "connection_ok": connection_ok,
+                    "pools": get_pool_stats(),
                     "last_check": self.last_health_check.isoformat() if self.last_health_check else None,
                     "performance": performance,
                     "circuit_breaker_state": self.retry_handler.circuit_breaker.state.value
@@ -17,12 +17,14 @@ import platform
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from database import get_db
 from error_handling.logging_config import get_logger
-from error_handling.database_resilience import db_connection_manager
+from error_handling import database_resilience
+from engine_registry import get_pool_stats
 
 
 class HealthStatus(BaseModel):
@@ -70,18 +72,19 @@ class HealthCheckManager:
         
         try:
             # Test basic connection
-            db.execute("SELECT 1")
+            db.execute(text("SELECT 1"))
             
             # Test a more complex query
-            result = db.execute("SELECT COUNT(*) as count FROM app_materials")
+            result = db.execute(text("SELECT COUNT(*) as count FROM app_materials"))
             materials_count = result.fetchone()[0]
             
             response_time = (time.time() - start_time) * 1000
             
             # Get database health from connection manager
             db_health = {}
-            if db_connection_manager:
-                db_health = db_connection_manager.get_health_status()
+            # Read through the module: the manager is created after this module is imported
+            if database_resilience.db_connection_manager:
+                db_health = database_resilience.db_connection_manager.get_health_status()
             
             return ServiceCheck(
                 name="database",
@@ -91,7 +94,8 @@ class HealthCheckManager:
                 details={
                     "materials_count": materials_count,
                     "connection_pool_status": db_health.get("status", "unknown"),
-                    "circuit_breaker_state": db_health.get("circuit_breaker_state", "unknown")
+                    "circuit_breaker_state": db_health.get("circuit_breaker_state", "unknown"),
+                    "connection_pools": get_pool_stats()
                 }
             )
             
@@ -160,6 +164,13 @@ class HealthCheckManager:
             from services.product_bom_service_db import ProductBOMServiceDB
             from security.formula_evaluator import formula_evaluator
             from security.middleware import SecurityMiddleware
+            from services.catalog_cache import catalog_cache
+            from services.product_cost_kernel import product_kernel_cache
+            from services.quote_item_cache import quote_item_cache
+            from services.session_cache import session_cache
+            from services.pdf_render_service import pdf_render_service
+            from services.import_job_service import import_job_runner
+            from security.password_hashing import password_hasher
             
             # Test formula evaluator
             test_result = formula_evaluator.evaluate_formula("2 + 2", {})
@@ -176,7 +187,15 @@ class HealthCheckManager:
                 details={
                     "formula_evaluator": "operational",
                     "security_middleware": "loaded",
-                    "bom_service": "available"
+                    "bom_service": "available",
+                    "formula_cache": formula_evaluator.get_cache_stats(),
+                    "catalog_cache": catalog_cache.get_stats(),
+                    "product_kernel_cache": product_kernel_cache.get_stats(),
+                    "quote_item_cache": quote_item_cache.get_stats(),
+                    "session_cache": session_cache.get_stats(),
+                    "pdf_renderer": pdf_render_service.get_stats(),
+                    "csv_import_jobs": import_job_runner.get_stats(),
+                    "password_hasher": password_hasher.get_stats()
                 }
             )
             
@@ -8,7 +8,8 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal, ROUND_HALF_UP
@@ -28,6 +29,7 @@ from database import get_db, User, UserSession, Quote, Company, Color, MaterialC
 from database import DatabaseUserService, DatabaseQuoteService, DatabaseCompanyService, DatabaseColorService, DatabaseMaterialService, DatabaseWorkOrderService
 from services.product_bom_service_db import ProductBOMServiceDB, initialize_sample_data
 from services.material_csv_service import MaterialCSVService
+from services.session_cache import session_cache
 from services.product_bom_csv_service import ProductBOMCSVService
 from security.formula_evaluator import formula_evaluator
 from security.middleware import SecurityMiddleware, SecureCookieMiddleware
@@ -108,6 +110,15 @@ async def lifespan(app: FastAPI):
             logger.critical(f"Critical error during sample data initialization: {str(e)}")
             # Log but don't crash the application
         
+        # Reanudar importaciones CSV que quedaron en cola antes de reiniciar
+        try:
+            from services.import_job_service import import_job_runner
+            resumed = import_job_runner.resume()
+            if resumed:
+                logger.info(f"🔄 Resumed {resumed} queued CSV import jobs")
+        except Exception as e:
+            logger.error(f"Could not resume CSV import jobs: {str(e)}")
+        
         # Log successful startup
         logger.info("✅ Application startup completed successfully")
         logger.audit_event("system_startup", "application", result="success")
@@ -126,6 +137,25 @@ async def lifespan(app: FastAPI):
     
     # === SHUTDOWN ===
     try:
+        # Cancelar trabajos de PDF pendientes y cerrar el pool de render
+        from services.pdf_render_service import pdf_render_service, pdf_job_manager
+        await pdf_job_manager.shutdown()
+        pdf_render_service.shutdown()
+        # Detener importaciones CSV: las que no empezaron siguen en cola para el próximo arranque
+        from services.import_job_service import import_job_runner
+        import_job_runner.shutdown()
+        # Escribir los eventos de auditoría pendientes antes de cerrar los pools de conexiones
+        from data_protection.audit_trail import shutdown_audit_system
+        shutdown_audit_system()
+        # Cerrar el pool de hash de contraseñas
+        from security.password_hashing import password_hasher
+        password_hasher.shutdown()
+        # Cerrar los pools de conexiones (async y sync del registro de engines)
+        from database import dispose_async_engine
+        from engine_registry import engine_registry
+        await dispose_async_engine()
+        engine_registry.dispose_sync()
+
         if logger:
             logger.info("🔄 Gracefully shutting down application...")
             logger.audit_event("system_shutdown", "application", result="success")
@@ -460,6 +490,11 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     try:
         token = credentials.credentials
         
+        # Token validado recientemente: sin consultas de sesión/usuario
+        user = session_cache.get(token)
+        if user is not None:
+            return user
+        
         user_service = DatabaseUserService(db)
         session = user_service.get_session_by_token(token)
         
@@ -473,6 +508,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             logger.security_event("user_not_found", "User not found for bearer token session",
                                 user_id=session.user_id)
             raise create_auth_error("UNAUTHORIZED_ACCESS")
+        session_cache.put(token, user, session.expires_at)
         return user
         
     except (DatabaseError, AuthenticationError):
@@ -518,6 +554,8 @@ def calculate_window_item_from_bom(item: WindowItem, product_bom_service: Produc
         'area_m2': area_m2,
         'perimeter_m': perimeter_m,
     }
+    # Convertidas una sola vez por ítem y compartidas por todas las fórmulas del BOM
+    formula_names = formula_evaluator.prepare_variables(formula_vars)
 
     # Inicializar costos detallados por tipo de material
     total_profiles_cost = Decimal('0')
@@ -533,7 +571,8 @@ def calculate_window_item_from_bom(item: WindowItem, product_bom_service: Produc
 
         try:
             # Evaluar la fórmula de forma segura para obtener la cantidad "neta" para UNA ventana
-            quantity_net_for_one_window = formula_evaluator.evaluate_formula(bom_item.quantity_formula, formula_vars)
+            # La fórmula se compila una sola vez y se reutiliza (caché acotado por texto)
+            quantity_net_for_one_window = formula_evaluator.compile_formula(bom_item.quantity_formula).evaluate_prepared(formula_names)
             if quantity_net_for_one_window < 0:
                 quantity_net_for_one_window = Decimal('0')
         except Exception as e:
@@ -552,8 +591,7 @@ def calculate_window_item_from_bom(item: WindowItem, product_bom_service: Produc
         price_per_unit = material.cost_per_unit
         if bom_item.material_type == MaterialType.PERFIL and item.selected_profile_color:
             # Buscar el precio del color específico para este material
-            color_service = DatabaseColorService(product_bom_service.db)
-            color_price = color_service.get_material_color_price(material.id, item.selected_profile_color)
+            color_price = product_bom_service.get_material_color_price(material.id, item.selected_profile_color)
             if color_price:
                 price_per_unit = color_price
 
@@ -647,6 +685,8 @@ def calculate_complete_quote(quote_request: QuoteRequest, db: Session) -> QuoteC
     """Calcula cotización completa usando base de datos - UPDATED for material_items"""
     
     product_bom_service = ProductBOMServiceDB(db)
+    # Cargar en bloque productos, materiales y precios por color de la cotización
+    product_bom_service.load_catalog_snapshot(quote_request.items, quote_request.material_items)
 
     calculated_items = []
     calculated_material_items = []  # NEW
@@ -728,8 +768,8 @@ async def dashboard_page(request: Request, db: Session = Depends(get_db)):
     
     # Obtener cotizaciones del usuario usando método disponible
     quote_service = DatabaseQuoteService(db)
-    recent_quotes = quote_service.get_quotes_by_user(user.id, limit=5)
-    total_quotes = len(quote_service.get_quotes_by_user(user.id, limit=1000))  # Simple count
+    recent_quotes = quote_service.get_quote_summaries_by_user(user.id, limit=5)
+    total_quotes = quote_service.count_quotes_by_user(user.id)
     
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
@@ -1227,14 +1267,15 @@ async def export_materials_csv(
     """Export materials to CSV format by category"""
     try:
         csv_service = MaterialCSVService(db)
-        csv_content = csv_service.export_materials_to_csv(category)
+        # Streamed in chunks while rows are read from the database
+        csv_chunks = csv_service.iter_materials_csv(category)
         
         # Generate filename
         category_part = f"_{category}" if category and category != "all" else ""
         filename = f"materials{category_part}.csv"
         
-        return Response(
-            content=csv_content,
+        return StreamingResponse(
+            csv_chunks,
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -1253,20 +1294,18 @@ async def import_materials_csv(
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="File must be a CSV file")
         
-        # Read file content
-        content = await file.read()
-        csv_content = content.decode('utf-8')
-        
-        # Process CSV
+        # Stream the upload (spooled to disk by Starlette) in chunks, off the event loop
         csv_service = MaterialCSVService(db)
-        results = csv_service.import_materials_from_csv(csv_content)
-        
+        results = await run_in_threadpool(csv_service.import_materials_streaming, file.file)
+        summary = results["summary"]
+
         return {
             "message": "CSV import completed",
             "filename": file.filename,
-            "summary": results["summary"],
-            "success_count": len(results["success"]),
-            "error_count": len(results["errors"]),
+            "summary": summary,
+            "success_count": summary["created"] + summary["updated"] + summary["deleted"],
+            "error_count": summary["skipped"] or len(results["errors"]),
+            "truncated": results["truncated"],
             "successes": results["success"],
             "errors": results["errors"]
         }
@@ -1310,14 +1349,15 @@ async def export_products_csv(
     """Export products to CSV format by window type"""
     try:
         csv_service = ProductBOMCSVService(db)
-        csv_content = csv_service.export_products_to_csv(window_type)
+        # Streamed in chunks while rows are read from the database
+        csv_chunks = csv_service.iter_products_csv(window_type)
         
         # Generate filename
         window_type_part = f"_{window_type}" if window_type and window_type != "all" else ""
         filename = f"products{window_type_part}.csv"
         
-        return Response(
-            content=csv_content,
+        return StreamingResponse(
+            csv_chunks,
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -1453,7 +1493,7 @@ async def get_work_orders(
     """Get list of work orders for current user"""
     try:
         work_order_service = DatabaseWorkOrderService(db)
-        work_orders = work_order_service.get_work_orders_by_user(current_user.id, limit)
+        work_orders = work_order_service.get_work_order_summaries_by_user(current_user.id, limit)
         return work_orders
         
     except Exception as e:
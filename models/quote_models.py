@@ -212,6 +212,7 @@ class WindowCalculation(BaseModel):
         None,
         description="[PREFERRED] ID del material de vidrio desde database"
     )
+    selected_profile_color: Optional[int] = Field(None, description="ID del color de perfiles usado en el cálculo.")
 
     width_cm: Decimal
     height_cm: Decimal
@@ -264,12 +265,29 @@ class QuoteCalculation(BaseModel):
     # Total final
     tax_amount: Decimal = Field(..., description="Monto de impuestos")
     total_final: Decimal = Field(..., description="Total final con impuestos")
+
+    # Tasas usadas en el cálculo (para editar o recotizar la cotización guardada)
+    profit_margin: Optional[Decimal] = None
+    indirect_costs_rate: Optional[Decimal] = None
+    tax_rate: Optional[Decimal] = None
+    labor_rate_per_m2_override: Optional[Decimal] = None
     
     # Metadatos
     calculated_at: datetime = Field(default_factory=datetime.now)
     valid_until: Optional[datetime] = None
     notes: Optional[str] = None
 
+class BatchQuoteRequest(BaseModel):
+    """Solicitud de cálculo de varias cotizaciones en un solo paso"""
+    quotes: List[QuoteRequest] = Field(..., min_items=1, max_items=500)
+
+class BatchQuoteResult(BaseModel):
+    """Resultado por cotización de un cálculo en lote (cálculo o error)"""
+    index: int
+    quote_id: Optional[int] = None
+    calculation: Optional[QuoteCalculation] = None
+    error: Optional[str] = None
+
 class QuoteSummary(BaseModel):
     """Resumen de cotización para listados"""
     id: int
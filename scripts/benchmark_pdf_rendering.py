@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark de generación de PDFs de cotizaciones (PDFs por segundo por worker)
+
+Compara:
+- legacy:   lo que hacía cada request antes del renderer compartido
+            (nuevo Environment de Jinja2, plantilla y CSS parseados por PDF)
+- renderer: PDFQuoteService con el PDFRenderer del proceso
+            (CSS, plantilla y fuentes preparados una sola vez)
+
+Uso (desde la raíz del proyecto, con WeasyPrint instalado):
+    python scripts/benchmark_pdf_rendering.py --count 50 --items 10
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Environment, FileSystemLoader
+from weasyprint import HTML, CSS
+
+from models.quote_models import QuoteCalculation
+from services.pdf_service import PDFQuoteService, PDF_STYLESHEET, get_pdf_renderer
+
+
+def sample_quote(items: int) -> dict:
+    """Cotización de ejemplo con N ventanas"""
+    window = {
+        "product_bom_id": 1, "product_bom_name": "Ventana Corrediza Serie 3",
+        "window_type": "corrediza", "aluminum_line": "nacional_serie_3",
+        "selected_glass_type": "claro_6mm", "width_cm": "150.00", "height_cm": "120.00",
+        "quantity": 2, "area_m2": "1.800", "perimeter_m": "5.400",
+        "total_profiles_cost": "1450.00", "total_glass_cost": "453.60", "total_hardware_cost": "220.00",
+        "total_consumables_cost": "80.00", "labor_cost": "280.80", "subtotal": "2484.40",
+        "aluminum_length_needed": "0", "aluminum_cost": "1750.00", "glass_area_needed": "0",
+        "hardware_cost": "220.00",
+    }
+    subtotal = Decimal("2484.40") * items
+    return QuoteCalculation(
+        quote_id=1,
+        client={"name": "Cliente Benchmark", "email": "cliente@example.com"},
+        items=[dict(window) for _ in range(items)],
+        materials_subtotal=subtotal * Decimal("0.88"),
+        labor_subtotal=subtotal * Decimal("0.12"),
+        subtotal_before_overhead=subtotal,
+        profit_amount=subtotal * Decimal("0.25"),
+        indirect_costs_amount=subtotal * Decimal("0.15"),
+        subtotal_with_overhead=subtotal * Decimal("1.40"),
+        tax_amount=subtotal * Decimal("0.224"),
+        total_final=subtotal * Decimal("1.624"),
+        valid_until=datetime.now() + timedelta(days=30),
+    ).model_dump(mode="json")
+
+
+def render_legacy(service: PDFQuoteService, quote_data: dict) -> bytes:
+    """Render como antes: Environment, plantilla y CSS nuevos en cada PDF"""
+    quote = QuoteCalculation(**quote_data)
+    products = service.calculate_unit_selling_prices(quote)
+    template = Environment(loader=FileSystemLoader("templates")).get_template("quote_pdf.html")
+    html_content = template.render(
+        quote=quote, products=products, company={"name": "Mi Empresa"}, company_logo_base64=None,
+        generated_date=datetime.now(), quote_number=f"COT-{quote.quote_id:05d}",
+        subtotal_before_overhead_formatted=f"${quote.subtotal_before_overhead:,.2f}",
+        profit_amount_formatted=f"${quote.profit_amount:,.2f}",
+        indirect_costs_amount_formatted=f"${quote.indirect_costs_amount:,.2f}",
+        subtotal_with_overhead_formatted=f"${quote.subtotal_with_overhead:,.2f}",
+        tax_amount_formatted=f"${quote.tax_amount:,.2f}",
+        total_final_formatted=f"${quote.total_final:,.2f}",
+        total_area=sum(p["area_m2"] for p in products), total_windows=sum(p["quantity"] for p in products),
+    )
+    return HTML(string=html_content).write_pdf(stylesheets=[CSS(string=PDF_STYLESHEET)])
+
+
+def render_shared(service: PDFQuoteService, quote_data: dict) -> bytes:
+    """Render actual: cada request crea su PDFQuoteService, el renderer es del proceso"""
+    return PDFQuoteService().generate_quote_pdf(quote_data, {"name": "Mi Empresa"})
+
+
+def measure(name: str, render, quote_data: dict, count: int) -> float:
+    service = PDFQuoteService()
+    render(service, quote_data)  # warm-up (imports, first font lookup)
+    start = time.perf_counter()
+    size = 0
+    for _ in range(count):
+        size += len(render(service, quote_data))
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed
+    print(f"{name:<10} {count:>5} PDFs  {elapsed:8.2f} s  {rate:8.2f} PDF/s  {size / count / 1024:8.1f} KB/PDF")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDFs por segundo por worker")
+    parser.add_argument("--count", type=int, default=30, help="PDFs por modo")
+    parser.add_argument("--items", type=int, default=10, help="Ventanas por cotización")
+    parser.add_argument("--mode", choices=["both", "legacy", "renderer"], default="both")
+    args = parser.parse_args()
+
+    quote_data = sample_quote(args.items)
+    print(f"Cotización de {args.items} ventanas, {args.count} PDFs por modo (pid {os.getpid()})")
+
+    rates = {}
+    if args.mode in ("both", "legacy"):
+        rates["legacy"] = measure("legacy", render_legacy, quote_data, args.count)
+    if args.mode in ("both", "renderer"):
+        get_pdf_renderer().warm_up()
+        rates["renderer"] = measure("renderer", render_shared, quote_data, args.count)
+    if len(rates) == 2:
+        print(f"Mejora: x{rates['renderer'] / rates['legacy']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark del límite de peticiones por IP (verificaciones por segundo)
+
+Compara, con N IPs distintas enviando peticiones en round-robin:
+- legacy: lista de timestamps por IP + limpieza de todos los clientes
+          en cada petición (lo que hacía SecurityMiddleware antes)
+- memory: InMemoryRateLimiter (GCRA, un float por IP, barrido por timer)
+- sqlite: SQLiteRateLimiter (GCRA en un archivo compartido por los workers)
+
+Uso (desde la raíz del proyecto):
+    python scripts/benchmark_rate_limiter.py --ips 10000 --requests 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from security.rate_limiter import InMemoryRateLimiter, SQLiteRateLimiter
+
+
+class LegacyRateLimiter:
+    """Algoritmo anterior de SecurityMiddleware._check_rate_limit, sin cambios"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.storage = {}
+
+    def allow(self, client_ip: str) -> bool:
+        current_time = time.time()
+        cutoff = current_time - (self.window * 2)
+        expired = [ip for ip, data in self.storage.items()
+                   if (not data['requests'] or max(data['requests']) < cutoff) and data['blocked_until'] < current_time]
+        for ip in expired:
+            del self.storage[ip]
+
+        client_data = self.storage.setdefault(client_ip, {'requests': [], 'blocked_until': 0})
+        if current_time < client_data['blocked_until']:
+            return False
+        window_start = current_time - self.window
+        client_data['requests'] = [t for t in client_data['requests'] if t > window_start]
+        if len(client_data['requests']) >= self.limit:
+            client_data['blocked_until'] = current_time + self.window
+            return False
+        client_data['requests'].append(current_time)
+        return True
+
+
+def measure(name: str, limiter, ips: list, requests: int) -> float:
+    start = time.perf_counter()
+    allowed = 0
+    for i in range(requests):
+        allowed += limiter.allow(ips[i % len(ips)])
+    elapsed = time.perf_counter() - start
+    rate = requests / elapsed
+    print(f"{name:<8} {requests:>8} checks  {elapsed:8.3f} s  {rate:12.0f} checks/s  "
+          f"{elapsed / requests * 1e6:8.2f} us/check  {allowed:>8} allowed")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificaciones de límite por segundo")
+    parser.add_argument("--ips", type=int, default=10000, help="IPs distintas")
+    parser.add_argument("--requests", type=int, default=100000, help="Verificaciones por modo")
+    parser.add_argument("--limit", type=int, default=100, help="Peticiones por ventana")
+    parser.add_argument("--window", type=float, default=60, help="Ventana en segundos")
+    parser.add_argument("--legacy-requests", type=int, default=2000,
+                        help="Verificaciones del modo legacy (O(clientes) por petición)")
+    args = parser.parse_args()
+
+    ips = [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(args.ips)]
+    print(f"{args.ips} IPs, límite {args.limit}/{args.window:g}s")
+
+    rates = {}
+    legacy = LegacyRateLimiter(args.limit, args.window)
+    for ip in ips:  # Estado con todos los clientes ya vistos
+        legacy.allow(ip)
+    rates["legacy"] = measure("legacy", legacy, ips, args.legacy_requests)
+
+    rates["memory"] = measure("memory", InMemoryRateLimiter(args.limit, args.window), ips, args.requests)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite_limiter = SQLiteRateLimiter(args.limit, args.window, os.path.join(directory, "rate_limit.sqlite3"))
+        rates["sqlite"] = measure("sqlite", sqlite_limiter, ips, args.requests)
+        sqlite_limiter.close()
+
+    print(f"memory vs legacy: x{rates['memory'] / rates['legacy']:.0f}   "
+          f"sqlite vs legacy: x{rates['sqlite'] / rates['legacy']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Verificación de integridad de todo el audit trail (checksums SHA-256)
+
+Recorre audit_logs en lotes con un cursor del servidor, recalcula los
+checksums en un pool de procesos y guarda un checkpoint tras cada lote:
+si se interrumpe, la siguiente ejecución continúa donde se quedó.
+
+Uso (desde la raíz del proyecto):
+    python scripts/verify_audit_trail.py --start 2026-07-01 --end 2026-09-30T23:59:59 --report q3.json
+    python scripts/verify_audit_trail.py --restart  # ignora el checkpoint anterior
+
+Sale con código 1 si hay eventos con checksum distinto y 2 si no terminó.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from data_protection.audit_trail import AuditTrailManager
+from data_protection.audit_verification import AuditIntegrityVerifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificar los checksums del audit trail")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Desde (ISO, incluido)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Hasta (ISO, incluido)")
+    parser.add_argument("--batch-size", type=int, default=settings.audit_verify_batch_size)
+    parser.add_argument("--workers", type=int, default=settings.audit_verify_workers,
+                        help="Procesos del pool (0 = en este proceso)")
+    parser.add_argument("--checkpoint", default=settings.audit_verify_checkpoint_path)
+    parser.add_argument("--max-events", type=int, help="Detenerse tras N eventos (se reanuda después)")
+    parser.add_argument("--restart", action="store_true", help="Empezar de cero aunque haya checkpoint")
+    parser.add_argument("--report", help="Archivo JSON donde guardar el reporte")
+    args = parser.parse_args()
+
+    manager = AuditTrailManager(settings.database_url)
+    try:
+        verifier = AuditIntegrityVerifier(manager, checkpoint_path=args.checkpoint,
+                                          batch_size=args.batch_size, workers=args.workers)
+        report = verifier.run(start_date=args.start, end_date=args.end, resume=not args.restart,
+                              max_events=args.max_events)
+    finally:
+        manager.shutdown()
+
+    print(f"Eventos verificados: {report['events_checked']}  "
+          f"({report['events_per_second']} eventos/s, {report['elapsed_seconds']} s)")
+    print(f"Checksums distintos: {report['mismatch_count']}")
+    for mismatch in report["mismatches"][:20]:
+        print(f"  {mismatch['timestamp']}  {mismatch['event_id']}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Reporte guardado en {args.report}")
+
+    if report["mismatch_count"]:
+        sys.exit(1)
+    if not report["completed"]:
+        print(f"Verificación incompleta; checkpoint en {args.checkpoint}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,119 @@
 import ast
 import math
 import operator
+import threading
+from collections import OrderedDict
 from decimal import Decimal
-from typing import Dict, Any, Union
-from simpleeval import simple_eval
+from typing import Dict, Any, Callable, Optional, Union
+from simpleeval import (
+    SimpleEval, NameNotDefined, AttributeDoesNotExist,
+    DISALLOW_FUNCTIONS, DISALLOW_METHODS, DISALLOW_PREFIXES, MAX_STRING_LENGTH
+)
+
+# Maximum number of distinct formulas kept compiled in memory
+FORMULA_CACHE_SIZE = 256
+
+# Safe "math" namespace exposed to formulas (math.ceil, math.floor, ...)
+# Built once instead of creating a new class on every evaluation
+_MATH_NAMESPACE = type('math', (), {
+    'ceil': math.ceil,
+    'floor': math.floor,
+    'sqrt': math.sqrt,
+    'pi': math.pi,
+    'e': math.e,
+})
+
+
+class _NotCompilable(Exception):
+    """Internal signal: node must be handled by the simpleeval interpreter"""
+
+
+class CompiledFormula:
+    """
+    A formula parsed and validated once, evaluated many times.
+
+    The expression tree is turned into a chain of Python closures that mirror
+    simpleeval's node semantics using the evaluator's whitelisted operators and
+    functions. Constructs outside the compiled subset are evaluated by
+    simpleeval using the pre-parsed tree, so results are identical either way.
+    """
+
+    __slots__ = ('formula', 'is_native', '_fn', '_error')
+
+    def __init__(self, formula: str, fn: Optional[Callable[[dict], Any]] = None,
+                 is_native: bool = False, error: Optional[Exception] = None):
+        self.formula = formula
+        self.is_native = is_native
+        self._fn = fn
+        self._error = error
+
+    def evaluate_prepared(self, names: Dict[str, Any]) -> Decimal:
+        """
+        Evaluate with a names dict already built by SafeFormulaEvaluator.prepare_variables().
+
+        Use this when several formulas share the same variables (e.g. every
+        BOM line of one window item) to avoid converting them on every call.
+        """
+        if self._error is not None:
+            raise ValueError(f"Error evaluating formula '{self.formula}': {str(self._error)}")
+
+        try:
+            result = self._fn(names)
+
+            # Convert result back to Decimal for precision
+            if isinstance(result, (int, float)):
+                return Decimal(str(result))
+            else:
+                return Decimal(str(float(result)))
+
+        except Exception as e:
+            raise ValueError(f"Error evaluating formula '{self.formula}': {str(e)}")
+
+
+class FormulaCache:
+    """Bounded, thread-safe LRU cache of CompiledFormula keyed by formula text"""
+
+    def __init__(self, max_size: int = FORMULA_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, CompiledFormula]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, formula: str) -> Optional[CompiledFormula]:
+        with self._lock:
+            compiled = self._entries.get(formula)
+            if compiled is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(formula)
+            self.hits += 1
+            return compiled
+
+    def put(self, formula: str, compiled: CompiledFormula):
+        with self._lock:
+            self._entries[formula] = compiled
+            self._entries.move_to_end(formula)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
+
 
 class SafeFormulaEvaluator:
     """
@@ -55,7 +165,201 @@ class SafeFormulaEvaluator:
             'pi': math.pi,
             'e': math.e,
         }
-    
+
+        # Compiled formulas shared by every evaluation through this instance
+        self.formula_cache = FormulaCache()
+
+    def prepare_variables(self, variables: Dict[str, Union[float, int, Decimal]]) -> Dict[str, Any]:
+        """
+        Build the names dict used to evaluate formulas.
+
+        Decimals are converted to float for math operations and the safe
+        "math" namespace is added, exactly as evaluate_formula() does.
+        """
+        names = dict(self.safe_names)
+        for key, value in variables.items():
+            if isinstance(value, Decimal):
+                names[key] = float(value)
+            else:
+                names[key] = value
+
+        # Add math module as a safe namespace
+        names['math'] = _MATH_NAMESPACE
+        return names
+
+    def compile_formula(self, formula: str) -> CompiledFormula:
+        """
+        Get the compiled version of a formula, parsing it only on first use.
+
+        Args:
+            formula: Mathematical expression string (e.g., "2 * (width_m + height_m)")
+
+        Returns:
+            CompiledFormula: Reusable callable, cached by formula text
+
+        Raises:
+            ValueError: If formula is not a non-empty string
+        """
+        if not formula or not isinstance(formula, str):
+            raise ValueError("Formula must be a non-empty string")
+
+        compiled = self.formula_cache.get(formula)
+        if compiled is not None:
+            return compiled
+
+        try:
+            tree = SimpleEval.parse(formula)
+        except Exception as e:
+            # Cache the failure too so invalid formulas are not re-parsed
+            compiled = CompiledFormula(formula, error=e)
+        else:
+            try:
+                compiled = CompiledFormula(formula, fn=self._compile_node(tree, formula), is_native=True)
+            except _NotCompilable:
+                compiled = CompiledFormula(formula, fn=self._interpreted(tree, formula))
+
+        self.formula_cache.put(formula, compiled)
+        return compiled
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Formula cache statistics (size, hits, misses, hit_rate)"""
+        return self.formula_cache.get_stats()
+
+    def clear_cache(self):
+        """Drop all compiled formulas"""
+        self.formula_cache.clear()
+
+    def _interpreted(self, tree: ast.AST, formula: str) -> Callable[[dict], Any]:
+        """Fallback: let simpleeval walk the pre-parsed tree (no re-parsing)"""
+        operators = self.safe_operators
+        functions = self.safe_functions
+
+        def run(names):
+            evaluator = SimpleEval(operators=operators, functions=functions, names=names)
+            return evaluator.eval(formula, previously_parsed=tree)
+        return run
+
+    def _compile_node(self, node: ast.AST, formula: str) -> Callable[[dict], Any]:
+        """Translate a simpleeval-compatible AST node into a closure over the names dict"""
+        if isinstance(node, ast.Expr):
+            return self._compile_node(node.value, formula)
+
+        if isinstance(node, ast.Constant):
+            value = node.value
+            if hasattr(value, '__len__') and len(value) > MAX_STRING_LENGTH:
+                raise _NotCompilable()
+            return lambda names: value
+
+        if isinstance(node, ast.Name):
+            name_id = node.id
+            functions = self.safe_functions
+
+            def lookup(names):
+                try:
+                    return names[name_id]
+                except KeyError:
+                    if name_id in functions:
+                        return functions[name_id]
+                    raise NameNotDefined(name_id, formula)
+            return lookup
+
+        if isinstance(node, ast.BinOp):
+            op = self.safe_operators.get(type(node.op))
+            if op is None:
+                raise _NotCompilable()
+            left = self._compile_node(node.left, formula)
+            right = self._compile_node(node.right, formula)
+            return lambda names: op(left(names), right(names))
+
+        if isinstance(node, ast.UnaryOp):
+            op = self.safe_operators.get(type(node.op))
+            if op is None:
+                raise _NotCompilable()
+            operand = self._compile_node(node.operand, formula)
+            return lambda names: op(operand(names))
+
+        if isinstance(node, ast.Compare):
+            ops = [self.safe_operators.get(type(o)) for o in node.ops]
+            if None in ops:
+                raise _NotCompilable()
+            first = self._compile_node(node.left, formula)
+            comparators = [self._compile_node(c, formula) for c in node.comparators]
+            pairs = list(zip(ops, comparators))
+
+            def compare(names):
+                right = first(names)
+                to_return = True
+                for op, comparator in pairs:
+                    if not to_return:
+                        break
+                    left = right
+                    right = comparator(names)
+                    to_return = op(left, right)
+                return to_return
+            return compare
+
+        if isinstance(node, ast.BoolOp):
+            values = [self._compile_node(v, formula) for v in node.values]
+            is_and = isinstance(node.op, ast.And)
+
+            def boolop(names):
+                to_return = False
+                for value in values:
+                    to_return = value(names)
+                    if is_and and not to_return:
+                        break
+                    if not is_and and to_return:
+                        break
+                return to_return
+            return boolop
+
+        if isinstance(node, ast.IfExp):
+            test = self._compile_node(node.test, formula)
+            body = self._compile_node(node.body, formula)
+            orelse = self._compile_node(node.orelse, formula)
+            return lambda names: body(names) if test(names) else orelse(names)
+
+        if isinstance(node, ast.Attribute):
+            attr = node.attr
+            if any(attr.startswith(prefix) for prefix in DISALLOW_PREFIXES) or attr in DISALLOW_METHODS:
+                raise _NotCompilable()
+            value = self._compile_node(node.value, formula)
+
+            def attribute(names):
+                evaluated = value(names)
+                try:
+                    return getattr(evaluated, attr)
+                except (AttributeError, TypeError):
+                    pass
+                try:
+                    return evaluated[attr]
+                except (KeyError, TypeError):
+                    pass
+                raise AttributeDoesNotExist(attr, formula)
+            return attribute
+
+        if isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Attribute):
+                func = self._compile_node(node.func, formula)
+            elif isinstance(node.func, ast.Name) and node.func.id in self.safe_functions:
+                fixed = self.safe_functions[node.func.id]
+                if fixed in DISALLOW_FUNCTIONS:
+                    raise _NotCompilable()
+                func = lambda names: fixed
+            else:
+                raise _NotCompilable()
+            args = [self._compile_node(a, formula) for a in node.args]
+            keywords = [(k.arg, self._compile_node(k.value, formula)) for k in node.keywords]
+
+            def call(names):
+                return func(names)(
+                    *(a(names) for a in args), **dict((k, v(names)) for k, v in keywords)
+                )
+            return call
+
+        # Assignments, subscripts, f-strings, ... keep simpleeval's exact behaviour
+        raise _NotCompilable()
+
     def evaluate_formula(self, formula: str, variables: Dict[str, Union[float, int, Decimal]]) -> Decimal:
         """
         Safely evaluate a mathematical formula with given variables.
@@ -70,45 +374,13 @@ class SafeFormulaEvaluator:
         Raises:
             ValueError: If formula is invalid or contains unsafe operations
             NameError: If formula references undefined variables
+
+        The formula is parsed once and kept in a bounded cache (see compile_formula),
+        so repeated evaluations only pay for the arithmetic.
         """
-        if not formula or not isinstance(formula, str):
-            raise ValueError("Formula must be a non-empty string")
-        
-        # Prepare variables for evaluation (convert Decimals to float for math operations)
-        eval_vars = {}
-        for key, value in variables.items():
-            if isinstance(value, Decimal):
-                eval_vars[key] = float(value)
-            else:
-                eval_vars[key] = value
-        
-        # Add math module as a safe namespace
-        eval_vars['math'] = type('math', (), {
-            'ceil': math.ceil,
-            'floor': math.floor,
-            'sqrt': math.sqrt,
-            'pi': math.pi,
-            'e': math.e,
-        })
-        
-        try:
-            # Use simpleeval for safe evaluation
-            result = simple_eval(
-                formula,
-                operators=self.safe_operators,
-                functions=self.safe_functions,
-                names={**self.safe_names, **eval_vars}
-            )
-            
-            # Convert result back to Decimal for precision
-            if isinstance(result, (int, float)):
-                return Decimal(str(result))
-            else:
-                return Decimal(str(float(result)))
-                
-        except Exception as e:
-            raise ValueError(f"Error evaluating formula '{formula}': {str(e)}")
-    
+        compiled = self.compile_formula(formula)
+        return compiled.evaluate_prepared(self.prepare_variables(variables))
+
     def validate_formula(self, formula: str, expected_variables: list = None) -> bool:
         """
         Validate if a formula is syntactically correct and uses only expected variables.
@@ -1,6 +1,5 @@
 # security/middleware.py - Security middleware for FastAPI
 import secrets
-import time
 import hashlib
 from typing import Dict, Set, Optional
 from fastapi import Request, Response, HTTPException, status
@@ -9,6 +8,8 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 import logging
 
+from security.rate_limiter import RateLimiter, create_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 class SecurityMiddleware(BaseHTTPMiddleware):
@@ -25,14 +26,16 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         app: ASGIApp,
         rate_limit_requests: int = 100,  # requests per minute
         rate_limit_window: int = 60,     # window in seconds
-        csrf_exempt_paths: Optional[Set[str]] = None
+        csrf_exempt_paths: Optional[Set[str]] = None,
+        rate_limiter: Optional[RateLimiter] = None
     ):
         super().__init__(app)
         self.rate_limit_requests = rate_limit_requests
         self.rate_limit_window = rate_limit_window
         
-        # Rate limiting storage (in production, use Redis)
-        self._rate_limit_storage: Dict[str, Dict] = {}
+        # GCRA limiter: O(1) per request; expired clients are evicted on a timer, not per request
+        self.rate_limiter = (rate_limiter if rate_limiter is not None
+                             else create_rate_limiter(rate_limit_requests, rate_limit_window))
         
         # CSRF exempt paths (API endpoints, public pages)
         self.csrf_exempt_paths = csrf_exempt_paths or {
@@ -57,6 +60,9 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         }
     
     async def dispatch(self, request: Request, call_next):
+        # Start the eviction timer on the app's event loop (first request)
+        self.rate_limiter.start_eviction()
+        
         # Get client IP for rate limiting
         client_ip = self._get_client_ip(request)
         
@@ -117,55 +123,11 @@ class SecurityMiddleware(BaseHTTPMiddleware):
     
     def _check_rate_limit(self, client_ip: str) -> bool:
         """Check if client has exceeded rate limit"""
-        current_time = time.time()
-        
-        # Clean old entries
-        self._cleanup_rate_limit_storage(current_time)
-        
-        # Get or create client entry
-        if client_ip not in self._rate_limit_storage:
-            self._rate_limit_storage[client_ip] = {
-                'requests': [],
-                'blocked_until': 0
-            }
-        
-        client_data = self._rate_limit_storage[client_ip]
-        
-        # Check if still blocked
-        if current_time < client_data['blocked_until']:
-            return False
-        
-        # Remove requests outside the window
-        window_start = current_time - self.rate_limit_window
-        client_data['requests'] = [
-            req_time for req_time in client_data['requests'] 
-            if req_time > window_start
-        ]
-        
-        # Check rate limit
-        if len(client_data['requests']) >= self.rate_limit_requests:
-            # Block for the remaining window time
-            client_data['blocked_until'] = current_time + self.rate_limit_window
-            logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            return False
-        
-        # Add current request
-        client_data['requests'].append(current_time)
-        return True
-    
-    def _cleanup_rate_limit_storage(self, current_time: float):
-        """Clean up old rate limit entries"""
-        cutoff = current_time - (self.rate_limit_window * 2)
-        
-        clients_to_remove = []
-        for client_ip, data in self._rate_limit_storage.items():
-            # Remove if no recent requests and not blocked
-            if (not data['requests'] or max(data['requests']) < cutoff) and \
-               data['blocked_until'] < current_time:
-                clients_to_remove.append(client_ip)
-        
-        for client_ip in clients_to_remove:
-            del self._rate_limit_storage[client_ip]
+        # Synchronous: the sqlite backend blocks the event loop for its (short) write
+        if self.rate_limiter.allow(client_ip):
+            return True
+        logger.warning(f"Rate limit exceeded for IP: {client_ip}")
+        return False
     
     def _is_csrf_exempt(self, path: str) -> bool:
         """Check if path is exempt from CSRF protection"""
@@ -0,0 +1,98 @@
+# security/password_hashing.py - Hash de contraseñas (bcrypt) en un pool de hilos acotado
+"""
+Password hashing off the event loop.
+
+bcrypt costs ~250ms per hash at the default work factor. Run inline in an
+async handler it stalls every other request of the worker for that long,
+so logins and registrations hand it to a small dedicated thread pool
+(bcrypt releases the GIL while it hashes). At most ``max_workers`` hashes
+run at once; a login storm queues there instead of starving the event
+loop or the default executor used by other blocking work.
+
+The work factor comes from ``settings.password_bcrypt_rounds``. Stored
+hashes with a different factor still verify, and verify_and_update()
+returns a new hash for them so login can replace it transparently.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from config import settings
+
+
+def build_password_context(rounds: int = settings.password_bcrypt_rounds) -> CryptContext:
+    """bcrypt context; hashes made with any other rounds value are reported as needing an update"""
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+pwd_context = build_password_context()
+
+
+class PasswordHasher:
+    """Async bcrypt hash / verify in a bounded thread pool"""
+
+    def __init__(self, context: CryptContext = pwd_context, max_workers: int = 2):
+        self.context = context
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.pending = 0
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashes = 0
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(self.context.hash, password)
+        with self._stats_lock:
+            self.hashes += 1
+        return hashed
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash): new_hash is set when the password is valid but hashed with another work factor"""
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        with self._stats_lock:
+            self.verifications += 1
+            if new_hash is not None:
+                self.rehashes += 1
+        return valid, new_hash
+
+    async def _run(self, func: Callable, *args) -> Any:
+        with self._stats_lock:
+            self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool(), func, *args)
+        finally:
+            with self._stats_lock:
+                self.pending -= 1
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'max_workers': self.max_workers,
+                'bcrypt_rounds': self.context.to_dict().get('bcrypt__rounds'),
+                'pending': self.pending,
+                'hashes': self.hashes,
+                'verifications': self.verifications,
+                'rehashes': self.rehashes,
+            }
+
+
+password_hasher = PasswordHasher(max_workers=settings.password_hash_workers)
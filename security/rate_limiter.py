@@ -0,0 +1,220 @@
+# security/rate_limiter.py - Límite de peticiones por IP (GCRA), en memoria o compartido en SQLite
+"""
+Per-client rate limiting with GCRA (the generic cell rate algorithm, a
+token bucket that stores one number per client).
+
+A client may send ``limit`` requests per ``window`` seconds, all at once if
+it wants; after that one request every ``window / limit`` seconds. The
+only state is the client's theoretical arrival time (TAT): a request at
+``now`` is allowed when ``max(TAT, now) + interval - now <= window`` and
+moves TAT forward by one interval. Each check is O(1) whatever the traffic.
+
+Clients whose TAT is in the past have a full bucket, which is the same as
+having no entry, so eviction just deletes them. It runs on a timer, never
+inside a request:
+
+- InMemoryRateLimiter keeps the TATs in ``shards`` dicts and sweeps one
+  shard per tick, so a sweep pause is bounded by clients / shards.
+- SQLiteRateLimiter keeps them in a SQLite file shared by every uvicorn
+  worker of the host, so they all enforce one limit; each check is a single
+  UPSERT ... RETURNING statement. It is a blocking call on the event loop:
+  the lock wait is capped at a few milliseconds and a check that cannot get
+  the lock lets the request through (fails open).
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter(ABC):
+    """GCRA parameters, counters and the eviction timer shared by the backends"""
+
+    backend = "base"
+
+    def __init__(self, limit: int, window: float, eviction_interval: float = 5.0):
+        if limit < 1 or window <= 0:
+            raise ValueError("Rate limit needs limit >= 1 and window > 0")
+        self.limit = limit
+        self.window = float(window)
+        self.interval = self.window / limit
+        self.eviction_interval = eviction_interval
+        self.allowed = 0
+        self.denied = 0
+        self.evicted = 0
+        self._eviction_handle: Optional[asyncio.TimerHandle] = None
+        self._eviction_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def allow(self, key: str) -> bool:
+        allowed = self._allow(key)
+        if allowed:
+            self.allowed += 1
+        else:
+            self.denied += 1
+        return allowed
+
+    @abstractmethod
+    def _allow(self, key: str) -> bool:
+        """Check and record one request of key"""
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """Drop clients whose bucket has refilled (one step of the sweep); returns entries dropped"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Clients currently tracked"""
+
+    def start_eviction(self):
+        """Run evict_expired() every eviction_interval seconds on the running event loop"""
+        loop = asyncio.get_running_loop()
+        # Also restart when the previous loop is gone (the timer died with it)
+        if self._eviction_handle is None or self._eviction_loop is not loop:
+            self._eviction_loop = loop
+            self._eviction_handle = loop.call_later(self.eviction_interval, self._eviction_tick)
+
+    def stop_eviction(self):
+        if self._eviction_handle is not None:
+            self._eviction_handle.cancel()
+            self._eviction_handle = None
+
+    def _eviction_tick(self):
+        try:
+            self.evicted += self.evict_expired()
+        except Exception as e:
+            logger.error(f"Rate limit eviction failed: {str(e)}")
+        self._eviction_handle = self._eviction_loop.call_later(self.eviction_interval, self._eviction_tick)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'backend': self.backend,
+            'limit': self.limit,
+            'window_seconds': self.window,
+            'clients': len(self),
+            'allowed': self.allowed,
+            'denied': self.denied,
+            'evicted': self.evicted,
+        }
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """GCRA state in per-process dicts (each uvicorn worker enforces its own limit)"""
+
+    backend = "memory"
+
+    def __init__(self, limit: int, window: float, shards: int = 16, eviction_interval: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        # Every shard is swept once per window
+        super().__init__(limit, window, eviction_interval or float(window) / shards)
+        self.clock = clock
+        self._shards: List[Dict[str, float]] = [{} for _ in range(shards)]
+        self._next_shard = 0
+        self._lock = threading.Lock()
+
+    def _shard(self, key: str) -> Dict[str, float]:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    def _allow(self, key: str) -> bool:
+        now = self.clock()
+        shard = self._shard(key)
+        with self._lock:
+            tat = max(shard.get(key, now), now) + self.interval
+            if tat - now > self.window:
+                return False
+            shard[key] = tat
+            return True
+
+    def evict_expired(self) -> int:
+        now = self.clock()
+        with self._lock:
+            shard = self._shards[self._next_shard]
+            self._next_shard = (self._next_shard + 1) % len(self._shards)
+            expired = [key for key, tat in shard.items() if tat <= now]
+            for key in expired:
+                del shard[key]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """GCRA state in a SQLite file shared by the worker processes of one host"""
+
+    backend = "sqlite"
+
+    _ALLOW_SQL = (
+        "INSERT INTO rate_limits (key, tat) VALUES (:key, :now + :interval) "
+        "ON CONFLICT (key) DO UPDATE SET tat = max(tat, :now) + :interval "
+        "WHERE max(tat, :now) + :interval - :now <= :window "
+        "RETURNING tat"
+    )
+
+    def __init__(self, limit: int, window: float, path: str, eviction_interval: float = 5.0,
+                 clock: Callable[[], float] = time.time, busy_timeout_ms: int = 5):
+        super().__init__(limit, window, eviction_interval)
+        self.path = path
+        self.clock = clock
+        self.lock_timeouts = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit: each check is its own short write transaction
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")  # Losing recent TATs on a crash only resets buckets
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_tat ON rate_limits (tat)")
+        # Checks run on the event loop: never wait long for another worker's write lock
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        self._lock = threading.Lock()
+
+    def _allow(self, key: str) -> bool:
+        params = {"key": key, "now": self.clock(), "interval": self.interval, "window": self.window}
+        with self._lock:
+            try:
+                # A row comes back only if the request was admitted (insert, or update allowed by the WHERE)
+                return self._conn.execute(self._ALLOW_SQL, params).fetchone() is not None
+            except sqlite3.OperationalError as e:
+                # Database locked by another worker: fail open rather than stall the event loop
+                self.lock_timeouts += 1
+                logger.warning(f"Rate limit check skipped: {str(e)}")
+                return True
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (self.clock(),)).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM rate_limits").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats['lock_timeouts'] = self.lock_timeouts
+        return stats
+
+    def close(self):
+        self.stop_eviction()
+        with self._lock:
+            self._conn.close()
+
+
+def create_rate_limiter(limit: int, window: float, backend: str = settings.rate_limit_backend,
+                        sqlite_path: str = settings.rate_limit_sqlite_path) -> RateLimiter:
+    """Limiter for settings.rate_limit_backend: "memory" (per worker) or "sqlite" (shared by the host)"""
+    if backend == "sqlite":
+        return SQLiteRateLimiter(limit, window, sqlite_path)
+    if backend == "memory":
+        return InMemoryRateLimiter(limit, window)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
@@ -0,0 +1,125 @@
+# services/catalog_cache.py - Caché de catálogo compartida por el proceso
+"""
+Process-wide, read-through cache for catalog data (materials, products,
+color prices, glass prices).
+
+Entries are stamped with the catalog version current when their loader
+started. Every catalog write (DatabaseMaterialService / DatabaseProductService /
+DatabaseColorService create/update/delete, CSV imports) calls
+bump_catalog_version(), so entries loaded before the write are dropped on
+their next read. The TTL bounds staleness across worker processes, which do
+not see each other's version bumps.
+
+Cached values are shared between requests: they must be detached values
+(Pydantic models, Decimals, tuples) and treated as read-only.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from config import settings
+
+# Marker for "not cached" (None is a valid cached value: "not found")
+MISSING = object()
+
+
+class CatalogCache:
+    """Thread-safe LRU + TTL cache invalidated by a global catalog version"""
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 2048):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (value, version, expires_at)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        """Invalidate every entry loaded before now (lazily, on next read)"""
+        with self._lock:
+            self._version += 1
+            return self._version
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, version, expires_at = entry
+                if version == self._version and time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+
+    def put(self, key: Hashable, value: Any, version: int = None):
+        """
+        Store value under key.
+
+        Args:
+            version: Catalog version read *before* loading the value; a write
+                     that happened while loading makes the entry stale at once.
+        """
+        with self._lock:
+            self._entries[key] = (
+                value,
+                self._version if version is None else version,
+                time.monotonic() + self.ttl_seconds,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Read-through lookup: call loader() on a miss and cache its result"""
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        version = self._version
+        value = loader()
+        self.put(key, value, version)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
+
+
+catalog_cache = CatalogCache(
+    ttl_seconds=settings.catalog_cache_ttl_seconds,
+    max_entries=settings.catalog_cache_max_entries,
+)
+
+
+def bump_catalog_version() -> int:
+    """Call after any committed change to materials, products or colors"""
+    return catalog_cache.bump_version()
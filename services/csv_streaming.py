@@ -0,0 +1,30 @@
+# services/csv_streaming.py - Escritura de CSV por bloques para respuestas en streaming
+import csv
+import io
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Rows per chunk yielded by the streaming CSV exports
+EXPORT_ROWS_PER_CHUNK = 500
+
+
+def iter_csv_chunks(headers: List[str], rows: Iterable[Dict[str, Any]],
+                    rows_per_chunk: int = EXPORT_ROWS_PER_CHUNK) -> Iterator[str]:
+    """Write dict rows as CSV, yielding the text every rows_per_chunk rows"""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=headers)
+    writer.writeheader()
+    yield output.getvalue()
+    output.seek(0)
+    output.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+            pending = 0
+    if pending:
+        yield output.getvalue()
@@ -0,0 +1,248 @@
+# services/import_job_service.py - Importaciones CSV en segundo plano (tabla import_jobs + pool local)
+"""
+Background CSV import jobs.
+
+An upload is copied to ``settings.import_job_upload_dir`` and recorded as a
+queued row of the import_jobs table; the request returns at once with the job
+id. A small thread pool runs the import with its own sessions, storing the
+rows processed after each chunk and reading back the job's cancel flag in the
+same statement. The finished job keeps the success/errors/summary result the
+CSV services return. Workers claim a job with a conditional UPDATE, so several
+app processes can share the table without an external broker; queued jobs
+left by a restart are picked up again by ``resume()``.
+"""
+
+import datetime as dt
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+from config import settings
+from database import DatabaseImportJobService, ImportJob, SessionLocal
+from services.material_csv_service import MaterialCSVService
+from services.product_bom_csv_service import ProductBOMCSVService
+
+# materials: streaming material import; products: row-by-row product import;
+# products_bulk: single-transaction product import
+IMPORT_KINDS = ("materials", "products", "products_bulk")
+
+_COPY_BLOCK_BYTES = 1024 * 1024
+
+
+def import_job_to_dict(job: ImportJob, include_result: bool = False) -> Dict[str, Any]:
+    def iso(value):
+        return value.isoformat() if value else None
+
+    data = {
+        "job_id": str(job.id),
+        "kind": job.kind,
+        "filename": job.filename,
+        "status": job.status,
+        "rows_processed": job.rows_processed,
+        "rows_total": job.rows_total,
+        "cancel_requested": job.cancel_requested,
+        "error": job.error,
+        "created_at": iso(job.created_at),
+        "started_at": iso(job.started_at),
+        "finished_at": iso(job.finished_at),
+    }
+    if include_result:
+        data["result"] = job.result
+    return data
+
+
+class ImportJobRunner:
+    """Queue CSV uploads as import jobs and run them in a local thread pool"""
+
+    def __init__(self, session_factory: Callable = SessionLocal, upload_dir: str = settings.import_job_upload_dir,
+                 max_workers: int = settings.import_job_workers,
+                 stale_seconds: int = settings.import_job_stale_seconds):
+        self.session_factory = session_factory
+        self.upload_dir = upload_dir
+        self.max_workers = max_workers
+        self.stale_seconds = stale_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._stopping = False
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def submit(self, user_id: Any, kind: str, filename: str, upload: BinaryIO) -> Dict[str, Any]:
+        """Save the upload to disk, record a queued job and schedule it (blocking: run off the event loop)"""
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unknown import kind: {kind}")
+
+        os.makedirs(self.upload_dir, exist_ok=True)
+        file_path = os.path.join(self.upload_dir, f"{uuid.uuid4().hex}.csv")
+        rows_total = self._save_upload(upload, file_path)
+        try:
+            with self.session_factory() as db:
+                job = DatabaseImportJobService(db).create_job(user_id, kind, filename, file_path, rows_total)
+                data = import_job_to_dict(job)
+        except Exception:
+            self._remove_file(file_path)
+            raise
+
+        self._schedule(job.id)
+        with self._stats_lock:
+            self.submitted += 1
+        return data
+
+    def get_job(self, user_id: Any, job_id: Any) -> Optional[Dict[str, Any]]:
+        with self.session_factory() as db:
+            job = DatabaseImportJobService(db).get_job(job_id, user_id)
+            return import_job_to_dict(job, include_result=True) if job is not None else None
+
+    def list_jobs(self, user_id: Any, limit: int = 20) -> List[Dict[str, Any]]:
+        with self.session_factory() as db:
+            return [import_job_to_dict(job) for job in DatabaseImportJobService(db).list_jobs(user_id, limit)]
+
+    def cancel(self, user_id: Any, job_id: Any) -> Optional[Dict[str, Any]]:
+        """Request cancellation: a queued job is cancelled now, a running one at its next progress report"""
+        with self.session_factory() as db:
+            job = DatabaseImportJobService(db).request_cancel(job_id, user_id)
+            if job is None:
+                return None
+            if job.status == "cancelled" and job.file_path:
+                self._remove_file(job.file_path)
+            return import_job_to_dict(job)
+
+    def run_job(self, job_id: Any):
+        """Run one queued job to completion (pool worker entry point)"""
+        with self.session_factory() as db:
+            jobs = DatabaseImportJobService(db)
+            if not jobs.claim_job(job_id):
+                # Cancelled before it started, or claimed by another process
+                return
+            job = jobs.get_job(job_id)
+            kind, file_path = job.kind, job.file_path
+
+        with self._stats_lock:
+            self.running += 1
+        state = {"rows": 0, "cancel_requested": False}
+        try:
+            with self.session_factory() as import_db, self.session_factory() as progress_db:
+                progress_jobs = DatabaseImportJobService(progress_db)
+
+                def progress(rows_processed: int) -> bool:
+                    state["rows"] = rows_processed
+                    state["cancel_requested"] = progress_jobs.update_progress(job_id, rows_processed)
+                    return not (state["cancel_requested"] or self._stopping)
+
+                results = self._run_import(import_db, kind, file_path, progress)
+
+            rows_processed = max(state["rows"], sum(results["summary"].values()))
+            if results.get("cancelled") and not state["cancel_requested"]:
+                status, error = "failed", f"Import interrupted by shutdown after {rows_processed} rows"
+            else:
+                status, error = ("cancelled" if results.get("cancelled") else "done"), None
+            self._finish(job_id, status, self._json_result(results), error, rows_processed)
+        except UnicodeDecodeError:
+            self._finish(job_id, "failed", None,
+                         "File encoding error. Please ensure the CSV file is UTF-8 encoded", state["rows"])
+        except Exception as e:
+            self._finish(job_id, "failed", None, f"Error importing CSV: {str(e)}", state["rows"])
+        finally:
+            with self._stats_lock:
+                self.running -= 1
+            self._remove_file(file_path)
+
+    def resume(self) -> int:
+        """On startup: fail jobs whose worker died and re-schedule queued ones. Returns jobs scheduled"""
+        cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(seconds=self.stale_seconds)
+        with self.session_factory() as db:
+            jobs = DatabaseImportJobService(db)
+            jobs.fail_stale_jobs(cutoff)
+            job_ids = [job.id for job in jobs.get_queued_jobs()]
+        for job_id in job_ids:
+            self._schedule(job_id)
+        return len(job_ids)
+
+    def shutdown(self, wait: bool = False):
+        """Stop the pool. Without wait, running imports stop at their next chunk and
+        jobs not started stay queued for resume(); with wait, everything finishes"""
+        with self._executor_lock:
+            self._stopping = not wait
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'max_workers': self.max_workers,
+                'submitted': self.submitted,
+                'running': self.running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+            }
+
+    def _schedule(self, job_id: Any):
+        with self._executor_lock:
+            if self._executor is None:
+                self._stopping = False
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="csv-import")
+            self._executor.submit(self.run_job, job_id)
+
+    @staticmethod
+    def _run_import(db, kind: str, file_path: str, progress: Callable[[int], bool]) -> Dict[str, Any]:
+        if kind == "materials":
+            with open(file_path, "rb") as csv_file:
+                return MaterialCSVService(db).import_materials_streaming(csv_file, progress=progress)
+
+        with open(file_path, encoding="utf-8") as csv_file:
+            csv_content = csv_file.read()
+        csv_service = ProductBOMCSVService(db)
+        if kind == "products_bulk":
+            return csv_service.import_products_bulk(csv_content, progress=progress)
+        return csv_service.import_products_from_csv(csv_content, progress=progress)
+
+    def _finish(self, job_id: Any, status: str, result: Optional[Dict], error: Optional[str], rows_processed: int):
+        with self.session_factory() as db:
+            DatabaseImportJobService(db).finish_job(job_id, status, result, error, rows_processed)
+        with self._stats_lock:
+            if status == "done":
+                self.completed += 1
+            elif status == "cancelled":
+                self.cancelled += 1
+            else:
+                self.failed += 1
+
+    @staticmethod
+    def _json_result(results: Dict[str, Any]) -> Dict[str, Any]:
+        """Service results as JSON-safe data (Decimal values become strings)"""
+        return json.loads(json.dumps(results, default=str))
+
+    @staticmethod
+    def _save_upload(upload: BinaryIO, file_path: str) -> int:
+        """Copy the upload in blocks; returns the data rows estimated from its line count"""
+        newlines, last_byte = 0, b"\n"
+        with open(file_path, "wb") as target:
+            while True:
+                block = upload.read(_COPY_BLOCK_BYTES)
+                if not block:
+                    break
+                target.write(block)
+                newlines += block.count(b"\n")
+                last_byte = block[-1:]
+        lines = newlines + (0 if last_byte == b"\n" else 1)
+        return max(lines - 1, 0)
+
+    @staticmethod
+    def _remove_file(file_path: Optional[str]):
+        if file_path:
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+
+import_job_runner = ImportJobRunner()
@@ -1,14 +1,18 @@
 # services/material_csv_service.py - CSV Import/Export service for materials
 import csv
 import io
-from typing import List, Dict, Optional, Tuple, Any
+from itertools import islice
+from typing import List, Dict, Optional, Tuple, Any, BinaryIO, Iterator, Callable
 from decimal import Decimal, InvalidOperation
 from sqlalchemy.orm import Session
 from pydantic import ValidationError
 
 from database import DatabaseMaterialService, AppMaterial as DBAppMaterial, DatabaseColorService
+from services.catalog_cache import bump_catalog_version
 from models.product_bom_models import AppMaterial, MaterialUnit
 from security.input_validation import InputValidator
+from config import settings
+from services.csv_streaming import iter_csv_chunks, EXPORT_ROWS_PER_CHUNK
 
 class MaterialCSVService:
     """Service for CSV import/export operations on materials with security validation"""
@@ -23,6 +27,12 @@ class MaterialCSVService:
         "color_name", "color_code", "color_price_per_unit"
     ]
     
+    # Material columns written by a create row (one INSERT needs the same keys on every row)
+    MATERIAL_FIELDS = ["name", "code", "unit", "category", "cost_per_unit", "selling_unit_length_m", "description"]
+    
+    # Rows kept in the success/errors lists of a streaming import (summary counts all)
+    MAX_REPORTED_ROWS = 1000
+    
     def __init__(self, db: Session):
         self.db = db
         self.material_service = DatabaseMaterialService(db)
@@ -31,74 +41,38 @@ class MaterialCSVService:
     
     def export_materials_to_csv(self, category: Optional[str] = None) -> str:
         """Export materials to CSV format by category, including color information for profiles"""
-        materials = self.material_service.get_all_materials()
-        
-        # Filter by category if specified
-        if category and category != "all":
-            materials = [m for m in materials if m.category == category]
-        
-        # Create CSV content
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=self.CSV_HEADERS)
-        writer.writeheader()
-        
-        for material in materials:
-            # Check if material is a profile with colors
-            if material.category == "Perfiles":
-                # Get material colors for this profile
-                material_colors = self.color_service.get_material_colors(material.id)
-                
-                if material_colors:
-                    # Export one row per color
-                    for material_color, color in material_colors:
-                        writer.writerow({
-                            "action": "update",
-                            "id": material.id,
-                            "name": material.name,
-                            "code": material.code or "",
-                            "unit": material.unit,
-                            "category": material.category,
-                            "cost_per_unit": str(material.cost_per_unit),
-                            "selling_unit_length_m": str(material.selling_unit_length_m) if material.selling_unit_length_m else "",
-                            "description": material.description or "",
-                            "color_name": color.name if color else "",
-                            "color_code": color.code if color and color.code else "",
-                            "color_price_per_unit": str(material_color.price_per_unit)
-                        })
-                else:
-                    # Export profile without specific colors
-                    writer.writerow({
-                        "action": "update",
-                        "id": material.id,
-                        "name": material.name,
-                        "code": material.code or "",
-                        "unit": material.unit,
-                        "category": material.category,
-                        "cost_per_unit": str(material.cost_per_unit),
-                        "selling_unit_length_m": str(material.selling_unit_length_m) if material.selling_unit_length_m else "",
-                        "description": material.description or "",
-                        "color_name": "",
-                        "color_code": "",
-                        "color_price_per_unit": ""
-                    })
-            else:
-                # Export non-profile materials without color information
-                writer.writerow({
-                    "action": "update",
-                    "id": material.id,
-                    "name": material.name,
-                    "code": material.code or "",
-                    "unit": material.unit,
-                    "category": material.category,
-                    "cost_per_unit": str(material.cost_per_unit),
-                    "selling_unit_length_m": str(material.selling_unit_length_m) if material.selling_unit_length_m else "",
-                    "description": material.description or "",
-                    "color_name": "",
-                    "color_code": "",
-                    "color_price_per_unit": ""
-                })
-        
-        return output.getvalue()
+        return "".join(self.iter_materials_csv(category))
+    
+    def iter_materials_csv(self, category: Optional[str] = None,
+                           rows_per_chunk: int = EXPORT_ROWS_PER_CHUNK) -> Iterator[str]:
+        """
+        Materials CSV as text chunks (header first, then rows_per_chunk rows per chunk).
+
+        Materials and their colors come from one joined query read with yield_per,
+        so memory and time to first chunk do not depend on the catalog size.
+        """
+        if category == "all":
+            category = None
+        rows = self.material_service.iter_materials_with_colors(category)
+        return iter_csv_chunks(self.CSV_HEADERS, (self._material_csv_row(*row) for row in rows), rows_per_chunk)
+    
+    @staticmethod
+    def _material_csv_row(material, material_color=None, color=None) -> Dict[str, Any]:
+        """Export row: one per material, or one per available color for profiles"""
+        return {
+            "action": "update",
+            "id": material.id,
+            "name": material.name,
+            "code": material.code or "",
+            "unit": material.unit,
+            "category": material.category,
+            "cost_per_unit": str(material.cost_per_unit),
+            "selling_unit_length_m": str(material.selling_unit_length_m) if material.selling_unit_length_m else "",
+            "description": material.description or "",
+            "color_name": color.name if color else "",
+            "color_code": color.code if color and color.code else "",
+            "color_price_per_unit": str(material_color.price_per_unit) if material_color else ""
+        }
     
     def import_materials_from_csv(self, csv_content: str) -> Dict[str, Any]:
         """Import materials from CSV with validation and bulk operations"""
@@ -144,8 +118,245 @@ class MaterialCSVService:
                 "error": f"CSV parsing error: {str(e)}"
             })
         
+        # Invalidate cached catalog data once the whole file has been applied
+        bump_catalog_version()
         return results
     
+    def import_materials_streaming(self, csv_file: BinaryIO, chunk_size: Optional[int] = None,
+                                   progress: Optional[Callable[[int], bool]] = None) -> Dict[str, Any]:
+        """
+        Import materials from a binary CSV file object without loading it whole.
+
+        Rows are read and validated chunk_size at a time; each chunk pre-fetches the
+        materials and colors it references (one query each), is written with bulk
+        INSERT / UPDATE statements and a material-color INSERT ... ON CONFLICT upsert,
+        and is committed as one transaction. A chunk that fails at the database is
+        rolled back and its rows are reported as errors; earlier chunks stay applied.
+
+        Results have the same shape as import_materials_from_csv; the success/errors
+        lists keep the first MAX_REPORTED_ROWS entries, summary counts every row.
+
+        progress, if given, is called after each committed chunk with the number of
+        data rows read so far; returning False stops the import there and sets
+        results["cancelled"] (committed chunks stay applied).
+        """
+        chunk_size = chunk_size or settings.csv_import_chunk_size
+        results = {
+            "success": [],
+            "errors": [],
+            "summary": {"created": 0, "updated": 0, "deleted": 0, "skipped": 0},
+            "chunks": 0,
+            "truncated": False
+        }
+
+        text_stream = io.TextIOWrapper(csv_file, encoding="utf-8-sig", newline="")
+        try:
+            csv_reader = csv.DictReader(text_stream)
+            if not self._validate_csv_headers(csv_reader.fieldnames):
+                results["errors"].append({
+                    "row": 0,
+                    "error": f"Invalid CSV headers. Expected: {', '.join(self.CSV_HEADERS)}"
+                })
+                return results
+
+            color_ids = {}  # ("code"|"name", value) -> color id, shared by every chunk
+            rows = enumerate(csv_reader, start=2)  # Start at 2 (header is row 1)
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                for result in self._import_chunk(chunk, color_ids):
+                    self._record_result(results, result)
+                results["chunks"] += 1
+                if progress is not None and not progress(chunk[-1][0] - 1):
+                    results["cancelled"] = True
+                    break
+        except csv.Error as e:
+            results["errors"].append({"row": 0, "error": f"CSV parsing error: {str(e)}"})
+        finally:
+            # The caller owns the upload: do not close it with the wrapper
+            text_stream.detach()
+            # Invalidate cached catalog data once the whole file has been applied
+            bump_catalog_version()
+
+        return results
+
+    def _record_result(self, results: Dict[str, Any], result: Dict[str, Any]):
+        if result["success"]:
+            results["summary"][result["action"]] += 1
+            bucket = results["success"]
+        else:
+            results["summary"]["skipped"] += 1
+            bucket = results["errors"]
+        if len(bucket) < self.MAX_REPORTED_ROWS:
+            bucket.append(result)
+        else:
+            results["truncated"] = True
+
+    def _import_chunk(self, chunk: List[Tuple[int, Dict[str, str]]], color_ids: Dict) -> List[Dict[str, Any]]:
+        """Validate, resolve and write one chunk of rows in a single transaction"""
+        # 1. Validate every row (no database access)
+        parsed, row_results = [], {}
+        for row_num, row in chunk:
+            entry = self._parse_row(row, row_num)
+            if entry["success"]:
+                parsed.append(entry)
+            else:
+                row_results[row_num] = entry
+
+        # 2. Pre-fetch what the chunk refers to
+        existing_by_id = self.material_service.get_materials_by_ids(
+            e["data"]["id"] for e in parsed if "id" in e["data"]
+        )
+        codes_in_use = {
+            code: material.id
+            for code, material in self.material_service.get_materials_by_codes(
+                e["data"]["code"] for e in parsed if e["data"].get("code")
+            ).items()
+        }
+
+        # 3. Resolve rows in file order against the pre-fetched state
+        creates, updates, deletes, color_links = [], {}, set(), []
+        for entry in parsed:
+            row_num, action, data = entry["row"], entry["action"], entry["data"]
+            if action == "create":
+                if data.get("code") and data["code"] in codes_in_use:
+                    row_results[row_num] = self._row_error(row_num, f"Material with code '{data['code']}' already exists")
+                    continue
+                if data.get("code"):
+                    codes_in_use[data["code"]] = None  # Taken by a row of this chunk
+                creates.append(entry)
+                category, name = data["category"], data["name"]
+            else:
+                material_id = data["id"]
+                existing = existing_by_id.get(material_id)
+                if existing is None or material_id in deletes:
+                    row_results[row_num] = self._row_error(row_num, f"Material with ID {material_id} not found")
+                    continue
+                if action == "delete":
+                    deletes.add(material_id)
+                    row_results[row_num] = {"success": True, "action": "deleted", "row": row_num,
+                                            "material_id": material_id, "material_name": existing.name}
+                    continue
+                code = data.get("code")
+                if code and code != existing.code and codes_in_use.get(code, material_id) != material_id:
+                    row_results[row_num] = self._row_error(row_num, f"Material with code '{code}' already exists")
+                    continue
+                if code:
+                    codes_in_use[code] = material_id
+                update_data = {k: v for k, v in data.items() if v is not None}
+                updates.setdefault(material_id, {}).update(update_data)
+                category = data.get("category") or existing.category
+                name = data.get("name") or existing.name
+                row_results[row_num] = {"success": True, "action": "updated", "row": row_num,
+                                        "material_id": material_id, "material_name": name}
+
+            entry["material_name"] = name
+            if category == "Perfiles" and entry["color"] is not None:
+                color_links.append(entry)
+            elif category != "Perfiles":
+                entry["color_message"] = "No color processing needed for non-profile materials"
+            else:
+                entry["color_message"] = "No color information provided"
+
+        # 4. Write the chunk in one transaction
+        try:
+            created_ids = self.material_service.bulk_create_materials([
+                {field: e["data"].get(field) for field in self.MATERIAL_FIELDS} for e in creates
+            ])
+            for entry, material_id in zip(creates, created_ids):
+                entry["data"]["id"] = material_id
+                row_results[entry["row"]] = {"success": True, "action": "created", "row": entry["row"],
+                                             "material_id": material_id, "material_name": entry["material_name"]}
+            self.material_service.bulk_update_materials(list(updates.values()))
+            self.material_service.bulk_deactivate_materials(deletes)
+            self._write_color_links(color_links, color_ids)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            color_ids.clear()  # Colors created by this chunk were rolled back too
+            for entry in parsed:
+                row_results[entry["row"]] = self._row_error(entry["row"], f"Database error in chunk: {str(e)}")
+
+        for entry in parsed:
+            result = row_results.get(entry["row"])
+            if result and result["success"] and entry.get("color_message"):
+                result["color_info"] = entry["color_message"]
+        return [row_results[row_num] for row_num, _ in chunk]
+
+    def _parse_row(self, row: Dict[str, str], row_num: int) -> Dict[str, Any]:
+        """Validated action, material data and color data of a row"""
+        action = row.get("action", "").strip().lower()
+        if action not in ["create", "update", "delete"]:
+            return self._row_error(row_num, f"Invalid action '{action}'. Must be: create, update, or delete")
+
+        if action == "delete":
+            try:
+                material_id = int(row.get("id", "").strip())
+            except (ValueError, TypeError):
+                return self._row_error(row_num, "Invalid material ID for delete action")
+            if not material_id:
+                return self._row_error(row_num, "Material ID is required for delete action")
+            return {"success": True, "row": row_num, "action": action, "data": {"id": material_id}, "color": None}
+
+        validated_data = self._validate_material_data(row, row_num, require_id=(action == "update"))
+        if not validated_data["valid"]:
+            return self._row_error(row_num, validated_data["error"])
+        color_result = self._validate_color_fields(row, row_num)
+        if not color_result["success"]:
+            return color_result
+        return {"success": True, "row": row_num, "action": action,
+                "data": validated_data["data"], "color": color_result["color"]}
+
+    @staticmethod
+    def _row_error(row_num: int, error: str) -> Dict[str, Any]:
+        return {"success": False, "row": row_num, "error": error}
+
+    def _write_color_links(self, entries: List[Dict[str, Any]], color_ids: Dict):
+        """Find or create the chunk's colors (one query, one insert) and upsert the prices"""
+        if not entries:
+            return
+        wanted = [e["color"] for e in entries]
+        missing_codes = {c["code"] for c in wanted if c["code"] and ("code", c["code"]) not in color_ids}
+        missing_names = {c["name"] for c in wanted if ("name", c["name"]) not in color_ids}
+        for color in self.color_service.find_colors(missing_codes, missing_names):
+            if color.code:
+                color_ids.setdefault(("code", color.code), color.id)
+            color_ids.setdefault(("name", color.name), color.id)
+
+        # Same lookup order as _process_color_data: code first, then name
+        def lookup(color):
+            if color["code"] and ("code", color["code"]) in color_ids:
+                return color_ids[("code", color["code"])]
+            return color_ids.get(("name", color["name"]))
+
+        new_colors = {}
+        for entry in entries:
+            color = entry["color"]
+            if lookup(color) is None and color["name"] not in new_colors:
+                new_colors[color["name"]] = {"name": color["name"], "code": color["code"] or None,
+                                             "description": f"Color for {entry['material_name']}",
+                                             "is_active": True}
+        new_ids = self.color_service.bulk_create_colors(list(new_colors.values()))
+        for row, color_id in zip(new_colors.values(), new_ids):
+            color_ids[("name", row["name"])] = color_id
+            if row["code"]:
+                color_ids[("code", row["code"])] = color_id
+
+        links = {}
+        for entry in entries:
+            color = entry["color"]
+            created = color["name"] in new_colors
+            color_id = lookup(color)
+            links[(entry["data"]["id"], color_id)] = {
+                "material_id": entry["data"]["id"], "color_id": color_id,
+                "price_per_unit": color["price"], "is_available": True
+            }
+            entry["color_message"] = (
+                f"{'Created new' if created else 'Using existing'} color: {color['name']} (price: {color['price']})"
+            )
+        self.color_service.upsert_material_colors(list(links.values()))
+
     def _validate_csv_headers(self, headers: List[str]) -> bool:
         """Validate that CSV has required headers"""
         if not headers:
@@ -428,13 +639,80 @@ class MaterialCSVService:
         if material.category != "Perfiles":
             return {"success": True, "color_message": "No color processing needed for non-profile materials"}
         
+        color_result = self._validate_color_fields(row, row_num)
+        if not color_result["success"] or color_result["color"] is None:
+            return color_result
+        color_name = color_result["color"]["name"]
+        color_code = color_result["color"]["code"]
+        color_price = color_result["color"]["price"]
+        
+        try:
+            # Check if color exists, create if not
+            existing_color = None
+            if color_code:
+                # Try to find by code first
+                existing_color = self.color_service.get_color_by_code(color_code)
+            
+            if not existing_color:
+                # Try to find by name
+                existing_color = self.color_service.get_color_by_name(color_name)
+            
+            if not existing_color:
+                # Create new color
+                color = self.color_service.create_color(
+                    name=color_name,
+                    code=color_code if color_code else None,
+                    description=f"Color for {material.name}"
+                )
+                color_message = f"Created new color: {color_name}"
+            else:
+                color = existing_color
+                color_message = f"Using existing color: {color_name}"
+            
+            # Create or update material-color relationship
+            existing_material_color = self.color_service.get_material_color_by_ids(material.id, color.id)
+            
+            if existing_material_color:
+                # Update existing relationship
+                self.color_service.update_material_color(
+                    existing_material_color.id,
+                    {
+                        "price_per_unit": color_price,
+                        "is_available": True
+                    }
+                )
+                color_message += f" (updated price: {color_price})"
+            else:
+                # Create new relationship
+                self.color_service.create_material_color({
+                    "material_id": material.id,
+                    "color_id": color.id,
+                    "price_per_unit": color_price,
+                    "is_available": True
+                })
+                color_message += f" (new price: {color_price})"
+            
+            return {"success": True, "color_message": color_message}
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "row": row_num,
+                "error": f"Error processing color data: {str(e)}"
+            }
+    
+    def _validate_color_fields(self, row: Dict[str, str], row_num: int) -> Dict[str, Any]:
+        """Validate and sanitize the color columns of a row (no database access)
+
+        Returns {"success": True, "color": None} when the row has no color data.
+        """
         color_name = row.get("color_name", "").strip()
         color_code = row.get("color_code", "").strip()
         color_price_str = row.get("color_price_per_unit", "").strip()
         
         # If no color information provided, skip color processing
         if not color_name and not color_price_str:
-            return {"success": True, "color_message": "No color information provided"}
+            return {"success": True, "color": None, "color_message": "No color information provided"}
         
         # Validate color information
         if not color_name:
@@ -486,60 +764,7 @@ class MaterialCSVService:
                 }
             color_code = self.validator.sanitize_text_input(color_code)
         
-        try:
-            # Check if color exists, create if not
-            existing_color = None
-            if color_code:
-                # Try to find by code first
-                existing_color = self.color_service.get_color_by_code(color_code)
-            
-            if not existing_color:
-                # Try to find by name
-                existing_color = self.color_service.get_color_by_name(color_name)
-            
-            if not existing_color:
-                # Create new color
-                color = self.color_service.create_color(
-                    name=color_name,
-                    code=color_code if color_code else None,
-                    description=f"Color for {material.name}"
-                )
-                color_message = f"Created new color: {color_name}"
-            else:
-                color = existing_color
-                color_message = f"Using existing color: {color_name}"
-            
-            # Create or update material-color relationship
-            existing_material_color = self.color_service.get_material_color_by_ids(material.id, color.id)
-            
-            if existing_material_color:
-                # Update existing relationship
-                self.color_service.update_material_color(
-                    existing_material_color.id,
-                    {
-                        "price_per_unit": color_price,
-                        "is_available": True
-                    }
-                )
-                color_message += f" (updated price: {color_price})"
-            else:
-                # Create new relationship
-                self.color_service.create_material_color({
-                    "material_id": material.id,
-                    "color_id": color.id,
-                    "price_per_unit": color_price,
-                    "is_available": True
-                })
-                color_message += f" (new price: {color_price})"
-            
-            return {"success": True, "color_message": color_message}
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "row": row_num,
-                "error": f"Error processing color data: {str(e)}"
-            }
+        return {"success": True, "color": {"name": color_name, "code": color_code, "price": color_price}}
     
     def get_csv_template(self, category: Optional[str] = None) -> str:
         """Generate a CSV template with sample data for the specified category"""
@@ -0,0 +1,349 @@
+# services/pdf_render_service.py - Render de PDFs fuera del event loop, con caché y trabajos
+"""
+PDF rendering subsystem for quotes.
+
+- Rendering runs in a bounded process pool (WeasyPrint is CPU bound and
+  would otherwise block the event loop of the worker for every PDF).
+- Generated PDFs are stored in a content-addressed disk cache keyed on the
+  quote_data hash, the company info and the logo's mtime, shared by every
+  uvicorn worker of the host. Cache reads and writes run in a thread, and
+  the directory is only scanned for pruning when the estimated size goes
+  over the limit or every rescan_seconds (other workers write to it too).
+- PDFJobManager provides enqueue / poll / download for large quotes.
+  Job ids are the cache keys, so a finished PDF can be downloaded from any
+  worker; queued/running/failed states are only known to the worker that
+  accepted the job.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def render_quote_pdf(quote_data: Dict, company_info: Optional[Dict]) -> bytes:
+    """Render one quote PDF (runs inside a pool process)"""
+    # Imported here so importing this module does not load WeasyPrint
+    from services.pdf_service import PDFQuoteService
+    return PDFQuoteService().generate_quote_pdf(quote_data, company_info)
+
+
+def warm_up_render_process():
+    """Pool process initializer: build the process's PDF renderer (CSS, template, fonts) up front"""
+    try:
+        from services.pdf_service import get_pdf_renderer
+        get_pdf_renderer().warm_up()
+    except Exception as e:
+        # Rendering will report the problem; a failed warm-up must not break the pool
+        logger.warning(f"PDF renderer warm-up failed: {str(e)}")
+
+
+def _logo_mtime(company_info: Optional[Dict]) -> Optional[float]:
+    logo_path = (company_info or {}).get('logo_path')
+    if not logo_path:
+        return None
+    try:
+        return os.stat(logo_path).st_mtime
+    except OSError:
+        return None
+
+
+def pdf_cache_key(quote_data: Dict, company_info: Optional[Dict]) -> str:
+    """Content address of a quote PDF: quote_data, company info and logo mtime"""
+    payload = json.dumps(
+        [quote_data, company_info, _logo_mtime(company_info)],
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PDFCache:
+    """Content-addressed PDF cache on disk, pruned oldest-first above max_bytes"""
+
+    # Pruning goes down to this fraction of max_bytes, so the next puts do not rescan
+    PRUNE_TARGET = 0.9
+
+    def __init__(self, directory: str, max_bytes: int, rescan_seconds: float = 300):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rescan_seconds = rescan_seconds
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        # Bytes on disk as of the last scan plus what this process wrote since (None: not scanned yet)
+        self._size_bytes: Optional[int] = None
+        self._last_scan = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.scans = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as pdf_file:
+                content = pdf_file.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, content: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        # Atomic publish: other workers never read a partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        with self._lock:
+            if self._size_bytes is not None:
+                self._size_bytes += len(content)
+            due = (self._size_bytes is None or self._size_bytes > self.max_bytes
+                   or time.monotonic() - self._last_scan >= self.rescan_seconds)
+        if due:
+            self._prune()
+
+    async def get_async(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def put_async(self, key: str, content: bytes):
+        await asyncio.to_thread(self.put, key, content)
+
+    async def contains_async(self, key: str) -> bool:
+        return await asyncio.to_thread(self.contains, key)
+
+    def _prune(self):
+        """Scan the directory and delete the oldest PDFs until under PRUNE_TARGET * max_bytes"""
+        if not self._prune_lock.acquire(blocking=False):
+            return  # Another thread is already scanning
+        try:
+            try:
+                entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.pdf')]
+                files = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries))
+            except OSError:
+                return
+            total = sum(size for _, size, _ in files)
+            if total > self.max_bytes:
+                for _, size, path in files:
+                    if total <= self.max_bytes * self.PRUNE_TARGET:
+                        break
+                    try:
+                        os.unlink(path)
+                        total -= size
+                    except OSError:
+                        continue
+            with self._lock:
+                self._size_bytes = total
+                self._last_scan = time.monotonic()
+                self.scans += 1
+        finally:
+            self._prune_lock.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'directory': self.directory,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'estimated_bytes': self._size_bytes,
+                'scans': self.scans,
+            }
+
+
+class PDFRenderService:
+    """Cached PDF rendering in a bounded process pool"""
+
+    def __init__(self, cache: PDFCache, max_workers: int = 2, max_pending: int = 8,
+                 render_func: Callable[[Dict, Optional[Dict]], bytes] = render_quote_pdf,
+                 initializer: Optional[Callable[[], None]] = warm_up_render_process):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.render_func = render_func
+        self.initializer = initializer
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.renders = 0
+        self.waiting = 0
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        """Process pool, started on first use (max_workers=0 renders in a thread instead)"""
+        if self.max_workers <= 0:
+            return None
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer)
+            return self._executor
+
+    async def render_async(self, quote_data: Dict, company_info: Optional[Dict] = None) -> bytes:
+        """PDF bytes for a quote, from the cache or rendered off the event loop"""
+        key = pdf_cache_key(quote_data, company_info)
+        cached = await self.cache.get_async(key)
+        if cached is not None:
+            return cached
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        # Bounded: excess requests wait here instead of piling up in the pool
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(self._pool(), self.render_func, quote_data, company_info)
+        finally:
+            self._slots.release()
+        self.renders += 1
+        await self.cache.put_async(key, content)
+        return content
+
+    def render(self, quote_data: Dict, company_info: Optional[Dict] = None) -> bytes:
+        """Synchronous variant (scripts, batch jobs): cache lookup then render in this process"""
+        key = pdf_cache_key(quote_data, company_info)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        content = self.render_func(quote_data, company_info)
+        self.renders += 1
+        self.cache.put(key, content)
+        return content
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'renders': self.renders,
+            'waiting': self.waiting,
+            'cache': self.cache.get_stats(),
+        }
+
+
+class PDFJob:
+    """State of one background PDF render"""
+
+    __slots__ = ('job_id', 'user_id', 'quote_id', 'status', 'error', 'created_at', 'finished_at')
+
+    def __init__(self, job_id: str, user_id: Any, quote_id: int):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.quote_id = quote_id
+        self.status = 'queued'
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'quote_id': self.quote_id,
+            'status': self.status,
+            'error': self.error,
+        }
+
+
+class PDFJobManager:
+    """Enqueue / poll / download of PDF renders (job id = PDF cache key)"""
+
+    def __init__(self, renderer: PDFRenderService, max_jobs: int = 1000):
+        self.renderer = renderer
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, PDFJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def enqueue(self, user_id: Any, quote_id: int, quote_data: Dict, company_info: Optional[Dict]) -> PDFJob:
+        """Start rendering in the background (no-op if the PDF is cached or already being rendered)"""
+        job_id = pdf_cache_key(quote_data, company_info)
+        job = self._jobs.get(job_id)
+        if job is not None and job.status in ('queued', 'running', 'done'):
+            return job
+
+        job = PDFJob(job_id, user_id, quote_id)
+        self._jobs[job_id] = job
+        self._prune()
+        if await self.renderer.cache.contains_async(job_id):
+            job.status = 'done'
+            job.finished_at = time.time()
+            return job
+        self._tasks[job_id] = asyncio.get_running_loop().create_task(self._run(job, quote_data, company_info))
+        return job
+
+    async def _run(self, job: PDFJob, quote_data: Dict, company_info: Optional[Dict]):
+        job.status = 'running'
+        try:
+            await self.renderer.render_async(quote_data, company_info)
+            job.status = 'done'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self._tasks.pop(job.job_id, None)
+
+    async def get_status(self, job_id: str, quote_id: int) -> Optional[Dict[str, Any]]:
+        """Job status; a cached PDF is reported as done on any worker. None if unknown"""
+        job = self._jobs.get(job_id)
+        if job is not None and job.quote_id != quote_id:
+            return None
+        if await self.renderer.cache.contains_async(job_id):
+            return {'job_id': job_id, 'quote_id': quote_id, 'status': 'done', 'error': None}
+        return job.to_dict() if job is not None else None
+
+    async def get_result(self, job_id: str) -> Optional[bytes]:
+        return await self.renderer.cache.get_async(job_id)
+
+    def _prune(self):
+        """Forget the oldest finished jobs above max_jobs"""
+        if len(self._jobs) <= self.max_jobs:
+            return
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished_at is not None),
+            key=lambda job: job.finished_at
+        )
+        for job in finished[:len(self._jobs) - self.max_jobs]:
+            self._jobs.pop(job.job_id, None)
+
+    async def shutdown(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+        self._tasks.clear()
+
+
+pdf_render_service = PDFRenderService(
+    PDFCache(settings.pdf_cache_dir, settings.pdf_cache_max_bytes),
+    max_workers=settings.pdf_render_workers,
+    max_pending=settings.pdf_render_max_pending,
+)
+pdf_job_manager = PDFJobManager(pdf_render_service)
@@ -1,45 +1,273 @@
 # services/pdf_service.py - Servicio para generación de PDFs de cotizaciones
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
 from datetime import datetime
-import io
 import os
 import base64
+import threading
 from weasyprint import HTML, CSS
+from weasyprint.text.fonts import FontConfiguration
 from jinja2 import Environment, FileSystemLoader
 from models.quote_models import QuoteCalculation
 
+# Hoja de estilos de los PDFs de cotización (se parsea una sola vez por proceso)
+PDF_STYLESHEET = """
+@page {
+    size: A4;
+    margin: 1cm;
+}
+
+body {
+    font-family: 'Arial', sans-serif;
+    font-size: 10pt;
+    line-height: 1.4;
+    color: #333;
+}
+
+.header {
+    border-bottom: 2px solid #007bff;
+    padding-bottom: 15px;
+    margin-bottom: 20px;
+}
+
+.header-content {
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+}
+
+.logo-section {
+    flex: 0 0 auto;
+    margin-right: 20px;
+}
+
+.company-logo {
+    max-height: 80px;
+    max-width: 150px;
+    object-fit: contain;
+}
+
+.company-details {
+    flex: 1;
+    text-align: center;
+}
+
+.company-name {
+    font-size: 24pt;
+    font-weight: bold;
+    color: #007bff;
+    margin-bottom: 5px;
+}
+
+.quote-title {
+    font-size: 18pt;
+    font-weight: bold;
+    margin: 15px 0;
+    text-align: center;
+    color: #495057;
+}
+
+.info-section {
+    display: flex;
+    justify-content: space-between;
+    margin-bottom: 20px;
+}
+
+.info-box {
+    border: 1px solid #dee2e6;
+    padding: 10px;
+    border-radius: 5px;
+    background-color: #f8f9fa;
+}
+
+.products-table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 20px 0;
+    font-size: 9pt;
+}
+
+.products-table th,
+.products-table td {
+    border: 1px solid #dee2e6;
+    padding: 8px;
+    text-align: left;
+}
+
+.products-table th {
+    background-color: #007bff;
+    color: white;
+    font-weight: bold;
+    text-align: center;
+}
+
+.products-table td.number {
+    text-align: right;
+}
+
+.products-table td.center {
+    text-align: center;
+}
+
+.totals-section {
+    margin-top: 20px;
+    page-break-inside: avoid;
+}
+
+.totals-table {
+    width: 50%;
+    margin-left: auto;
+    border-collapse: collapse;
+}
+
+.totals-table td {
+    padding: 5px 10px;
+    border: 1px solid #dee2e6;
+}
+
+.totals-table .label {
+    background-color: #f8f9fa;
+    font-weight: bold;
+    text-align: right;
+}
+
+.totals-table .amount {
+    text-align: right;
+    background-color: white;
+}
+
+.total-final {
+    background-color: #f8f9fa !important;
+    color: black !important;
+    font-weight: bold;
+    font-size: 12pt;
+    border: 2px solid #007bff;
+}
+
+.footer {
+    margin-top: 30px;
+    border-top: 1px solid #dee2e6;
+    padding-top: 15px;
+    font-size: 8pt;
+    color: #6c757d;
+    text-align: center;
+}
+
+.validity-note {
+    margin-top: 20px;
+    padding: 10px;
+    background-color: #fff3cd;
+    border: 1px solid #ffeaa7;
+    border-radius: 5px;
+    font-style: italic;
+}
+"""
+
+# Logos codificados en base64 que se conservan por proceso
+LOGO_CACHE_SIZE = 32
+
+
+class PDFRenderer:
+    """
+    Recursos de render de larga vida, uno por proceso.
+
+    Parsea la hoja de estilos, compila quote_pdf.html y resuelve la
+    configuración de fuentes una sola vez; también conserva los logos ya
+    codificados en base64 (por ruta y fecha de modificación).
+    """
+
+    def __init__(self, template_dir: str = 'templates'):
+        self.env = Environment(loader=FileSystemLoader(template_dir))
+        self.template = self.env.get_template('quote_pdf.html')
+        self.font_config = FontConfiguration()
+        self.stylesheet = CSS(string=PDF_STYLESHEET, font_config=self.font_config)
+        self._logos: Dict[Tuple[str, float], Optional[str]] = {}
+        self._logos_lock = threading.Lock()
+
+    def warm_up(self):
+        """Render a tiny document so fonts are discovered before the first real PDF"""
+        self.write_pdf("<p>.</p>")
+
+    def render_html(self, **template_data) -> str:
+        return self.template.render(**template_data)
+
+    def write_pdf(self, html_content: str) -> bytes:
+        return HTML(string=html_content).write_pdf(
+            stylesheets=[self.stylesheet], font_config=self.font_config
+        )
+
+    def logo_data_uri(self, logo_path: str, encode) -> Optional[str]:
+        """Logo como data URI; solo se vuelve a codificar si el archivo cambió"""
+        key = (logo_path, os.stat(logo_path).st_mtime)
+        with self._logos_lock:
+            if key in self._logos:
+                return self._logos[key]
+        data_uri = encode(logo_path)
+        with self._logos_lock:
+            if len(self._logos) >= LOGO_CACHE_SIZE:
+                self._logos.clear()
+            self._logos[key] = data_uri
+        return data_uri
+
+
+_renderer: Optional[PDFRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_pdf_renderer() -> PDFRenderer:
+    """Renderer compartido del proceso (se crea en el primer uso)"""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = PDFRenderer()
+    return _renderer
+
+
 class PDFQuoteService:
     """Servicio para generar PDFs profesionales de cotizaciones"""
     
-    def __init__(self):
-        # Configurar Jinja2 para templates de PDF
-        self.env = Environment(loader=FileSystemLoader('templates'))
+    def __init__(self, renderer: Optional[PDFRenderer] = None):
+        # Plantilla, CSS y fuentes compartidos por todas las instancias del proceso
+        self._renderer = renderer
+
+    @property
+    def renderer(self) -> PDFRenderer:
+        if self._renderer is None:
+            self._renderer = get_pdf_renderer()
+        return self._renderer
+
+    @property
+    def env(self) -> Environment:
+        return self.renderer.env
     
     def get_logo_base64(self, logo_path: str) -> str:
-        """Convierte una imagen a base64 para uso en PDF"""
+        """Convierte una imagen a base64 para uso en PDF (cacheado por ruta y fecha de modificación)"""
         try:
             if not logo_path or not os.path.exists(logo_path):
                 return None
-                
-            with open(logo_path, "rb") as image_file:
-                base64_data = base64.b64encode(image_file.read()).decode('utf-8')
-                
-                # Detectar tipo de imagen por extensión
-                file_extension = os.path.splitext(logo_path)[1].lower()
-                if file_extension in ['.png']:
-                    mime_type = 'image/png'
-                elif file_extension in ['.jpg', '.jpeg']:
-                    mime_type = 'image/jpeg'
-                elif file_extension in ['.svg']:
-                    mime_type = 'image/svg+xml'
-                else:
-                    mime_type = 'image/png'  # default
-                
-                return f"data:{mime_type};base64,{base64_data}"
+            return self.renderer.logo_data_uri(logo_path, self._encode_logo)
         except Exception as e:
             print(f"Error cargando logo: {e}")
             return None
+
+    @staticmethod
+    def _encode_logo(logo_path: str) -> str:
+        with open(logo_path, "rb") as image_file:
+            base64_data = base64.b64encode(image_file.read()).decode('utf-8')
+
+        # Detectar tipo de imagen por extensión
+        file_extension = os.path.splitext(logo_path)[1].lower()
+        if file_extension in ['.png']:
+            mime_type = 'image/png'
+        elif file_extension in ['.jpg', '.jpeg']:
+            mime_type = 'image/jpeg'
+        elif file_extension in ['.svg']:
+            mime_type = 'image/svg+xml'
+        else:
+            mime_type = 'image/png'  # default
+
+        return f"data:{mime_type};base64,{base64_data}"
     
     def calculate_unit_selling_prices(self, quote: QuoteCalculation) -> List[Dict]:
         """
@@ -146,172 +374,11 @@ class PDFQuoteService:
             'total_windows': sum(p['quantity'] for p in products_info)
         }
         
-        # Renderizar template HTML
-        template = self.env.get_template('quote_pdf.html')
-        html_content = template.render(**template_data)
-        
-        # CSS para el PDF
-        css_content = """
-        @page {
-            size: A4;
-            margin: 1cm;
-        }
-        
-        body {
-            font-family: 'Arial', sans-serif;
-            font-size: 10pt;
-            line-height: 1.4;
-            color: #333;
-        }
-        
-        .header {
-            border-bottom: 2px solid #007bff;
-            padding-bottom: 15px;
-            margin-bottom: 20px;
-        }
-        
-        .header-content {
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-        }
-        
-        .logo-section {
-            flex: 0 0 auto;
-            margin-right: 20px;
-        }
-        
-        .company-logo {
-            max-height: 80px;
-            max-width: 150px;
-            object-fit: contain;
-        }
-        
-        .company-details {
-            flex: 1;
-            text-align: center;
-        }
-        
-        .company-name {
-            font-size: 24pt;
-            font-weight: bold;
-            color: #007bff;
-            margin-bottom: 5px;
-        }
-        
-        .quote-title {
-            font-size: 18pt;
-            font-weight: bold;
-            margin: 15px 0;
-            text-align: center;
-            color: #495057;
-        }
-        
-        .info-section {
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 20px;
-        }
-        
-        .info-box {
-            border: 1px solid #dee2e6;
-            padding: 10px;
-            border-radius: 5px;
-            background-color: #f8f9fa;
-        }
-        
-        .products-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            font-size: 9pt;
-        }
-        
-        .products-table th,
-        .products-table td {
-            border: 1px solid #dee2e6;
-            padding: 8px;
-            text-align: left;
-        }
-        
-        .products-table th {
-            background-color: #007bff;
-            color: white;
-            font-weight: bold;
-            text-align: center;
-        }
-        
-        .products-table td.number {
-            text-align: right;
-        }
-        
-        .products-table td.center {
-            text-align: center;
-        }
-        
-        .totals-section {
-            margin-top: 20px;
-            page-break-inside: avoid;
-        }
-        
-        .totals-table {
-            width: 50%;
-            margin-left: auto;
-            border-collapse: collapse;
-        }
-        
-        .totals-table td {
-            padding: 5px 10px;
-            border: 1px solid #dee2e6;
-        }
-        
-        .totals-table .label {
-            background-color: #f8f9fa;
-            font-weight: bold;
-            text-align: right;
-        }
-        
-        .totals-table .amount {
-            text-align: right;
-            background-color: white;
-        }
-        
-        .total-final {
-            background-color: #f8f9fa !important;
-            color: black !important;
-            font-weight: bold;
-            font-size: 12pt;
-            border: 2px solid #007bff;
-        }
-        
-        .footer {
-            margin-top: 30px;
-            border-top: 1px solid #dee2e6;
-            padding-top: 15px;
-            font-size: 8pt;
-            color: #6c757d;
-            text-align: center;
-        }
-        
-        .validity-note {
-            margin-top: 20px;
-            padding: 10px;
-            background-color: #fff3cd;
-            border: 1px solid #ffeaa7;
-            border-radius: 5px;
-            font-style: italic;
-        }
-        """
-        
-        # Generar PDF
-        html_doc = HTML(string=html_content)
-        css_doc = CSS(string=css_content)
-        
-        pdf_buffer = io.BytesIO()
-        html_doc.write_pdf(pdf_buffer, stylesheets=[css_doc])
-        pdf_buffer.seek(0)
+        # Renderizar template HTML (plantilla ya compilada)
+        html_content = self.renderer.render_html(**template_data)
         
-        return pdf_buffer.getvalue()
+        # Generar PDF con la hoja de estilos y fuentes preparadas
+        return self.renderer.write_pdf(html_content)
     
     def format_currency(self, amount: Decimal) -> str:
         """Formatea una cantidad como moneda"""
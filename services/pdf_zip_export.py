@@ -0,0 +1,109 @@
+# services/pdf_zip_export.py - Exportación de varias cotizaciones como ZIP de PDFs
+"""
+Streamed ZIP of quote PDFs.
+
+PDFs are rendered through PDFRenderService (process pool + PDF cache) with at
+most ``window`` renders in flight, and each one is written to the archive and
+handed to the client as soon as it is ready, in input order. Memory holds the
+in-flight PDFs and the ZIP central directory only, whatever the batch size.
+Quotes may come from an async iterator (batches read through the async
+driver) or a sync one, which is advanced in the thread pool so its batch
+queries never run on the event loop.
+"""
+
+import asyncio
+import zipfile
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Tuple, Union
+
+from fastapi.concurrency import run_in_threadpool
+
+from services.pdf_render_service import PDFRenderService
+
+
+class _ZipChunks:
+    """Write-only sink for zipfile: keeps what was written since the last drain
+
+    It has no seek/tell, so zipfile writes entries with data descriptors and
+    never goes back to patch headers: every byte can be sent right away.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def quote_pdf_filename(quote_id: int) -> str:
+    return f"cotizacion_{quote_id}.pdf"
+
+
+async def stream_quote_pdfs_zip(
+    render_service: PDFRenderService,
+    quotes: Union[Iterable[Tuple[int, Dict]], AsyncIterable[Tuple[int, Dict]]],
+    company_info: Optional[Dict],
+    window: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    ZIP archive of the quotes' PDFs, yielded chunk by chunk.
+
+    ``quotes`` yields (quote_id, quote_data) and is consumed lazily, off the
+    event loop, ``window`` renders ahead of the entry being written. A PDF that fails to render is
+    left out and listed in ``errores.txt`` at the end of the archive (the
+    response status has already been sent by then).
+    """
+    window = max(1, window or render_service.max_pending)
+    is_async = hasattr(quotes, '__aiter__')
+    quotes = quotes.__aiter__() if is_async else iter(quotes)
+    pending = deque()
+    errors = []
+    sink = _ZipChunks()
+    archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED)
+
+    async def schedule():
+        while len(pending) < window:
+            if is_async:
+                item = await anext(quotes, None)
+            else:
+                # next() may run a batch query: keep it off the event loop
+                item = await run_in_threadpool(next, quotes, None)
+            if item is None:
+                return
+            quote_id, quote_data = item
+            task = asyncio.ensure_future(render_service.render_async(quote_data, company_info))
+            pending.append((quote_id, task))
+
+    try:
+        await schedule()
+        while pending:
+            quote_id, task = pending.popleft()
+            try:
+                content = await task
+            except Exception as e:
+                errors.append(f"{quote_pdf_filename(quote_id)}: {e}")
+            else:
+                # PDFs are already compressed: stored entries, no deflate cost
+                archive.writestr(quote_pdf_filename(quote_id), content)
+            await schedule()
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+
+        if errors:
+            archive.writestr('errores.txt', '\n'.join(errors) + '\n')
+        archive.close()
+        yield sink.drain()
+    finally:
+        # Client went away (or a render raised something unexpected): stop what is queued
+        for _, task in pending:
+            task.cancel()
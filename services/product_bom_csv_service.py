@@ -2,14 +2,17 @@
 import csv
 import io
 import json
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Iterator, Callable
 from decimal import Decimal, InvalidOperation
 from sqlalchemy.orm import Session
 from pydantic import ValidationError
 
-from database import DatabaseProductService, AppProduct as DBAppProduct
+from database import DatabaseProductService, DatabaseMaterialService, AppProduct as DBAppProduct
+from services.catalog_cache import bump_catalog_version
+from services.csv_streaming import iter_csv_chunks, EXPORT_ROWS_PER_CHUNK
 from models.product_bom_models import AppProduct, BOMItem, MaterialType, WindowType, AluminumLine
 from security.input_validation import InputValidator
+from security.formula_evaluator import formula_evaluator
 
 class ProductBOMCSVService:
     """Service for CSV import/export operations on product BOM catalog with security validation"""
@@ -37,39 +40,44 @@ class ProductBOMCSVService:
     
     def export_products_to_csv(self, window_type: Optional[str] = None) -> str:
         """Export products to CSV format by window type"""
-        products = self.product_service.get_all_products()
-        
-        # Filter by window type if specified
-        if window_type and window_type != "all":
-            products = [p for p in products if p.window_type == window_type]
-        
-        # Create CSV content
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=self.CSV_HEADERS)
-        writer.writeheader()
-        
-        for product in products:
+        return "".join(self.iter_products_csv(window_type))
+    
+    def iter_products_csv(self, window_type: Optional[str] = None,
+                          rows_per_chunk: int = EXPORT_ROWS_PER_CHUNK) -> Iterator[str]:
+        """Products CSV as text chunks, read from the database with yield_per"""
+        if window_type == "all":
+            window_type = None
+        products = self.product_service.iter_products(window_type)
+        return iter_csv_chunks(self.CSV_HEADERS, (self._product_csv_row(p) for p in products), rows_per_chunk)
+    
+    @staticmethod
+    def _product_csv_row(product) -> Dict[str, Any]:
+        return {
+            "action": "update",  # Default action for existing products
+            "id": product.id,
+            "name": product.name,
+            "window_type": product.window_type,
+            "aluminum_line": product.aluminum_line,
+            "min_width_cm": str(product.min_width_cm),
+            "max_width_cm": str(product.max_width_cm),
+            "min_height_cm": str(product.min_height_cm),
+            "max_height_cm": str(product.max_height_cm),
             # Convert BOM to JSON string for CSV
-            bom_json = json.dumps(product.bom) if product.bom else "[]"
-            
-            writer.writerow({
-                "action": "update",  # Default action for existing products
-                "id": product.id,
-                "name": product.name,
-                "window_type": product.window_type,
-                "aluminum_line": product.aluminum_line,
-                "min_width_cm": str(product.min_width_cm),
-                "max_width_cm": str(product.max_width_cm),
-                "min_height_cm": str(product.min_height_cm),
-                "max_height_cm": str(product.max_height_cm),
-                "bom_json": bom_json,
-                "description": product.description or ""
-            })
-        
-        return output.getvalue()
+            "bom_json": json.dumps(product.bom) if product.bom else "[]",
+            "description": product.description or ""
+        }
     
-    def import_products_from_csv(self, csv_content: str) -> Dict[str, Any]:
-        """Import products from CSV with validation and bulk operations"""
+    # Rows between progress callbacks of the row-by-row import
+    PROGRESS_EVERY_ROWS = 100
+    
+    def import_products_from_csv(self, csv_content: str,
+                                 progress: Optional[Callable[[int], bool]] = None) -> Dict[str, Any]:
+        """Import products from CSV with validation and bulk operations
+
+        progress, if given, is called every PROGRESS_EVERY_ROWS rows with the number
+        of rows processed; returning False stops the import and sets
+        results["cancelled"] (rows already processed stay applied).
+        """
         results = {
             "success": [],
             "errors": [],
@@ -105,6 +113,11 @@ class ProductBOMCSVService:
                         "error": f"Unexpected error: {str(e)}"
                     })
                     results["summary"]["skipped"] += 1
+                
+                rows_done = row_num - 1
+                if progress is not None and rows_done % self.PROGRESS_EVERY_ROWS == 0 and not progress(rows_done):
+                    results["cancelled"] = True
+                    break
         
         except Exception as e:
             results["errors"].append({
@@ -112,7 +125,229 @@ class ProductBOMCSVService:
                 "error": f"CSV parsing error: {str(e)}"
             })
         
+        # Invalidate cached catalog data once the whole file has been applied
+        bump_catalog_version()
+        return results
+    
+    # Sample measurements a BOM formula must evaluate with (same names as quote pricing)
+    FORMULA_TEST_VARIABLES = {
+        "width_m": 1.0, "height_m": 1.0, "width_cm": 100.0, "height_cm": 100.0,
+        "quantity": 1, "area_m2": 1.0, "perimeter_m": 4.0,
+    }
+    
+    # Product columns written by the bulk import (diffed against the stored product)
+    PRODUCT_FIELDS = ["name", "window_type", "aluminum_line", "min_width_cm", "max_width_cm",
+                      "min_height_cm", "max_height_cm", "bom", "description"]
+    
+    def import_products_bulk(self, csv_content: str, dry_run: bool = False,
+                             progress: Optional[Callable[[int], bool]] = None) -> Dict[str, Any]:
+        """
+        Import a whole products CSV in one transaction, or preview it with dry_run.
+
+        All rows are parsed first. Every distinct quantity formula is compiled and
+        test-evaluated once, and every BOM material_id is checked against the set
+        of active material ids loaded in one query; products referenced by
+        update/delete rows are loaded in one query too. Valid rows are then written
+        with one INSERT, one executemany UPDATE and one soft-delete UPDATE.
+
+        Returns the usual success/errors/summary plus "diff": for each valid row the
+        action and the changed fields ({"field": {"from": old, "to": new}}); updates
+        that change nothing are reported as "unchanged" and not written. Each product
+        may be updated or deleted by one row only; later rows for the same id are
+        reported as errors.
+
+        progress, if given, is called once every row has been checked, before
+        anything is written; returning False sets results["cancelled"] and the
+        file is not applied.
+        """
+        results = {
+            "success": [],
+            "errors": [],
+            "diff": [],
+            "summary": {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0, "skipped": 0},
+            "dry_run": dry_run
+        }
+
+        try:
+            csv_reader = csv.DictReader(io.StringIO(csv_content))
+            if not self._validate_csv_headers(csv_reader.fieldnames):
+                results["errors"].append({
+                    "row": 0,
+                    "error": f"Invalid CSV headers. Expected: {', '.join(self.CSV_HEADERS)}"
+                })
+                return results
+            parsed = [self._parse_product_row(row, row_num) for row_num, row in enumerate(csv_reader, start=2)]
+        except Exception as e:
+            results["errors"].append({"row": 0, "error": f"CSV parsing error: {str(e)}"})
+            return results
+
+        # Catalog references, each checked once for the whole file
+        valid = [entry for entry in parsed if entry["success"]]
+        boms = [entry["data"]["bom"] for entry in valid if "bom" in entry["data"]]
+        formula_errors = self._check_formulas({item["quantity_formula"] for bom in boms for item in bom})
+        material_ids = DatabaseMaterialService(self.db).get_active_material_ids() if boms else set()
+        existing = self.product_service.get_products_by_ids(
+            entry["data"]["id"] for entry in valid if "id" in entry["data"]
+        )
+
+        # planned: ids already updated or deleted by an earlier row (one row per product)
+        creates, updates, deletes, planned = [], [], set(), set()
+        for entry in parsed:
+            row_num = entry["row"]
+            result = entry if not entry["success"] else self._plan_product_row(
+                entry, existing, planned, material_ids, formula_errors
+            )
+            if not result["success"]:
+                results["errors"].append(result)
+                results["summary"]["skipped"] += 1
+                continue
+            results["diff"].append({k: result[k] for k in ("row", "action", "product_id", "product_name", "changes")})
+            results["summary"][result["action"]] += 1
+            if result["action"] == "created":
+                creates.append(result)
+            elif result["action"] == "updated":
+                updates.append(result)
+            elif result["action"] == "deleted":
+                deletes.add(result["product_id"])
+            if result["action"] != "created":
+                planned.add(result["product_id"])
+            if result["action"] != "unchanged":
+                results["success"].append({k: result[k] for k in ("success", "action", "row", "product_id", "product_name")})
+
+        if dry_run:
+            return results
+        if progress is not None and not progress(len(parsed)):
+            results["cancelled"] = True
+            results["success"] = []
+            results["summary"].update(created=0, updated=0, deleted=0)
+            return results
+
+        try:
+            # No product_category column in this format (headers must match exactly) and
+            # window_type is required on create: every product is a window, which is
+            # the AppProduct.product_category default
+            created_ids = self.product_service.bulk_create_products([result["values"] for result in creates])
+            for result, product_id in zip(creates, created_ids):
+                result["product_id"] = product_id
+            self.product_service.bulk_update_products([
+                dict(result["values"], id=result["product_id"]) for result in updates
+            ])
+            self.product_service.bulk_deactivate_products(deletes)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            results["errors"].append({"row": 0, "error": f"Database error, nothing was imported: {str(e)}"})
+            results["success"] = []
+            results["summary"].update(created=0, updated=0, deleted=0)
+            return results
+
+        # Report the ids assigned to created products
+        created_by_row = {result["row"]: result["product_id"] for result in creates}
+        for item in results["success"] + results["diff"]:
+            if item["row"] in created_by_row:
+                item["product_id"] = created_by_row[item["row"]]
+
+        # Invalidate cached catalog data once the whole file has been applied
+        bump_catalog_version()
         return results
+
+    def _parse_product_row(self, row: Dict[str, str], row_num: int) -> Dict[str, Any]:
+        """Validated action and data of one row (no database access)"""
+        action = row.get("action", "").strip().lower()
+        if action not in ["create", "update", "delete"]:
+            return {"success": False, "row": row_num,
+                    "error": f"Invalid action '{action}'. Must be: create, update, or delete"}
+
+        if action == "delete":
+            try:
+                product_id = int(row.get("id", "").strip())
+            except (ValueError, TypeError):
+                return {"success": False, "row": row_num, "error": "Invalid product ID for delete action"}
+            if not product_id:
+                return {"success": False, "row": row_num, "error": "Product ID is required for delete action"}
+            return {"success": True, "row": row_num, "action": action, "data": {"id": product_id}}
+
+        validated_data = self._validate_product_data(row, row_num, require_id=(action == "update"))
+        if not validated_data["valid"]:
+            return {"success": False, "row": row_num, "error": validated_data["error"]}
+        data = validated_data["data"]
+        if action == "update" and not row.get("bom_json", "").strip():
+            # An update without bom_json keeps the stored BOM
+            data.pop("bom", None)
+        if "bom" in data:
+            try:
+                data["bom"] = [BOMItem(**item).model_dump(mode="json") for item in data["bom"]]
+            except ValidationError as e:
+                return {"success": False, "row": row_num, "error": f"Validation error: {str(e)}"}
+        return {"success": True, "row": row_num, "action": action, "data": data}
+
+    def _check_formulas(self, formulas) -> Dict[str, Optional[str]]:
+        """Compile and test-evaluate each distinct formula once: {formula: error or None}"""
+        names = formula_evaluator.prepare_variables(self.FORMULA_TEST_VARIABLES)
+        errors = {}
+        for formula in formulas:
+            try:
+                formula_evaluator.compile_formula(formula).evaluate_prepared(names)
+                errors[formula] = None
+            except ValueError as e:
+                errors[formula] = str(e)
+        return errors
+
+    def _plan_product_row(self, entry: Dict[str, Any], existing: Dict[int, Any], planned: set,
+                          material_ids: set, formula_errors: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        """Resolve a validated row against the pre-loaded catalog: action, values and diff"""
+        row_num, action, data = entry["row"], entry["action"], entry["data"]
+
+        for index, item in enumerate(data.get("bom", []), start=1):
+            if item["material_id"] not in material_ids:
+                return {"success": False, "row": row_num,
+                        "error": f"Material ID {item['material_id']} in BOM item {index} not found"}
+            if formula_errors.get(item["quantity_formula"]):
+                return {"success": False, "row": row_num,
+                        "error": f"Invalid quantity formula in BOM item {index}: {formula_errors[item['quantity_formula']]}"}
+
+        values = {field: data[field] for field in self.PRODUCT_FIELDS if data.get(field) is not None}
+        if action == "create":
+            values.setdefault("description", None)
+            values.setdefault("bom", [])
+            changes = {field: {"from": None, "to": self._diff_value(value)} for field, value in values.items()}
+            return {"success": True, "row": row_num, "action": "created", "product_id": None,
+                    "product_name": values["name"], "values": values, "changes": changes}
+
+        product = existing.get(data["id"])
+        if product is None:
+            return {"success": False, "row": row_num, "error": f"Product with ID {data['id']} not found"}
+        if data["id"] in planned:
+            # Both rows would be diffed against the stored product and only the last one applied
+            return {"success": False, "row": row_num,
+                    "error": f"Product with ID {data['id']} already updated or deleted by an earlier row"}
+        if action == "delete":
+            return {"success": True, "row": row_num, "action": "deleted", "product_id": product.id,
+                    "product_name": product.name, "values": {}, "changes": {}}
+
+        changes = {}
+        for field, value in values.items():
+            current = getattr(product, field)
+            if field == "bom":
+                current = self._normalized_bom(current)
+            if current != value:
+                changes[field] = {"from": self._diff_value(current), "to": self._diff_value(value)}
+        values = {field: values[field] for field in changes}
+        return {"success": True, "row": row_num, "action": "updated" if changes else "unchanged",
+                "product_id": product.id, "product_name": values.get("name", product.name),
+                "values": values, "changes": changes}
+
+    @staticmethod
+    def _normalized_bom(bom) -> list:
+        """Stored BOM in the same JSON form as imported BOMs (for comparison)"""
+        try:
+            return [BOMItem(**item).model_dump(mode="json") for item in bom or []]
+        except (ValidationError, TypeError):
+            return bom
+
+    @staticmethod
+    def _diff_value(value):
+        return str(value) if isinstance(value, Decimal) else value
     
     def _validate_csv_headers(self, headers: List[str]) -> bool:
         """Validate that CSV has required headers"""
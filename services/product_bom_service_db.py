@@ -1,13 +1,17 @@
 # services/product_bom_service_db.py - Versión actualizada para usar base de datos
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Tuple
 from decimal import Decimal
 import math
-from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, noload
 
 from models.product_bom_models import AppMaterial, AppProduct, BOMItem, MaterialUnit, MaterialType
 from models.quote_models import WindowType, AluminumLine, GlassType, LaborCost, Glass
 from database import AppMaterial as DBAppMaterial, AppProduct as DBAppProduct
 from database import DatabaseMaterialService, DatabaseProductService, DatabaseColorService, Color, MaterialColor
+from database import AsyncServiceAdapter
+from services.catalog_cache import catalog_cache as shared_catalog_cache, CatalogCache, MISSING
+from services.product_cost_kernel import ProductCostKernel, product_kernel_cache
 
 # Glass type to material code mapping
 # Material codes follow pattern: VID-{TYPE}-{THICKNESS}
@@ -32,28 +36,253 @@ GLASS_FALLBACK_PRICES = {
     GlassType.TEMPLADO_6MM: Decimal('195.00'),
 }
 
+class CatalogSnapshot:
+    """
+    In-memory view of every catalog row a quote calculation needs.
+
+    Loaded with a fixed number of queries (products, materials + glass,
+    material-color prices) instead of one query per item / BOM line / color.
+    Lookups for IDs that were part of the load are answered from the dicts,
+    including "not found"; anything else is reported as not covered so the
+    service can fall back to the database.
+    """
+
+    def __init__(self):
+        self.kernels: Dict[int, ProductCostKernel] = {}
+        self.products: Dict[int, AppProduct] = {}
+        self.materials: Dict[int, AppMaterial] = {}
+        self.materials_by_code: Dict[str, AppMaterial] = {}
+        self.color_prices: Dict[Tuple[int, int], Decimal] = {}
+        self.product_ids: set = set()
+        self.material_ids: set = set()
+        self.material_codes: set = set()
+        self.color_keys: set = set()
+        self.query_count = 0
+
+    @classmethod
+    def load(cls, service: 'ProductBOMServiceDB', items: Iterable = (),
+             material_items: Iterable = ()) -> 'CatalogSnapshot':
+        """
+        Bulk-load products, materials and color prices referenced by quote items.
+
+        Rows already in the service's catalog cache are taken from it; only
+        the misses are queried (and then cached).
+
+        Args:
+            service: ProductBOMServiceDB providing the session and model converters
+            items: WindowItem objects (QuoteRequest.items)
+            material_items: MaterialOnlyItem objects (QuoteRequest.material_items)
+
+        Returns:
+            CatalogSnapshot: Populated snapshot (at most 3 queries)
+        """
+        snapshot = cls()
+        db = service.db
+        cache = service.catalog_cache
+        version = cache.version if cache is not None else None
+        items = list(items)
+        material_items = list(material_items)
+
+        # Query 1: products (as precompiled cost kernels)
+        snapshot._load_products(service, {item.product_bom_id for item in items}, version)
+
+        # Query 2: BOM materials, material-only items and glass (by id or legacy code)
+        snapshot.material_ids = {m.material_id for m in material_items}
+        for product in snapshot.products.values():
+            snapshot.material_ids.update(bom_item.material_id for bom_item in product.bom)
+        for item in items:
+            if item.selected_glass_material_id is not None:
+                snapshot.material_ids.add(item.selected_glass_material_id)
+            elif item.selected_glass_type is not None and item.selected_glass_type in GLASS_TYPE_TO_MATERIAL_CODE:
+                snapshot.material_codes.add(GLASS_TYPE_TO_MATERIAL_CODE[item.selected_glass_type])
+
+        missing_ids = snapshot._take_cached(cache, "material", snapshot.material_ids, snapshot.materials)
+        missing_codes = snapshot._take_cached(
+            cache, "material_code", snapshot.material_codes, snapshot.materials_by_code
+        )
+        if missing_ids or missing_codes:
+            db_materials = (
+                db.query(DBAppMaterial)
+                .options(noload(DBAppMaterial.material_colors))
+                .filter(
+                    or_(
+                        DBAppMaterial.id.in_(missing_ids),
+                        DBAppMaterial.code.in_(missing_codes)
+                    ),
+                    DBAppMaterial.is_active == True
+                )
+                .all()
+            )
+            snapshot.query_count += 1
+            for db_material in db_materials:
+                material = service._db_material_to_pydantic(db_material)
+                if db_material.id in missing_ids:
+                    snapshot.materials[db_material.id] = material
+                if db_material.code in missing_codes:
+                    snapshot.materials_by_code[db_material.code] = material
+            snapshot._store_cached(cache, "material", missing_ids, snapshot.materials, version)
+            snapshot._store_cached(cache, "material_code", missing_codes, snapshot.materials_by_code, version)
+
+        # Query 3: color prices for colored profiles
+        for item in items:
+            product = snapshot.products.get(item.product_bom_id)
+            if product and item.selected_profile_color:
+                snapshot.color_keys.update(
+                    (b.material_id, item.selected_profile_color)
+                    for b in product.bom if b.material_type == MaterialType.PERFIL
+                )
+
+        missing_keys = snapshot._take_cached(
+            cache, "material_color_price", snapshot.color_keys, snapshot.color_prices
+        )
+        if missing_keys:
+            material_colors = db.query(MaterialColor).filter(
+                MaterialColor.material_id.in_({material_id for material_id, _ in missing_keys}),
+                MaterialColor.color_id.in_({color_id for _, color_id in missing_keys}),
+                MaterialColor.is_available == True
+            ).all()
+            snapshot.query_count += 1
+            for material_color in material_colors:
+                key = (material_color.material_id, material_color.color_id)
+                if key in missing_keys:
+                    snapshot.color_prices[key] = material_color.price_per_unit
+            snapshot._store_cached(cache, "material_color_price", missing_keys, snapshot.color_prices, version)
+
+        return snapshot
+
+    @classmethod
+    def load_products(cls, service: 'ProductBOMServiceDB', product_ids: Iterable[int]) -> 'CatalogSnapshot':
+        """Snapshot covering only products (at most 1 query), e.g. for rendering lists"""
+        snapshot = cls()
+        cache = service.catalog_cache
+        snapshot._load_products(service, set(product_ids), cache.version if cache is not None else None)
+        return snapshot
+
+    def _load_products(self, service: 'ProductBOMServiceDB', product_ids: set, version: Optional[int]):
+        cache = service.catalog_cache
+        self.product_ids = product_ids
+        missing = self._take_cached(cache, "product_kernel", product_ids, self.kernels)
+        if missing:
+            db_products = service.db.query(DBAppProduct).filter(
+                DBAppProduct.id.in_(missing),
+                DBAppProduct.is_active == True
+            ).all()
+            self.query_count += 1
+            for db_product in db_products:
+                self.kernels[db_product.id] = service._product_kernel(db_product)
+            self._store_cached(cache, "product_kernel", missing, self.kernels, version)
+        self.products = {product_id: kernel.product for product_id, kernel in self.kernels.items()}
+
+    @staticmethod
+    def _take_cached(cache, prefix: str, keys: set, target: Dict) -> set:
+        """Copy cached entries for keys into target; return the keys still to load"""
+        if cache is None:
+            return set(keys)
+        missing = set()
+        for key in keys:
+            value = cache.get((prefix, key))
+            if value is MISSING:
+                missing.add(key)
+            elif value is not None:
+                target[key] = value
+        return missing
+
+    @staticmethod
+    def _store_cached(cache, prefix: str, keys: set, loaded: Dict, version: Optional[int]):
+        """Cache freshly loaded entries, including "not found" as None"""
+        if cache is None:
+            return
+        for key in keys:
+            cache.put((prefix, key), loaded.get(key), version)
+
+    def covers_product(self, product_id: int) -> bool:
+        return product_id in self.product_ids
+
+    def covers_material(self, material_id: int) -> bool:
+        return material_id in self.material_ids
+
+    def covers_material_code(self, code: str) -> bool:
+        return code in self.material_codes
+
+    def covers_color_price(self, material_id: int, color_id: int) -> bool:
+        return (material_id, color_id) in self.color_keys
+
+
 class ProductBOMServiceDB:
     """Versión de ProductBOMService que usa base de datos en lugar de memoria"""
 
-    def __init__(self, db: Session, enable_glass_cache: bool = True):
+    def __init__(self, db: Session, enable_glass_cache: bool = True,
+                 snapshot: Optional[CatalogSnapshot] = None,
+                 catalog_cache: Optional[CatalogCache] = shared_catalog_cache):
         self.db = db
         self.material_service = DatabaseMaterialService(db)
         self.product_service = DatabaseProductService(db)
         # Optional glass price caching for performance
         self._glass_price_cache = {} if enable_glass_cache else None
+        # Optional per-quote catalog snapshot (see load_catalog_snapshot)
+        self.snapshot = snapshot
+        # Process-wide read-through cache (None = always query the database)
+        self.catalog_cache = catalog_cache
+
+    def _cached(self, key: Tuple, loader):
+        """Read-through lookup in the shared catalog cache"""
+        if self.catalog_cache is None:
+            return loader()
+        return self.catalog_cache.get_or_load(key, loader)
+
+    def load_catalog_snapshot(self, items: Iterable = (), material_items: Iterable = ()) -> CatalogSnapshot:
+        """
+        Bulk-load the catalog rows referenced by a quote and serve lookups from memory.
+
+        Usage:
+            service.load_catalog_snapshot(quote_request.items, quote_request.material_items)
+        """
+        self.snapshot = CatalogSnapshot.load(self, items, material_items)
+        return self.snapshot
+
+    def load_product_snapshot(self, product_ids: Iterable[int]) -> CatalogSnapshot:
+        """Bulk-load only the given products (get_product / get_product_base_info then hit memory)"""
+        self.snapshot = CatalogSnapshot.load_products(self, product_ids)
+        return self.snapshot
     
     # === Métodos para Materiales ===
     def get_all_materials(self) -> List[AppMaterial]:
         """Obtiene todos los materiales activos de la base de datos"""
-        db_materials = self.material_service.get_all_materials()
-        return [self._db_material_to_pydantic(mat) for mat in db_materials]
+        return list(self._cached(("materials",), lambda: tuple(
+            self._db_material_to_pydantic(mat) for mat in self.material_service.get_all_materials()
+        )))
+
+    def get_materials_by_category(self, category: str) -> List[AppMaterial]:
+        """Obtiene los materiales activos de una categoría (p. ej. "Vidrio")"""
+        return list(self._cached(("materials_by_category", category), lambda: tuple(
+            self._db_material_to_pydantic(mat) for mat in self.material_service.get_materials_by_category(category)
+        )))
     
     def get_material(self, material_id: int) -> Optional[AppMaterial]:
         """Obtiene un material específico por ID"""
+        if self.snapshot is not None and self.snapshot.covers_material(material_id):
+            return self.snapshot.materials.get(material_id)
+        return self._cached(("material", material_id), lambda: self._load_material(material_id))
+
+    def _load_material(self, material_id: int) -> Optional[AppMaterial]:
         db_material = self.material_service.get_material_by_id(material_id)
         if not db_material:
             return None
         return self._db_material_to_pydantic(db_material)
+
+    def _load_material_by_code(self, code: str) -> Optional[AppMaterial]:
+        db_material = (
+            self.db.query(DBAppMaterial)
+            .options(noload(DBAppMaterial.material_colors))
+            .filter(
+                DBAppMaterial.code == code,
+                DBAppMaterial.is_active == True
+            )
+            .first()
+        )
+        if not db_material:
+            return None
+        return self._db_material_to_pydantic(db_material)
     
     def create_material(self, material: AppMaterial) -> AppMaterial:
         """Crea un nuevo material en la base de datos"""
@@ -91,15 +320,33 @@ class ProductBOMServiceDB:
     # === Métodos para Productos ===
     def get_all_products(self) -> List[AppProduct]:
         """Obtiene todos los productos activos de la base de datos"""
-        db_products = self.product_service.get_all_products()
-        return [self._db_product_to_pydantic(prod) for prod in db_products]
+        return list(self._cached(("products",), lambda: tuple(
+            self._product_kernel(prod).product for prod in self.product_service.get_all_products()
+        )))
     
     def get_product(self, product_id: int) -> Optional[AppProduct]:
         """Obtiene un producto específico por ID"""
+        kernel = self.get_cost_kernel(product_id)
+        return kernel.product if kernel else None
+
+    def get_cost_kernel(self, product_id: int) -> Optional[ProductCostKernel]:
+        """Kernel de costos precompilado del producto (BOM con fórmulas compiladas)"""
+        if self.snapshot is not None and self.snapshot.covers_product(product_id):
+            return self.snapshot.kernels.get(product_id)
+        return self._cached(("product_kernel", product_id), lambda: self._load_product_kernel(product_id))
+
+    def _load_product_kernel(self, product_id: int) -> Optional[ProductCostKernel]:
         db_product = self.product_service.get_product_by_id(product_id)
         if not db_product:
             return None
-        return self._db_product_to_pydantic(db_product)
+        return self._product_kernel(db_product)
+
+    def _product_kernel(self, db_product: DBAppProduct) -> ProductCostKernel:
+        """Kernel for this product version, built (and converted to Pydantic) only once per updated_at"""
+        return product_kernel_cache.get_or_build(
+            db_product.id, db_product.updated_at,
+            lambda: ProductCostKernel(self._db_product_to_pydantic(db_product), db_product.updated_at)
+        )
     
     def create_product(self, product: AppProduct) -> AppProduct:
         """Crea un nuevo producto en la base de datos - UPDATED for product_category"""
@@ -172,6 +419,15 @@ class ProductBOMServiceDB:
             }
         return None
     
+    def get_material_color_price(self, material_id: int, color_id: int) -> Optional[Decimal]:
+        """Precio específico de un material en un color (snapshot o base de datos)"""
+        if self.snapshot is not None and self.snapshot.covers_color_price(material_id, color_id):
+            return self.snapshot.color_prices.get((material_id, color_id))
+        return self._cached(
+            ("material_color_price", (material_id, color_id)),
+            lambda: DatabaseColorService(self.db).get_material_color_price(material_id, color_id)
+        )
+
     def get_labor_cost_data(self, window_type: WindowType) -> Optional[LaborCost]:
         """Obtiene el costo de mano de obra para un tipo de ventana."""
         _LABOR_COSTS = [
@@ -231,15 +487,14 @@ class ProductBOMServiceDB:
         price = None
 
         try:
-            # Query database for glass material
-            glass_material = (
-                self.db.query(DBAppMaterial)
-                .filter(
-                    DBAppMaterial.code == material_code,
-                    DBAppMaterial.is_active == True
+            # Query database for glass material (or read it from the quote snapshot / catalog cache)
+            if self.snapshot is not None and self.snapshot.covers_material_code(material_code):
+                glass_material = self.snapshot.materials_by_code.get(material_code)
+            else:
+                glass_material = self._cached(
+                    ("material_code", material_code),
+                    lambda: self._load_material_by_code(material_code)
                 )
-                .first()
-            )
 
             if glass_material:
                 # Database price found - use it
@@ -313,14 +568,10 @@ class ProductBOMServiceDB:
         if self._glass_price_cache is not None and material_id in self._glass_price_cache:
             return self._glass_price_cache[material_id]
 
-        # Query database by material ID
-        glass_material = (
-            self.db.query(DBAppMaterial)
-            .filter(DBAppMaterial.id == material_id)
-            .filter(DBAppMaterial.category == "Vidrio")
-            .filter(DBAppMaterial.is_active == True)
-            .first()
-        )
+        # Query database by material ID (or read it from the quote snapshot / catalog cache)
+        glass_material = self.get_material(material_id)
+        if glass_material is not None and glass_material.category != "Vidrio":
+            glass_material = None
 
         if not glass_material:
             raise ValueError(
@@ -395,6 +646,10 @@ class ProductBOMServiceDB:
             description=db_product.description
         )
 
+class AsyncProductBOMServiceDB(AsyncServiceAdapter):
+    """ProductBOMServiceDB sobre una AsyncSession (cada método corre con run_sync)"""
+    service_class = ProductBOMServiceDB
+
 # === Función para inicializar datos de ejemplo ===
 def initialize_sample_data(db: Session):
     """Inicializa la base de datos con datos de ejemplo si está vacía - VERSIÓN MEJORADA"""
@@ -0,0 +1,191 @@
+# services/product_cost_kernel.py - Kernel de costos precompilado por producto
+"""
+Precompiled per-product cost kernels.
+
+A ProductCostKernel is built once from a product row: the Pydantic
+AppProduct (BOMItems already converted), and for every BOM line the
+material reference, compiled quantity formula, waste factor and cost
+bucket (PERFIL / HERRAJE / CONSUMIBLE). Pricing a window item is then one
+call to ProductCostKernel.material_costs().
+
+Kernels are cached process-wide by (product id, updated_at): any change
+made through update_product (including CSV imports) sets a new updated_at
+and therefore a new kernel. Material prices and selling-unit lengths are
+not baked in; they are read at pricing time so material edits apply
+without rebuilding kernels.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from models.product_bom_models import AppProduct, MaterialType, MaterialUnit
+from security.formula_evaluator import formula_evaluator
+
+# Maximum number of product kernels kept in memory
+KERNEL_CACHE_SIZE = 512
+
+# BOM material types that are costed from the BOM (glass and labor are priced separately)
+COST_BUCKETS = (MaterialType.PERFIL, MaterialType.HERRAJE, MaterialType.CONSUMIBLE)
+
+
+def empty_material_totals() -> Dict[MaterialType, Decimal]:
+    """Zeroed cost per BOM bucket"""
+    return {bucket: Decimal('0') for bucket in COST_BUCKETS}
+
+
+class KernelLine:
+    """One BOM line: material reference, compiled formula, waste factor and bucket"""
+
+    __slots__ = ('material_id', 'material_type', 'bucket', 'quantity_formula',
+                 'waste_factor', 'compiled', 'compile_error')
+
+    def __init__(self, bom_item):
+        self.material_id = bom_item.material_id
+        self.material_type = bom_item.material_type
+        self.bucket = bom_item.material_type if bom_item.material_type in COST_BUCKETS else None
+        self.quantity_formula = bom_item.quantity_formula
+        self.waste_factor = bom_item.waste_factor
+        self.compiled = None
+        self.compile_error = None
+        try:
+            self.compiled = formula_evaluator.compile_formula(bom_item.quantity_formula)
+        except Exception as e:
+            # Reported when the line is priced, like any other formula error
+            self.compile_error = e
+
+    def formula_error(self, material, error: Exception) -> ValueError:
+        return ValueError(
+            f"Error al evaluar fórmula '{self.quantity_formula}' para material "
+            f"'{material.name}': {error}"
+        )
+
+    def check_compiled(self, material):
+        """Raise the formula error for this line if its formula could not be compiled"""
+        if self.compile_error is not None:
+            raise self.formula_error(material, self.compile_error)
+
+    def quantity_for_one(self, material, formula_names: dict) -> Decimal:
+        """Quantity to cost for ONE window: formula, waste factor and selling-unit rounding"""
+        try:
+            # Evaluate formula safely to get net quantity for ONE window
+            quantity_net_for_one_window = self.compiled.evaluate_prepared(formula_names)
+            if quantity_net_for_one_window < 0:
+                quantity_net_for_one_window = Decimal('0')
+        except Exception as e:
+            raise self.formula_error(material, e)
+
+        # Apply waste factor
+        quantity_with_waste_for_one_window = quantity_net_for_one_window * self.waste_factor
+
+        # Adjust for selling unit if it's a profile
+        if material.selling_unit_length_m and material.unit == MaterialUnit.ML:
+            num_selling_units = math.ceil(
+                quantity_with_waste_for_one_window / material.selling_unit_length_m
+            )
+            return Decimal(str(num_selling_units)) * material.selling_unit_length_m
+        return quantity_with_waste_for_one_window
+
+    def price_per_unit(self, material, color_id: Optional[int], product_bom_service) -> Decimal:
+        """Material price, using the color-specific price for profiles when available"""
+        if self.material_type == MaterialType.PERFIL and color_id:
+            color_price = product_bom_service.get_material_color_price(material.id, color_id)
+            if color_price:
+                return color_price
+        return material.cost_per_unit
+
+
+class ProductCostKernel:
+    """Precompiled BOM of one product version"""
+
+    __slots__ = ('product', 'updated_at', 'lines')
+
+    def __init__(self, product: AppProduct, updated_at=None):
+        self.product = product
+        self.updated_at = updated_at
+        self.lines = tuple(KernelLine(bom_item) for bom_item in product.bom)
+
+    def material_not_found_error(self, line: KernelLine) -> ValueError:
+        return ValueError(
+            f"Material con ID {line.material_id} referenciado en BOM de "
+            f"'{self.product.name}' no encontrado."
+        )
+
+    def material_costs(self, item, formula_names: dict, product_bom_service) -> Dict[MaterialType, Decimal]:
+        """
+        BOM material cost of a window item, per bucket (quantity of windows included).
+
+        Args:
+            item: WindowItem (quantity, selected_profile_color)
+            formula_names: Variables from SafeFormulaEvaluator.prepare_variables()
+            product_bom_service: Source of materials and color prices (snapshot / cache aware)
+
+        Raises:
+            ValueError: Missing material or formula error, with the calculator's messages
+        """
+        totals = empty_material_totals()
+        for line in self.lines:
+            material = product_bom_service.get_material(line.material_id)
+            if not material:
+                raise self.material_not_found_error(line)
+            line.check_compiled(material)
+
+            quantity_to_cost = line.quantity_for_one(material, formula_names)
+            price_per_unit = line.price_per_unit(material, item.selected_profile_color, product_bom_service)
+
+            # Cost of this material for ONE window, multiplied by quantity of windows in quote item
+            if line.bucket is not None:
+                totals[line.bucket] += quantity_to_cost * price_per_unit * item.quantity
+        return totals
+
+
+class ProductKernelCache:
+    """Bounded, thread-safe LRU cache of ProductCostKernel keyed by (product id, updated_at)"""
+
+    def __init__(self, max_size: int = KERNEL_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, ProductCostKernel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, product_id: int, updated_at: Any,
+                     build: Callable[[], ProductCostKernel]) -> ProductCostKernel:
+        key = (product_id, updated_at)
+        with self._lock:
+            kernel = self._entries.get(key)
+            if kernel is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return kernel
+            self.misses += 1
+
+        kernel = build()
+        with self._lock:
+            self._entries[key] = kernel
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return kernel
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
+
+
+product_kernel_cache = ProductKernelCache()
@@ -0,0 +1,83 @@
+# services/quote_item_cache.py - Caché de resultados de cálculo por ítem
+"""
+Memo cache of WindowCalculation results, keyed by a canonical hash of the
+window item and the catalog version.
+
+Users recalculate a quote many times while editing it, usually changing
+one item out of many. Unchanged items reuse their cached WindowCalculation;
+only changed items are priced and the quote roll-up (overhead, taxes) is
+always recomputed.
+
+The key covers everything an item's price depends on: product, dimensions,
+glass (material id or legacy type), profile color, quantity, labor rate
+override and the catalog version, so any catalog write makes earlier
+results unreachable. Entries also expire with the catalog cache TTL, which
+bounds staleness across worker processes.
+"""
+
+import hashlib
+import json
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from config import settings
+from models.quote_models import WindowItem, WindowCalculation
+from services.catalog_cache import CatalogCache, MISSING, catalog_cache
+
+
+def _canonical_decimal(value: Optional[Decimal]) -> Optional[str]:
+    """150, 150.0 and 150.00 hash the same"""
+    if value is None:
+        return None
+    return format(Decimal(value).normalize(), 'f')
+
+
+def item_cache_key(item: WindowItem, labor_rate_override: Optional[Decimal] = None,
+                   catalog_version: Optional[int] = None) -> str:
+    """SHA-256 of the normalized item, labor override and catalog version"""
+    if catalog_version is None:
+        catalog_version = catalog_cache.version
+    glass_type = item.selected_glass_type
+    canonical = [
+        catalog_version,
+        item.product_bom_id,
+        _canonical_decimal(item.width_cm),
+        _canonical_decimal(item.height_cm),
+        item.quantity,
+        item.selected_glass_material_id,
+        glass_type.value if glass_type is not None else None,
+        item.selected_profile_color,
+        _canonical_decimal(labor_rate_override),
+    ]
+    return hashlib.sha256(json.dumps(canonical, separators=(',', ':')).encode()).hexdigest()
+
+
+class QuoteItemCache:
+    """LRU + TTL cache of WindowCalculation per canonical item key"""
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 60):
+        self._cache = CatalogCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    def get(self, key: str, item: WindowItem) -> Optional[WindowCalculation]:
+        """Cached calculation for item (a copy carrying the item's own dimension values), or None"""
+        calculation = self._cache.get(key)
+        if calculation is MISSING:
+            return None
+        return calculation.model_copy(update={'width_cm': item.width_cm, 'height_cm': item.height_cm})
+
+    def put(self, key: str, calculation: WindowCalculation):
+        self._cache.put(key, calculation.model_copy())
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._cache.get_stats()
+        stats.pop('version', None)
+        return stats
+
+
+quote_item_cache = QuoteItemCache(
+    max_entries=settings.quote_item_cache_max_entries,
+    ttl_seconds=settings.catalog_cache_ttl_seconds,
+)
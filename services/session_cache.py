@@ -0,0 +1,125 @@
+# services/session_cache.py - Caché de tokens de sesión validados (token -> datos del usuario)
+"""
+Process-wide cache of validated session tokens.
+
+Authenticating a request takes two queries (session by token, then the
+user). A hit here skips both: the entry holds the user's column values,
+taken when the token was last validated, and each hit builds a fresh
+transient User from them, so requests never share a mutable instance. The
+password hash is not cached.
+
+Entries expire at the earlier of the TTL and the session's own expires_at.
+DatabaseUserService.invalidate_session() (logout) drops the token at once;
+the TTL bounds how long another worker process, which does not see that
+call, may keep accepting it. Tokens are stored as SHA-256 digests.
+"""
+
+import datetime as dt
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+
+# User columns kept in an entry (everything but the password hash)
+USER_SNAPSHOT_FIELDS = ("id", "email", "full_name", "created_at", "is_active")
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _epoch(expires_at: Optional[dt.datetime]) -> float:
+    """Session expiry as a Unix timestamp (naive datetimes, as SQLite returns them, are UTC)"""
+    if expires_at is None:
+        return float("inf")
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=dt.timezone.utc)
+    return expires_at.timestamp()
+
+
+class SessionCache:
+    """Thread-safe LRU cache of token -> user snapshot, bounded by TTL and session expiry"""
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # token digest -> (user snapshot, expires_at as Unix time)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str):
+        """Return a transient User for a cached, unexpired token, or None"""
+        key = _token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() >= entry[1]:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return self._build_user(entry[0])
+
+    def put(self, token: str, user, session_expires_at: Optional[dt.datetime] = None):
+        """Cache user for token until the TTL or the session's expires_at, whichever comes first"""
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        expires_at = min(time.time() + self.ttl_seconds, _epoch(session_expires_at))
+        snapshot = {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS}
+        key = _token_key(token)
+        with self._lock:
+            self._entries[key] = (snapshot, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, token: str) -> bool:
+        """Drop one token (logout / session invalidated)"""
+        with self._lock:
+            removed = self._entries.pop(_token_key(token), None) is not None
+            if removed:
+                self.invalidations += 1
+            return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
+
+    @staticmethod
+    def _build_user(snapshot: Dict[str, Any]):
+        from database import User  # database imports this module
+        return User(**snapshot)
+
+
+session_cache = SessionCache(
+    ttl_seconds=settings.session_cache_ttl_seconds,
+    max_entries=settings.session_cache_max_entries,
+)
@@ -0,0 +1,110 @@
+"""Shared pytest configuration
+
+- Minimal `benchmark` fixture when pytest-benchmark is not installed, so
+  performance tests still run (once, untimed) instead of erroring at setup.
+- In-memory SQLite catalog fixtures with a SELECT counter, used by the
+  query-count tests (no PostgreSQL required).
+"""
+
+import importlib.util
+
+import pytest
+from sqlalchemy import BigInteger, create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+if importlib.util.find_spec("pytest_benchmark") is None:
+
+    @pytest.fixture
+    def benchmark():
+        """Fallback for pytest-benchmark's fixture: call the function once"""
+        def run(func, *args, **kwargs):
+            return func(*args, **kwargs)
+        return run
+
+
+# === In-memory SQLite catalog (no PostgreSQL required) ===
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(BigInteger, "sqlite")
+def _compile_bigint_sqlite(type_, compiler, **kw):
+    # SQLite only autoincrements "INTEGER PRIMARY KEY" columns
+    return "INTEGER"
+
+
+class QueryCounter:
+    """Counts SELECT statements executed on an engine"""
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def reset(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.count += 1
+            self.statements.append(statement)
+
+
+@pytest.fixture
+def sqlite_engine():
+    """Engine with the catalog tables created on in-memory SQLite"""
+    from database import Base, AppMaterial, AppProduct, Color, MaterialColor
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(
+        engine,
+        tables=[AppMaterial.__table__, AppProduct.__table__, Color.__table__, MaterialColor.__table__],
+    )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def query_counter(sqlite_engine):
+    """Attach a SELECT counter to the SQLite engine"""
+    counter = QueryCounter()
+    event.listen(sqlite_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(sqlite_engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def catalog_db(sqlite_engine):
+    """Session on SQLite seeded with the sample catalog (colors, materials, 3 products)"""
+    from services.catalog_cache import catalog_cache
+    from services.product_cost_kernel import product_kernel_cache
+    from services.quote_item_cache import quote_item_cache
+    from services.product_bom_service_db import initialize_sample_data
+
+    session = sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)()
+    initialize_sample_data(session)
+    # Every test gets a fresh catalog: drop rows cached from other databases
+    catalog_cache.clear()
+    product_kernel_cache.clear()
+    quote_item_cache.clear()
+    yield session
+    session.close()
+    catalog_cache.clear()
+    product_kernel_cache.clear()
+    quote_item_cache.clear()
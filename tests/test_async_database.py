@@ -0,0 +1,123 @@
+"""
+Tests for the async database path (database.get_async_db / Async*Service)
+
+Run on SQLite through aiosqlite; the same services go through asyncpg in
+production. Event-loop responsiveness is checked with a ticker task that
+must keep running while a slow query is in flight.
+"""
+
+import asyncio
+import datetime as dt
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database import (
+    AppMaterial, AppProduct, AsyncDatabaseQuoteService, AsyncDatabaseUserService, AsyncServiceAdapter, Base,
+    Color, DatabaseQuoteService, MaterialColor, Quote, User, UserSession, async_database_url
+)
+
+pytest.importorskip("aiosqlite")
+
+
+def _run(coro_factory):
+    """Run a test coroutine against a fresh in-memory async database"""
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[
+                User.__table__, UserSession.__table__, Quote.__table__, AppMaterial.__table__,
+                AppProduct.__table__, Color.__table__, MaterialColor.__table__
+            ]))
+        factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+        try:
+            async with factory() as db:
+                return await coro_factory(db)
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+def test_async_database_url_uses_async_drivers():
+    assert async_database_url("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+    assert async_database_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/app")
+
+
+def test_services_round_trip_through_async_session():
+    async def scenario(db):
+        users = AsyncDatabaseUserService(db)
+        user = await users.create_user("async@example.com", "hash", "Async User")
+        expires = dt.datetime.now(dt.timezone.utc) + dt.timedelta(days=1)
+        await users.create_session(user.id, "token-async", expires)
+
+        session = await users.get_session_by_token("token-async")
+        quotes = AsyncDatabaseQuoteService(db)
+        saved = await quotes.create_quote(session.user_id, {
+            "client_name": "Cliente Async", "total_final": 100, "items_count": 1,
+            "quote_data": {"items": [{"window_type": "corrediza", "area_m2": "1.5"}]},
+        })
+        return saved.id, await quotes.get_quote_by_id(saved.id, user.id), await quotes.count_quotes_by_user(user.id)
+
+    quote_id, quote, count = _run(scenario)
+
+    # Attributes stay readable after the session commits (no implicit I/O)
+    assert quote.id == quote_id
+    assert quote.client_name == "Cliente Async"
+    assert count == 1
+
+
+class AsyncPlainQuoteService(AsyncServiceAdapter):
+    service_class = DatabaseQuoteService
+
+
+def test_generators_are_not_adapted():
+    with pytest.raises(AttributeError):
+        AsyncPlainQuoteService(None).iter_quote_data
+    with pytest.raises(AttributeError):
+        AsyncDatabaseQuoteService(None)._filter_quotes
+
+
+def test_quote_data_is_read_in_async_batches():
+    async def scenario(db):
+        user = await AsyncDatabaseUserService(db).create_user("batches@example.com", "hash", "Batches")
+        quotes = AsyncDatabaseQuoteService(db)
+        for n in range(5):
+            await quotes.create_quote(user.id, {"client_name": "Ana", "total_final": 100, "items_count": 0,
+                                                "quote_data": {"n": n}})
+        return [data["n"] async for _, data in quotes.iter_quote_data(user.id, batch_size=2, client_name="ana")]
+
+    assert _run(scenario) == [0, 1, 2, 3, 4]
+
+
+def test_event_loop_keeps_running_during_query():
+    slow_query = text("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3000000) "
+                      "SELECT count(*) FROM n")
+
+    async def scenario(db):
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        ticks_before = ticks
+        count = await db.run_sync(lambda session: session.execute(slow_query).scalar())
+        done.set()
+        await task
+        return count, ticks - ticks_before
+
+    count, ticks_during_query = _run(scenario)
+
+    assert count == 3000000
+    assert ticks_during_query > 5
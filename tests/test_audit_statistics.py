@@ -0,0 +1,178 @@
+"""
+Tests for the audit statistics queries, daily rollups and partition
+management (data_protection/audit_trail.py)
+
+Events are inserted with fixed timestamps straight into audit_logs on a
+SQLite file; statistics with and without rollups must agree. Partition DDL
+is PostgreSQL-only and is checked on the statements issued.
+"""
+
+import datetime as dt
+import uuid
+
+import pytest
+from sqlalchemy import event, inspect
+
+from config import settings
+from data_protection.audit_trail import (
+    AuditAction, AuditEvent, AuditLevel, AuditTrailManager, audit_partition_month, audit_partition_name,
+    expired_partition_months
+)
+from engine_registry import get_engine
+
+DAY = dt.date(2026, 3, 1)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = AuditTrailManager(f"sqlite:///{tmp_path / 'audit.db'}")
+    rows = []
+    # Five days; each day: 3 creates by user-a (one failed), 1 critical login by user-b
+    for offset in range(5):
+        for hour, action, user_id, level, success in [
+            (1, AuditAction.CREATE, "user-a", AuditLevel.MEDIUM, True),
+            (9, AuditAction.CREATE, "user-a", AuditLevel.MEDIUM, True),
+            (17, AuditAction.CREATE, "user-a", AuditLevel.MEDIUM, False),
+            (23, AuditAction.LOGIN, "user-b", AuditLevel.CRITICAL, True),
+        ]:
+            timestamp = dt.datetime.combine(DAY + dt.timedelta(days=offset), dt.time(hour))
+            rows.append(manager._event_row(AuditEvent(
+                event_id=str(uuid.uuid4()), timestamp=timestamp, user_id=user_id, session_id=None,
+                action=action, resource_type="quote", resource_id=None, level=level, success=success,
+                checksum="0" * 64
+            )))
+    with get_engine(manager.database_url).begin() as conn:
+        conn.execute(manager.audit_table.insert(), rows)
+    yield manager
+    manager.shutdown()
+
+
+def _counting_selects(manager):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append(statement)
+
+    engine = get_engine(manager.database_url)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return engine, before_cursor_execute, statements
+
+
+def test_statistics_from_raw_events_in_two_queries(manager):
+    engine, listener, statements = _counting_selects(manager)
+    try:
+        stats = manager.get_audit_statistics(use_rollups=False)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert stats["total_events"] == 20
+    assert stats["events_by_action"] == {"create": 15, "login": 5}
+    assert stats["events_by_level"] == {"medium": 15, "critical": 5}
+    assert stats["success_rate_percent"] == 75.0
+    assert stats["most_active_users"] == [{"user_id": "user-a", "event_count": 15},
+                                          {"user_id": "user-b", "event_count": 5}]
+    assert len(statements) == 2
+
+
+def test_rollups_match_raw_statistics_for_partial_days(manager):
+    assert manager.refresh_daily_rollups(through=DAY + dt.timedelta(days=3)) == 4
+    assert manager.refresh_daily_rollups(through=DAY + dt.timedelta(days=3)) == 0  # Incremental
+
+    # Starts mid-day 0 and ends mid-day 4 (which is not rolled up): edges come from raw events
+    period = {"start_date": dt.datetime.combine(DAY, dt.time(8)),
+              "end_date": dt.datetime.combine(DAY + dt.timedelta(days=4), dt.time(12))}
+    raw = manager.get_audit_statistics(use_rollups=False, **period)
+    rolled = manager.get_audit_statistics(**period)
+
+    assert rolled["rollup_days"] == {"first": (DAY + dt.timedelta(days=1)).isoformat(),
+                                     "last": (DAY + dt.timedelta(days=3)).isoformat()}
+    for key in ("total_events", "events_by_action", "events_by_level", "success_rate_percent",
+                "most_active_users"):
+        assert rolled[key] == raw[key]
+    assert raw["total_events"] == 3 + 12 + 2
+
+
+def test_late_events_for_a_rolled_up_day_are_counted(manager):
+    manager.refresh_daily_rollups(through=DAY + dt.timedelta(days=3))
+    # Written by the background writer after the day was rolled up
+    late = manager._event_row(AuditEvent(
+        event_id=str(uuid.uuid4()), timestamp=dt.datetime.combine(DAY + dt.timedelta(days=2), dt.time(23, 59, 59)),
+        user_id="user-b", session_id=None, action=AuditAction.LOGIN, resource_type="quote", resource_id=None,
+        level=AuditLevel.CRITICAL, success=True, checksum="0" * 64
+    ))
+    with get_engine(manager.database_url).begin() as conn:
+        conn.execute(manager.audit_table.insert(), [late])
+
+    assert manager.refresh_daily_rollups(through=DAY + dt.timedelta(days=3)) == 1  # Day 2 re-rolled
+    assert manager.refresh_daily_rollups(through=DAY + dt.timedelta(days=3)) == 0
+
+    raw = manager.get_audit_statistics(use_rollups=False)
+    rolled = manager.get_audit_statistics()
+    assert rolled["total_events"] == raw["total_events"] == 21
+    assert rolled["events_by_action"] == raw["events_by_action"]
+
+
+def test_days_within_the_grace_period_are_not_rolled_up(manager, monkeypatch):
+    monkeypatch.setattr(settings, "audit_rollup_grace_seconds", 2 * 24 * 3600)
+    today = dt.datetime.utcnow().date()
+
+    manager.refresh_daily_rollups(through=today)
+
+    assert manager.get_audit_statistics()["rollup_days"]["last"] == (today - dt.timedelta(days=3)).isoformat()
+
+
+def test_cleanup_drops_rollups_before_cutoff(manager):
+    manager.refresh_daily_rollups(through=DAY + dt.timedelta(days=4))
+    manager.retention_days = (dt.datetime.utcnow().date() - (DAY + dt.timedelta(days=2))).days
+
+    result = manager.cleanup_old_events(dry_run=False)
+
+    # The cutoff falls inside day 2: its rollup is kept whole, days 0 and 1 are gone
+    stats = manager.get_audit_statistics()
+    assert 8 <= result["events_deleted"] < 12
+    assert stats["total_events"] == 12
+    assert stats["rollup_days"]["first"] == (DAY + dt.timedelta(days=2)).isoformat()
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, *args):
+        self.statements.append(str(statement))
+
+
+def test_partition_names_and_expiry():
+    months = [dt.date(2019, 11, 1), dt.date(2019, 12, 1), dt.date(2020, 1, 1)]
+
+    assert audit_partition_name(dt.date(2019, 12, 1)) == "audit_logs_y2019m12"
+    assert [audit_partition_month(audit_partition_name(month)) for month in months] == months
+    assert audit_partition_month("audit_logs_default") is None
+    # Only months whose last day is before the cutoff are dropped whole
+    assert expired_partition_months(months, dt.datetime(2020, 1, 15)) == months[:2]
+    assert expired_partition_months(months, dt.datetime(2019, 12, 31, 23)) == months[:1]
+
+
+def test_partitions_are_created_ahead(manager, monkeypatch):
+    monkeypatch.setattr(settings, "audit_partition_months_ahead", 2)
+    conn = RecordingConnection()
+
+    manager.ensure_partitions(conn, through=dt.date(2099, 1, 20))
+    manager.ensure_partitions(conn)
+
+    assert "PARTITION OF audit_logs DEFAULT" in conn.statements[0]
+    assert any("audit_logs_y2099m01 PARTITION OF audit_logs FOR VALUES FROM ('2099-01-01') TO ('2099-02-01')" in sql
+               for sql in conn.statements)
+    current = dt.datetime.utcnow().date().replace(day=1)
+    assert sum(audit_partition_name(current) in sql for sql in conn.statements) == 2
+
+
+def test_search_filters_have_composite_indexes(manager):
+    indexes = {index["name"]: index["column_names"]
+               for index in inspect(get_engine(manager.database_url)).get_indexes("audit_logs")}
+
+    assert indexes["idx_audit_logs_user_timestamp"] == ["user_id", "timestamp"]
+    assert indexes["idx_audit_logs_resource_timestamp"] == ["resource_type", "resource_id", "timestamp"]
+    assert indexes["idx_audit_logs_action_timestamp"] == ["action", "timestamp"]
+    assert len(manager.search_events(user_id="user-b", action=AuditAction.LOGIN, limit=3)) == 3
@@ -0,0 +1,75 @@
+"""
+Tests for bulk audit checksum verification (data_protection/audit_verification.py)
+
+Events are written through the audit writer into a SQLite file; one is then
+tampered with directly in audit_logs.
+"""
+
+import datetime as dt
+import json
+
+import pytest
+from sqlalchemy import update
+
+from data_protection.audit_trail import AuditAction, AuditLevel, AuditTrailManager
+from data_protection.audit_verification import AuditIntegrityVerifier
+from engine_registry import get_engine
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = AuditTrailManager(f"sqlite:///{tmp_path / 'audit.db'}")
+    event_ids = [manager.log_event(AuditAction.UPDATE, "quote", user_id="user-1", resource_id=str(i),
+                                   level=AuditLevel.HIGH, new_values={"total": f"{i}.00"})
+                 for i in range(120)]
+    assert manager.force_flush(timeout=10)
+    manager.event_ids = event_ids
+    yield manager
+    manager.shutdown()
+
+
+def _tamper(manager, event_id):
+    table = manager.audit_table
+    with get_engine(manager.database_url).begin() as conn:
+        conn.execute(update(table).where(table.c.event_id == event_id).values(resource_id="999"))
+
+
+def test_reports_tampered_events_using_a_process_pool(manager, tmp_path):
+    _tamper(manager, manager.event_ids[7])
+    checkpoint = tmp_path / "checkpoint.json"
+
+    report = AuditIntegrityVerifier(manager, checkpoint_path=str(checkpoint), batch_size=25, workers=2).run()
+
+    assert report["completed"]
+    assert report["events_checked"] == 120
+    assert report["mismatch_count"] == 1
+    assert report["mismatches"][0]["event_id"] == manager.event_ids[7]
+    assert not manager.verify_event_integrity(manager.event_ids[7])
+    assert not checkpoint.exists()  # Finished runs leave nothing to resume
+
+
+def test_interrupted_run_resumes_from_checkpoint(manager, tmp_path):
+    _tamper(manager, manager.event_ids[100])
+    checkpoint = tmp_path / "checkpoint.json"
+    verifier = AuditIntegrityVerifier(manager, checkpoint_path=str(checkpoint), batch_size=20, workers=0)
+
+    first = verifier.run(max_events=50)
+    assert not first["completed"]
+    assert first["events_checked"] == 60  # Whole batches
+    assert json.loads(checkpoint.read_text())["events_checked"] == 60
+
+    second = verifier.run()
+
+    assert second["resumed"] and second["completed"]
+    assert second["events_checked"] == 120
+    assert [m["event_id"] for m in second["mismatches"]] == [manager.event_ids[100]]
+
+
+def test_checkpoint_is_tied_to_its_range(manager, tmp_path):
+    verifier = AuditIntegrityVerifier(manager, checkpoint_path=str(tmp_path / "checkpoint.json"),
+                                      batch_size=10, workers=0)
+    verifier.run(start_date=dt.datetime(2000, 1, 1), max_events=10)
+
+    with pytest.raises(ValueError):
+        verifier.run()
+    assert verifier.run(resume=False)["events_checked"] == 120
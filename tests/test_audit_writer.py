@@ -0,0 +1,115 @@
+"""
+Tests for the background audit writer (data_protection/audit_trail.py)
+
+The audit_logs table lives in a SQLite file so the writer thread and the
+test read through the shared engine of that URL.
+"""
+
+import datetime as dt
+import threading
+import time
+
+import pytest
+
+from data_protection.audit_trail import AuditAction, AuditEvent, AuditEventWriter, AuditLevel, AuditTrailManager
+from engine_registry import get_engine
+
+
+class StalledWriter(AuditEventWriter):
+    """Writer whose database hangs until released"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+
+    def _write(self, rows):
+        self.release.wait(5)
+        return []
+
+
+class DownEngine:
+    def connect(self):
+        raise OSError("database down")
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = AuditTrailManager(f"sqlite:///{tmp_path / 'audit.db'}")
+    yield manager
+    manager.shutdown()
+
+
+def _log(manager, resource_id="1"):
+    return manager.log_event(AuditAction.UPDATE, "quote", user_id="user-1", resource_id=resource_id,
+                             level=AuditLevel.HIGH, new_values={"total": "100.00"})
+
+
+def test_events_are_written_in_background_batches(manager):
+    event_ids = [_log(manager, str(i)) for i in range(250)]
+
+    assert manager.force_flush(timeout=10)
+
+    stats = manager._writer.get_stats()
+    assert stats["written"] == 250
+    assert stats["pending_events"] == 0
+    assert stats["flushes"] <= 4  # 100-event batches (plus the flushed remainder), not one insert per event
+    assert manager.verify_event_integrity(event_ids[-1])
+
+
+def test_interval_flush_without_full_batch(manager):
+    manager._writer.flush_interval = 0.05
+    event_id = _log(manager)
+
+    time.sleep(0.3)
+
+    assert manager.get_event_by_id(event_id) is not None
+
+
+def test_shutdown_writes_pending_events(tmp_path):
+    manager = AuditTrailManager(f"sqlite:///{tmp_path / 'audit.db'}")
+    manager._writer.flush_interval = 60  # Nothing would be written before shutdown otherwise
+    event_id = _log(manager)
+
+    manager.shutdown()
+
+    assert manager.get_event_by_id(event_id) is not None
+
+
+def test_full_queue_drops_after_timeout_without_touching_the_database(manager):
+    writer = StalledWriter(get_engine(manager.database_url), manager.audit_table,
+                           batch_size=1, max_queue=2, put_timeout_ms=10)
+
+    try:
+        results = [writer.submit(manager._event_row(_event(manager, i))) for i in range(5)]
+        stats = writer.get_stats()
+    finally:
+        writer.release.set()
+        writer.close()
+
+    assert results.count(False) == stats["dropped"] >= 1
+    assert stats["queue_full_waits"] >= stats["dropped"]
+    assert stats["max_queue_depth"] == 2
+
+
+def test_failed_batch_is_retried(manager):
+    writer = manager._writer
+    writer.flush_interval = 0.02
+    original = writer.engine
+    writer.engine = DownEngine()
+    event_id = _log(manager)
+    time.sleep(0.1)
+    assert writer.get_stats()["failed_flushes"] >= 1
+
+    writer.engine = original
+    time.sleep(0.1)
+
+    assert manager.get_event_by_id(event_id) is not None
+    assert writer.get_stats()["dropped"] == 0
+
+
+def _event(manager, i):
+    event = AuditEvent(event_id=f"00000000-0000-0000-0000-{i:012d}", timestamp=dt.datetime.utcnow(),
+                       user_id=None, session_id=None, action=AuditAction.READ, resource_type="quote",
+                       resource_id=str(i), level=AuditLevel.LOW, success=True)
+    event.checksum = manager._calculate_checksum(event)
+    return event
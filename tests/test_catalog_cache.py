@@ -0,0 +1,171 @@
+"""
+Tests for the process-wide catalog cache (services/catalog_cache.py)
+
+- TTL expiry, LRU eviction and version-stamp invalidation
+- ProductBOMServiceDB reads served from the cache (no queries on a hit)
+- Catalog writes and CSV imports invalidate cached entries
+"""
+
+import pytest
+from decimal import Decimal
+
+from services.catalog_cache import CatalogCache, catalog_cache, MISSING
+from services.product_bom_service_db import ProductBOMServiceDB
+from services.material_csv_service import MaterialCSVService
+from database import DatabaseMaterialService, DatabaseColorService
+from models.quote_models import WindowItem, GlassType
+
+
+class TestCatalogCache:
+    """Unit tests for CatalogCache"""
+
+    def test_get_or_load_calls_loader_once(self):
+        cache = CatalogCache(ttl_seconds=60, max_entries=10)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return "value"
+
+        assert cache.get_or_load("key", loader) == "value"
+        assert cache.get_or_load("key", loader) == "value"
+        assert len(calls) == 1
+        assert cache.get_stats()["hits"] == 1
+
+    def test_none_is_cached(self):
+        cache = CatalogCache()
+        cache.put("missing-row", None)
+        assert cache.get("missing-row") is None
+        assert cache.get("never-stored") is MISSING
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("services.catalog_cache.time.monotonic", lambda: now[0])
+        cache = CatalogCache(ttl_seconds=30)
+
+        cache.put("key", 1)
+        now[0] += 29
+        assert cache.get("key") == 1
+        now[0] += 2
+        assert cache.get("key") is MISSING
+        assert cache.get_stats()["size"] == 0
+
+    def test_lru_eviction(self):
+        cache = CatalogCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_version_bump_invalidates(self):
+        cache = CatalogCache()
+        cache.put("key", "old")
+        cache.bump_version()
+        assert cache.get("key") is MISSING
+
+    def test_write_during_load_is_not_cached_as_fresh(self):
+        cache = CatalogCache()
+
+        def loader():
+            # A catalog write commits while the row is being read
+            cache.bump_version()
+            return "stale"
+
+        assert cache.get_or_load("key", loader) == "stale"
+        assert cache.get("key") is MISSING
+
+
+class TestCatalogCacheIntegration:
+    """ProductBOMServiceDB + shared cache on the SQLite sample catalog"""
+
+    def test_repeated_reads_skip_database(self, catalog_db, query_counter):
+        ProductBOMServiceDB(catalog_db).get_all_materials()
+        ProductBOMServiceDB(catalog_db).get_product(1)
+
+        query_counter.reset()
+        service = ProductBOMServiceDB(catalog_db)
+        materials = service.get_all_materials()
+        product = service.get_product(1)
+
+        assert query_counter.count == 0
+        assert len(materials) == 25
+        assert product.id == 1
+
+    def test_returned_lists_are_copies(self, catalog_db):
+        service = ProductBOMServiceDB(catalog_db)
+        service.get_all_products().clear()
+        assert len(service.get_all_products()) == 3
+
+    def test_update_material_invalidates(self, catalog_db):
+        service = ProductBOMServiceDB(catalog_db)
+        assert service.get_material(10).cost_per_unit == Decimal("120.00")
+        assert service.get_glass_cost_per_m2(GlassType.CLARO_6MM) == Decimal("120.00")
+
+        DatabaseMaterialService(catalog_db).update_material(10, cost_per_unit=Decimal("150.00"))
+
+        fresh = ProductBOMServiceDB(catalog_db)
+        assert fresh.get_material(10).cost_per_unit == Decimal("150.00")
+        assert fresh.get_glass_cost_per_m2(GlassType.CLARO_6MM) == Decimal("150.00")
+        assert fresh.get_glass_cost_by_material_id(10) == Decimal("150.00")
+
+    def test_delete_product_invalidates(self, catalog_db):
+        service = ProductBOMServiceDB(catalog_db)
+        assert service.get_product(2) is not None
+
+        service.delete_product(2)
+
+        assert ProductBOMServiceDB(catalog_db).get_product(2) is None
+
+    def test_color_price_update_invalidates(self, catalog_db):
+        color_service = DatabaseColorService(catalog_db)
+        service = ProductBOMServiceDB(catalog_db)
+        original = service.get_material_color_price(1, 2)
+
+        material_color = color_service.get_material_color_by_ids(1, 2)
+        color_service.update_material_color(material_color.id, {"price_per_unit": original + 10})
+
+        assert ProductBOMServiceDB(catalog_db).get_material_color_price(1, 2) == original + 10
+
+    def test_snapshot_reuses_cached_rows(self, catalog_db, query_counter):
+        items = [
+            WindowItem(product_bom_id=1, selected_glass_material_id=9, selected_profile_color=2,
+                       width_cm=Decimal("150"), height_cm=Decimal("120"), quantity=1),
+            WindowItem(product_bom_id=2, selected_glass_type=GlassType.TEMPLADO_6MM,
+                       width_cm=Decimal("100"), height_cm=Decimal("100"), quantity=1),
+        ]
+        first = ProductBOMServiceDB(catalog_db).load_catalog_snapshot(items)
+        assert first.query_count == 3
+
+        query_counter.reset()
+        second = ProductBOMServiceDB(catalog_db).load_catalog_snapshot(items)
+
+        assert query_counter.count == 0
+        assert second.products.keys() == first.products.keys()
+        assert second.materials.keys() == first.materials.keys()
+        assert second.color_prices == first.color_prices
+
+    def test_disabled_cache_always_queries(self, catalog_db, query_counter):
+        service = ProductBOMServiceDB(catalog_db, catalog_cache=None)
+        service.get_product(1)
+
+        query_counter.reset()
+        service.get_product(1)
+        assert query_counter.count == 1
+
+    def test_csv_import_bumps_version(self, catalog_db):
+        version = catalog_cache.version
+        csv_content = (
+            ",".join(MaterialCSVService.CSV_HEADERS) + "\n"
+            "create,,Vidrio Prueba 8mm,VID-PRUEBA-8,M2,Vidrio,300.00,,,,,\n"
+        )
+
+        results = MaterialCSVService(catalog_db).import_materials_from_csv(csv_content)
+
+        assert results["summary"]["created"] == 1
+        assert catalog_cache.version > version
+        assert any(m.code == "VID-PRUEBA-8" for m in ProductBOMServiceDB(catalog_db).get_all_materials())
@@ -0,0 +1,75 @@
+"""
+Tests for the streaming material/product CSV exports (services/csv_streaming.py)
+"""
+
+import csv
+import io
+
+from database import DatabaseColorService, DatabaseMaterialService, DatabaseProductService
+from services.csv_streaming import iter_csv_chunks
+from services.material_csv_service import MaterialCSVService
+from services.product_bom_csv_service import ProductBOMCSVService
+
+
+def _rows(chunks):
+    return list(csv.DictReader(io.StringIO("".join(chunks))))
+
+
+def _legacy_material_rows(session):
+    """Rows as the per-material export produced them (get_material_colors per profile)"""
+    colors = DatabaseColorService(session)
+    rows = []
+    for material in DatabaseMaterialService(session).get_all_materials():
+        material_colors = colors.get_material_colors(material.id) if material.category == "Perfiles" else []
+        for material_color, color in material_colors or [(None, None)]:
+            rows.append(MaterialCSVService._material_csv_row(material, material_color, color))
+    return [{k: str(v) for k, v in row.items()} for row in rows]
+
+
+class TestIterCsvChunks:
+
+    def test_header_first_then_fixed_size_chunks(self):
+        chunks = list(iter_csv_chunks(["a", "b"], ({"a": i, "b": i * 2} for i in range(5)), rows_per_chunk=2))
+
+        assert chunks[0] == "a,b\r\n"
+        assert [chunk.count("\r\n") for chunk in chunks[1:]] == [2, 2, 1]
+        assert _rows(chunks)[4] == {"a": "4", "b": "8"}
+
+
+class TestMaterialExport:
+
+    def test_matches_per_material_export(self, catalog_db):
+        exported = _rows(MaterialCSVService(catalog_db).iter_materials_csv())
+
+        key = lambda row: (int(row["id"]), row["color_name"])
+        assert sorted(exported, key=key) == sorted(_legacy_material_rows(catalog_db), key=key)
+        assert any(row["color_name"] for row in exported)
+
+    def test_single_query_for_materials_and_colors(self, catalog_db, query_counter):
+        query_counter.reset()
+        chunks = list(MaterialCSVService(catalog_db).iter_materials_csv(rows_per_chunk=5))
+
+        assert query_counter.count == 1
+        assert len(chunks) > 3
+
+    def test_category_filter(self, catalog_db):
+        rows = _rows(MaterialCSVService(catalog_db).iter_materials_csv("Vidrio"))
+        assert rows and {row["category"] for row in rows} == {"Vidrio"}
+        assert _rows(MaterialCSVService(catalog_db).iter_materials_csv("all")) == \
+            _rows(MaterialCSVService(catalog_db).iter_materials_csv())
+
+    def test_export_to_string_uses_stream(self, catalog_db):
+        service = MaterialCSVService(catalog_db)
+        assert service.export_materials_to_csv() == "".join(service.iter_materials_csv())
+
+
+class TestProductExport:
+
+    def test_exports_every_active_product(self, catalog_db, query_counter):
+        query_counter.reset()
+        rows = _rows(ProductBOMCSVService(catalog_db).iter_products_csv())
+
+        assert query_counter.count == 1
+        products = DatabaseProductService(catalog_db).get_all_products()
+        assert [int(row["id"]) for row in rows] == sorted(p.id for p in products)
+        assert rows[0]["bom_json"].startswith("[")
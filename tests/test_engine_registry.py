@@ -0,0 +1,85 @@
+"""
+Tests for the shared engine registry (engine_registry.py)
+
+Pools are exercised on a SQLite file so QueuePool sizing applies; the
+PostgreSQL options are checked on the keyword arguments alone.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from config import settings
+from engine_registry import EngineRegistry, engine_options
+
+
+@pytest.fixture
+def registry():
+    registry = EngineRegistry()
+    yield registry
+    registry.dispose_sync()
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'pool.db'}"
+
+
+def test_same_url_shares_one_engine(registry, db_url):
+    engine = registry.get_engine(db_url)
+
+    assert registry.get_engine(db_url) is engine
+    assert registry.get_engine(db_url.replace("pool.db", "other.db")) is not engine
+
+
+def test_pool_stats_report_checked_out_connections(registry, db_url):
+    engine = registry.get_engine(db_url)
+
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        busy = registry.get_pool_stats()[db_url]
+    idle = registry.get_pool_stats()[db_url]
+
+    assert busy["checked_out"] == 2
+    assert busy["checkouts"] == 2
+    assert idle["checked_out"] == 0
+    assert idle["checked_in"] == 2
+    assert idle["max_overflow"] == settings.db_max_overflow
+
+
+def test_exhausted_pool_times_out_and_is_counted(registry, db_url, monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 1)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    monkeypatch.setattr(settings, "db_pool_timeout_seconds", 0.05)
+    engine = registry.get_engine(db_url)
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = registry.get_pool_stats()[db_url]
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_ms"] >= 50
+
+
+def test_worker_connection_budget_is_below_the_old_engines():
+    # Before: create_engine defaults (5 + 10) plus the resilience engine (10 + 20)
+    budget = (settings.db_pool_size + settings.db_max_overflow
+              + settings.db_async_pool_size + settings.db_async_max_overflow)
+    assert budget <= 30
+
+
+def test_postgres_options_set_timeouts():
+    sync_options = engine_options(make_url("postgresql://u:p@db/app"))
+    async_options = engine_options(make_url("postgresql+asyncpg://u:p@db/app"), is_async=True)
+
+    assert sync_options["pool_pre_ping"] is settings.db_pool_pre_ping
+    assert (sync_options["pool_size"], sync_options["max_overflow"]) == (settings.db_pool_size,
+                                                                         settings.db_max_overflow)
+    assert (async_options["pool_size"], async_options["max_overflow"]) == (settings.db_async_pool_size,
+                                                                           settings.db_async_max_overflow)
+    assert sync_options["connect_args"]["options"] == f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    assert async_options["connect_args"]["server_settings"]["statement_timeout"] == str(settings.db_statement_timeout_ms)
+    assert engine_options(make_url("sqlite://")) == {}
@@ -21,6 +21,7 @@ from services.product_bom_service_db import (
 )
 from models.quote_models import GlassType
 from models.product_bom_models import MaterialUnit
+from services.catalog_cache import bump_catalog_version
 
 
 class TestGlassPricingDatabase:
@@ -111,6 +112,8 @@ class TestGlassPricingDatabase:
             DBAppMaterial.category == "Vidrio"
         ).delete()
         db_session.commit()
+        # Raw deletes bypass the services, so invalidate the catalog cache by hand
+        bump_catalog_version()
 
         for glass_type in GlassType:
             price = bom_service_no_data.get_glass_cost_per_m2(glass_type)
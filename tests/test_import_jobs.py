@@ -0,0 +1,147 @@
+"""
+Tests for the background CSV import jobs (services/import_job_service.py)
+
+Jobs run against SQLite through the same import_jobs table and sessions the
+app uses; the pool is drained with shutdown(wait=True).
+"""
+
+import csv
+import datetime as dt
+import io
+import json
+import os
+import uuid
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database import AppMaterial, AppProduct, DatabaseImportJobService, ImportJob
+from services.import_job_service import ImportJobRunner
+from services.material_csv_service import MaterialCSVService
+from services.product_bom_csv_service import ProductBOMCSVService
+
+USER_ID = uuid.uuid4()
+
+
+def _csv_file(headers, rows):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=headers)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({header: row.get(header, "") for header in headers})
+    return io.BytesIO(output.getvalue().encode("utf-8"))
+
+
+def _materials_csv(count):
+    return _csv_file(MaterialCSVService.CSV_HEADERS, [
+        {"action": "create", "name": f"Herraje {i}", "code": f"JOB-{i:03d}", "unit": "PZA",
+         "category": "Herrajes", "cost_per_unit": "10.00"}
+        for i in range(count)
+    ])
+
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    ImportJob.__table__.create(sqlite_engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)
+
+
+@pytest.fixture
+def runner(session_factory, tmp_path):
+    runner = ImportJobRunner(session_factory, upload_dir=str(tmp_path), max_workers=1)
+    yield runner
+    runner.shutdown(wait=True)
+
+
+def _id(job):
+    return uuid.UUID(job["job_id"])
+
+
+def _queue_only(runner, monkeypatch):
+    """Record jobs without running them"""
+    monkeypatch.setattr(runner, "_schedule", lambda job_id: None)
+
+
+class TestImportJobs:
+
+    def test_materials_job_runs_in_background(self, runner, tmp_path):
+        job = runner.submit(USER_ID, "materials", "materiales.csv", _materials_csv(25))
+        assert job["status"] == "queued"
+        assert job["rows_total"] == 25
+
+        runner.shutdown(wait=True)
+
+        done = runner.get_job(USER_ID, _id(job))
+        assert done["status"] == "done"
+        assert done["rows_processed"] == 25
+        assert done["result"]["summary"] == {"created": 25, "updated": 0, "deleted": 0, "skipped": 0}
+        assert os.listdir(tmp_path) == []  # Upload removed once processed
+        assert runner.get_job(uuid.uuid4(), _id(job)) is None  # Other users cannot see it
+        assert runner.get_stats()["completed"] == 1
+
+    def test_cancel_running_job_stops_after_current_chunk(self, runner, session_factory, monkeypatch):
+        monkeypatch.setattr(settings, "csv_import_chunk_size", 10)
+        _queue_only(runner, monkeypatch)
+        job = runner.submit(USER_ID, "materials", "materiales.csv", _materials_csv(35))
+        reports = []
+        original = DatabaseImportJobService.update_progress
+
+        def cancel_on_first_report(service, job_id, rows_processed):
+            reports.append(rows_processed)
+            with session_factory() as db:
+                DatabaseImportJobService(db).request_cancel(job_id, USER_ID)
+            return original(service, job_id, rows_processed)
+
+        monkeypatch.setattr(DatabaseImportJobService, "update_progress", cancel_on_first_report)
+        runner.run_job(_id(job))
+
+        cancelled = runner.get_job(USER_ID, _id(job))
+        assert reports == [10]
+        assert cancelled["status"] == "cancelled"
+        assert cancelled["rows_processed"] == 10
+        assert cancelled["result"]["summary"]["created"] == 10
+        with session_factory() as db:
+            assert db.query(AppMaterial).count() == 10  # The committed chunk stays applied
+
+    def test_cancel_queued_job_never_runs(self, runner, monkeypatch, tmp_path):
+        _queue_only(runner, monkeypatch)
+        job = runner.submit(USER_ID, "materials", "materiales.csv", _materials_csv(3))
+
+        assert runner.cancel(USER_ID, _id(job))["status"] == "cancelled"
+        runner.run_job(_id(job))
+
+        assert runner.get_job(USER_ID, _id(job))["status"] == "cancelled"
+        assert os.listdir(tmp_path) == []
+
+    def test_resume_runs_queued_and_fails_stale_jobs(self, runner, session_factory, monkeypatch, tmp_path):
+        _queue_only(runner, monkeypatch)
+        rows = [{"action": "create", "name": "Ventana reanudada", "window_type": "corrediza",
+                 "aluminum_line": "nacional_serie_3", "min_width_cm": "50", "max_width_cm": "300",
+                 "min_height_cm": "50", "max_height_cm": "250", "bom_json": json.dumps([])}]
+        queued = runner.submit(USER_ID, "products_bulk", "productos.csv",
+                               _csv_file(ProductBOMCSVService.CSV_HEADERS, rows))
+        with session_factory() as db:
+            stale = ImportJob(user_id=USER_ID, kind="materials", filename="caido.csv", status="running",
+                              heartbeat_at=dt.datetime.now(dt.timezone.utc) - dt.timedelta(hours=1))
+            db.add(stale)
+            db.commit()
+            stale_id = stale.id
+
+        restarted = ImportJobRunner(session_factory, upload_dir=str(tmp_path), max_workers=1)
+        assert restarted.resume() == 1
+        restarted.shutdown(wait=True)
+
+        assert restarted.get_job(USER_ID, _id(queued))["result"]["summary"]["created"] == 1
+        assert restarted.get_job(USER_ID, stale_id)["status"] == "failed"
+        with session_factory() as db:
+            assert db.query(AppProduct).filter_by(name="Ventana reanudada").count() == 1
+
+    def test_encoding_error_fails_job(self, runner):
+        job = runner.submit(USER_ID, "products", "productos.csv", io.BytesIO("nombre\n\xe9".encode("latin-1")))
+        runner.shutdown(wait=True)
+
+        failed = runner.get_job(USER_ID, _id(job))
+        assert failed["status"] == "failed"
+        assert "UTF-8" in failed["error"]
+        assert runner.list_jobs(USER_ID)[0]["job_id"] == job["job_id"]
@@ -0,0 +1,115 @@
+"""
+Tests for the streaming material CSV import (MaterialCSVService.import_materials_streaming)
+
+Runs against SQLite: bulk INSERT / UPDATE and the material-color
+INSERT ... ON CONFLICT upsert are executed for real.
+"""
+
+import csv
+import io
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from database import AppMaterial, Color, MaterialColor
+from services.material_csv_service import MaterialCSVService
+
+
+def _csv_file(rows):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=MaterialCSVService.CSV_HEADERS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({header: row.get(header, "") for header in MaterialCSVService.CSV_HEADERS})
+    return io.BytesIO(output.getvalue().encode("utf-8"))
+
+
+def _create(code, category="Herrajes", **extra):
+    row = {"action": "create", "name": f"Material {code}", "code": code, "unit": "PZA",
+           "category": category, "cost_per_unit": "10.00"}
+    row.update(extra)
+    return row
+
+
+@pytest.fixture
+def session(sqlite_engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)()
+    session.add(Color(name="Blanco", code="WHT", is_active=True))
+    session.add(AppMaterial(name="Perfil existente", code="PRF-1", unit="ML", category="Perfiles",
+                            cost_per_unit=Decimal("40")))
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestStreamingImport:
+
+    def test_creates_in_bulk_per_chunk(self, session, query_counter):
+        rows = [_create(f"HRJ-{i:03d}") for i in range(25)]
+
+        query_counter.reset()
+        results = MaterialCSVService(session).import_materials_streaming(_csv_file(rows), chunk_size=10)
+
+        assert results["summary"]["created"] == 25
+        assert results["chunks"] == 3
+        assert session.query(AppMaterial).count() == 26
+        # Pre-fetch per chunk (codes), not one lookup per row
+        assert query_counter.count <= 3 * 2
+
+    def test_update_delete_and_errors(self, session):
+        existing_id = session.query(AppMaterial.id).filter_by(code="PRF-1").scalar()
+        rows = [
+            {"action": "update", "id": str(existing_id), "cost_per_unit": "45.50"},
+            _create("PRF-1"),                                 # code already taken
+            _create("NEW-1"),
+            _create("NEW-1"),                                 # duplicated inside the file
+            {"action": "update", "id": "999", "name": "X"},  # not found
+            {"action": "delete", "id": str(existing_id)},
+            {"action": "bogus"},
+        ]
+
+        results = MaterialCSVService(session).import_materials_streaming(_csv_file(rows))
+
+        assert results["summary"] == {"created": 1, "updated": 1, "deleted": 1, "skipped": 4}
+        assert [e["row"] for e in results["errors"]] == [3, 5, 6, 8]
+        session.expire_all()
+        material = session.get(AppMaterial, existing_id)
+        assert material.cost_per_unit == Decimal("45.50")
+        assert material.is_active is False
+
+    def test_profile_colors_are_upserted(self, session):
+        existing_id = session.query(AppMaterial.id).filter_by(code="PRF-1").scalar()
+        rows = [
+            {"action": "update", "id": str(existing_id), "color_name": "Blanco", "color_code": "WHT",
+             "color_price_per_unit": "50"},
+            _create("PRF-2", category="Perfiles", unit="ML", color_name="Bronce", color_price_per_unit="55"),
+            _create("PRF-3", category="Perfiles", unit="ML", color_name="Bronce", color_price_per_unit="56"),
+        ]
+        service = MaterialCSVService(session)
+
+        results = service.import_materials_streaming(_csv_file(rows))
+        assert results["summary"]["skipped"] == 0
+        # Re-importing updates the existing material-color prices instead of failing
+        rows[0]["color_price_per_unit"] = "52"
+        service.import_materials_streaming(_csv_file(rows[:1]))
+
+        assert session.query(Color).count() == 2
+        prices = {mc.material_id: mc.price_per_unit for mc in session.query(MaterialColor).all()}
+        assert len(prices) == 3
+        assert prices[existing_id] == Decimal("52")
+
+    def test_invalid_headers(self, session):
+        results = MaterialCSVService(session).import_materials_streaming(io.BytesIO(b"foo,bar\n1,2\n"))
+        assert results["errors"][0]["row"] == 0
+        assert results["summary"]["created"] == 0
+
+    def test_reported_rows_are_capped(self, session, monkeypatch):
+        monkeypatch.setattr(MaterialCSVService, "MAX_REPORTED_ROWS", 5)
+        rows = [_create(f"HRJ-{i:03d}") for i in range(12)]
+
+        results = MaterialCSVService(session).import_materials_streaming(_csv_file(rows))
+
+        assert results["summary"]["created"] == 12
+        assert len(results["success"]) == 5
+        assert results["truncated"] is True
@@ -0,0 +1,88 @@
+"""
+Tests for bcrypt hashing off the event loop (security/password_hashing.py)
+
+A low work factor keeps the tests fast; the event-loop check uses a slow
+stand-in hash so it does not depend on machine speed.
+"""
+
+import asyncio
+import time
+import uuid
+
+from sqlalchemy.orm import sessionmaker
+
+from app.routes.auth import _check_password
+from database import DatabaseUserService, User
+from security.password_hashing import PasswordHasher, build_password_context
+
+
+def test_hash_and_verify_run_in_pool():
+    hasher = PasswordHasher(build_password_context(rounds=4), max_workers=1)
+
+    async def scenario():
+        hashed = await hasher.hash("secreto")
+        return hashed, await hasher.verify_and_update("secreto", hashed), \
+            await hasher.verify_and_update("otro", hashed)
+
+    try:
+        hashed, good, bad = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+
+    assert hashed.startswith("$2b$04$")
+    assert good == (True, None)
+    assert bad == (False, None)
+    assert hasher.get_stats()["verifications"] == 2
+
+
+class SlowContext:
+    """Stands in for a high work factor"""
+
+    def hash(self, password):
+        time.sleep(0.2)
+        return "hashed"
+
+
+def test_event_loop_keeps_running_while_hashing():
+    hasher = PasswordHasher(SlowContext(), max_workers=1)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        await hasher.hash("secreto")
+        task.cancel()
+        return ticks
+
+    try:
+        assert asyncio.run(scenario()) > 10
+    finally:
+        hasher.shutdown()
+
+
+def test_login_rehashes_old_work_factor(sqlite_engine, monkeypatch):
+    User.__table__.create(sqlite_engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)()
+    old_hash = build_password_context(rounds=4).hash("secreto")
+    users = DatabaseUserService(db)
+    user = users.create_user(f"{uuid.uuid4().hex}@example.com", old_hash, "Usuario")
+
+    hasher = PasswordHasher(build_password_context(rounds=5), max_workers=1)
+    monkeypatch.setattr("app.dependencies.auth.password_hasher", hasher)
+    try:
+        assert asyncio.run(_check_password(users, user, "secreto")) is True
+        assert asyncio.run(_check_password(users, user, "otro")) is False
+    finally:
+        hasher.shutdown()
+
+    db.expire_all()
+    stored = users.get_user_by_email(user.email).hashed_password
+    assert stored.startswith("$2b$05$")
+    assert hasher.get_stats()["rehashes"] == 1
+    db.close()
@@ -0,0 +1,226 @@
+"""
+Tests for the PDF rendering subsystem (services/pdf_render_service.py)
+
+Rendering is replaced by a tiny picklable function, so WeasyPrint is not
+needed: these tests cover the cache, the bounded pool and the job API.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from services.pdf_render_service import (
+    PDFCache, PDFRenderService, PDFJobManager, pdf_cache_key, warm_up_render_process
+)
+
+QUOTE = {"client": {"name": "Cliente"}, "items": [{"product_bom_id": 1, "area_m2": "1.800"}], "total_final": "1000.00"}
+COMPANY = {"name": "Mi Empresa", "logo_path": None}
+
+
+def fake_render(quote_data, company_info):
+    """Module-level so it can run in a pool process"""
+    return f"%PDF {quote_data['client']['name']} {os.getpid()}".encode()
+
+
+def failing_render(quote_data, company_info):
+    raise ValueError("plantilla inválida")
+
+
+@pytest.fixture
+def pdf_cache(tmp_path):
+    return PDFCache(str(tmp_path / "pdf"), max_bytes=1024 * 1024)
+
+
+class TestPDFCacheKey:
+
+    def test_key_depends_on_quote_and_company(self):
+        key = pdf_cache_key(QUOTE, COMPANY)
+        assert key == pdf_cache_key(dict(QUOTE), dict(COMPANY))
+        assert key != pdf_cache_key(dict(QUOTE, total_final="1001.00"), COMPANY)
+        assert key != pdf_cache_key(QUOTE, dict(COMPANY, name="Otra Empresa"))
+
+    def test_key_changes_when_logo_file_changes(self, tmp_path):
+        logo = tmp_path / "logo.png"
+        logo.write_bytes(b"png")
+        company = dict(COMPANY, logo_path=str(logo))
+        key = pdf_cache_key(QUOTE, company)
+
+        os.utime(logo, (time.time() + 60, time.time() + 60))
+
+        assert pdf_cache_key(QUOTE, company) != key
+
+
+class TestPDFCache:
+
+    def test_put_get_and_miss(self, pdf_cache):
+        assert pdf_cache.get("abc") is None
+        pdf_cache.put("abc", b"%PDF")
+        assert pdf_cache.get("abc") == b"%PDF"
+        assert pdf_cache.get_stats()["hits"] == 1
+        assert pdf_cache.get_stats()["misses"] == 1
+
+    def test_prunes_oldest_above_max_bytes(self, tmp_path):
+        cache = PDFCache(str(tmp_path), max_bytes=25)
+        for index, key in enumerate(("a", "b", "c")):
+            cache.put(key, b"x" * 10)
+            os.utime(tmp_path / f"{key}.pdf", (1000 + index, 1000 + index))
+        cache.put("d", b"x" * 10)
+
+        assert cache.get("a") is None
+        assert cache.get("d") is not None
+
+    def test_directory_is_scanned_only_above_the_limit(self, tmp_path):
+        cache = PDFCache(str(tmp_path), max_bytes=1000)
+        for index in range(50):
+            cache.put(f"pdf{index}", b"x" * 10)
+        assert cache.get_stats()["scans"] == 1  # First put only: 500 bytes stay under the limit
+
+        for index in range(50, 60):
+            cache.put(f"pdf{index}", b"x" * 60)
+
+        stats = cache.get_stats()
+        assert stats["scans"] < 10  # Each scan prunes to 90%, the next ones do not rescan
+        assert sum(f.stat().st_size for f in tmp_path.iterdir()) <= 1000
+
+    def test_cache_io_runs_off_the_event_loop(self, pdf_cache, monkeypatch):
+        loop_threads = []
+        original_get = PDFCache.get
+        monkeypatch.setattr(PDFCache, "get",
+                            lambda self, key: (loop_threads.append(threading.current_thread()), original_get(self, key))[1])
+        service = PDFRenderService(pdf_cache, max_workers=0, render_func=fake_render)
+
+        async def scenario():
+            await service.render_async(QUOTE, COMPANY)
+            return threading.current_thread()
+
+        loop_thread = asyncio.run(scenario())
+
+        assert loop_threads and loop_thread not in loop_threads
+
+
+class TestPDFRenderService:
+
+    def test_second_render_served_from_cache(self, pdf_cache):
+        service = PDFRenderService(pdf_cache, max_workers=0, render_func=fake_render)
+
+        first = asyncio.run(service.render_async(QUOTE, COMPANY))
+        second = asyncio.run(service.render_async(QUOTE, COMPANY))
+
+        assert first == second
+        assert service.renders == 1
+        assert service.render(QUOTE, COMPANY) == first
+
+    def test_renders_in_process_pool(self, pdf_cache):
+        service = PDFRenderService(pdf_cache, max_workers=1, render_func=fake_render, initializer=None)
+        try:
+            content = asyncio.run(service.render_async(QUOTE, COMPANY))
+        finally:
+            service.shutdown()
+
+        assert content.startswith(b"%PDF Cliente")
+        assert content != f"%PDF Cliente {os.getpid()}".encode()
+
+    def test_pending_renders_are_bounded(self, pdf_cache):
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def slow_render(quote_data, company_info):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return b"%PDF"
+
+        service = PDFRenderService(pdf_cache, max_workers=0, max_pending=2, render_func=slow_render)
+
+        async def burst():
+            await asyncio.gather(*(
+                service.render_async(dict(QUOTE, total_final=str(i)), COMPANY) for i in range(6)
+            ))
+
+        asyncio.run(burst())
+        assert peak[0] <= 2
+        assert service.renders == 6
+
+    def test_event_loop_keeps_running_while_rendering(self, pdf_cache):
+        def slow_render(quote_data, company_info):
+            time.sleep(0.2)
+            return b"%PDF"
+
+        service = PDFRenderService(pdf_cache, max_workers=0, render_func=slow_render)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def scenario():
+            await asyncio.gather(service.render_async(QUOTE, COMPANY), ticker())
+
+        asyncio.run(scenario())
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.2
+
+
+    def test_failed_warm_up_is_logged(self, monkeypatch, caplog):
+        def broken_renderer():
+            raise OSError("cannot load library 'libpango-1.0-0'")
+
+        # Stands in for services.pdf_service, whose import loads WeasyPrint
+        monkeypatch.setitem(sys.modules, "services.pdf_service",
+                            types.SimpleNamespace(get_pdf_renderer=broken_renderer))
+
+        with caplog.at_level(logging.WARNING, logger="services.pdf_render_service"):
+            warm_up_render_process()
+
+        assert "PDF renderer warm-up failed: cannot load library" in caplog.text
+
+
+class TestPDFJobManager:
+
+    def test_enqueue_poll_download(self, pdf_cache):
+        manager = PDFJobManager(PDFRenderService(pdf_cache, max_workers=0, render_func=fake_render))
+
+        async def scenario():
+            job = await manager.enqueue("user", 7, QUOTE, COMPANY)
+            assert (await manager.get_status(job.job_id, 7))["status"] in ("queued", "running")
+            await asyncio.sleep(0.1)
+            return (job, await manager.get_status(job.job_id, 7), await manager.get_status(job.job_id, 8),
+                    await manager.get_result(job.job_id))
+
+        job, status, other_quote, result = asyncio.run(scenario())
+
+        assert job.job_id == pdf_cache_key(QUOTE, COMPANY)
+        assert status["status"] == "done"
+        assert other_quote is None
+        assert result.startswith(b"%PDF")
+
+    def test_done_on_any_worker_sharing_the_cache(self, pdf_cache):
+        PDFRenderService(pdf_cache, max_workers=0, render_func=fake_render).render(QUOTE, COMPANY)
+        other_worker = PDFJobManager(PDFRenderService(pdf_cache, max_workers=0, render_func=fake_render))
+
+        status = asyncio.run(other_worker.get_status(pdf_cache_key(QUOTE, COMPANY), 7))
+
+        assert status["status"] == "done"
+
+    def test_failed_job_reports_error(self, pdf_cache):
+        manager = PDFJobManager(PDFRenderService(pdf_cache, max_workers=0, render_func=failing_render))
+
+        async def scenario():
+            job = await manager.enqueue("user", 7, QUOTE, COMPANY)
+            await asyncio.sleep(0.1)
+            return await manager.get_status(job.job_id, 7), await manager.get_result(job.job_id)
+
+        status, result = asyncio.run(scenario())
+
+        assert status["status"] == "failed"
+        assert "plantilla inválida" in status["error"]
+        assert result is None
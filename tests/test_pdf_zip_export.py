@@ -0,0 +1,161 @@
+"""
+Tests for the multi-quote PDF ZIP export (services/pdf_zip_export.py and
+the DatabaseQuoteService export queries)
+"""
+
+import asyncio
+import io
+import time
+import uuid
+import zipfile
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from database import Quote, DatabaseQuoteService
+from services.pdf_render_service import PDFCache, PDFRenderService
+from services.pdf_zip_export import stream_quote_pdfs_zip
+
+
+def fake_render(quote_data, company_info):
+    if quote_data.get("broken"):
+        raise ValueError("plantilla inválida")
+    time.sleep(quote_data.get("delay", 0))
+    return f"%PDF {quote_data['n']}".encode()
+
+
+@pytest.fixture
+def render_service(tmp_path):
+    return PDFRenderService(PDFCache(str(tmp_path / "pdf"), 1024 * 1024), max_workers=0,
+                            max_pending=4, render_func=fake_render)
+
+
+def _collect(render_service, quotes, window=None):
+    async def scenario():
+        return [chunk async for chunk in stream_quote_pdfs_zip(render_service, quotes, None, window=window)]
+    return asyncio.run(scenario())
+
+
+class TestStreamQuotePdfsZip:
+
+    def test_archive_has_one_pdf_per_quote_in_order(self, render_service):
+        # Later quotes render faster: entries must still follow the input order
+        quotes = [(i, {"n": i, "delay": 0.02 * (5 - i)}) for i in range(1, 6)]
+
+        chunks = _collect(render_service, quotes)
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert archive.namelist() == [f"cotizacion_{i}.pdf" for i in range(1, 6)]
+        assert archive.read("cotizacion_3.pdf") == b"%PDF 3"
+        # Streamed: one chunk per PDF plus the central directory
+        assert len(chunks) == 6
+
+    def test_quotes_are_consumed_lazily(self, render_service):
+        consumed = []
+
+        def quotes():
+            for i in range(20):
+                consumed.append(i)
+                yield i, {"n": i}
+
+        async def scenario():
+            stream = stream_quote_pdfs_zip(render_service, quotes(), None, window=3)
+            await stream.__anext__()
+            seen = len(consumed)
+            await stream.aclose()
+            return seen
+
+        # First entry written, at most window more scheduled
+        assert asyncio.run(scenario()) <= 4
+
+    def test_accepts_async_quote_iterators(self, render_service):
+        async def quotes():
+            for i in range(1, 4):
+                yield i, {"n": i}
+
+        chunks = _collect(render_service, quotes())
+
+        assert zipfile.ZipFile(io.BytesIO(b"".join(chunks))).namelist() == [f"cotizacion_{i}.pdf" for i in range(1, 4)]
+
+    def test_event_loop_keeps_running_while_a_batch_loads(self, render_service):
+        def quotes():
+            time.sleep(0.2)  # A batch query on the sync session
+            yield 1, {"n": 1}
+
+        async def scenario():
+            ticks = 0
+            done = asyncio.Event()
+
+            async def ticker():
+                nonlocal ticks
+                while not done.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0.001)
+
+            task = asyncio.create_task(ticker())
+            chunks = [chunk async for chunk in stream_quote_pdfs_zip(render_service, quotes(), None)]
+            done.set()
+            await task
+            return chunks, ticks
+
+        chunks, ticks = asyncio.run(scenario())
+
+        assert zipfile.ZipFile(io.BytesIO(b"".join(chunks))).namelist() == ["cotizacion_1.pdf"]
+        assert ticks > 20
+
+    def test_failed_render_is_listed_in_errores(self, render_service):
+        chunks = _collect(render_service, [(1, {"n": 1}), (2, {"n": 2, "broken": True})])
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert archive.namelist() == ["cotizacion_1.pdf", "errores.txt"]
+        assert "cotizacion_2.pdf: plantilla inválida" in archive.read("errores.txt").decode()
+
+
+@pytest.fixture
+def export_db(sqlite_engine):
+    Quote.__table__.create(sqlite_engine)
+    session = sessionmaker(bind=sqlite_engine)()
+    user_id = uuid.uuid4()
+    for index, (client, month) in enumerate([("Ana", 1), ("ana", 2), ("Beto", 2), ("Ana", 3), ("Beto", 2)]):
+        session.add(Quote(
+            user_id=user_id, client_name=client, total_final=100, materials_subtotal=0, labor_subtotal=0,
+            profit_amount=0, indirect_costs_amount=0, tax_amount=0, items_count=0,
+            quote_data={"n": index}, created_at=datetime(2025, month, 15, tzinfo=timezone.utc),
+        ))
+    session.add(Quote(user_id=uuid.uuid4(), client_name="Ana", total_final=1, materials_subtotal=0,
+                      labor_subtotal=0, profit_amount=0, indirect_costs_amount=0, tax_amount=0,
+                      items_count=0, quote_data={"n": 99}))
+    session.commit()
+    yield session, user_id
+    session.close()
+
+
+class TestQuoteExportQueries:
+
+    def test_filter_by_client_ignores_case(self, export_db):
+        session, user_id = export_db
+        service = DatabaseQuoteService(session)
+
+        rows = list(service.iter_quote_data(user_id, client_name="ANA "))
+
+        assert [data["n"] for _, data in rows] == [0, 1, 3]
+        assert service.count_quotes_for_export(user_id, client_name="ana") == 3
+
+    def test_filter_by_month(self, export_db):
+        session, user_id = export_db
+        filters = {"created_from": datetime(2025, 2, 1, tzinfo=timezone.utc),
+                   "created_to": datetime(2025, 3, 1, tzinfo=timezone.utc)}
+
+        rows = list(DatabaseQuoteService(session).iter_quote_data(user_id, **filters))
+
+        assert [data["n"] for _, data in rows] == [1, 2, 4]
+
+    def test_reads_in_batches(self, export_db, query_counter):
+        session, user_id = export_db
+        query_counter.reset()
+
+        rows = list(DatabaseQuoteService(session).iter_quote_data(user_id, batch_size=2))
+
+        assert len(rows) == 5
+        assert query_counter.count == 3
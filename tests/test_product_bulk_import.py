@@ -0,0 +1,117 @@
+"""
+Tests for the bulk product/BOM CSV import (ProductBOMCSVService.import_products_bulk)
+"""
+
+import csv
+import io
+import json
+
+from database import AppProduct, DatabaseProductService
+from security.formula_evaluator import formula_evaluator
+from services.product_bom_csv_service import ProductBOMCSVService
+
+BOM = [{"material_id": 1, "material_type": "PERFIL", "quantity_formula": "2 * width_m + 2 * height_m"},
+       {"material_id": 2, "material_type": "PERFIL", "quantity_formula": "math.ceil(height_m) * 2"}]
+
+
+def _csv(rows):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=ProductBOMCSVService.CSV_HEADERS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({header: row.get(header, "") for header in ProductBOMCSVService.CSV_HEADERS})
+    return output.getvalue()
+
+
+def _create(name, bom=BOM):
+    return {"action": "create", "name": name, "window_type": "corrediza", "aluminum_line": "nacional_serie_3",
+            "min_width_cm": "50", "max_width_cm": "300", "min_height_cm": "50", "max_height_cm": "250",
+            "bom_json": json.dumps(bom)}
+
+
+class TestBulkProductImport:
+
+    def test_creates_updates_and_deletes_in_one_transaction(self, catalog_db):
+        service = ProductBOMCSVService(catalog_db)
+        rows = [_create(f"Serie nueva {i}") for i in range(20)]
+        rows += [{"action": "update", "id": "1", "max_width_cm": "320"}, {"action": "delete", "id": "3"}]
+        commits = []
+        original_commit = catalog_db.commit
+        catalog_db.commit = lambda: (commits.append(1), original_commit())
+
+        results = service.import_products_bulk(_csv(rows))
+
+        assert results["summary"] == {"created": 20, "updated": 1, "deleted": 1, "unchanged": 0, "skipped": 0}
+        assert len(commits) == 1
+        catalog_db.expire_all()
+        products = DatabaseProductService(catalog_db)
+        assert products.get_product_by_id(1).max_width_cm == 320
+        assert products.get_product_by_id(1).bom  # BOM kept when bom_json is empty
+        assert products.get_product_by_id(3) is None
+        created = [r for r in results["success"] if r["action"] == "created"]
+        assert products.get_product_by_id(created[0]["product_id"]).bom[0]["quantity_formula"] == BOM[0]["quantity_formula"]
+
+    def test_dry_run_reports_diff_without_writing(self, catalog_db):
+        before = catalog_db.query(AppProduct).count()
+        current_width = DatabaseProductService(catalog_db).get_product_by_id(1).max_width_cm
+        rows = [_create("Vista previa"), {"action": "update", "id": "1", "max_width_cm": "320"},
+                {"action": "update", "id": "2",
+                 "max_width_cm": str(DatabaseProductService(catalog_db).get_product_by_id(2).max_width_cm)}]
+
+        results = ProductBOMCSVService(catalog_db).import_products_bulk(_csv(rows), dry_run=True)
+
+        assert catalog_db.query(AppProduct).count() == before
+        diff = {entry["row"]: entry for entry in results["diff"]}
+        assert diff[2]["action"] == "created" and diff[2]["changes"]["name"]["to"] == "Vista previa"
+        assert diff[3]["changes"] == {"max_width_cm": {"from": str(current_width), "to": "320"}}
+        assert diff[4]["action"] == "unchanged"
+        assert results["summary"]["unchanged"] == 1
+
+    def test_each_formula_compiled_once_and_catalog_loaded_once(self, catalog_db, query_counter, monkeypatch):
+        compiled = []
+        original = formula_evaluator.compile_formula
+        monkeypatch.setattr(formula_evaluator, "compile_formula", lambda f: (compiled.append(f), original(f))[1])
+        rows = [_create(f"Producto {i}") for i in range(50)]
+
+        query_counter.reset()
+        results = ProductBOMCSVService(catalog_db).import_products_bulk(_csv(rows), dry_run=True)
+
+        assert results["summary"]["created"] == 50
+        assert sorted(compiled) == sorted(item["quantity_formula"] for item in BOM)
+        # Material ids only (no product rows are referenced)
+        assert query_counter.count == 1
+
+    def test_rejects_unknown_materials_and_bad_formulas(self, catalog_db):
+        rows = [
+            _create("Material inexistente", bom=[dict(BOM[0], material_id=9999)]),
+            _create("Fórmula inválida", bom=[dict(BOM[0], quantity_formula="2 * ancho_m")]),
+            {"action": "update", "id": "9999", "name": "Nadie"},
+            _create("Correcto"),
+        ]
+
+        results = ProductBOMCSVService(catalog_db).import_products_bulk(_csv(rows))
+
+        errors = {error["row"]: error["error"] for error in results["errors"]}
+        assert "Material ID 9999 in BOM item 1 not found" == errors[2]
+        assert errors[3].startswith("Invalid quantity formula in BOM item 1")
+        assert errors[4] == "Product with ID 9999 not found"
+        assert results["summary"]["created"] == 1
+
+    def test_a_product_is_changed_by_one_row_only(self, catalog_db):
+        rows = [{"action": "update", "id": "1", "max_width_cm": "320"},
+                {"action": "update", "id": "1", "max_width_cm": "330"},
+                {"action": "delete", "id": "1"}]
+
+        results = ProductBOMCSVService(catalog_db).import_products_bulk(_csv(rows))
+
+        errors = {error["row"]: error["error"] for error in results["errors"]}
+        assert errors[3] == errors[4] == "Product with ID 1 already updated or deleted by an earlier row"
+        assert results["summary"]["updated"] == 1 and results["summary"]["skipped"] == 2
+        catalog_db.expire_all()
+        assert DatabaseProductService(catalog_db).get_product_by_id(1).max_width_cm == 320
+
+    def test_created_products_are_windows(self, catalog_db):
+        results = ProductBOMCSVService(catalog_db).import_products_bulk(_csv([_create("Ventana nueva")]))
+
+        product = DatabaseProductService(catalog_db).get_product_by_id(results["success"][0]["product_id"])
+        assert product.product_category == "window"
@@ -0,0 +1,146 @@
+"""
+Tests for precompiled per-product cost kernels (services/product_cost_kernel.py)
+
+- Kernel material costs match a line-by-line BOM evaluation
+- Kernels are reused across catalog cache invalidations while updated_at is unchanged
+- Product edits (new updated_at) build a new kernel
+- Missing material / bad formula errors keep the calculator's messages
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from database import AppProduct as DBAppProduct, DatabaseMaterialService
+from models.product_bom_models import MaterialType, MaterialUnit
+from models.quote_models import WindowItem
+from security.formula_evaluator import formula_evaluator
+from services.catalog_cache import bump_catalog_version
+from services.product_bom_service_db import ProductBOMServiceDB
+from services.product_cost_kernel import ProductCostKernel, ProductKernelCache, product_kernel_cache
+
+
+def _item(product_id=1, width=150, height=120, quantity=2, color=None):
+    return WindowItem(
+        product_bom_id=product_id,
+        width_cm=Decimal(str(width)),
+        height_cm=Decimal(str(height)),
+        quantity=quantity,
+        selected_profile_color=color,
+        selected_glass_material_id=9,
+    )
+
+
+def _formula_names(item):
+    width_m = item.width_cm / Decimal('100')
+    height_m = item.height_cm / Decimal('100')
+    return formula_evaluator.prepare_variables({
+        'width_m': width_m,
+        'height_m': height_m,
+        'width_cm': item.width_cm,
+        'height_cm': item.height_cm,
+        'quantity': item.quantity,
+        'area_m2': width_m * height_m,
+        'perimeter_m': 2 * (width_m + height_m),
+    })
+
+
+def _reference_costs(item, service):
+    """Line-by-line BOM evaluation, as the calculator did before kernels"""
+    product = service.get_product(item.product_bom_id)
+    totals = {bucket: Decimal('0') for bucket in (MaterialType.PERFIL, MaterialType.HERRAJE, MaterialType.CONSUMIBLE)}
+    names = _formula_names(item)
+    for bom_item in product.bom:
+        material = service.get_material(bom_item.material_id)
+        quantity = max(formula_evaluator.compile_formula(bom_item.quantity_formula).evaluate_prepared(names), Decimal('0'))
+        quantity *= bom_item.waste_factor
+        if material.selling_unit_length_m and material.unit == MaterialUnit.ML:
+            quantity = Decimal(str(math.ceil(quantity / material.selling_unit_length_m))) * material.selling_unit_length_m
+        price = material.cost_per_unit
+        if bom_item.material_type == MaterialType.PERFIL and item.selected_profile_color:
+            price = service.get_material_color_price(material.id, item.selected_profile_color) or price
+        if bom_item.material_type in totals:
+            totals[bom_item.material_type] += quantity * price * item.quantity
+    return totals
+
+
+def _touch_product(db, product_id, updated_at):
+    db.query(DBAppProduct).filter(DBAppProduct.id == product_id).update({"updated_at": updated_at})
+    db.commit()
+    bump_catalog_version()
+
+
+class TestProductCostKernel:
+
+    @pytest.mark.parametrize("product_id,color", [(1, None), (1, 2), (2, 3), (3, None)])
+    def test_material_costs_match_line_by_line(self, catalog_db, product_id, color):
+        service = ProductBOMServiceDB(catalog_db)
+        item = _item(product_id, 100, 90, 3, color)
+        kernel = service.get_cost_kernel(product_id)
+
+        assert kernel.material_costs(item, _formula_names(item), service) == _reference_costs(item, service)
+
+    def test_material_not_found_message(self, catalog_db):
+        service = ProductBOMServiceDB(catalog_db)
+        product = service.get_product(1)
+        broken = product.model_copy(update={"bom": [product.bom[0].model_copy(update={"material_id": 999})]})
+
+        with pytest.raises(ValueError, match="Material con ID 999 referenciado en BOM de"):
+            ProductCostKernel(broken).material_costs(_item(), _formula_names(_item()), service)
+
+    def test_bad_formula_reported_when_priced(self, catalog_db):
+        service = ProductBOMServiceDB(catalog_db)
+        product = service.get_product(1)
+        broken = product.model_copy(update={"bom": [product.bom[0].model_copy(update={"quantity_formula": "width_m +"})]})
+
+        kernel = ProductCostKernel(broken)
+
+        with pytest.raises(ValueError, match="Error al evaluar fórmula 'width_m \\+'"):
+            kernel.material_costs(_item(), _formula_names(_item()), service)
+
+
+class TestProductKernelCache:
+
+    def test_get_or_build_keyed_by_updated_at(self):
+        cache = ProductKernelCache(max_size=2)
+        built = []
+
+        def build():
+            built.append(1)
+            return object()
+
+        first = cache.get_or_build(1, "t1", build)
+        assert cache.get_or_build(1, "t1", build) is first
+        assert cache.get_or_build(1, "t2", build) is not first
+        cache.get_or_build(2, "t1", build)
+
+        assert len(built) == 3
+        assert cache.get_stats()["size"] == 2
+        assert cache.get_stats()["hits"] == 1
+
+    def test_kernel_survives_catalog_version_bump(self, catalog_db):
+        kernel = ProductBOMServiceDB(catalog_db).get_cost_kernel(1)
+
+        # A material edit invalidates cached rows but not the product's kernel
+        DatabaseMaterialService(catalog_db).update_material(10, cost_per_unit=Decimal("150.00"))
+
+        assert ProductBOMServiceDB(catalog_db).get_cost_kernel(1) is kernel
+
+    def test_product_edit_builds_new_kernel(self, catalog_db):
+        kernel = ProductBOMServiceDB(catalog_db).get_cost_kernel(1)
+
+        _touch_product(catalog_db, 1, datetime.now(timezone.utc) + timedelta(minutes=1))
+
+        fresh = ProductBOMServiceDB(catalog_db).get_cost_kernel(1)
+        assert fresh is not kernel
+        assert fresh.product.id == 1
+
+    def test_snapshot_shares_kernels(self, catalog_db):
+        service = ProductBOMServiceDB(catalog_db)
+        snapshot = service.load_catalog_snapshot([_item(1), _item(2)])
+
+        assert snapshot.products[1] is snapshot.kernels[1].product
+        assert ProductBOMServiceDB(catalog_db, catalog_cache=None).get_cost_kernel(1) is snapshot.kernels[1]
+        assert product_kernel_cache.get_stats()["size"] == 2
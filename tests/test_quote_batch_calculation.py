@@ -0,0 +1,215 @@
+"""
+Tests for batch quote calculation (bulk re-pricing)
+
+calculate_window_items_batch / calculate_quotes_batch must return exactly
+what the one-at-a-time functions return, including their errors.
+"""
+
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.routes.quotes import (
+    calculate_window_item_from_bom,
+    calculate_window_item_cached,
+    calculate_window_items_batch,
+    calculate_complete_quote,
+    calculate_quotes_batch,
+    quote_request_from_saved_quote,
+    reprice_user_quotes,
+)
+from database import DatabaseMaterialService
+from services.product_bom_service_db import ProductBOMServiceDB
+from services.quote_item_cache import quote_item_cache
+from models.quote_models import WindowItem, QuoteRequest, Client, GlassType
+
+
+def _item(product_id, width, height, quantity=1, color=None, glass_id=None, glass_type=None):
+    return WindowItem(
+        product_bom_id=product_id,
+        width_cm=Decimal(str(width)),
+        height_cm=Decimal(str(height)),
+        quantity=quantity,
+        selected_profile_color=color,
+        selected_glass_material_id=glass_id,
+        selected_glass_type=glass_type,
+    )
+
+
+def _outcome(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    except ValueError as e:
+        return ("error", str(e))
+
+
+def _comparable(calculation):
+    if isinstance(calculation, (ValueError, tuple)):
+        return ("error", str(calculation if isinstance(calculation, ValueError) else calculation[1]))
+    data = calculation.model_dump()
+    data.pop("calculated_at", None)
+    data.pop("valid_until", None)
+    return data
+
+
+@pytest.fixture
+def mixed_items():
+    """Valid items sharing products/dimensions plus every kind of invalid item"""
+    return [
+        _item(1, 150, 120, 2, color=2, glass_id=9),
+        _item(1, 150, 120, 2, color=3, glass_id=10),
+        _item(1, 100, 100, 1, glass_type=GlassType.BRONCE_6MM),
+        _item(2, 100, 100, 3, color=2, glass_type=GlassType.TEMPLADO_6MM),
+        _item(2, 100, 100, 3, color=2, glass_id=15),
+        _item(3, 80, 60, 4, glass_id=14),
+        _item(3, 500, 60, 1, glass_id=14),          # out of range
+        _item(1, 150, 120, 1, glass_id=3),          # not a glass material
+        _item(1, 150, 120, 1, glass_id=999),        # unknown glass
+        _item(99, 100, 100, 1, glass_id=9),         # unknown product
+    ]
+
+
+class TestBatchItemCalculation:
+
+    def test_batch_matches_single_item_calculation(self, catalog_db, mixed_items):
+        service = ProductBOMServiceDB(catalog_db)
+        expected = [_comparable(_outcome(calculate_window_item_from_bom, item, service)) for item in mixed_items]
+
+        results = calculate_window_items_batch(mixed_items, service)
+
+        assert [_comparable(r) for r in results] == expected
+        assert sum(isinstance(r, ValueError) for r in results) == 4
+
+    def test_labor_overrides_applied_per_item(self, catalog_db, mixed_items):
+        service = ProductBOMServiceDB(catalog_db)
+        overrides = [Decimal("50") if i % 2 else None for i in range(len(mixed_items))]
+        expected = [
+            _comparable(_outcome(calculate_window_item_from_bom, item, service, override))
+            for item, override in zip(mixed_items, overrides)
+        ]
+
+        results = calculate_window_items_batch(mixed_items, service, overrides)
+
+        assert [_comparable(r) for r in results] == expected
+
+
+class TestBatchQuoteCalculation:
+
+    @pytest.fixture
+    def quote_requests(self, mixed_items):
+        return [
+            QuoteRequest(client=Client(name="A"), items=mixed_items[:3]),
+            QuoteRequest(client=Client(name="B"), items=mixed_items[3:6], profit_margin=Decimal("0.30"),
+                         labor_rate_per_m2_override=Decimal("40")),
+            QuoteRequest(client=Client(name="C"), items=mixed_items[5:8]),
+            QuoteRequest(client=Client(name="D"), items=mixed_items[:1], tax_rate=Decimal("0.08")),
+        ]
+
+    def test_batch_matches_complete_quote(self, catalog_db, quote_requests):
+        expected = [_comparable(_outcome(calculate_complete_quote, r, catalog_db)) for r in quote_requests]
+
+        results = calculate_quotes_batch(quote_requests, catalog_db)
+
+        assert [_comparable(r) for r in results] == expected
+        assert isinstance(results[2], ValueError)
+
+    def test_batch_uses_one_snapshot(self, catalog_db, query_counter, quote_requests):
+        query_counter.reset()
+        calculate_quotes_batch(quote_requests * 20, catalog_db)
+        assert query_counter.count <= 3
+
+    def test_rates_are_recorded(self, catalog_db, quote_requests):
+        result = calculate_quotes_batch(quote_requests[1:2], catalog_db)[0]
+        assert result.profit_margin == Decimal("0.30")
+        assert result.labor_rate_per_m2_override == Decimal("40")
+
+
+class TestQuoteItemCaching:
+
+    def test_recalculation_reuses_unchanged_items(self, catalog_db, query_counter, mixed_items):
+        request = QuoteRequest(client=Client(name="A"), items=mixed_items[:6])
+        first = calculate_complete_quote(request, catalog_db)
+
+        edited = request.model_copy(update={"items": mixed_items[:5] + [_item(3, 80, 60, 5, glass_id=14)]})
+        query_counter.reset()
+        second = calculate_complete_quote(edited, catalog_db)
+
+        assert quote_item_cache.get_stats()["hits"] == 5
+        assert _comparable(second.items[0]) == _comparable(first.items[0])
+        assert second.items[5].quantity == 5
+        assert query_counter.count <= 3
+
+    def test_fully_cached_quote_skips_database(self, catalog_db, query_counter, mixed_items):
+        request = QuoteRequest(client=Client(name="A"), items=mixed_items[:3], tax_rate=Decimal("0.08"))
+        first = calculate_complete_quote(request, catalog_db)
+
+        query_counter.reset()
+        second = calculate_complete_quote(request.model_copy(update={"tax_rate": Decimal("0.16")}), catalog_db)
+
+        assert query_counter.count == 0
+        assert second.materials_subtotal == first.materials_subtotal
+        assert second.tax_amount > first.tax_amount
+
+    def test_catalog_write_invalidates_items(self, catalog_db, mixed_items):
+        item = mixed_items[1]
+        service = ProductBOMServiceDB(catalog_db)
+        before = calculate_window_item_cached(item, service)
+
+        DatabaseMaterialService(catalog_db).update_material(10, cost_per_unit=Decimal("200.00"))
+
+        after = calculate_window_item_cached(item, ProductBOMServiceDB(catalog_db))
+        assert after.total_glass_cost > before.total_glass_cost
+        assert quote_item_cache.get_stats()["hits"] == 0
+
+    def test_errors_are_not_cached(self, catalog_db, mixed_items):
+        service = ProductBOMServiceDB(catalog_db)
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                calculate_window_item_cached(mixed_items[6], service)
+        assert quote_item_cache.get_stats()["size"] == 0
+
+
+class TestRepriceSavedQuotes:
+
+    def _saved_quote(self, quote_id, calculation):
+        return SimpleNamespace(
+            id=quote_id,
+            client_name=calculation.client.name,
+            client_email=None,
+            client_phone=None,
+            client_address=None,
+            notes=None,
+            quote_data=calculation.model_dump(mode="json"),
+        )
+
+    def test_rates_derived_for_older_quotes(self, catalog_db):
+        request = QuoteRequest(client=Client(name="A"), items=[_item(1, 150, 120, 2, color=2, glass_id=9)],
+                               profit_margin=Decimal("0.30"))
+        saved = self._saved_quote(1, calculate_complete_quote(request, catalog_db))
+        for key in ("profit_margin", "indirect_costs_rate", "tax_rate"):
+            saved.quote_data.pop(key)
+
+        rebuilt = quote_request_from_saved_quote(saved)
+
+        assert rebuilt.profit_margin == Decimal("0.3000")
+        assert rebuilt.items[0].selected_profile_color == 2
+
+    def test_reprice_picks_up_new_prices(self, catalog_db):
+        request = QuoteRequest(client=Client(name="A"), items=[_item(1, 150, 120, 2, glass_id=10)])
+        original = calculate_complete_quote(request, catalog_db)
+        saved_quotes = [self._saved_quote(1, original), self._saved_quote(2, original)]
+        saved_quotes[1].quote_data["items"][0]["product_bom_id"] = 99
+
+        DatabaseMaterialService(catalog_db).update_material(10, cost_per_unit=Decimal("200.00"))
+
+        with patch("app.routes.quotes.DatabaseQuoteService") as quote_service_cls:
+            quote_service = quote_service_cls.return_value
+            quote_service.get_quotes_by_user.return_value = saved_quotes
+            results = reprice_user_quotes("user-id", catalog_db, save=True)
+
+        assert [r.quote_id for r in results] == [1, 2]
+        assert results[0].calculation.total_final > original.total_final
+        assert results[1].error is not None
+        quote_service.update_quote.assert_called_once()
+        assert quote_service.update_quote.call_args[0][0] == 1
@@ -0,0 +1,83 @@
+"""
+Tests for the per-item quote calculation cache (services/quote_item_cache.py)
+"""
+
+from decimal import Decimal
+
+from models.quote_models import WindowItem, WindowCalculation, GlassType, WindowType, AluminumLine
+from services.catalog_cache import bump_catalog_version
+from services.quote_item_cache import QuoteItemCache, item_cache_key
+
+
+def _item(**overrides):
+    fields = dict(product_bom_id=1, width_cm=Decimal("150"), height_cm=Decimal("120"), quantity=2,
+                  selected_profile_color=2, selected_glass_material_id=9)
+    fields.update(overrides)
+    return WindowItem(**fields)
+
+
+def _calculation(item):
+    zero = Decimal("0")
+    return WindowCalculation(
+        product_bom_id=item.product_bom_id, product_bom_name="Ventana", window_type=WindowType.CORREDIZA,
+        aluminum_line=AluminumLine.SERIE_3, width_cm=item.width_cm, height_cm=item.height_cm,
+        quantity=item.quantity, area_m2=Decimal("1.8"), perimeter_m=Decimal("5.4"),
+        total_profiles_cost=Decimal("100"), total_glass_cost=zero, total_hardware_cost=zero,
+        total_consumables_cost=zero, labor_cost=zero, subtotal=Decimal("100"),
+        aluminum_length_needed=zero, aluminum_cost=zero, glass_area_needed=zero, hardware_cost=zero,
+    )
+
+
+class TestItemCacheKey:
+
+    def test_equivalent_decimals_share_key(self):
+        assert item_cache_key(_item(width_cm=Decimal("150.00")), Decimal("40.0"), 1) == \
+            item_cache_key(_item(), Decimal("40"), 1)
+
+    def test_every_priced_field_changes_key(self):
+        base = item_cache_key(_item(), None, 1)
+        variants = [
+            item_cache_key(_item(product_bom_id=2), None, 1),
+            item_cache_key(_item(height_cm=Decimal("121")), None, 1),
+            item_cache_key(_item(quantity=3), None, 1),
+            item_cache_key(_item(selected_profile_color=3), None, 1),
+            item_cache_key(_item(selected_glass_material_id=10), None, 1),
+            item_cache_key(_item(selected_glass_material_id=None, selected_glass_type=GlassType.CLARO_6MM), None, 1),
+            item_cache_key(_item(), Decimal("40"), 1),
+            item_cache_key(_item(), None, 2),
+        ]
+        assert base not in variants
+        assert len(set(variants)) == len(variants)
+
+    def test_defaults_to_current_catalog_version(self):
+        key = item_cache_key(_item())
+        bump_catalog_version()
+        assert item_cache_key(_item()) != key
+
+
+class TestQuoteItemCache:
+
+    def test_hit_returns_copy_with_item_dimensions(self):
+        cache = QuoteItemCache(max_entries=10)
+        stored = _calculation(_item())
+        key = item_cache_key(_item(), None, 1)
+        cache.put(key, stored)
+
+        item = _item(width_cm=Decimal("150.00"))
+        hit = cache.get(item_cache_key(item, None, 1), item)
+
+        assert hit is not stored
+        assert hit.width_cm == Decimal("150.00") and str(hit.width_cm) == "150.00"
+        assert hit.total_profiles_cost == stored.total_profiles_cost
+        assert cache.get_stats()["hits"] == 1
+
+    def test_miss_and_lru_eviction(self):
+        cache = QuoteItemCache(max_entries=1)
+        first, second = _item(), _item(quantity=5)
+        cache.put(item_cache_key(first, None, 1), _calculation(first))
+        cache.put(item_cache_key(second, None, 1), _calculation(second))
+
+        assert cache.get(item_cache_key(first, None, 1), first) is None
+        assert cache.get(item_cache_key(second, None, 1), second) is not None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
@@ -0,0 +1,217 @@
+"""
+Tests for quote list queries (DatabaseQuoteService / DatabaseWorkOrderService)
+
+- COUNT(*) and keyset pagination
+- Summary projections that leave the JSONB columns unloaded
+- Denormalized list columns filled on save
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.presenters.quote_presenter import QuoteListPresenter
+from database import Quote, WorkOrder, DatabaseQuoteService, DatabaseWorkOrderService
+from services.product_bom_service_db import ProductBOMServiceDB
+
+
+@pytest.fixture
+def quotes_db(sqlite_engine):
+    """Session with 25 quotes for one user (some sharing created_at) and 3 for another"""
+    Quote.__table__.create(sqlite_engine)
+    session = sessionmaker(bind=sqlite_engine)()
+    user_id, other_user_id = uuid.uuid4(), uuid.uuid4()
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for index in range(28):
+        session.add(Quote(
+            user_id=user_id if index < 25 else other_user_id,
+            client_name=f"Cliente {index}",
+            total_final=100, materials_subtotal=50, labor_subtotal=20, profit_amount=10,
+            indirect_costs_amount=10, tax_amount=10, items_count=1, quote_data={},
+            # Pairs of quotes share a timestamp: the id breaks the tie
+            created_at=start + timedelta(minutes=index // 2),
+        ))
+    session.commit()
+    yield session, user_id
+    session.close()
+
+
+class TestQuoteCount:
+
+    def test_count_quotes_by_user(self, quotes_db, query_counter):
+        session, user_id = quotes_db
+        query_counter.reset()
+
+        assert DatabaseQuoteService(session).count_quotes_by_user(user_id) == 25
+        assert query_counter.count == 1
+        assert "count" in query_counter.statements[0].lower()
+
+    def test_count_for_user_without_quotes(self, quotes_db):
+        session, _ = quotes_db
+        assert DatabaseQuoteService(session).count_quotes_by_user(uuid.uuid4()) == 0
+
+
+class TestKeysetPagination:
+
+    def test_pages_cover_all_quotes_in_order(self, quotes_db):
+        session, user_id = quotes_db
+        service = DatabaseQuoteService(session)
+        expected = [q.id for q in service.get_quotes_by_user(user_id, limit=100)]
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            quotes, cursor = service.get_quotes_page_by_user(user_id, limit=10, cursor=cursor)
+            seen.extend(q.id for q in quotes)
+            pages += 1
+            if cursor is None:
+                break
+
+        assert seen == expected
+        assert pages == 3
+
+    def test_exact_multiple_has_no_empty_last_page(self, quotes_db):
+        session, user_id = quotes_db
+        quotes, cursor = DatabaseQuoteService(session).get_quotes_page_by_user(user_id, limit=25)
+        assert len(quotes) == 25
+        assert cursor is None
+
+    def test_cursor_round_trip(self, quotes_db):
+        session, user_id = quotes_db
+        quote = DatabaseQuoteService(session).get_quotes_by_user(user_id, limit=1)[0]
+        cursor = DatabaseQuoteService.encode_quote_cursor(quote)
+
+        created_at, quote_id = DatabaseQuoteService.decode_quote_cursor(cursor)
+
+        assert quote_id == quote.id
+        assert created_at == quote.created_at
+
+    def test_invalid_cursor(self, quotes_db):
+        session, user_id = quotes_db
+        with pytest.raises(ValueError, match="Cursor de paginación inválido"):
+            DatabaseQuoteService(session).get_quotes_page_by_user(user_id, cursor="not-a-cursor")
+
+
+def _saved_quote_data(items):
+    return {
+        "client_name": "Cliente", "total_final": Decimal("1000.00"), "materials_subtotal": 0,
+        "labor_subtotal": 0, "profit_amount": 0, "indirect_costs_amount": 0, "tax_amount": 0,
+        "items_count": len(items), "quote_data": {"items": items},
+    }
+
+
+def _saved_item(index, area="1.500"):
+    return {"product_bom_id": index, "product_bom_name": f"Ventana {index}", "window_type": "corrediza",
+            "width_cm": "150.90", "height_cm": "100.00", "area_m2": area}
+
+
+class TestQuoteSummaries:
+
+    def test_create_quote_fills_summary_columns(self, quotes_db):
+        session, user_id = quotes_db
+        quote = DatabaseQuoteService(session).create_quote(user_id, _saved_quote_data(
+            [_saved_item(i) for i in range(5)]
+        ))
+
+        assert quote.total_area_m2 == Decimal("7.500")
+        assert [item["name"] for item in quote.sample_items] == ["Ventana 0", "Ventana 1", "Ventana 2"]
+        assert quote.sample_items[0] == {"window_type": "corrediza", "name": "Ventana 0",
+                                         "width_cm": 150, "height_cm": 100}
+
+    def test_update_quote_refreshes_summary_columns(self, quotes_db):
+        session, user_id = quotes_db
+        service = DatabaseQuoteService(session)
+        quote = service.create_quote(user_id, _saved_quote_data([_saved_item(1)]))
+
+        service.update_quote(quote.id, user_id, _saved_quote_data([_saved_item(7, area="2.000")]))
+
+        assert quote.total_area_m2 == Decimal("2.000")
+        assert quote.sample_items[0]["name"] == "Ventana 7"
+
+    def test_summaries_leave_quote_data_unloaded(self, quotes_db, query_counter):
+        session, user_id = quotes_db
+        DatabaseQuoteService(session).create_quote(user_id, _saved_quote_data([_saved_item(i) for i in range(4)]))
+        session.expunge_all()
+        service = DatabaseQuoteService(session)
+
+        query_counter.reset()
+        quotes = service.get_quote_summaries_by_user(user_id, limit=30)
+        page, _ = service.get_quotes_page_by_user(user_id, limit=30, summary=True)
+
+        assert len(quotes) == len(page) == 26
+        assert all("quote_data" in inspect(q).unloaded for q in quotes)
+        assert all("quote_data" not in statement for statement in query_counter.statements)
+
+    def test_presenter_uses_summary_columns(self, quotes_db, query_counter):
+        session, user_id = quotes_db
+        DatabaseQuoteService(session).create_quote(user_id, _saved_quote_data([_saved_item(i) for i in range(4)]))
+        session.expunge_all()
+        quote = DatabaseQuoteService(session).get_quote_summaries_by_user(user_id, limit=1)[0]
+
+        query_counter.reset()
+        presented = QuoteListPresenter(session).present(quote)
+
+        assert query_counter.count == 0
+        assert "quote_data" in inspect(quote).unloaded
+        assert presented["total_area"] == 6.0
+        assert presented["remaining_items"] == 1
+        assert presented["price_per_m2"] == pytest.approx(1000 / 6)
+
+    def test_work_order_summaries_leave_data_unloaded(self, quotes_db):
+        session, user_id = quotes_db
+        WorkOrder.__table__.create(session.get_bind())
+        session.add(WorkOrder(order_number="WO-2025-001", quote_id=1, user_id=user_id, client_name="Cliente",
+                              total_amount=100, materials_cost=50, labor_cost=20, work_order_data={"items": []}))
+        session.commit()
+        session.expunge_all()
+
+        work_orders = DatabaseWorkOrderService(session).get_work_order_summaries_by_user(user_id)
+
+        assert [w.order_number for w in work_orders] == ["WO-2025-001"]
+        assert "work_order_data" in inspect(work_orders[0]).unloaded
+
+
+class TestQuoteListPresenterPage:
+
+    @pytest.fixture
+    def legacy_quotes(self, quotes_db, catalog_db):
+        """30 quotes saved before the summary columns, 3 items each over products 1-3"""
+        session, _ = quotes_db
+        user_id = uuid.uuid4()
+        for index in range(30):
+            items = [dict(_saved_item(product_id), window_type=None) for product_id in (1, 2, 3)]
+            session.add(Quote(user_id=user_id, client_name=f"Legado {index}", total_final=900,
+                              materials_subtotal=0, labor_subtotal=0, profit_amount=0,
+                              indirect_costs_amount=0, tax_amount=0, items_count=3,
+                              quote_data={"items": items}))
+        session.commit()
+        session.expunge_all()
+        return session, user_id
+
+    @pytest.mark.parametrize("per_page", [5, 30])
+    def test_fixed_query_count_per_page(self, legacy_quotes, query_counter, per_page):
+        session, user_id = legacy_quotes
+        quotes = DatabaseQuoteService(session).get_quote_summaries_by_user(user_id, limit=per_page)
+
+        query_counter.reset()
+        presented = QuoteListPresenter(session).present_page(quotes)
+
+        # One query for the page's quote_data, one for its products
+        assert query_counter.count == 2
+        assert len(presented) == per_page
+        products = ProductBOMServiceDB(session)
+        assert [item["name"] for item in presented[0]["sample_items"]] == [
+            products.get_product(product_id).name for product_id in (1, 2, 3)
+        ]
+
+    def test_page_matches_row_by_row(self, legacy_quotes):
+        session, user_id = legacy_quotes
+        expected = [QuoteListPresenter(session).present(q)
+                    for q in DatabaseQuoteService(session).get_quotes_by_user(user_id, limit=10)]
+        session.expunge_all()
+
+        quotes = DatabaseQuoteService(session).get_quote_summaries_by_user(user_id, limit=10)
+        assert QuoteListPresenter(session).present_page(quotes) == expected
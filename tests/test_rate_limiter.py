@@ -0,0 +1,155 @@
+"""
+Tests for the GCRA rate limiter (security/rate_limiter.py) and its use in
+SecurityMiddleware
+
+A fake clock drives the limiters. Throughput is measured by
+scripts/benchmark_rate_limiter.py; the benchmark test here only guards
+against per-request work that grows with the number of clients.
+"""
+
+import asyncio
+import sqlite3
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from security.middleware import SecurityMiddleware
+from security.rate_limiter import InMemoryRateLimiter, RateLimiter, SQLiteRateLimiter, create_rate_limiter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter_factory(request, tmp_path):
+    created = []
+
+    def factory(limit, window, clock):
+        if request.param == "memory":
+            limiter = InMemoryRateLimiter(limit, window, shards=4, clock=clock)
+        else:
+            limiter = SQLiteRateLimiter(limit, window, str(tmp_path / "rate_limit.sqlite3"), clock=clock)
+        created.append(limiter)
+        return limiter
+
+    yield factory
+    for limiter in created:
+        if isinstance(limiter, SQLiteRateLimiter):
+            limiter.close()
+
+
+class TestGCRA:
+
+    def test_burst_then_one_request_per_interval(self, limiter_factory):
+        clock = FakeClock()
+        limiter = limiter_factory(5, 10, clock)
+
+        assert [limiter.allow("10.0.0.1") for _ in range(6)] == [True] * 5 + [False]
+        assert limiter.allow("10.0.0.2") is True  # Other clients keep their own bucket
+
+        clock.now += 2  # One interval (10s / 5) refills one request
+        assert limiter.allow("10.0.0.1") is True
+        assert limiter.allow("10.0.0.1") is False
+
+        assert limiter.get_stats()["denied"] == 2
+
+    def test_expired_clients_are_evicted(self, limiter_factory):
+        clock = FakeClock()
+        limiter = limiter_factory(5, 10, clock)
+        for i in range(20):
+            limiter.allow(f"10.0.0.{i}")
+        assert len(limiter) == 20
+
+        clock.now += 10
+        for _ in range(4):  # One shard per step in memory, everything at once in SQLite
+            limiter.evict_expired()
+
+        assert len(limiter) == 0
+
+    def test_sqlite_limit_is_shared_between_processes(self, tmp_path):
+        clock = FakeClock()
+        path = str(tmp_path / "shared.sqlite3")
+        worker_a = SQLiteRateLimiter(3, 60, path, clock=clock)
+        worker_b = SQLiteRateLimiter(3, 60, path, clock=clock)
+        try:
+            assert [worker_a.allow("10.0.0.1"), worker_b.allow("10.0.0.1"), worker_a.allow("10.0.0.1")] == [True] * 3
+            assert worker_b.allow("10.0.0.1") is False
+        finally:
+            worker_a.close()
+            worker_b.close()
+
+    def test_sqlite_fails_open_when_the_file_is_locked(self, tmp_path):
+        path = str(tmp_path / "locked.sqlite3")
+        limiter = SQLiteRateLimiter(1, 60, path, clock=FakeClock())
+        other_worker = sqlite3.connect(path, isolation_level=None)
+        try:
+            assert limiter.allow("10.0.0.1") is True
+            other_worker.execute("BEGIN IMMEDIATE")  # Holds the write lock
+
+            start = time.perf_counter()
+            allowed = limiter.allow("10.0.0.1")  # Over the limit, but the check cannot run
+            waited = time.perf_counter() - start
+            stats = limiter.get_stats()
+        finally:
+            other_worker.rollback()
+            other_worker.close()
+            limiter.close()
+
+        assert allowed is True
+        assert stats["lock_timeouts"] == 1
+        assert waited < 1
+
+    def test_backends_must_implement_the_algorithm(self):
+        with pytest.raises(TypeError):
+            RateLimiter(10, 60)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_rate_limiter(10, 60, backend="redis")
+
+    @pytest.mark.benchmark
+    def test_check_cost_does_not_grow_with_clients(self):
+        limiter = InMemoryRateLimiter(100, 60)
+        ips = [f"10.0.{i // 256}.{i % 256}" for i in range(10000)]
+        for ip in ips:
+            limiter.allow(ip)
+
+        start = time.perf_counter()
+        for ip in ips * 5:
+            limiter.allow(ip)
+        per_check = (time.perf_counter() - start) / (len(ips) * 5)
+
+        assert len(limiter) == 10000
+        assert per_check < 50e-6  # The old per-request scan of 10k clients took milliseconds
+
+
+class TestSecurityMiddleware:
+
+    def test_rejects_over_limit_and_starts_eviction_timer(self):
+        limiter = InMemoryRateLimiter(2, 60)
+        app = FastAPI()
+        app.add_middleware(SecurityMiddleware, rate_limiter=limiter)
+
+        @app.get("/api/ping")
+        async def ping():
+            return {"ok": True}
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                codes = [(await client.get("/api/ping")).status_code for _ in range(3)]
+            started = limiter._eviction_handle is not None
+            limiter.stop_eviction()
+            return codes, started
+
+        codes, started = asyncio.run(scenario())
+
+        assert codes == [200, 200, 429]
+        assert started
@@ -0,0 +1,95 @@
+"""
+Tests for the validated-token cache (services/session_cache.py)
+"""
+
+import asyncio
+import datetime as dt
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.dependencies.auth import get_current_user_from_cookie
+from database import DatabaseUserService, User, UserSession
+from services.session_cache import SessionCache, session_cache
+
+
+def _user(email="cache@example.com"):
+    return User(id=uuid.uuid4(), email=email, hashed_password="hash",
+                full_name="Cache User", is_active=True)
+
+
+def _in(seconds):
+    return dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=seconds)
+
+
+class TestSessionCache:
+
+    def test_hit_returns_fresh_user_without_password_hash(self):
+        cache = SessionCache(ttl_seconds=60)
+        user = _user()
+        cache.put("token", user, _in(3600))
+
+        first, second = cache.get("token"), cache.get("token")
+
+        assert first.id == user.id and first.email == user.email
+        assert first is not second
+        assert first.hashed_password is None
+        assert cache.get_stats()["hits"] == 2
+
+    def test_session_expiry_caps_ttl(self):
+        cache = SessionCache(ttl_seconds=60)
+        cache.put("token", _user(), _in(0.05))
+        assert cache.get("token") is not None
+
+        time.sleep(0.06)
+
+        assert cache.get("token") is None
+        assert cache.get_stats()["size"] == 0
+
+    def test_invalidate_and_bound(self):
+        cache = SessionCache(ttl_seconds=60, max_entries=2)
+        user = _user()
+        cache.put("a", user)
+        cache.put("b", user)
+        cache.put("c", _user("other@example.com"))
+
+        assert cache.get("a") is None  # Least recently used, evicted
+        assert cache.invalidate("c") is True
+        assert cache.invalidate("c") is False
+        stats = cache.get_stats()
+        assert (stats["size"], stats["evictions"], stats["invalidations"]) == (1, 1, 1)
+
+
+class TestCookieAuthentication:
+
+    @pytest.fixture
+    def db(self, sqlite_engine):
+        User.__table__.create(sqlite_engine)
+        UserSession.__table__.create(sqlite_engine)
+        session_cache.clear()
+        db = sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)()
+        yield db
+        db.close()
+        session_cache.clear()
+
+    def test_second_request_skips_queries_until_logout(self, db, query_counter):
+        users = DatabaseUserService(db)
+        user = users.create_user("cookie@example.com", "hash", "Cookie User")
+        users.create_session(user.id, "token-cookie", _in(3600))
+        request = SimpleNamespace(cookies={"access_token": "token-cookie"})
+
+        query_counter.reset()
+        assert asyncio.run(get_current_user_from_cookie(request, db)).id == user.id
+        assert query_counter.count == 2
+
+        query_counter.reset()
+        assert asyncio.run(get_current_user_from_cookie(request, db)).id == user.id
+        assert query_counter.count == 0
+
+        users.invalidate_session("token-cookie")
+
+        assert asyncio.run(get_current_user_from_cookie(request, db)) is None
+        assert session_cache.get_stats()["invalidations"] == 1